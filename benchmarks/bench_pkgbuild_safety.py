@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Benchmark analyze_pkgbuild_safety over a corpus of PKGBUILDs.
+
+Compares the precompiled single-pass scanner against the previous
+per-pattern re.search loop and checks that both report the same issues.
+
+Usage:
+    python benchmarks/bench_pkgbuild_safety.py [PATH ...] [--rounds N]
+
+Each PATH is a PKGBUILD file or a directory searched recursively for
+files named PKGBUILD (for example an AUR helper clone cache or a
+`pkgctl repo clone` checkout). Without paths, the yay and paru clone
+caches in ~/.cache are used.
+"""
+
+import argparse
+import logging
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from arch_ops_server.aur import (
+    PKGBUILD_DANGEROUS_PATTERNS,
+    PKGBUILD_INFO_PATTERNS,
+    PKGBUILD_SUSPICIOUS_PATTERNS,
+    analyze_pkgbuild_safety,
+)
+
+DEFAULT_CORPUS_DIRS = [
+    Path.home() / ".cache" / "yay",
+    Path.home() / ".cache" / "paru" / "clone",
+]
+
+
+def collect_pkgbuilds(paths: List[Path]) -> List[Tuple[Path, str]]:
+    """Read every PKGBUILD under the given files/directories."""
+    corpus = []
+    for path in paths:
+        files = [path] if path.is_file() else sorted(path.rglob("PKGBUILD"))
+        for file in files:
+            try:
+                corpus.append((file, file.read_text(encoding="utf-8", errors="replace")))
+            except OSError as e:
+                print(f"skipping {file}: {e}", file=sys.stderr)
+    return corpus
+
+
+def per_pattern_scan(content: str) -> List[Tuple[int, str]]:
+    """Line scan as done before precompilation: re.search per pattern per line."""
+    patterns = PKGBUILD_DANGEROUS_PATTERNS + PKGBUILD_SUSPICIOUS_PATTERNS + PKGBUILD_INFO_PATTERNS
+    findings = []
+    for i, line in enumerate(content.split('\n'), 1):
+        stripped_line = line.strip()
+        if stripped_line.startswith('#') or not stripped_line:
+            continue
+        for pattern, message in patterns:
+            if re.search(pattern, line, re.IGNORECASE):
+                findings.append((i, message))
+    return findings
+
+
+def line_findings(content: str) -> List[Tuple[int, str]]:
+    """Line-level findings of analyze_pkgbuild_safety in per_pattern_scan order."""
+    result = analyze_pkgbuild_safety(content)
+    findings = [
+        (item["line"], item["issue"])
+        for key in ("red_flags", "warnings", "info")
+        for item in result[key]
+        if item["line"] > 0
+    ]
+    order = {
+        message: index
+        for index, (_, message) in enumerate(
+            PKGBUILD_DANGEROUS_PATTERNS + PKGBUILD_SUSPICIOUS_PATTERNS + PKGBUILD_INFO_PATTERNS
+        )
+    }
+    return sorted(findings, key=lambda f: (f[0], order[f[1]]))
+
+
+def time_rounds(func, corpus: List[Tuple[Path, str]], rounds: int) -> float:
+    """Return the best wall time in seconds for one pass over the corpus."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _, content in corpus:
+            func(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", type=Path, help="PKGBUILD files or directories")
+    parser.add_argument("--rounds", type=int, default=5, help="timing rounds (best is reported)")
+    args = parser.parse_args()
+
+    # The analyzer logs every finding; keep the benchmark output readable
+    logging.disable(logging.CRITICAL)
+
+    paths = args.paths or [d for d in DEFAULT_CORPUS_DIRS if d.is_dir()]
+    corpus = collect_pkgbuilds(paths)
+    if not corpus:
+        print("No PKGBUILDs found; pass files or directories to scan.", file=sys.stderr)
+        return 2
+
+    mismatches = [path for path, content in corpus if per_pattern_scan(content) != line_findings(content)]
+    for path in mismatches:
+        print(f"MISMATCH: {path}", file=sys.stderr)
+
+    lines = sum(content.count('\n') + 1 for _, content in corpus)
+    per_pattern = time_rounds(per_pattern_scan, corpus, args.rounds)
+    analyzer = time_rounds(analyze_pkgbuild_safety, corpus, args.rounds)
+
+    print(f"corpus: {len(corpus)} PKGBUILDs, {lines} lines")
+    print(f"per-pattern re.search: {per_pattern * 1000:9.1f} ms  ({len(corpus) / per_pattern:8.0f} PKGBUILDs/s)")
+    print(f"analyze_pkgbuild_safety: {analyzer * 1000:7.1f} ms  ({len(corpus) / analyzer:8.0f} PKGBUILDs/s)")
+    print(f"speedup: {per_pattern / analyzer:.1f}x")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
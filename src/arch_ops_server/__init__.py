@@ -8,10 +8,18 @@ ecosystem, providing access to the Arch Wiki, AUR, and official repositories.
 
 __version__ = "3.1.0"
 
-from .wiki import search_wiki, get_wiki_page, get_wiki_page_as_text
+from .wiki import (
+    search_wiki,
+    get_wiki_page,
+    get_wiki_page_as_text,
+    get_wiki_sections,
+    get_wiki_section,
+    stream_wiki_page,
+)
 from .aur import (
     search_aur, 
     get_aur_info, 
+    get_aur_info_batch,
     get_pkgbuild, 
     get_aur_file, 
     analyze_pkgbuild_safety, 
@@ -20,14 +28,18 @@ from .aur import (
 )
 from .pacman import (
     get_official_package_info,
+    get_official_package_info_batch,
     check_updates_dry_run,
     remove_package,
     remove_packages_batch,
+    list_installed_packages,
     list_orphan_packages,
     remove_orphans,
     find_package_owner,
+    find_package_owners,
     list_package_files,
     search_package_files,
+    search_package_files_batch,
     verify_package_integrity,
     list_package_groups,
     list_group_packages,
@@ -58,6 +70,7 @@ from .mirrors import (
     list_active_mirrors,
     test_mirror_speed,
     suggest_fastest_mirrors,
+    benchmark_mirror_throughput,
     check_mirrorlist_health
 )
 from .config import (
@@ -66,7 +79,8 @@ from .config import (
     check_ignored_packages,
     get_parallel_downloads_setting
 )
-from .utils import IS_ARCH, run_command
+from .utils import IS_ARCH, run_command, capabilities
+from .http_client import http_client_lifespan
 
 # Import server from the server module
 from .server import server
@@ -87,14 +101,16 @@ async def main():
 
     logger.info("Starting Arch Linux MCP Server (STDIO)")
     logger.info(f"Running on Arch Linux: {IS_ARCH}")
+    await capabilities.probe()
 
-    # Run the server using STDIO
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    # Run the server using STDIO, keeping pooled HTTP clients open for its lifetime
+    async with http_client_lifespan():
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options()
+            )
 
 
 def main_sync():
@@ -116,9 +132,13 @@ __all__ = [
     "search_wiki",
     "get_wiki_page",
     "get_wiki_page_as_text",
+    "get_wiki_sections",
+    "get_wiki_section",
+    "stream_wiki_page",
     # AUR
     "search_aur",
     "get_aur_info",
+    "get_aur_info_batch",
     "get_pkgbuild",
     "get_aur_file",
     "analyze_pkgbuild_safety",
@@ -126,14 +146,18 @@ __all__ = [
     "install_package_secure",
     # Pacman
     "get_official_package_info",
+    "get_official_package_info_batch",
     "check_updates_dry_run",
     "remove_package",
     "remove_packages_batch",
+    "list_installed_packages",
     "list_orphan_packages",
     "remove_orphans",
     "find_package_owner",
+    "find_package_owners",
     "list_package_files",
     "search_package_files",
+    "search_package_files_batch",
     "verify_package_integrity",
     "list_package_groups",
     "list_group_packages",
@@ -160,6 +184,7 @@ __all__ = [
     "list_active_mirrors",
     "test_mirror_speed",
     "suggest_fastest_mirrors",
+    "benchmark_mirror_throughput",
     "check_mirrorlist_health",
     # Config
     "analyze_pacman_conf",
@@ -169,6 +194,7 @@ __all__ = [
     # Utils
     "IS_ARCH",
     "run_command",
+    "capabilities",
     # Main functions
     "main",
     "main_sync",
@@ -4,8 +4,12 @@ AUR (Arch User Repository) interface module.
 Provides search, package info, and PKGBUILD retrieval via AUR RPC v5.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+import os
+import re
+from typing import Dict, Any, List, Optional, Pattern, Tuple
+from urllib.parse import urlparse
 import httpx
 from datetime import datetime
 
@@ -14,8 +18,11 @@ from .utils import (
     add_aur_warning, 
     get_aur_helper,
     IS_ARCH,
-    run_command
+    run_command,
+    capabilities
 )
+from .http_client import get_http_client
+from .cache import AsyncTTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +34,52 @@ AUR_CGIT_BASE_URL = "https://aur.archlinux.org/cgit/aur.git/plain"  # No cloning
 DEFAULT_TIMEOUT = 10.0
 MAX_RESULTS = 50  # AUR RPC limit
 
+# Batched info requests: names per RPC call (keeps the URI short) and parallel calls
+AUR_INFO_CHUNK_SIZE = 150
+MAX_CONCURRENT_AUR_REQUESTS = 4
+
+# RPC response cache (AUR metadata changes on the scale of hours)
+AUR_CACHE_TTL = float(os.getenv("ARCH_OPS_AUR_CACHE_TTL", "300"))
+AUR_CACHE_MAX_ENTRIES = int(os.getenv("ARCH_OPS_AUR_CACHE_SIZE", "256"))
+
+aur_rpc_cache = AsyncTTLCache("AUR RPC", ttl=AUR_CACHE_TTL, max_entries=AUR_CACHE_MAX_ENTRIES)
+
+
+async def _aur_rpc(rpc_type: str, args: List[str]) -> Dict[str, Any]:
+    """
+    Call the AUR RPC v5 interface, serving repeated queries from the cache.
+    
+    Responses are cached per (type, args); concurrent identical calls share
+    one request. RPC error payloads and HTTP failures are not cached.
+    
+    Args:
+        rpc_type: RPC type ("search" or "info")
+        args: Search term (single item) or package names
+    
+    Returns:
+        Decoded RPC JSON response
+    
+    Raises:
+        httpx.HTTPError: On timeouts and non-2xx responses
+    """
+    async def fetch() -> Dict[str, Any]:
+        params: Dict[str, Any] = {"v": "5", "type": rpc_type}
+        if rpc_type == "search":
+            params["arg"] = args[0]
+        else:
+            params["arg[]"] = args
+        
+        client = get_http_client(AUR_RPC_URL)
+        response = await client.get(AUR_RPC_URL, params=params, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+    
+    return await aur_rpc_cache.get_or_load(
+        (rpc_type, tuple(args)),
+        fetch,
+        cache_if=lambda data: data.get("type") != "error"
+    )
+
 
 async def search_aur(query: str, limit: int = 20, sort_by: str = "relevance") -> Dict[str, Any]:
     """
@@ -45,47 +98,37 @@ async def search_aur(query: str, limit: int = 20, sort_by: str = "relevance") ->
     # Clamp limit
     limit = min(limit, MAX_RESULTS)
     
-    params = {
-        "v": "5",
-        "type": "search",
-        "arg": query
-    }
-    
     try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            response = await client.get(AUR_RPC_URL, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data.get("type") == "error":
-                return create_error_response(
-                    "AURError",
-                    data.get("error", "Unknown AUR error")
-                )
-            
-            results = data.get("results", [])
-            
-            # Apply smart ranking based on sort_by parameter
-            sorted_results = _apply_smart_ranking(results, query, sort_by)
-            
-            # Limit and format results
-            formatted_results = [
-                _format_package_info(pkg)
-                for pkg in sorted_results[:limit]
-            ]
-            
-            logger.info(f"Found {len(formatted_results)} AUR packages for '{query}'")
-            
-            # Wrap with safety warning
-            return add_aur_warning({
-                "query": query,
-                "count": len(formatted_results),
-                "total_found": len(results),
-                "sort_by": sort_by,
-                "results": formatted_results
-            })
-            
+        data = await _aur_rpc("search", [query])
+        
+        if data.get("type") == "error":
+            return create_error_response(
+                "AURError",
+                data.get("error", "Unknown AUR error")
+            )
+        
+        results = data.get("results", [])
+        
+        # Apply smart ranking based on sort_by parameter
+        sorted_results = _apply_smart_ranking(results, query, sort_by)
+        
+        # Limit and format results
+        formatted_results = [
+            _format_package_info(pkg)
+            for pkg in sorted_results[:limit]
+        ]
+        
+        logger.info(f"Found {len(formatted_results)} AUR packages for '{query}'")
+        
+        # Wrap with safety warning
+        return add_aur_warning({
+            "query": query,
+            "count": len(formatted_results),
+            "total_found": len(results),
+            "sort_by": sort_by,
+            "results": formatted_results
+        })
+        
     except httpx.TimeoutException:
         logger.error(f"AUR search timed out for query: {query}")
         return create_error_response(
@@ -128,40 +171,30 @@ async def get_aur_info(package_name: str) -> Dict[str, Any]:
     """
     logger.info(f"Fetching AUR info for: {package_name}")
     
-    params = {
-        "v": "5",
-        "type": "info",
-        "arg[]": package_name
-    }
-    
     try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            response = await client.get(AUR_RPC_URL, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data.get("type") == "error":
-                return create_error_response(
-                    "AURError",
-                    data.get("error", "Unknown AUR error")
-                )
-            
-            results = data.get("results", [])
-            
-            if not results:
-                return create_error_response(
-                    "NotFound",
-                    f"AUR package '{package_name}' not found"
-                )
-            
-            package_info = _format_package_info(results[0], detailed=True)
-            
-            logger.info(f"Successfully fetched info for {package_name}")
-            
-            # Wrap with safety warning
-            return add_aur_warning(package_info)
-            
+        data = await _aur_rpc("info", [package_name])
+        
+        if data.get("type") == "error":
+            return create_error_response(
+                "AURError",
+                data.get("error", "Unknown AUR error")
+            )
+        
+        results = data.get("results", [])
+        
+        if not results:
+            return create_error_response(
+                "NotFound",
+                f"AUR package '{package_name}' not found"
+            )
+        
+        package_info = _format_package_info(results[0], detailed=True)
+        
+        logger.info(f"Successfully fetched info for {package_name}")
+        
+        # Wrap with safety warning
+        return add_aur_warning(package_info)
+        
     except httpx.TimeoutException:
         logger.error(f"AUR info fetch timed out for: {package_name}")
         return create_error_response(
@@ -183,6 +216,111 @@ async def get_aur_info(package_name: str) -> Dict[str, Any]:
         )
 
 
+async def get_aur_info_batch(package_names: List[str]) -> Dict[str, Any]:
+    """
+    Get detailed information about several AUR packages at once.
+    
+    AUR RPC v5 accepts many arg[] values per info request, so names are
+    split into chunks of AUR_INFO_CHUNK_SIZE and the chunks are fetched
+    concurrently (at most MAX_CONCURRENT_AUR_REQUESTS at a time).
+    
+    Args:
+        package_names: Exact package names
+    
+    Returns:
+        Dict with per-package details, missing names and per-package errors,
+        wrapped with the AUR safety warning
+    """
+    if not package_names:
+        return create_error_response(
+            "ValidationError",
+            "No packages specified"
+        )
+    
+    # Deduplicate while keeping the caller's order
+    names = list(dict.fromkeys(package_names))
+    chunks = [
+        names[i:i + AUR_INFO_CHUNK_SIZE]
+        for i in range(0, len(names), AUR_INFO_CHUNK_SIZE)
+    ]
+    
+    logger.info(f"Fetching AUR info for {len(names)} packages in {len(chunks)} requests")
+    
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_AUR_REQUESTS)
+    
+    async def fetch(chunk: List[str]) -> Dict[str, Any]:
+        async with semaphore:
+            return await _fetch_aur_info_chunk(chunk)
+    
+    responses = await asyncio.gather(*(fetch(chunk) for chunk in chunks))
+    
+    found: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, Dict[str, Any]] = {}
+    
+    for chunk, response in zip(chunks, responses):
+        if response.get("error"):
+            for name in chunk:
+                errors[name] = response
+            continue
+        for pkg in response["results"]:
+            found[pkg.get("Name")] = _format_package_info(pkg, detailed=True)
+    
+    packages = {name: found[name] for name in names if name in found}
+    not_found = [name for name in names if name not in found and name not in errors]
+    
+    logger.info(f"Fetched {len(packages)}/{len(names)} AUR packages")
+    
+    return add_aur_warning({
+        "package_count": len(names),
+        "found_count": len(packages),
+        "packages": packages,
+        "not_found": not_found,
+        "errors": errors
+    })
+
+
+async def _fetch_aur_info_chunk(package_names: List[str]) -> Dict[str, Any]:
+    """
+    Run one multi-arg AUR RPC info request.
+    
+    Args:
+        package_names: Package names for this request
+    
+    Returns:
+        Dict with raw "results" or an error response
+    """
+    try:
+        data = await _aur_rpc("info", package_names)
+        
+        if data.get("type") == "error":
+            return create_error_response(
+                "AURError",
+                data.get("error", "Unknown AUR error")
+            )
+        
+        return {"results": data.get("results", [])}
+        
+    except httpx.TimeoutException:
+        logger.error(f"AUR batch info fetch timed out for {len(package_names)} packages")
+        return create_error_response(
+            "TimeoutError",
+            f"AUR info fetch timed out for {len(package_names)} packages"
+        )
+    except httpx.HTTPStatusError as e:
+        logger.error(f"AUR batch info HTTP error: {e}")
+        return create_error_response(
+            "HTTPError",
+            f"AUR info fetch failed with status {e.response.status_code}",
+            str(e)
+        )
+    except Exception as e:
+        logger.error(f"AUR batch info fetch failed: {e}")
+        return create_error_response(
+            "InfoError",
+            f"Failed to get AUR package info: {str(e)}"
+        )
+
+
 async def get_aur_file(package_name: str, filename: str = "PKGBUILD") -> str:
     """
     Fetch any file from an AUR package via cgit web interface (no cloning required).
@@ -213,20 +351,20 @@ async def get_aur_file(package_name: str, filename: str = "PKGBUILD") -> str:
     url = f"{base_url}/{filename}?h={package_name}"
     
     try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            response = await client.get(url, follow_redirects=True)
-            response.raise_for_status()
-            
-            content = response.text
-            
-            # Basic validation - ensure we got actual content
-            if not content or len(content) < 10:
-                raise ValueError(f"Retrieved {filename} appears to be empty or invalid")
-            
-            logger.info(f"Successfully fetched {filename} for {package_name} ({len(content)} bytes)")
-            
-            return content
-            
+        client = get_http_client(url)
+        response = await client.get(url, timeout=DEFAULT_TIMEOUT, follow_redirects=True)
+        response.raise_for_status()
+        
+        content = response.text
+        
+        # Basic validation - ensure we got actual content
+        if not content or len(content) < 10:
+            raise ValueError(f"Retrieved {filename} appears to be empty or invalid")
+        
+        logger.info(f"Successfully fetched {filename} for {package_name} ({len(content)} bytes)")
+        
+        return content
+        
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
             error_msg = f"{filename} not found for package '{package_name}'"
@@ -686,15 +824,10 @@ async def install_package_secure(package_name: str) -> Dict[str, Any]:
     logger.info("[STEP 0/5] Verifying sudo configuration...")
     
     # Test if sudo password is cached or passwordless sudo is configured
-    # Use skip_sudo_check=True to avoid recursive check
-    test_exit_code, _, test_stderr = await run_command(
-        ["sudo", "-n", "true"],
-        timeout=5,
-        check=False,
-        skip_sudo_check=True
-    )
+    # (a successful probe is reused by the install commands below)
+    sudo_ready = await capabilities.sudo_ready()
     
-    if test_exit_code != 0:
+    if not sudo_ready:
         result["messages"].append("⚠️  SUDO PASSWORD REQUIRED")
         result["messages"].append("")
         result["messages"].append("Package installation requires sudo privileges.")
@@ -888,6 +1021,8 @@ async def install_package_secure(package_name: str) -> Dict[str, Any]:
             result["messages"].append(f"✅ Successfully installed {package_name} from AUR")
             result["security_checks"]["decision"] = "INSTALLED"
             logger.info(f"Successfully installed AUR package: {package_name}")
+            # Make newly installed commands (e.g. an AUR helper) visible
+            capabilities.refresh()
         else:
             result["messages"].append(f"❌ Installation failed with exit code {exit_code}")
             result["messages"].append(f"   Error: {stderr}")
@@ -916,6 +1051,143 @@ async def install_package_secure(package_name: str) -> Dict[str, Any]:
     return result
 
 
+# ============================================================================
+# PKGBUILD SAFETY RULES
+# ============================================================================
+# (pattern, message) pairs matched case-insensitively against each PKGBUILD line.
+# They are compiled once at import; see _compile_pkgbuild_rules().
+
+# CRITICAL PATTERNS - Definitely malicious
+PKGBUILD_DANGEROUS_PATTERNS = [
+    # Destructive commands
+    (r"rm\s+-rf\s+/[^a-zA-Z]", "CRITICAL: rm -rf / or /something detected - system destruction"),
+    (r"\bdd\b.*if=/dev/(zero|random|urandom).*of=/dev/sd", "CRITICAL: dd overwriting disk detected"),
+    (r":\(\)\{.*:\|:.*\}", "CRITICAL: Fork bomb detected"),
+    (r"\bmkfs\.", "CRITICAL: Filesystem formatting detected"),
+    (r"fdisk.*-w", "CRITICAL: Partition table modification detected"),
+    
+    # Reverse shells and backdoors
+    (r"/dev/tcp/\d+\.\d+\.\d+\.\d+/\d+", "CRITICAL: Reverse shell via /dev/tcp detected"),
+    (r"nc\s+-[^-]*e\s+/bin/(ba)?sh", "CRITICAL: Netcat reverse shell detected"),
+    (r"bash\s+-i\s+>&\s+/dev/tcp/", "CRITICAL: Interactive reverse shell detected"),
+    (r"python.*socket.*connect", "CRITICAL: Python socket connection (potential backdoor)"),
+    (r"perl.*socket.*connect", "CRITICAL: Perl socket connection (potential backdoor)"),
+    
+    # Malicious downloads and execution
+    (r"curl[^|]*\|\s*(ba)?sh", "CRITICAL: Piping curl to shell (remote code execution)"),
+    (r"wget[^|]*\|\s*(ba)?sh", "CRITICAL: Piping wget to shell (remote code execution)"),
+    (r"curl.*-o.*&&.*chmod\s+\+x.*&&\s*\./", "CRITICAL: Download, make executable, and run pattern"),
+    
+    # Crypto mining patterns
+    (r"xmrig|minerd|cpuminer|ccminer", "CRITICAL: Cryptocurrency miner detected"),
+    (r"stratum\+tcp://", "CRITICAL: Mining pool connection detected"),
+    (r"--donate-level", "CRITICAL: XMRig miner option detected"),
+    
+    # Rootkit/malware installation
+    (r"chattr\s+\+i", "CRITICAL: Making files immutable (rootkit technique)"),
+    (r"/etc/ld\.so\.preload", "CRITICAL: LD_PRELOAD manipulation (rootkit technique)"),
+    (r"HISTFILE=/dev/null", "CRITICAL: History clearing (covering tracks)"),
+]
+
+# SUSPICIOUS PATTERNS - Require careful review
+PKGBUILD_SUSPICIOUS_PATTERNS = [
+    # Obfuscation techniques
+    (r"base64\s+-d", "Obfuscation: base64 decoding detected"),
+    (r"xxd\s+-r", "Obfuscation: hex decoding detected"),
+    (r"\beval\b", "Obfuscation: eval usage (can execute arbitrary code)"),
+    (r"\$\(.*base64.*\)", "Obfuscation: base64 in command substitution"),
+    (r"openssl\s+enc\s+-d", "Obfuscation: encrypted content decoding"),
+    (r"echo.*\|.*sh", "Obfuscation: piping echo to shell"),
+    (r"printf.*\|.*sh", "Obfuscation: piping printf to shell"),
+    
+    # Suspicious permissions and ownership
+    (r"chmod\s+[0-7]*7[0-7]*7", "Dangerous: world-writable permissions"),
+    (r"chown\s+root", "Suspicious: changing ownership to root"),
+    (r"chmod\s+[u+]*s", "Suspicious: setuid/setgid (privilege escalation risk)"),
+    
+    # Suspicious file operations
+    (r"mktemp.*&&.*chmod", "Suspicious: temp file creation with permission change"),
+    (r">/dev/null\s+2>&1", "Suspicious: suppressing all output (hiding activity)"),
+    (r"nohup.*&", "Suspicious: background process that persists"),
+    
+    # Network activity
+    (r"curl.*-s.*-o", "Network: silent download detected"),
+    (r"wget.*-q.*-O", "Network: quiet download detected"),
+    (r"nc\s+-l", "Network: netcat listening mode (potential backdoor)"),
+    (r"socat", "Network: socat usage (advanced networking tool)"),
+    (r"ssh.*-R\s+\d+:", "Network: SSH reverse tunnel detected"),
+    
+    # Data exfiltration
+    (r"curl.*-X\s+POST.*--data", "Data exfiltration: HTTP POST with data"),
+    (r"tar.*\|.*ssh", "Data exfiltration: tar over SSH"),
+    (r"scp.*-r.*\*", "Data exfiltration: recursive SCP"),
+    
+    # Systemd/init manipulation
+    (r"systemctl.*enable.*\.service", "System: enabling systemd service"),
+    (r"/etc/systemd/system/", "System: systemd unit file modification"),
+    (r"update-rc\.d", "System: SysV init modification"),
+    (r"@reboot", "System: cron job at reboot"),
+    
+    # Kernel module manipulation
+    (r"modprobe", "System: kernel module loading"),
+    (r"insmod", "System: kernel module insertion"),
+    (r"/lib/modules/", "System: kernel module directory access"),
+    
+    # Compiler/build chain manipulation
+    (r"gcc.*-fPIC.*-shared", "Build: creating shared library (could be malicious)"),
+    (r"LD_PRELOAD=", "Build: LD_PRELOAD manipulation (function hijacking)"),
+]
+
+# INFORMATIONAL PATTERNS - Good to know but not necessarily bad
+PKGBUILD_INFO_PATTERNS = [
+    (r"sudo\s+", "Info: sudo usage detected"),
+    (r"git\s+clone", "Info: git clone detected"),
+    (r"make\s+install", "Info: make install detected"),
+    (r"pip\s+install", "Info: pip install detected"),
+    (r"npm\s+install", "Info: npm install detected"),
+    (r"cargo\s+install", "Info: cargo install detected"),
+]
+
+# Source URL checks
+SUSPICIOUS_TLDS = ['.tk', '.ml', '.ga', '.cf', '.gq', '.cn', '.ru']
+SUSPICIOUS_URL_PATTERNS = [
+    (r'bit\.ly|tinyurl|shorturl', "URL shortener (hides true destination)"),
+    (r'pastebin|hastebin|paste\.ee', "Paste site (common for malware hosting)"),
+    (r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}', "Raw IP address (suspicious)"),
+]
+BINARY_EXTENSIONS = ['.bin', '.exe', '.AppImage', '.deb', '.rpm', '.jar', '.apk']
+
+
+def _compile_pkgbuild_rules(patterns: List[Tuple[str, str]]) -> List[Tuple[Pattern[str], str]]:
+    """Compile (pattern, message) pairs with the flags used for PKGBUILD scanning."""
+    return [(re.compile(pattern, re.IGNORECASE), message) for pattern, message in patterns]
+
+
+_DANGEROUS_RULES = _compile_pkgbuild_rules(PKGBUILD_DANGEROUS_PATTERNS)
+_SUSPICIOUS_RULES = _compile_pkgbuild_rules(PKGBUILD_SUSPICIOUS_PATTERNS)
+_INFO_RULES = _compile_pkgbuild_rules(PKGBUILD_INFO_PATTERNS)
+_SUSPICIOUS_URL_RULES = _compile_pkgbuild_rules(SUSPICIOUS_URL_PATTERNS)
+
+# Alternation of every line rule. A line matches it if and only if at least
+# one rule matches, so the (vast majority of) lines that match nothing are
+# rejected in a single regex scan. A combined match only reports one
+# alternative per position, so hit lines are still checked rule by rule to
+# report every issue on them.
+_LINE_RULES_ALTERNATION = "|".join(
+    f"(?:{pattern})"
+    for pattern, _ in PKGBUILD_DANGEROUS_PATTERNS + PKGBUILD_SUSPICIOUS_PATTERNS + PKGBUILD_INFO_PATTERNS
+)
+_ANY_LINE_RULE = re.compile(_LINE_RULES_ALTERNATION, re.IGNORECASE)
+
+# IGNORECASE makes the alternation several times slower. For ASCII lines,
+# matching the lowercased line against the lowercased patterns is
+# equivalent (no pattern uses an uppercase escape such as \S or \D).
+_ANY_LINE_RULE_ASCII = re.compile(_LINE_RULES_ALTERNATION.lower())
+
+_SOURCE_ARRAY = re.compile(r'source=\([^)]+\)|source_\w+=\([^)]+\)', re.MULTILINE)
+_SOURCE_URL = re.compile(r'https?://[^\s\'"]+')
+
+
 def analyze_pkgbuild_safety(pkgbuild_content: str) -> Dict[str, Any]:
     """
     Perform comprehensive safety analysis on PKGBUILD content.
@@ -942,9 +1214,6 @@ def analyze_pkgbuild_safety(pkgbuild_content: str) -> Dict[str, Any]:
         - risk_score: 0-100 (higher = more dangerous)
         - recommendation: action recommendation
     """
-    import re
-    from urllib.parse import urlparse
-    
     red_flags = []  # Critical security issues
     warnings = []   # Suspicious but not necessarily malicious
     info = []       # Informational notices
@@ -952,103 +1221,6 @@ def analyze_pkgbuild_safety(pkgbuild_content: str) -> Dict[str, Any]:
     lines = pkgbuild_content.split('\n')
     logger.debug(f"Analyzing PKGBUILD with {len(lines)} lines")
     
-    # ========================================================================
-    # CRITICAL PATTERNS - Definitely malicious
-    # ========================================================================
-    dangerous_patterns = [
-        # Destructive commands
-        (r"rm\s+-rf\s+/[^a-zA-Z]", "CRITICAL: rm -rf / or /something detected - system destruction"),
-        (r"\bdd\b.*if=/dev/(zero|random|urandom).*of=/dev/sd", "CRITICAL: dd overwriting disk detected"),
-        (r":\(\)\{.*:\|:.*\}", "CRITICAL: Fork bomb detected"),
-        (r"\bmkfs\.", "CRITICAL: Filesystem formatting detected"),
-        (r"fdisk.*-w", "CRITICAL: Partition table modification detected"),
-        
-        # Reverse shells and backdoors
-        (r"/dev/tcp/\d+\.\d+\.\d+\.\d+/\d+", "CRITICAL: Reverse shell via /dev/tcp detected"),
-        (r"nc\s+-[^-]*e\s+/bin/(ba)?sh", "CRITICAL: Netcat reverse shell detected"),
-        (r"bash\s+-i\s+>&\s+/dev/tcp/", "CRITICAL: Interactive reverse shell detected"),
-        (r"python.*socket.*connect", "CRITICAL: Python socket connection (potential backdoor)"),
-        (r"perl.*socket.*connect", "CRITICAL: Perl socket connection (potential backdoor)"),
-        
-        # Malicious downloads and execution
-        (r"curl[^|]*\|\s*(ba)?sh", "CRITICAL: Piping curl to shell (remote code execution)"),
-        (r"wget[^|]*\|\s*(ba)?sh", "CRITICAL: Piping wget to shell (remote code execution)"),
-        (r"curl.*-o.*&&.*chmod\s+\+x.*&&\s*\./", "CRITICAL: Download, make executable, and run pattern"),
-        
-        # Crypto mining patterns
-        (r"xmrig|minerd|cpuminer|ccminer", "CRITICAL: Cryptocurrency miner detected"),
-        (r"stratum\+tcp://", "CRITICAL: Mining pool connection detected"),
-        (r"--donate-level", "CRITICAL: XMRig miner option detected"),
-        
-        # Rootkit/malware installation
-        (r"chattr\s+\+i", "CRITICAL: Making files immutable (rootkit technique)"),
-        (r"/etc/ld\.so\.preload", "CRITICAL: LD_PRELOAD manipulation (rootkit technique)"),
-        (r"HISTFILE=/dev/null", "CRITICAL: History clearing (covering tracks)"),
-    ]
-    
-    # ========================================================================
-    # SUSPICIOUS PATTERNS - Require careful review
-    # ========================================================================
-    suspicious_patterns = [
-        # Obfuscation techniques
-        (r"base64\s+-d", "Obfuscation: base64 decoding detected"),
-        (r"xxd\s+-r", "Obfuscation: hex decoding detected"),
-        (r"\beval\b", "Obfuscation: eval usage (can execute arbitrary code)"),
-        (r"\$\(.*base64.*\)", "Obfuscation: base64 in command substitution"),
-        (r"openssl\s+enc\s+-d", "Obfuscation: encrypted content decoding"),
-        (r"echo.*\|.*sh", "Obfuscation: piping echo to shell"),
-        (r"printf.*\|.*sh", "Obfuscation: piping printf to shell"),
-        
-        # Suspicious permissions and ownership
-        (r"chmod\s+[0-7]*7[0-7]*7", "Dangerous: world-writable permissions"),
-        (r"chown\s+root", "Suspicious: changing ownership to root"),
-        (r"chmod\s+[u+]*s", "Suspicious: setuid/setgid (privilege escalation risk)"),
-        
-        # Suspicious file operations
-        (r"mktemp.*&&.*chmod", "Suspicious: temp file creation with permission change"),
-        (r">/dev/null\s+2>&1", "Suspicious: suppressing all output (hiding activity)"),
-        (r"nohup.*&", "Suspicious: background process that persists"),
-        
-        # Network activity
-        (r"curl.*-s.*-o", "Network: silent download detected"),
-        (r"wget.*-q.*-O", "Network: quiet download detected"),
-        (r"nc\s+-l", "Network: netcat listening mode (potential backdoor)"),
-        (r"socat", "Network: socat usage (advanced networking tool)"),
-        (r"ssh.*-R\s+\d+:", "Network: SSH reverse tunnel detected"),
-        
-        # Data exfiltration
-        (r"curl.*-X\s+POST.*--data", "Data exfiltration: HTTP POST with data"),
-        (r"tar.*\|.*ssh", "Data exfiltration: tar over SSH"),
-        (r"scp.*-r.*\*", "Data exfiltration: recursive SCP"),
-        
-        # Systemd/init manipulation
-        (r"systemctl.*enable.*\.service", "System: enabling systemd service"),
-        (r"/etc/systemd/system/", "System: systemd unit file modification"),
-        (r"update-rc\.d", "System: SysV init modification"),
-        (r"@reboot", "System: cron job at reboot"),
-        
-        # Kernel module manipulation
-        (r"modprobe", "System: kernel module loading"),
-        (r"insmod", "System: kernel module insertion"),
-        (r"/lib/modules/", "System: kernel module directory access"),
-        
-        # Compiler/build chain manipulation
-        (r"gcc.*-fPIC.*-shared", "Build: creating shared library (could be malicious)"),
-        (r"LD_PRELOAD=", "Build: LD_PRELOAD manipulation (function hijacking)"),
-    ]
-    
-    # ========================================================================
-    # INFORMATIONAL PATTERNS - Good to know but not necessarily bad
-    # ========================================================================
-    info_patterns = [
-        (r"sudo\s+", "Info: sudo usage detected"),
-        (r"git\s+clone", "Info: git clone detected"),
-        (r"make\s+install", "Info: make install detected"),
-        (r"pip\s+install", "Info: pip install detected"),
-        (r"npm\s+install", "Info: npm install detected"),
-        (r"cargo\s+install", "Info: cargo install detected"),
-    ]
-    
     # ========================================================================
     # SCAN PATTERNS LINE BY LINE
     # ========================================================================
@@ -1058,34 +1230,44 @@ def analyze_pkgbuild_safety(pkgbuild_content: str) -> Dict[str, Any]:
         if stripped_line.startswith('#') or not stripped_line:
             continue
         
+        # Single pass over all rules; most lines stop here
+        if line.isascii():
+            hit = _ANY_LINE_RULE_ASCII.search(line.lower())
+        else:
+            hit = _ANY_LINE_RULE.search(line)
+        if not hit:
+            continue
+        
+        content = stripped_line[:100]  # Limit length for output
+        
         # Check dangerous patterns (red flags)
-        for pattern, message in dangerous_patterns:
-            if re.search(pattern, line, re.IGNORECASE):
+        for pattern, message in _DANGEROUS_RULES:
+            if pattern.search(line):
                 logger.warning(f"Red flag found at line {i}: {message}")
                 red_flags.append({
                     "line": i,
-                    "content": line.strip()[:100],  # Limit length for output
+                    "content": content,
                     "issue": message,
                     "severity": "CRITICAL"
                 })
         
         # Check suspicious patterns
-        for pattern, message in suspicious_patterns:
-            if re.search(pattern, line, re.IGNORECASE):
+        for pattern, message in _SUSPICIOUS_RULES:
+            if pattern.search(line):
                 logger.info(f"Warning found at line {i}: {message}")
                 warnings.append({
                     "line": i,
-                    "content": line.strip()[:100],
+                    "content": content,
                     "issue": message,
                     "severity": "WARNING"
                 })
         
         # Check informational patterns
-        for pattern, message in info_patterns:
-            if re.search(pattern, line, re.IGNORECASE):
+        for pattern, message in _INFO_RULES:
+            if pattern.search(line):
                 info.append({
                     "line": i,
-                    "content": line.strip()[:100],
+                    "content": content,
                     "issue": message,
                     "severity": "INFO"
                 })
@@ -1093,20 +1275,12 @@ def analyze_pkgbuild_safety(pkgbuild_content: str) -> Dict[str, Any]:
     # ========================================================================
     # ANALYZE SOURCE URLs
     # ========================================================================
-    source_urls = re.findall(r'source=\([^)]+\)|source_\w+=\([^)]+\)', pkgbuild_content, re.MULTILINE)
+    source_urls = _SOURCE_ARRAY.findall(pkgbuild_content)
     suspicious_domains = []
     
-    # Known suspicious TLDs and patterns
-    suspicious_tlds = ['.tk', '.ml', '.ga', '.cf', '.gq', '.cn', '.ru']
-    suspicious_url_patterns = [
-        (r'bit\.ly|tinyurl|shorturl', "URL shortener (hides true destination)"),
-        (r'pastebin|hastebin|paste\.ee', "Paste site (common for malware hosting)"),
-        (r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}', "Raw IP address (suspicious)"),
-    ]
-    
     for source_block in source_urls:
         # Extract URLs from source array
-        urls = re.findall(r'https?://[^\s\'"]+', source_block)
+        urls = _SOURCE_URL.findall(source_block)
         
         for url in urls:
             try:
@@ -1114,7 +1288,7 @@ def analyze_pkgbuild_safety(pkgbuild_content: str) -> Dict[str, Any]:
                 domain = parsed.netloc.lower()
                 
                 # Check for suspicious TLDs
-                if any(domain.endswith(tld) for tld in suspicious_tlds):
+                if any(domain.endswith(tld) for tld in SUSPICIOUS_TLDS):
                     warnings.append({
                         "line": 0,
                         "content": url,
@@ -1124,8 +1298,8 @@ def analyze_pkgbuild_safety(pkgbuild_content: str) -> Dict[str, Any]:
                     suspicious_domains.append(domain)
                 
                 # Check for suspicious URL patterns
-                for pattern, message in suspicious_url_patterns:
-                    if re.search(pattern, url, re.IGNORECASE):
+                for pattern, message in _SUSPICIOUS_URL_RULES:
+                    if pattern.search(url):
                         warnings.append({
                             "line": 0,
                             "content": url,
@@ -1138,9 +1312,9 @@ def analyze_pkgbuild_safety(pkgbuild_content: str) -> Dict[str, Any]:
     # ========================================================================
     # DETECT BINARY DOWNLOADS
     # ========================================================================
-    binary_extensions = ['.bin', '.exe', '.AppImage', '.deb', '.rpm', '.jar', '.apk']
-    for ext in binary_extensions:
-        if ext in pkgbuild_content.lower():
+    lowered_content = pkgbuild_content.lower()
+    for ext in BINARY_EXTENSIONS:
+        if ext in lowered_content:
             warnings.append({
                 "line": 0,
                 "content": "",
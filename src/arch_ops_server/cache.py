@@ -0,0 +1,150 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+In-process response cache module.
+Provides an asyncio-safe TTL + LRU cache with single-flight loading so
+repeated or concurrent identical requests hit the network once.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTTLCache:
+    """
+    Bounded cache of coroutine results.
+
+    Entries expire after `ttl` seconds and the least recently used entry is
+    evicted once `max_entries` is exceeded. While a key is being loaded,
+    other callers asking for the same key wait for that load instead of
+    starting their own. Exceptions are never cached.
+    """
+
+    def __init__(self, name: str, ttl: float = 300.0, max_entries: int = 256) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return a fresh cached value without loading it.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entries if needed.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        cache_if: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Return the cached value for key, loading it once if needed.
+
+        Args:
+            key: Cache key
+            loader: Zero-argument coroutine function producing the value
+            cache_if: Optional predicate; values it rejects are returned but not cached
+
+        Returns:
+            Cached or freshly loaded value
+
+        Raises:
+            Exception: Whatever the loader raises (shared by coalesced callers)
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            logger.debug(f"{self.name} cache hit: {key}")
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.debug(f"{self.name} cache joined in-flight load: {key}")
+            return await asyncio.shield(task)
+
+        self.misses += 1
+        logger.debug(f"{self.name} cache miss: {key}")
+
+        async def load() -> Any:
+            try:
+                result = await loader()
+                if cache_if is None or cache_if(result):
+                    self.set(key, result)
+                return result
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.ensure_future(load())
+        self._inflight[key] = task
+        # Shield so one caller being cancelled does not cancel the shared load
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        """Drop all entries and forget in-flight loads (counters are kept)."""
+        self._entries.clear()
+        self._inflight.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict with size, limits and hit/miss counts
+        """
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+        }
@@ -4,10 +4,13 @@ Configuration file parsing module.
 Parses and analyzes pacman and makepkg configuration files.
 """
 
+import glob
 import logging
+import os
 import re
+import threading
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Callable, List, Optional, Tuple
 
 from .utils import (
     IS_ARCH,
@@ -20,78 +23,396 @@ logger = logging.getLogger(__name__)
 PACMAN_CONF = "/etc/pacman.conf"
 MAKEPKG_CONF = "/etc/makepkg.conf"
 
+# Nesting limit for Include directives (same as pacman)
+MAX_INCLUDE_DEPTH = 10
 
-def parse_config_file(file_path: str) -> Dict[str, Any]:
+# [options] keys whose space-separated values accumulate over repeated lines
+LIST_OPTIONS = frozenset([
+    "Architecture", "CacheDir", "HookDir", "HoldPkg", "IgnoreGroup",
+    "IgnorePkg", "NoExtract", "NoUpgrade",
+])
+
+# Section header and commented-out mirror lines
+_SECTION_HEADER = re.compile(r'^\[([^\]]+)\]$')
+_COMMENTED_SERVER = re.compile(r'Server\s*=\s*(.+)')
+
+# Signature of each path a parsed result was built from (None if missing)
+Sources = Dict[str, Optional[Tuple[int, int, int]]]
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """Return (mtime_ns, size, inode) of a path, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _read_config_lines(file_path: str, sources: Optional[Sources]) -> List[str]:
+    """
+    Read a configuration file, recording its signature first.
+
+    The signature is taken before reading so a change made while the file
+    is being read is still detected on the next cache lookup.
+
+    Args:
+        file_path: Path to read
+        sources: Dict collecting path signatures, or None
+
+    Returns:
+        File lines without line terminators
+    """
+    if sources is not None:
+        sources[file_path] = _file_signature(file_path)
+    with open(file_path, 'r') as f:
+        return f.read().splitlines()
+
+
+def _expand_include(pattern: str, sources: Optional[Sources]) -> List[str]:
+    """
+    Resolve an Include pattern to the files it names.
+
+    Like pacman, the pattern may be a glob. The directory holding a glob
+    pattern is recorded as a source so adding or removing a matching file
+    invalidates cached results.
+
+    Args:
+        pattern: Include value
+        sources: Dict collecting path signatures, or None
+
+    Returns:
+        Sorted list of matching paths
+    """
+    if not glob.has_magic(pattern):
+        if os.path.exists(pattern):
+            return [pattern]
+        # Watch the missing file so creating it invalidates the cache
+        if sources is not None:
+            sources[pattern] = None
+        return []
+
+    if sources is not None:
+        directory = os.path.dirname(pattern) or "."
+        sources[directory] = _file_signature(directory)
+    return sorted(glob.glob(pattern))
+
+
+def _tokenize_config(lines: List[str]) -> Dict[str, Any]:
     """
-    Parse a configuration file with INI-like format.
+    Split one INI-like file into entries without interpreting them.
+
+    Args:
+        lines: File lines
+
+    Returns:
+        Dict with "entries" as (kind, line, key, value) tuples where kind is
+        "section", "option" or "flag", plus the file's comments and its
+        active and commented-out Server values
+    """
+    entries: List[Tuple[str, int, str, Optional[str]]] = []
+    comments = []
+    servers = []
+    commented_servers = []
+
+    for line_num, line in enumerate(lines, 1):
+        line = line.strip()
+
+        # Skip empty lines
+        if not line:
+            continue
+
+        if line.startswith('#'):
+            comments.append({
+                "line": line_num,
+                "text": line
+            })
+            server_match = _COMMENTED_SERVER.search(line)
+            if server_match:
+                commented_servers.append(server_match.group(1).strip())
+            continue
+
+        # Section headers [SectionName]
+        section_match = _SECTION_HEADER.match(line)
+        if section_match:
+            entries.append(("section", line_num, section_match.group(1).strip(), None))
+            continue
+
+        # Key = Value pairs; bare keys are flags such as Color
+        if '=' in line:
+            key, value = line.split('=', 1)
+            key = key.strip()
+            value = value.strip()
+            entries.append(("option", line_num, key, value))
+            if key == "Server":
+                servers.append(value)
+        else:
+            entries.append(("flag", line_num, line, None))
+
+    return {
+        "entries": entries,
+        "comments": comments,
+        "servers": servers,
+        "commented_servers": commented_servers
+    }
+
+
+def parse_config_file(file_path: str, sources: Optional[Sources] = None) -> Dict[str, Any]:
+    """
+    Parse a pacman-style configuration file into a repository model.
+
+    The file is read in one pass that follows `Include =` directives
+    recursively (globs included) in the context of the including section,
+    as pacman does. Every file is read once per parse even when several
+    repositories include it. Include cycles are skipped.
+
+    The model holds:
+        options: Last value of each [options] key
+        list_options: Space-separated [options] values accumulated over
+            repeated lines (IgnorePkg, HoldPkg, CacheDir, ...)
+        flags: Bare [options] keys such as Color or VerbosePkgLists
+        repositories: Repositories in declaration order, each with its
+            Server list (in pacman's lookup order) and last value per key
+        includes: Each Include directive with the files it matched
+        files: Active and commented-out Server values of each file read
+        comments: Comments of the main file
 
     Args:
         file_path: Path to configuration file
+        sources: Optional dict filled with the signature of every file read
 
     Returns:
         Dict with parsed configuration data
     """
     config = {
         "options": {},
+        "list_options": {},
+        "flags": [],
         "repositories": [],
+        "includes": [],
+        "files": {},
         "comments": []
     }
 
-    current_section = None
+    repositories: Dict[str, Dict[str, Any]] = {}
+    tokenized: Dict[str, Dict[str, Any]] = {}
 
-    try:
-        with open(file_path, 'r') as f:
-            for line_num, line in enumerate(f, 1):
-                original_line = line
-                line = line.strip()
+    def load(path: str) -> Dict[str, Any]:
+        if path not in tokenized:
+            tokenized[path] = _tokenize_config(_read_config_lines(path, sources))
+        return tokenized[path]
 
-                # Skip empty lines
-                if not line:
-                    continue
+    def walk(path: str, section: Optional[str], stack: Tuple[str, ...]) -> Optional[str]:
+        stack = stack + (os.path.realpath(path),)
 
-                # Store comments
-                if line.startswith('#'):
-                    config["comments"].append({
+        for kind, line_num, key, value in load(path)["entries"]:
+            if kind == "section":
+                section = key
+                if section.lower() != "options" and section not in repositories:
+                    # A repeated section header continues the same repository
+                    repositories[section] = {
+                        "name": section,
                         "line": line_num,
-                        "text": line
-                    })
+                        "file": path,
+                        "servers": [],
+                        "config": {}
+                    }
+                    config["repositories"].append(repositories[section])
+                continue
+
+            if section is None:
+                continue
+
+            repo = repositories.get(section)
+            if kind == "flag":
+                if repo is None and key not in config["flags"]:
+                    config["flags"].append(key)
+                continue
+
+            if repo is None:
+                # Include is a directive, not an option
+                if key != "Include":
+                    config["options"][key] = value
+                if key in LIST_OPTIONS:
+                    config["list_options"].setdefault(key, []).extend(value.split())
+            else:
+                repo["config"][key] = value
+                if key == "Server":
+                    repo["servers"].append(value)
+
+            if key != "Include":
+                continue
+
+            if len(stack) > MAX_INCLUDE_DEPTH:
+                logger.warning(f"Include depth exceeded in {path}, skipping {value}")
+                continue
+
+            files = _expand_include(value, sources)
+            config["includes"].append({
+                "section": section,
+                "pattern": value,
+                "files": files
+            })
+            for included in files:
+                if os.path.realpath(included) in stack:
+                    logger.warning(f"Include cycle: {path} includes {included}, skipping")
                     continue
+                try:
+                    section = walk(included, section, stack)
+                except OSError as e:
+                    logger.warning(f"Failed to read included file {included}: {e}")
 
-                # Section headers [SectionName]
-                section_match = re.match(r'\[(\w+)\]', line)
-                if section_match:
-                    current_section = section_match.group(1)
-                    
-                    # If it's a repository section
-                    if current_section not in ["options", "Options"]:
-                        config["repositories"].append({
-                            "name": current_section,
-                            "line": line_num
-                        })
-                    continue
-
-                # Key = Value pairs
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    key = key.strip()
-                    value = value.strip()
-
-                    if current_section and current_section.lower() == "options":
-                        config["options"][key] = value
-                    elif current_section:
-                        # Add to repository config
-                        for repo in config["repositories"]:
-                            if repo["name"] == current_section:
-                                if "config" not in repo:
-                                    repo["config"] = {}
-                                repo["config"][key] = value
+        return section
 
+    try:
+        walk(file_path, None, ())
     except Exception as e:
         logger.error(f"Failed to parse config file {file_path}: {e}")
 
+    config["files"] = {
+        path: {
+            "servers": data["servers"],
+            "commented_servers": data["commented_servers"]
+        }
+        for path, data in tokenized.items()
+    }
+    if file_path in tokenized:
+        config["comments"] = tokenized[file_path]["comments"]
+
     return config
 
 
+def parse_makepkg_conf(file_path: str, sources: Optional[Sources] = None) -> Dict[str, str]:
+    """
+    Parse makepkg.conf shell variable assignments.
+
+    Args:
+        file_path: Path to makepkg.conf
+        sources: Optional dict filled with the signature of the file
+
+    Returns:
+        Dict mapping variable name to its unquoted value
+    """
+    config = {}
+
+    for line in _read_config_lines(file_path, sources):
+        line = line.strip()
+
+        # Skip comments and empty lines
+        if not line or line.startswith('#'):
+            continue
+
+        # Match VAR=value or VAR="value"
+        match = re.match(r'^([A-Z_]+)=(.+)$', line)
+        if match:
+            key = match.group(1)
+            value = match.group(2)
+
+            # Remove quotes
+            value = value.strip('"').strip("'")
+
+            config[key] = value
+
+    return config
+
+
+class ConfigCache:
+    """
+    Cache of parsed configuration files.
+
+    A parsed result is kept together with the (mtime, size, inode)
+    signature of every file it was built from, including Include targets
+    and the directories of Include globs. A lookup re-stats those paths
+    and only re-parses when one of them changed, so repeated analyses of
+    an unchanged pacman.conf cost a few stat calls.
+
+    Returned structures are shared between callers and must not be
+    modified.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[Tuple[str, str], Tuple[Sources, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_path: str, parser: Callable[[str, Sources], Any]) -> Any:
+        """
+        Return the parsed form of a file, parsing it only if it changed.
+
+        Args:
+            file_path: Path to the configuration file
+            parser: Function taking (path, sources) that parses the file and
+                records the signature of every path it read in sources
+
+        Returns:
+            Parser result (shared, do not modify)
+
+        Raises:
+            Exception: Whatever the parser raises (nothing is cached)
+        """
+        key = (parser.__name__, file_path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                sources, result = entry
+                if all(_file_signature(path) == sig for path, sig in sources.items()):
+                    self.hits += 1
+                    return result
+
+            self.misses += 1
+            logger.debug(f"Parsing {file_path}")
+
+            new_sources: Sources = {}
+            result = parser(file_path, new_sources)
+            self._entries[key] = (new_sources, result)
+            return result
+
+    def invalidate(self) -> None:
+        """Force every file to be re-parsed on the next lookup."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Process-wide parsed configuration cache
+config_cache = ConfigCache()
+
+
+def _config_summary(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy a parsed pacman.conf without its server lists.
+
+    Mirror lists (often hundreds of commented-out servers, repeated for
+    every repository including them) are replaced by per-repository server
+    counts, and the cached model is not handed out to callers.
+
+    Args:
+        config: Result of parse_config_file
+
+    Returns:
+        New dict with options, list_options, flags, repositories, includes
+        and comments
+    """
+    return {
+        "options": dict(config.get("options", {})),
+        "list_options": {key: list(values) for key, values in config.get("list_options", {}).items()},
+        "flags": list(config.get("flags", [])),
+        "repositories": [
+            {
+                "name": repo["name"],
+                "line": repo["line"],
+                "file": repo["file"],
+                "server_count": len(repo["servers"]),
+                "config": {key: value for key, value in repo["config"].items() if key != "Server"}
+            }
+            for repo in config.get("repositories", [])
+        ],
+        "includes": [dict(include, files=list(include["files"])) for include in config.get("includes", [])],
+        "comments": list(config.get("comments", []))
+    }
+
+
 async def analyze_pacman_conf() -> Dict[str, Any]:
     """
     Parse and analyze pacman.conf.
@@ -116,20 +437,16 @@ async def analyze_pacman_conf() -> Dict[str, Any]:
                 f"pacman.conf not found at {PACMAN_CONF}"
             )
 
-        config = parse_config_file(PACMAN_CONF)
+        config = config_cache.get(PACMAN_CONF, parse_config_file)
 
         # Extract specific important options
         options = config.get("options", {})
         
-        # Parse multi-value options
-        ignored_packages = []
-        ignored_groups = []
-        
-        for key, value in options.items():
-            if key == "IgnorePkg":
-                ignored_packages = [p.strip() for p in value.split()]
-            elif key == "IgnoreGroup":
-                ignored_groups = [g.strip() for g in value.split()]
+        # Multi-value options accumulate over repeated lines (copied, the
+        # lists belong to the cached model)
+        list_options = config.get("list_options", {})
+        ignored_packages = list(list_options.get("IgnorePkg", []))
+        ignored_groups = list(list_options.get("IgnoreGroup", []))
 
         # Parse ParallelDownloads
         parallel_downloads = options.get("ParallelDownloads", "1")
@@ -156,8 +473,13 @@ async def analyze_pacman_conf() -> Dict[str, Any]:
             "ignored_groups": ignored_groups,
             "sig_level": sig_level,
             "local_file_sig_level": local_file_sig_level,
-            "all_options": options,
-            "raw_config": config
+            "flags": list(config.get("flags", [])),
+            "server_counts": {
+                repo["name"]: len(repo["servers"])
+                for repo in config.get("repositories", [])
+            },
+            "all_options": dict(options),
+            "raw_config": _config_summary(config)
         }
 
     except Exception as e:
@@ -192,27 +514,7 @@ async def analyze_makepkg_conf() -> Dict[str, Any]:
                 f"makepkg.conf not found at {MAKEPKG_CONF}"
             )
 
-        config = {}
-
-        # Parse as shell script variables
-        with open(makepkg_conf, 'r') as f:
-            for line in f:
-                line = line.strip()
-
-                # Skip comments and empty lines
-                if not line or line.startswith('#'):
-                    continue
-
-                # Match VAR=value or VAR="value"
-                match = re.match(r'^([A-Z_]+)=(.+)$', line)
-                if match:
-                    key = match.group(1)
-                    value = match.group(2)
-                    
-                    # Remove quotes
-                    value = value.strip('"').strip("'")
-                    
-                    config[key] = value
+        config = config_cache.get(MAKEPKG_CONF, parse_makepkg_conf)
 
         # Extract important settings
         cflags = config.get("CFLAGS", "")
@@ -251,7 +553,7 @@ async def analyze_makepkg_conf() -> Dict[str, Any]:
             "options": options_list,
             "carch": carch,
             "pkgext": pkgext,
-            "all_config": config
+            "all_config": dict(config)
         }
 
     except Exception as e:
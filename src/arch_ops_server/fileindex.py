@@ -0,0 +1,379 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Installed file ownership index module.
+Maps every path listed in /var/lib/pacman/local/*/files to the packages
+owning it, so ownership and file-list queries need no pacman process. The
+index is persisted in the server cache directory and refreshed
+incrementally: only database entries that were added, removed or
+rewritten since the last refresh are read again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .localdb import PACMAN_LOCAL_DB, parse_desc
+from .utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the persisted layout changes
+FILE_INDEX_FORMAT = "2"
+
+# Persisted index: the interned directories and, per entry, its files as
+# raw directory ids (native array('I') bytes) plus newline-joined names.
+# The lookup tree is rebuilt from these on load.
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE dirs (id INTEGER PRIMARY KEY, path TEXT NOT NULL);
+CREATE TABLE entries (entry TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, dir_ids BLOB, names TEXT);
+"""
+
+# Owners of one path: a local db entry name ("vim-9.0.1000-1"), or a tuple
+# of them for paths shared by several packages (mostly directories)
+Owners = Union[str, Tuple[str, ...]]
+
+
+def _split_path(path: str) -> Tuple[str, str]:
+    """
+    Split a database path into its directory and last component.
+
+    Directories keep their trailing slash on the last component, as in
+    the files database: "usr/bin/vim" -> ("usr/bin/", "vim") and
+    "usr/bin/" -> ("usr/", "bin/").
+    """
+    directory = path[:path.rstrip('/').rfind('/') + 1]
+    return directory, path[len(directory):]
+
+
+def entry_package(entry: str) -> Tuple[str, str]:
+    """
+    Split a local database entry name into package name and version.
+
+    Args:
+        entry: Entry directory name such as "vim-9.0.1000-1"
+
+    Returns:
+        (name, version) tuple
+    """
+    name, pkgver, pkgrel = entry.rsplit('-', 2)
+    return name, f"{pkgver}-{pkgrel}"
+
+
+class FileOwnershipIndex:
+    """
+    Reverse index of the files owned by installed packages.
+
+    Directory prefixes are interned in a table and referenced by number:
+    the lookup tree maps directory id -> last path component -> owners,
+    and each entry keeps its files as an array of directory ids plus the
+    list of last components, which is all incremental updates need.
+
+    A refresh is skipped while the database directory is unchanged
+    (pacman adds or removes an entry directory on every transaction).
+    Otherwise each entry's files file is compared by (mtime_ns, size)
+    against the index and only changed entries are parsed.
+    """
+
+    def __init__(self, path: str = PACMAN_LOCAL_DB, cache_path: Optional[Path] = None) -> None:
+        self.path = path
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._restored = False
+        self._reset()
+
+    def _reset(self) -> None:
+        """Forget everything indexed so far."""
+        self._signature: Optional[Tuple[int, int]] = None
+        self._dirs: List[str] = []
+        self._dir_ids: Dict[str, int] = {}
+        self._tree: Dict[int, Dict[str, Owners]] = {}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._by_name: Dict[str, str] = {}
+
+    @property
+    def cache_file(self) -> Path:
+        """Persisted index location (one file per database path)."""
+        if self.cache_path is not None:
+            return self.cache_path
+        digest = hashlib.sha256(os.path.abspath(self.path).encode("utf-8")).hexdigest()[:16]
+        return get_cache_dir() / f"file-owners-{digest}.sqlite"
+
+    def is_available(self) -> bool:
+        """Check whether the local database directory exists."""
+        return Path(self.path).is_dir()
+
+    def invalidate(self) -> None:
+        """Make the next refresh compare every entry again."""
+        self._signature = None
+
+    def refresh(self) -> int:
+        """
+        Bring the index up to date with the local database.
+
+        Returns:
+            Number of entries added, re-read or removed
+
+        Raises:
+            FileNotFoundError: If the database directory does not exist
+        """
+        with self._lock:
+            if not self._restored:
+                self._restored = True
+                self._restore()
+
+            st = os.stat(self.path)
+            signature = (st.st_mtime_ns, st.st_ino)
+            if signature == self._signature:
+                return 0
+
+            start = time.monotonic()
+            seen = set()
+            changed = 0
+
+            with os.scandir(self.path) as it:
+                for entry in it:
+                    if not entry.is_dir():
+                        continue
+
+                    files_path = os.path.join(entry.path, "files")
+                    try:
+                        files_st = os.stat(files_path)
+                    except OSError:
+                        continue
+
+                    file_signature = (files_st.st_mtime_ns, files_st.st_size)
+                    current = self._entries.get(entry.name)
+                    if current is not None and current["signature"] == file_signature:
+                        seen.add(entry.name)
+                        continue
+
+                    try:
+                        with open(files_path, encoding="utf-8", errors="replace") as f:
+                            paths = parse_desc(f.read()).get("FILES", [])
+                        entry_package(entry.name)
+                    except (OSError, ValueError) as e:
+                        logger.warning(f"Skipping local db entry {entry.name}: {e}")
+                        continue
+
+                    if current is not None:
+                        self._remove_entry(entry.name)
+                    self._add_entry(entry.name, file_signature, paths)
+                    seen.add(entry.name)
+                    changed += 1
+
+            for name in set(self._entries) - seen:
+                self._remove_entry(name)
+                changed += 1
+
+            self._signature = signature
+
+            if changed:
+                logger.info(
+                    f"Updated file ownership index from {self.path}: {changed} entries changed, "
+                    f"{len(self._entries)} packages in {time.monotonic() - start:.2f}s"
+                )
+            self._persist()
+            return changed
+
+    def _add_entry(self, entry: str, signature: Tuple[int, int], paths: List[str]) -> None:
+        """Index the files of one database entry."""
+        dir_ids = array('I')
+        names: List[str] = []
+
+        for path in paths:
+            directory, name = _split_path(path)
+            dir_id = self._dir_ids.get(directory)
+            if dir_id is None:
+                dir_id = len(self._dirs)
+                self._dirs.append(directory)
+                self._dir_ids[directory] = dir_id
+                self._tree[dir_id] = {}
+            dir_ids.append(dir_id)
+            names.append(name)
+
+        self._index_entry(entry, signature, dir_ids, names)
+
+    def _index_entry(self, entry: str, signature: Tuple[int, int], dir_ids: array, names: List[str]) -> None:
+        """Insert the files of one entry, given as interned directory ids and names, into the tree."""
+        entry = sys.intern(entry)
+
+        for dir_id, name in zip(dir_ids, names):
+            children = self._tree[dir_id]
+            owners = children.get(name)
+            if owners is None:
+                children[name] = entry
+            elif isinstance(owners, str):
+                children[name] = (owners, entry)
+            else:
+                children[name] = owners + (entry,)
+
+        self._entries[entry] = {"signature": signature, "dirs": dir_ids, "names": names}
+        self._by_name[entry_package(entry)[0]] = entry
+
+    def _remove_entry(self, entry: str) -> None:
+        """Drop the files of one database entry (interned directories are kept)."""
+        record = self._entries.pop(entry)
+
+        for dir_id, name in zip(record["dirs"], record["names"]):
+            children = self._tree[dir_id]
+            owners = children.get(name)
+            if owners == entry:
+                del children[name]
+            elif isinstance(owners, tuple):
+                remaining = tuple(owner for owner in owners if owner != entry)
+                children[name] = remaining[0] if len(remaining) == 1 else remaining
+
+        package = entry_package(entry)[0]
+        if self._by_name.get(package) == entry:
+            del self._by_name[package]
+
+    def _restore(self) -> None:
+        """Load the persisted index, ignoring missing or incompatible files."""
+        path = self.cache_file
+        if not path.is_file():
+            return
+
+        try:
+            with closing(sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)) as db:
+                meta = dict(db.execute("SELECT key, value FROM meta").fetchall())
+                if meta.get("format") != FILE_INDEX_FORMAT or meta.get("path") != os.path.abspath(self.path):
+                    return
+                dirs = [directory for directory, in db.execute("SELECT path FROM dirs ORDER BY id")]
+                rows = db.execute("SELECT entry, mtime_ns, size, dir_ids, names FROM entries").fetchall()
+            signature = tuple(json.loads(meta["signature"]))
+        except (sqlite3.Error, KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable file ownership index {path}: {e}")
+            return
+
+        self._reset()
+        self._dirs = dirs
+        self._dir_ids = {directory: i for i, directory in enumerate(dirs)}
+        self._tree = {i: {} for i in range(len(dirs))}
+        for entry, mtime_ns, size, dir_blob, joined in rows:
+            dir_ids = array('I')
+            dir_ids.frombytes(dir_blob)
+            names = joined.split('\n') if joined else []
+            if len(dir_ids) != len(names) or any(dir_id >= len(dirs) for dir_id in dir_ids):
+                logger.warning(f"Ignoring inconsistent file ownership index {path}")
+                self._reset()
+                return
+            self._index_entry(entry, (mtime_ns, size), dir_ids, names)
+
+        self._signature = signature
+        logger.debug(f"Loaded file ownership index for {len(self._entries)} packages from {path}")
+
+    def _persist(self) -> None:
+        """Write the index to the cache file atomically (temporary file + os.replace)."""
+        path = self.cache_file
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.unlink(missing_ok=True)
+            with closing(sqlite3.connect(tmp_path)) as db, db:
+                db.executescript(_SCHEMA)
+                db.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+                    ("format", FILE_INDEX_FORMAT),
+                    ("path", os.path.abspath(self.path)),
+                    ("signature", json.dumps(self._signature)),
+                ])
+                db.executemany("INSERT INTO dirs (id, path) VALUES (?, ?)", enumerate(self._dirs))
+                db.executemany(
+                    "INSERT INTO entries (entry, mtime_ns, size, dir_ids, names) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        (entry, *record["signature"], record["dirs"].tobytes(), '\n'.join(record["names"]))
+                        for entry, record in self._entries.items()
+                    )
+                )
+            os.replace(tmp_path, path)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not save file ownership index to {path}: {e}")
+
+    def _lookup(self, path: str) -> List[str]:
+        """Return the entries owning one absolute path."""
+        parent, name = os.path.split(os.path.abspath(path))
+        if not name:
+            return []
+
+        # Like pacman -Qo, also try the parent with symlinks resolved (/bin -> /usr/bin)
+        for candidate in dict.fromkeys((parent, os.path.realpath(parent))):
+            directory = candidate.strip('/') + '/' if candidate != '/' else ''
+            dir_id = self._dir_ids.get(directory)
+            if dir_id is None:
+                continue
+
+            children = self._tree[dir_id]
+            owners = children.get(name) or children.get(name + '/')
+            if owners:
+                return [owners] if isinstance(owners, str) else list(owners)
+
+        return []
+
+    def owners(self, path: str) -> List[Tuple[str, str]]:
+        """
+        Find the packages owning a path.
+
+        Args:
+            path: File or directory path
+
+        Returns:
+            List of (package name, version) tuples, empty if unowned
+        """
+        return self.owners_batch([path])[path]
+
+    def owners_batch(self, paths: Iterable[str]) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        Find the owners of many paths with a single refresh.
+
+        Args:
+            paths: File or directory paths
+
+        Returns:
+            Dict mapping each path to its (package name, version) owners
+        """
+        self.refresh()
+        return {path: [entry_package(entry) for entry in self._lookup(path)] for path in paths}
+
+    def files(self, name: str) -> Optional[List[str]]:
+        """
+        List the files owned by an installed package (like pacman -Ql).
+
+        Args:
+            name: Package name
+
+        Returns:
+            Absolute paths (directories end with '/'), or None if not installed
+        """
+        self.refresh()
+        entry = self._by_name.get(name)
+        if entry is None:
+            return None
+
+        record = self._entries[entry]
+        return ['/' + self._dirs[dir_id] + name for dir_id, name in zip(record["dirs"], record["names"])]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get index size counters.
+
+        Returns:
+            Dict with package, directory and path counts
+        """
+        return {
+            "packages": len(self._entries),
+            "directories": len(self._dirs),
+            "paths": sum(len(children) for children in self._tree.values()),
+        }
+
+
+# Process-wide file ownership index
+file_index = FileOwnershipIndex()
@@ -0,0 +1,410 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Repository file search index module.
+Ingests the pacman files databases (/var/lib/pacman/sync/*.files) into an
+SQLite index once, so "which package provides this file" queries are
+answered with an indexed lookup instead of `pacman -F` decompressing every
+files database on each search.
+
+Each repository is re-ingested only after its .files database changes
+(pacman -Fy replaces the file). The index can also be built ahead of time:
+    python -m arch_ops_server.filesdb [--sync-dir DIR]
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import sys
+import tarfile
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .syncdb import PACMAN_SYNC_DB, _repo_sort_key, iter_files_database, repository_files, repository_order
+from .utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the index schema changes
+FILES_INDEX_FORMAT = "2"
+
+# Query modes accepted by FilesIndex.search()
+MATCH_MODES = ("exact", "glob", "regex")
+
+# Default cap on the number of matches returned by one search
+FILE_SEARCH_LIMIT = 10000
+
+# Names looked up per statement by search_many() (SQLite host parameter limit)
+BATCH_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS repos (name TEXT PRIMARY KEY, signature TEXT, packages INTEGER, files INTEGER, error TEXT);
+CREATE TABLE IF NOT EXISTS packages (id INTEGER PRIMARY KEY, repo TEXT, name TEXT, version TEXT);
+CREATE TABLE IF NOT EXISTS dirs (id INTEGER PRIMARY KEY, path TEXT UNIQUE);
+CREATE TABLE IF NOT EXISTS files (package INTEGER, dir INTEGER, name TEXT);
+CREATE INDEX IF NOT EXISTS packages_repo ON packages (repo);
+CREATE INDEX IF NOT EXISTS files_name ON files (name);
+"""
+
+_SELECT_MATCHES = (
+    "SELECT p.repo, p.name, p.version, d.path || f.name "
+    "FROM files f JOIN packages p ON p.id = f.package JOIN dirs d ON d.id = f.dir "
+)
+
+
+def _signature(path: Path) -> str:
+    """Return the (mtime_ns, size, inode) signature of a database file."""
+    st = path.stat()
+    return f"{st.st_mtime_ns}:{st.st_size}:{st.st_ino}"
+
+
+def _split_path(path: str) -> Tuple[str, str]:
+    """Split "usr/bin/vim" into ("usr/bin/", "vim")."""
+    directory, _, name = path.rpartition("/")
+    return (directory + "/" if directory else ""), name
+
+
+def _order_by(order: List[str]) -> Tuple[str, List[str]]:
+    """
+    Build an ORDER BY clause listing matches in repository lookup order.
+
+    Sorting in SQL lets LIMIT keep the first matches (as _repo_sort_key
+    orders them) instead of arbitrary ones.
+
+    Args:
+        order: Repository names in lookup order
+
+    Returns:
+        (clause, parameters) tuple
+    """
+    cases = " ".join(f"WHEN ? THEN {i}" for i in range(len(order)))
+    rank = f"CASE p.repo {cases} ELSE {len(order)} END, " if order else ""
+    return f"ORDER BY {rank}p.repo, p.name, d.path || f.name", list(order)
+
+
+def _match(repo: str, package: str, version: str, path: str) -> Dict[str, Any]:
+    """Build a match dict in the shape search_package_files returns."""
+    return {
+        "package": package,
+        "repository": repo,
+        "version": version,
+        "file": path,
+    }
+
+
+class FilesIndex:
+    """
+    SQLite index of the files in every repository package.
+
+    Directory prefixes are stored once in `dirs`; `files` holds one row per
+    regular file (package id, directory id, basename) with an index on the
+    basename, so basename and full-path lookups are B-tree searches and
+    globs with a literal prefix use the same index. Suffixes such as
+    "bin/vim" are matched on the basename first, then on the directory.
+
+    The index is written in WAL mode, one transaction per repository, so
+    searches keep working (against the previous data) during a refresh.
+    """
+
+    def __init__(self, sync_path: str = PACMAN_SYNC_DB, index_path: Optional[Path] = None) -> None:
+        self.sync_path = sync_path
+        self.path = index_path
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self) -> Path:
+        """Index file in use (one per sync directory)."""
+        if self.path is not None:
+            return self.path
+        digest = hashlib.sha256(os.path.abspath(self.sync_path).encode("utf-8")).hexdigest()[:16]
+        return get_cache_dir() / f"files-index-{digest}.sqlite"
+
+    def database_files(self) -> List[Path]:
+        """List the .files databases of the configured repositories in lookup order."""
+        return repository_files(self.sync_path, ".files")
+
+    def is_available(self) -> bool:
+        """Check whether any files database has been synced (pacman -Fy)."""
+        return bool(self.database_files())
+
+    def _indexed_signatures(self) -> Dict[str, str]:
+        """Return the signature of every ingested repository."""
+        if not self.index_path.is_file():
+            return {}
+        try:
+            with closing(self._connect(read_only=True)) as db:
+                return dict(db.execute("SELECT name, signature FROM repos").fetchall())
+        except sqlite3.Error:
+            return {}
+
+    def stale_repositories(self) -> List[str]:
+        """
+        List repositories whose index is missing, outdated or no longer synced.
+
+        Returns:
+            Repository names needing a refresh
+        """
+        indexed = self._indexed_signatures()
+        current = {db_file.stem: _signature(db_file) for db_file in self.database_files()}
+
+        stale = [repo for repo, signature in current.items() if indexed.get(repo) != signature]
+        stale.extend(repo for repo in indexed if repo not in current)
+        return stale
+
+    def is_current(self) -> bool:
+        """Check whether every synced repository is ingested and up to date."""
+        return not self.stale_repositories()
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open the index database."""
+        if read_only:
+            uri = f"{self.index_path.resolve().as_uri()}?mode=ro"
+            return sqlite3.connect(uri, uri=True)
+        return sqlite3.connect(self.index_path)
+
+    def refresh(self) -> List[str]:
+        """
+        Ingest new or changed .files databases and drop removed ones.
+
+        Returns:
+            Names of the repositories that were (re)ingested or dropped
+        """
+        with self._lock:
+            stale = self.stale_repositories()
+            if not stale:
+                return []
+
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with closing(self._connect()) as db:
+                db.execute("PRAGMA journal_mode=WAL")
+                self._prepare(db)
+
+                files = {db_file.stem: db_file for db_file in self.database_files()}
+                for repo in stale:
+                    if repo in files:
+                        self._ingest(db, repo, files[repo])
+                    else:
+                        with db:
+                            self._drop(db, repo)
+                        logger.info(f"Dropped {repo} from the files index")
+
+            return stale
+
+    def _prepare(self, db: sqlite3.Connection) -> None:
+        """Create the schema, starting over if it is from another format or sync directory."""
+        meta = {}
+        try:
+            meta = dict(db.execute("SELECT key, value FROM meta").fetchall())
+        except sqlite3.OperationalError:
+            pass
+
+        expected = {"format": FILES_INDEX_FORMAT, "sync_path": os.path.abspath(self.sync_path)}
+        if meta and meta != expected:
+            logger.info(f"Rebuilding files index {self.index_path}")
+            with db:
+                for table in ("meta", "repos", "packages", "dirs", "files"):
+                    db.execute(f"DROP TABLE IF EXISTS {table}")
+
+        with db:
+            db.executescript(_SCHEMA)
+            db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", expected.items())
+
+    @staticmethod
+    def _drop(db: sqlite3.Connection, repo: str) -> None:
+        """Delete one repository's packages and files."""
+        db.execute("DELETE FROM files WHERE package IN (SELECT id FROM packages WHERE repo = ?)", (repo,))
+        db.execute("DELETE FROM packages WHERE repo = ?", (repo,))
+        db.execute("DELETE FROM repos WHERE name = ?", (repo,))
+
+    def _ingest(self, db: sqlite3.Connection, repo: str, db_file: Path) -> None:
+        """Replace one repository's rows with the content of its .files database."""
+        start = time.monotonic()
+        signature = _signature(db_file)
+        dir_ids = dict(db.execute("SELECT path, id FROM dirs").fetchall())
+        package_count = 0
+        file_count = 0
+
+        try:
+            with db:
+                self._drop(db, repo)
+
+                for name, version, paths in iter_files_database(str(db_file)):
+                    package_id = db.execute(
+                        "INSERT INTO packages (repo, name, version) VALUES (?, ?, ?)",
+                        (repo, name, version)
+                    ).lastrowid
+
+                    rows = []
+                    for path in paths:
+                        if path.endswith("/"):
+                            continue
+                        directory, basename = _split_path(path)
+                        dir_id = dir_ids.get(directory)
+                        if dir_id is None:
+                            dir_id = db.execute("INSERT INTO dirs (path) VALUES (?)", (directory,)).lastrowid
+                            dir_ids[directory] = dir_id
+                        rows.append((package_id, dir_id, basename))
+
+                    db.executemany("INSERT INTO files (package, dir, name) VALUES (?, ?, ?)", rows)
+                    package_count += 1
+                    file_count += len(rows)
+
+                db.execute(
+                    "INSERT INTO repos (name, signature, packages, files) VALUES (?, ?, ?, ?)",
+                    (repo, signature, package_count, file_count)
+                )
+        except (OSError, tarfile.TarError, RuntimeError) as e:
+            logger.warning(f"Skipping unreadable files database {db_file}: {e}")
+            # Keep the previous rows but record the failure with the current
+            # signature, so the database is not retried until it changes again
+            with db:
+                db.execute(
+                    "INSERT INTO repos (name, signature, packages, files, error) VALUES (?, ?, 0, 0, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET signature = excluded.signature, error = excluded.error",
+                    (repo, signature, str(e))
+                )
+            return
+
+        logger.info(
+            f"Indexed {file_count} files of {package_count} packages from {repo} "
+            f"in {time.monotonic() - start:.1f}s"
+        )
+
+    def search(self, pattern: str, mode: str = "exact", limit: int = FILE_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """
+        Find repository files by name or path (like pacman -F / -Fx).
+
+        A pattern without '/' is matched against file basenames. A pattern
+        containing '/' is matched against the path: in exact mode
+        "/usr/bin/vim" matches that file only and "bin/vim" any path ending
+        in it; glob and regex patterns must match the whole path (glob) or
+        part of it (regex).
+
+        Args:
+            pattern: File name, path, glob or regular expression
+            mode: "exact", "glob" or "regex"
+            limit: Maximum number of matches
+
+        Returns:
+            Match dicts (package, repository, version, file) in repository order
+
+        Raises:
+            ValueError: If the mode is unknown or the regex is invalid
+            sqlite3.Error: If the index cannot be read
+        """
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode: {mode} (expected one of {', '.join(MATCH_MODES)})")
+
+        by_path = "/" in pattern
+        with closing(self._connect(read_only=True)) as db:
+            if mode == "exact":
+                if by_path and pattern.startswith("/"):
+                    directory, basename = _split_path(pattern.lstrip("/"))
+                    where, params = "f.name = ? AND d.path = ?", [basename, directory]
+                elif by_path:
+                    # Suffix: the directory is the given one or ends with "/<given>"
+                    directory, basename = _split_path(pattern)
+                    escaped = directory.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                    where = "f.name = ? AND (d.path = ? OR d.path LIKE ? ESCAPE '\\')"
+                    params = [basename, directory, f"%/{escaped}"]
+                else:
+                    where, params = "f.name = ?", [pattern]
+            elif mode == "glob":
+                where = "d.path || f.name GLOB ?" if by_path else "f.name GLOB ?"
+                params = [pattern.lstrip("/")]
+            else:
+                compiled = re.compile(pattern)
+                db.create_function("matches", 1, lambda value: compiled.search(value) is not None,
+                                   deterministic=True)
+                where, params = ("matches(d.path || f.name)" if by_path else "matches(f.name)"), []
+
+            order_by, order_params = _order_by(repository_order())
+            rows = db.execute(
+                f"{_SELECT_MATCHES} WHERE {where} {order_by} LIMIT ?",
+                (*params, *order_params, limit)
+            ).fetchall()
+
+        return [_match(*row) for row in rows]
+
+    def search_many(self, names: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Find the packages providing many file basenames at once.
+
+        Args:
+            names: Exact file basenames such as "libfoo.so.3"
+
+        Returns:
+            Dict mapping each name to its matches in repository order
+        """
+        names = list(dict.fromkeys(names))
+        results: Dict[str, List[Dict[str, Any]]] = {name: [] for name in names}
+        order = repository_order()
+
+        with closing(self._connect(read_only=True)) as db:
+            for i in range(0, len(names), BATCH_CHUNK):
+                chunk = names[i:i + BATCH_CHUNK]
+                rows = db.execute(
+                    f"{_SELECT_MATCHES} WHERE f.name IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                rows.sort(key=lambda row: (_repo_sort_key(row[0], order), row[1], row[3]))
+                for row in rows:
+                    results[row[3].rpartition("/")[2]].append(_match(*row))
+
+        return results
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Report the ingested repositories.
+
+        Returns:
+            Dict with index path and per-repository package and file counts
+            (plus the error of a repository whose last ingest failed)
+        """
+        with closing(self._connect(read_only=True)) as db:
+            repos = db.execute("SELECT name, packages, files, error FROM repos").fetchall()
+        order = repository_order()
+        return {
+            "index_path": str(self.index_path),
+            "repositories": {
+                name: {"packages": packages, "files": files, **({"error": error} if error else {})}
+                for name, packages, files, error in sorted(repos, key=lambda r: _repo_sort_key(r[0], order))
+            },
+        }
+
+
+# Process-wide repository file search index
+files_index = FilesIndex()
+
+
+def main() -> int:
+    """Command line entry point for building the index."""
+    parser = argparse.ArgumentParser(description="Build the repository file search index.")
+    parser.add_argument("--sync-dir", default=PACMAN_SYNC_DB,
+                        help=f"directory holding the .files databases (default: {PACMAN_SYNC_DB})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    index = FilesIndex(args.sync_dir)
+    if not index.is_available():
+        print(f"No .files databases in {args.sync_dir}; run 'sudo pacman -Fy' first.", file=sys.stderr)
+        return 1
+
+    try:
+        updated = index.refresh()
+    except (OSError, sqlite3.Error) as e:
+        print(f"Failed to build files index: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Updated {len(updated)} repositories in {index.index_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Persistent HTTP cache module.
+Stores response bodies with their ETag/Last-Modified validators on disk so
+unchanged resources are revalidated with a conditional request (304)
+instead of being downloaded again, including across server restarts.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from .utils import get_cache_dir
+from .http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+# Subdirectory of the server cache directory holding HTTP entries
+HTTP_CACHE_SUBDIR = "http"
+
+# Size bound of the disk cache (metadata and bodies, in megabytes)
+HTTP_CACHE_DISK_MB = float(os.getenv("ARCH_OPS_HTTP_CACHE_DISK_MB", "64"))
+
+DEFAULT_TIMEOUT = 10.0
+
+
+class CachedResponse:
+    """
+    Minimal stand-in for httpx.Response built from a cache entry.
+
+    Exposes the attributes callers of cached_get() use: status_code,
+    headers, content, text, json() and raise_for_status().
+    """
+
+    def __init__(self, url: str, meta: Dict[str, Any], body: bytes) -> None:
+        self.url = url
+        self.status_code = meta.get("status_code", 200)
+        self.headers = httpx.Headers(meta.get("headers", {}))
+        self.content = body
+        self.from_cache = True
+
+    @property
+    def text(self) -> str:
+        """Body decoded with the stored charset (UTF-8 by default)."""
+        charset = "utf-8"
+        content_type = self.headers.get("content-type", "")
+        if "charset=" in content_type:
+            charset = content_type.split("charset=", 1)[1].split(";")[0].strip()
+        return self.content.decode(charset, errors="replace")
+
+    def json(self) -> Any:
+        """Decode the body as JSON."""
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        """Cached entries are always successful responses."""
+        return None
+
+
+class HttpCache:
+    """
+    Disk-backed store of response bodies keyed by full request URL.
+
+    Each entry is a <sha256>.json metadata file (URL, validators, selected
+    headers) next to a <sha256>.body file. Writes go through a temporary
+    file and os.replace so a crash never leaves a torn entry. The cache is
+    trimmed oldest-first (by metadata file modification time) when its
+    total size exceeds its bound.
+    """
+
+    # Response headers kept with the body
+    STORED_HEADERS = ("content-type", "etag", "last-modified")
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        disk_bytes: int = int(HTTP_CACHE_DISK_MB * 1024 * 1024)
+    ) -> None:
+        self.directory = directory or (get_cache_dir() / HTTP_CACHE_SUBDIR)
+        self.disk_bytes = disk_bytes
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        """Return (metadata path, body path) for a URL."""
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def load(self, url: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """
+        Read a cache entry.
+
+        Args:
+            url: Full request URL (including query string)
+
+        Returns:
+            Tuple of (metadata, body) or None if not cached
+        """
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+
+        if meta.get("url") != url:
+            return None
+
+        return meta, body
+
+    def store(self, url: str, response: httpx.Response) -> bool:
+        """
+        Save a successful response if it carries a validator.
+
+        Args:
+            url: Full request URL (including query string)
+            response: Response with status 200
+
+        Returns:
+            True if the response was stored
+        """
+        headers = {
+            name: response.headers[name]
+            for name in self.STORED_HEADERS
+            if response.headers.get(name)
+        }
+        if "etag" not in headers and "last-modified" not in headers:
+            return False
+
+        meta = {
+            "url": url,
+            "status_code": response.status_code,
+            "headers": headers,
+            "stored_at": time.time(),
+        }
+        meta_path, body_path = self._paths(url)
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for path, data in ((body_path, response.content), (meta_path, json.dumps(meta).encode("utf-8"))):
+                tmp_path = path.with_suffix(path.suffix + ".tmp")
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write HTTP cache entry for {url}: {e}")
+            return False
+
+        self._trim_disk()
+        return True
+
+    def _trim_disk(self) -> None:
+        """Delete the least recently written entries until the cache fits its bound."""
+        try:
+            entries = []
+            for meta_path in self.directory.glob("*.json"):
+                body_path = meta_path.with_suffix(".body")
+                st = meta_path.stat()
+                try:
+                    size = st.st_size + body_path.stat().st_size
+                except FileNotFoundError:
+                    size = st.st_size
+                entries.append((st.st_mtime_ns, size, meta_path, body_path))
+        except OSError:
+            return
+
+        total = sum(size for _, size, _, _ in entries)
+        for _, size, meta_path, body_path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.disk_bytes:
+                break
+            try:
+                # Metadata first: load() ignores a body without it
+                meta_path.unlink()
+                body_path.unlink(missing_ok=True)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self) -> None:
+        """Delete every cache entry."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# Process-wide HTTP cache
+http_cache = HttpCache()
+
+
+async def cached_get(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    follow_redirects: bool = False
+):
+    """
+    GET a URL through the persistent cache.
+
+    If a cached copy exists its validators are sent as If-None-Match /
+    If-Modified-Since; a 304 answer is served from disk. Fresh 200
+    responses with a validator replace the cached copy.
+
+    Args:
+        url: Request URL
+        params: Query parameters
+        timeout: Request timeout in seconds
+        follow_redirects: Follow HTTP redirects
+
+    Returns:
+        httpx.Response for fresh downloads, CachedResponse for 304 revalidations
+
+    Raises:
+        httpx.HTTPError: On timeouts and non-2xx responses (as client.get would)
+    """
+    full_url = str(httpx.URL(url, params=params)) if params else url
+
+    headers = {}
+    cached = http_cache.load(full_url)
+    if cached is not None:
+        meta, _ = cached
+        if meta["headers"].get("etag"):
+            headers["If-None-Match"] = meta["headers"]["etag"]
+        if meta["headers"].get("last-modified"):
+            headers["If-Modified-Since"] = meta["headers"]["last-modified"]
+
+    client = get_http_client(url)
+    response = await client.get(
+        url,
+        params=params,
+        headers=headers,
+        timeout=timeout,
+        follow_redirects=follow_redirects
+    )
+
+    if response.status_code == 304 and cached is not None:
+        logger.debug(f"HTTP cache revalidated: {full_url}")
+        meta, body = cached
+        return CachedResponse(full_url, meta, body)
+
+    response.raise_for_status()
+
+    if response.status_code == 200 and http_cache.store(full_url, response):
+        logger.debug(f"HTTP cache stored: {full_url}")
+
+    return response
@@ -0,0 +1,161 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Shared HTTP client module.
+Provides process-wide pooled httpx clients so repeated tool calls reuse
+keep-alive connections to the Arch Linux web services.
+"""
+
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Hosts that get a dedicated connection pool (and therefore their own limits)
+KNOWN_HOSTS = [
+    "wiki.archlinux.org",
+    "aur.archlinux.org",
+    "archlinux.org",
+]
+
+# Connection pool settings
+DEFAULT_TIMEOUT = 10.0
+MAX_CONNECTIONS_PER_HOST = 10
+MAX_KEEPALIVE_CONNECTIONS = 5
+KEEPALIVE_EXPIRY = 30.0
+
+# Pool used for any host not listed in KNOWN_HOSTS (mainly mirrors)
+DEFAULT_POOL = "default"
+
+# The default pool is shared by every mirror: its limits are sized for
+# concurrent probes and benchmarks of many mirrors (httpx has no per-host
+# cap), keeping a few idle connections per recently used mirror
+DEFAULT_POOL_MAX_CONNECTIONS = 64
+DEFAULT_POOL_MAX_KEEPALIVE_CONNECTIONS = 32
+
+
+class HttpClientRegistry:
+    """
+    Registry of long-lived httpx.AsyncClient instances keyed by host.
+
+    Clients are created lazily on first use (or eagerly by start()) and stay
+    open until close() is called, so TCP/TLS connections are reused across
+    tool calls instead of being renegotiated for every request.
+    """
+
+    def __init__(self) -> None:
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _create_client(self, pool: str) -> httpx.AsyncClient:
+        """
+        Create a pooled client for the given pool name.
+
+        Args:
+            pool: Host name or DEFAULT_POOL
+
+        Returns:
+            New httpx.AsyncClient
+        """
+        if pool == DEFAULT_POOL:
+            limits = httpx.Limits(
+                max_connections=DEFAULT_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=DEFAULT_POOL_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            )
+        else:
+            limits = httpx.Limits(
+                max_connections=MAX_CONNECTIONS_PER_HOST,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            )
+        logger.debug(f"Creating HTTP client pool: {pool} (http2={HTTP2_AVAILABLE})")
+        return httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            limits=limits,
+            http2=HTTP2_AVAILABLE,
+        )
+
+    def get(self, url: Optional[str] = None) -> httpx.AsyncClient:
+        """
+        Get the shared client responsible for a URL.
+
+        Args:
+            url: Request URL (or None for the default pool)
+
+        Returns:
+            Shared httpx.AsyncClient for the URL's host
+        """
+        host = urlparse(url).hostname if url else None
+        pool = host if host in KNOWN_HOSTS else DEFAULT_POOL
+
+        client = self._clients.get(pool)
+        if client is None:
+            client = self._create_client(pool)
+            self._clients[pool] = client
+        return client
+
+    def start(self) -> None:
+        """Create the pools for all known hosts up front."""
+        for host in KNOWN_HOSTS + [DEFAULT_POOL]:
+            if host not in self._clients:
+                self._clients[host] = self._create_client(host)
+        logger.info(f"HTTP client pools ready: {len(self._clients)}")
+
+    async def close(self) -> None:
+        """Close every client and release pooled connections."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close HTTP client: {e}")
+
+        if clients:
+            logger.info(f"Closed {len(clients)} HTTP client pools")
+
+    def reset(self) -> None:
+        """Forget all clients without closing them (used by tests)."""
+        self._clients.clear()
+
+
+# Process-wide registry
+http_clients = HttpClientRegistry()
+
+
+def get_http_client(url: Optional[str] = None) -> httpx.AsyncClient:
+    """
+    Get the shared pooled client for a URL.
+
+    Args:
+        url: Request URL used to pick the per-host pool
+
+    Returns:
+        Shared httpx.AsyncClient
+    """
+    return http_clients.get(url)
+
+
+@asynccontextmanager
+async def http_client_lifespan() -> AsyncIterator[HttpClientRegistry]:
+    """
+    Open the shared HTTP clients for the lifetime of a server run.
+
+    Yields:
+        The process-wide HttpClientRegistry
+    """
+    http_clients.start()
+    try:
+        yield http_clients
+    finally:
+        await http_clients.close()
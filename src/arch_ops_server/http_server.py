@@ -29,6 +29,8 @@ except ImportError:
     SSE_AVAILABLE = False
 
 from .server import server
+from .http_client import http_client_lifespan
+from .utils import capabilities
 from . import __version__
 
 logger = logging.getLogger(__name__)
@@ -815,9 +817,11 @@ async def run_http_server(host: str = "0.0.0.0", port: int = 8080) -> None:
         access_log=True,
     )
 
-    # Run server
+    # Run server, keeping pooled HTTP clients open for its lifetime
     server_instance = uvicorn.Server(config)
-    await server_instance.serve()
+    await capabilities.probe()
+    async with http_client_lifespan():
+        await server_instance.serve()
 
 
 def main_http():
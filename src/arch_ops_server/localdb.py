@@ -0,0 +1,305 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Pacman local database reader module.
+Reads /var/lib/pacman/local directly so installed-package queries do not
+need to fork pacman.
+"""
+
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Pacman local database path
+PACMAN_LOCAL_DB = "/var/lib/pacman/local"
+
+# %REASON% values used by libalpm
+REASON_EXPLICIT = "0"
+REASON_DEPEND = "1"
+
+# Version constraint suffix of a dependency string (e.g. "glibc>=2.38")
+_DEPEND_CONSTRAINT = re.compile(r'[<>=].*$')
+
+
+def parse_desc(content: str) -> Dict[str, List[str]]:
+    """
+    Parse an alpm database entry (desc/files format) into sections.
+
+    Entries look like "%NAME%" on one line followed by one value per line,
+    terminated by a blank line.
+
+    Args:
+        content: Raw file content
+
+    Returns:
+        Dict mapping section name (without %) to its list of values
+    """
+    sections: Dict[str, List[str]] = {}
+    current = None
+
+    for line in content.split('\n'):
+        if line.startswith('%') and line.endswith('%') and len(line) > 2:
+            current = line[1:-1]
+            sections[current] = []
+        elif not line:
+            current = None
+        elif current is not None:
+            sections[current].append(line)
+
+    return sections
+
+
+def dependency_name(depend: str) -> str:
+    """
+    Strip version constraint and description from a dependency string.
+
+    Args:
+        depend: Dependency such as "glibc>=2.38" or "python: for scripts"
+
+    Returns:
+        Bare package or provision name
+    """
+    name = depend.split(':', 1)[0].strip()
+    return _DEPEND_CONSTRAINT.sub('', name)
+
+
+def _package_from_desc(sections: Dict[str, List[str]]) -> Optional[Dict[str, Any]]:
+    """
+    Build a package dict from parsed desc sections.
+
+    Args:
+        sections: Output of parse_desc()
+
+    Returns:
+        Package dict or None if the entry has no name
+    """
+    def single(key: str, default: str = "") -> str:
+        values = sections.get(key)
+        return values[0] if values else default
+
+    name = single("NAME")
+    if not name:
+        return None
+
+    reason = single("REASON", REASON_EXPLICIT)
+
+    return {
+        "name": name,
+        "version": single("VERSION"),
+        "description": single("DESC"),
+        "url": single("URL"),
+        "architecture": single("ARCH"),
+        "packager": single("PACKAGER"),
+        "build_date": int(single("BUILDDATE", "0") or 0),
+        "install_date": int(single("INSTALLDATE", "0") or 0),
+        "installed_size": int(single("SIZE", "0") or 0),
+        "reason": "dependency" if reason == REASON_DEPEND else "explicit",
+        "groups": sections.get("GROUPS", []),
+        "licenses": sections.get("LICENSE", []),
+        "depends": sections.get("DEPENDS", []),
+        "optdepends": sections.get("OPTDEPENDS", []),
+        "provides": sections.get("PROVIDES", []),
+        "conflicts": sections.get("CONFLICTS", []),
+        "replaces": sections.get("REPLACES", []),
+        "required_by": [],
+        "optional_for": [],
+    }
+
+
+class LocalDatabase:
+    """
+    In-memory index of the pacman local database.
+
+    The index is built once and rebuilt only when the database directory
+    changes (pacman adds or removes an entry directory on every install or
+    removal) or when an indexed desc file is rewritten in place, as
+    `pacman -D --asdeps/--asexplicit` does. Checking costs one stat per
+    installed package.
+    """
+
+    def __init__(self, path: str = PACMAN_LOCAL_DB) -> None:
+        self.path = path
+        self._packages: Dict[str, Dict[str, Any]] = {}
+        self._entries: Dict[str, Path] = {}
+        self._groups: Dict[str, List[str]] = {}
+        self._desc_mtimes: Dict[str, int] = {}
+        self._signature: Optional[Tuple[int, int]] = None
+
+    def _current_signature(self) -> Tuple[int, int]:
+        """Return (mtime_ns, inode) of the database directory."""
+        st = os.stat(self.path)
+        return (st.st_mtime_ns, st.st_ino)
+
+    def _descs_unchanged(self) -> bool:
+        """Check that no indexed desc file was rewritten since it was read."""
+        try:
+            return all(
+                os.stat(self._entries[name] / "desc").st_mtime_ns == mtime
+                for name, mtime in self._desc_mtimes.items()
+            )
+        except OSError:
+            return False
+
+    def is_available(self) -> bool:
+        """Check whether the local database directory exists."""
+        return Path(self.path).is_dir()
+
+    def invalidate(self) -> None:
+        """Force the next query to rebuild the index."""
+        self._signature = None
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the package index, rebuilding it if the database changed.
+
+        Returns:
+            Dict mapping package name to package dict
+
+        Raises:
+            FileNotFoundError: If the database directory does not exist
+        """
+        signature = self._current_signature()
+        if signature == self._signature and self._descs_unchanged():
+            return self._packages
+
+        packages: Dict[str, Dict[str, Any]] = {}
+        entries: Dict[str, Path] = {}
+        desc_mtimes: Dict[str, int] = {}
+
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if not entry.is_dir():
+                    continue
+
+                desc_path = Path(entry.path) / "desc"
+                try:
+                    # Stat before reading so a rewrite during the read is detected next time
+                    desc_mtime = os.stat(desc_path).st_mtime_ns
+                    content = desc_path.read_text(encoding="utf-8", errors="replace")
+                except OSError as e:
+                    logger.warning(f"Skipping unreadable local db entry {entry.name}: {e}")
+                    continue
+
+                pkg = _package_from_desc(parse_desc(content))
+                if pkg is None:
+                    continue
+
+                packages[pkg["name"]] = pkg
+                entries[pkg["name"]] = Path(entry.path)
+                desc_mtimes[pkg["name"]] = desc_mtime
+
+        self._compute_reverse_dependencies(packages)
+
+        groups: Dict[str, List[str]] = {}
+        for name in sorted(packages):
+            for group in packages[name]["groups"]:
+                groups.setdefault(group, []).append(name)
+
+        self._packages = packages
+        self._entries = entries
+        self._desc_mtimes = desc_mtimes
+        self._groups = groups
+        self._signature = signature
+
+        logger.info(f"Indexed {len(packages)} installed packages from {self.path}")
+
+        return packages
+
+    @staticmethod
+    def _compute_reverse_dependencies(packages: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Fill required_by/optional_for for every package.
+
+        Dependencies are resolved by package name or by provision, like
+        `pacman -Qi` does (version constraints are not checked).
+
+        Args:
+            packages: Package index to update in place
+        """
+        providers: Dict[str, List[str]] = {}
+        for name, pkg in packages.items():
+            providers.setdefault(name, []).append(name)
+            for provide in pkg["provides"]:
+                providers.setdefault(dependency_name(provide), []).append(name)
+
+        for name in sorted(packages):
+            pkg = packages[name]
+            for field, target in (("depends", "required_by"), ("optdepends", "optional_for")):
+                for depend in pkg[field]:
+                    for provider in providers.get(dependency_name(depend), []):
+                        reverse = packages[provider][target]
+                        if name not in reverse:
+                            reverse.append(name)
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Get an installed package by name."""
+        return self.load().get(name)
+
+    def packages(self) -> List[Dict[str, Any]]:
+        """List all installed packages sorted by name (like pacman -Q)."""
+        packages = self.load()
+        return [packages[name] for name in sorted(packages)]
+
+    def explicit_packages(self) -> List[Dict[str, Any]]:
+        """List explicitly installed packages (like pacman -Qe)."""
+        return [pkg for pkg in self.packages() if pkg["reason"] == "explicit"]
+
+    def orphan_packages(self) -> List[Dict[str, Any]]:
+        """
+        List packages installed as dependencies that nothing needs anymore.
+
+        Matches `pacman -Qtd`: neither required nor optionally required.
+        """
+        return [
+            pkg for pkg in self.packages()
+            if pkg["reason"] == "dependency"
+            and not pkg["required_by"]
+            and not pkg["optional_for"]
+        ]
+
+    def groups(self) -> Dict[str, List[str]]:
+        """Map each group of installed packages to its installed members."""
+        self.load()
+        return self._groups
+
+    def entry_path(self, name: str) -> Optional[Path]:
+        """
+        Get the database entry directory of an installed package.
+
+        Args:
+            name: Package name
+
+        Returns:
+            Path such as /var/lib/pacman/local/vim-9.0.1000-1, or None if not installed
+        """
+        self.load()
+        return self._entries.get(name)
+
+    def files(self, name: str) -> Optional[List[str]]:
+        """
+        List the files owned by an installed package.
+
+        Args:
+            name: Package name
+
+        Returns:
+            Absolute paths (directories end with '/'), or None if not installed
+        """
+        entry = self.entry_path(name)
+        if entry is None:
+            return None
+
+        try:
+            content = (entry / "files").read_text(encoding="utf-8", errors="replace")
+        except OSError as e:
+            logger.warning(f"Could not read file list for {name}: {e}")
+            return []
+
+        return ['/' + path for path in parse_desc(content).get("FILES", [])]
+
+
+# Process-wide local database index
+local_db = LocalDatabase()
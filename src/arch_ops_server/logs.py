@@ -4,11 +4,14 @@ Pacman transaction log parsing module.
 Parses and analyzes pacman transaction logs for troubleshooting and auditing.
 """
 
+import asyncio
 import logging
+import os
 import re
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 from .utils import (
     IS_ARCH,
@@ -20,6 +23,35 @@ logger = logging.getLogger(__name__)
 # Pacman log file path
 PACMAN_LOG = "/var/log/pacman.log"
 
+# Log line: "[2024-01-15T10:30:45+0100] [ALPM] message" (pacman >= 5.1),
+# "[2018-01-15 10:30] [ALPM] message" or "[2012-01-15 10:30] message" (older)
+LOG_LINE_PATTERN = re.compile(
+    r'^\[(\d{4}-\d{2}-\d{2})[T ](\d{2}:\d{2})(:\d{2})?([+-]\d{4}|Z)?\]\s+'
+    r'(?:\[([\w-]+)\]\s+)?(.*)$'
+)
+
+# Package event message: "upgraded linux (6.6.1-1 -> 6.6.2-1)"
+PACKAGE_EVENT_PATTERN = re.compile(
+    r'^(installed|upgraded|removed|downgraded|reinstalled) (\S+) \((.*)\)$'
+)
+
+# Tags whose messages describe package events (scriptlet output is excluded)
+PACKAGE_EVENT_TAGS = {None, "ALPM", "PACMAN"}
+
+# Keywords marking a line as a failure or warning
+ERROR_KEYWORDS = ["error", "failed", "warning", "could not", "unable to", "conflict"]
+
+# Block size for reading the log backwards from EOF
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# Transaction type filters
+TRANSACTION_ACTIONS = {
+    "all": ["installed", "upgraded", "removed", "downgraded", "reinstalled"],
+    "install": ["installed"],
+    "remove": ["removed"],
+    "upgrade": ["upgraded", "downgraded", "reinstalled"]
+}
+
 
 def parse_log_line(line: str) -> Optional[Dict[str, Any]]:
     """
@@ -64,6 +96,365 @@ def parse_log_line(line: str) -> Optional[Dict[str, Any]]:
     }
 
 
+def read_lines_reversed(path: str, block_size: int = TAIL_BLOCK_SIZE) -> Iterator[str]:
+    """
+    Yield the lines of a file from last to first.
+
+    Reads fixed-size blocks backwards from EOF, so a consumer that stops
+    after N lines only pays for the blocks holding those lines.
+
+    Args:
+        path: File to read
+        block_size: Bytes read per seek
+
+    Yields:
+        Non-empty lines (without newline), most recent first
+    """
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b""
+
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+
+            lines = (f.read(read_size) + remainder).split(b'\n')
+            # The first piece may be the tail of a line that starts in an earlier block
+            remainder = lines.pop(0)
+
+            for line in reversed(lines):
+                if line:
+                    yield line.decode('utf-8', errors='replace')
+
+        if remainder:
+            yield remainder.decode('utf-8', errors='replace')
+
+
+def _parse_log_entry(line: str) -> Optional[Tuple[str, Optional[str], str]]:
+    """
+    Split a log line into timestamp, tag and message.
+
+    Args:
+        line: Raw log line
+
+    Returns:
+        Tuple of (ISO timestamp, tag or None, message) or None if malformed
+    """
+    match = LOG_LINE_PATTERN.match(line)
+    if not match:
+        return None
+
+    date_str, time_str, seconds, tz, tag, message = match.groups()
+    timestamp = f"{date_str}T{time_str}{seconds or ':00'}{tz or ''}"
+    return timestamp, tag, message.strip()
+
+
+def _package_event(line: str, entry: Tuple[str, Optional[str], str]) -> Optional[Dict[str, Any]]:
+    """Build a package event dict if the entry is an install/upgrade/remove line."""
+    timestamp, tag, message = entry
+    if tag not in PACKAGE_EVENT_TAGS:
+        return None
+
+    match = PACKAGE_EVENT_PATTERN.match(message)
+    if not match:
+        return None
+
+    action, package, version_info = match.groups()
+    return {
+        "timestamp": timestamp,
+        "action": action,
+        "package": package,
+        "version_info": version_info,
+        "raw_line": line.strip()
+    }
+
+
+def _sync_event(line: str, entry: Tuple[str, Optional[str], str]) -> Optional[Dict[str, Any]]:
+    """Build a sync event dict if the entry is a database sync or full upgrade."""
+    timestamp, _, message = entry
+    lower = message.lower()
+
+    if "starting full system upgrade" in lower:
+        event_type = "full_upgrade"
+    elif "synchronizing package lists" in lower:
+        event_type = "sync"
+    else:
+        return None
+
+    return {
+        "timestamp": timestamp,
+        "type": event_type,
+        "message": line.strip()
+    }
+
+
+def tail_package_events(path: str, actions: List[str], limit: int) -> List[Dict[str, Any]]:
+    """
+    Get the most recent package events by reading the log backwards.
+
+    Args:
+        path: Pacman log path
+        actions: Actions to include
+        limit: Maximum number of events
+
+    Returns:
+        Events, most recent first
+    """
+    events: List[Dict[str, Any]] = []
+    if limit <= 0:
+        return events
+
+    for line in read_lines_reversed(path):
+        entry = _parse_log_entry(line)
+        event = _package_event(line, entry) if entry else None
+        if event and event["action"] in actions:
+            events.append(event)
+            if len(events) >= limit:
+                break
+
+    return events
+
+
+def tail_sync_events(path: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    Get the most recent sync events by reading the log backwards.
+
+    Args:
+        path: Pacman log path
+        limit: Maximum number of events
+
+    Returns:
+        Sync events, most recent first
+    """
+    events: List[Dict[str, Any]] = []
+    if limit <= 0:
+        return events
+
+    for line in read_lines_reversed(path):
+        entry = _parse_log_entry(line)
+        event = _sync_event(line, entry) if entry else None
+        if event:
+            events.append(event)
+            if len(events) >= limit:
+                break
+
+    return events
+
+
+def find_last_update_timestamp(path: str = PACMAN_LOG) -> Optional[str]:
+    """
+    Find when packages were last installed or upgraded, reading from EOF.
+
+    Args:
+        path: Pacman log path
+
+    Returns:
+        ISO timestamp of the most recent install/upgrade/full upgrade, or None
+    """
+    for line in read_lines_reversed(path):
+        entry = _parse_log_entry(line)
+        if not entry:
+            continue
+
+        event = _package_event(line, entry)
+        if event and event["action"] in ("installed", "upgraded"):
+            return entry[0]
+
+        sync = _sync_event(line, entry)
+        if sync and sync["type"] == "full_upgrade":
+            return entry[0]
+
+    return None
+
+
+class PacmanLogIndex:
+    """
+    Incremental in-memory index of the pacman log.
+
+    The log is append-only, so the index remembers the byte offset it has
+    parsed up to (and the file's inode) and only parses newly appended
+    lines on refresh(). A different inode or a file shorter than the offset
+    (rotation or truncation) triggers a full rebuild.
+
+    Indexed data:
+    - events: package events (install/upgrade/remove/...) in log order
+    - by_package: the same event dicts grouped by package
+    - by_action: positions in events grouped by action
+    - transactions: "transaction started" ... "transaction completed"
+      groups with their command and events, in log order
+    - sync_events: database syncs and full upgrades
+    - problems: error and warning lines
+    """
+
+    def __init__(self, path: str = PACMAN_LOG) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        """Forget everything parsed so far."""
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._partial = b""
+        self._last_command: Optional[str] = None
+        self._open_transaction: Optional[Dict[str, Any]] = None
+        self.events: List[Dict[str, Any]] = []
+        self.by_package: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_action: Dict[str, List[int]] = {}
+        self.transactions: List[Dict[str, Any]] = []
+        self.sync_events: List[Dict[str, Any]] = []
+        self.problems: List[Dict[str, Any]] = []
+
+    @property
+    def offset(self) -> int:
+        """Byte offset parsed up to."""
+        return self._offset
+
+    def is_loaded(self) -> bool:
+        """Check whether the log has been indexed at least once."""
+        return self._inode is not None
+
+    def refresh(self) -> int:
+        """
+        Parse lines appended since the last refresh.
+
+        Returns:
+            Number of bytes read
+
+        Raises:
+            FileNotFoundError: If the log does not exist
+        """
+        with self._lock:
+            st = os.stat(self.path)
+
+            if st.st_ino != self._inode or st.st_size < self._offset:
+                if self._inode is not None:
+                    logger.info(f"{self.path} was rotated or truncated, rebuilding index")
+                self._reset()
+                self._inode = st.st_ino
+
+            if st.st_size == self._offset:
+                return 0
+
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+
+            self._offset += len(data)
+
+            # Keep an unterminated last line until the rest of it is written
+            lines = (self._partial + data).split(b'\n')
+            self._partial = lines.pop()
+
+            for raw in lines:
+                self._index_line(raw.decode('utf-8', errors='replace'))
+
+            logger.debug(f"Indexed {len(data)} bytes of {self.path} ({len(self.events)} events)")
+            return len(data)
+
+    def _index_line(self, line: str) -> None:
+        """Add one log line to the index."""
+        entry = _parse_log_entry(line)
+        if entry is None:
+            return
+
+        timestamp, tag, message = entry
+        lower = message.lower()
+
+        if tag == "PACMAN" and message.startswith("Running '"):
+            self._last_command = message[len("Running '"):].rstrip("'")
+
+        if lower.startswith("transaction "):
+            state = lower.split(None, 1)[1]
+            if state == "started":
+                self._open_transaction = {
+                    "started": timestamp,
+                    "ended": None,
+                    "status": "incomplete",
+                    "command": self._last_command,
+                    "events": []
+                }
+                self.transactions.append(self._open_transaction)
+            elif self._open_transaction is not None:
+                self._open_transaction["ended"] = timestamp
+                self._open_transaction["status"] = state
+                self._open_transaction = None
+
+        sync = _sync_event(line, entry)
+        if sync:
+            self.sync_events.append(sync)
+
+        event = _package_event(line, entry)
+        if event:
+            self.by_action.setdefault(event["action"], []).append(len(self.events))
+            self.events.append(event)
+            self.by_package.setdefault(event["package"], []).append(event)
+            if self._open_transaction is not None:
+                self._open_transaction["events"].append(event)
+            return
+
+        if any(keyword in lower for keyword in ERROR_KEYWORDS):
+            self.problems.append({
+                "timestamp": timestamp,
+                "severity": "error" if "error" in lower or "failed" in lower else "warning",
+                "message": line.strip()
+            })
+
+    def recent_events(self, actions: List[str], limit: int) -> List[Dict[str, Any]]:
+        """
+        Get the most recent events with one of the given actions.
+
+        Args:
+            actions: Actions to include
+            limit: Maximum number of events
+
+        Returns:
+            Events, most recent first
+        """
+        if limit <= 0:
+            return []
+
+        if set(actions) >= set(TRANSACTION_ACTIONS["all"]):
+            return self.events[-limit:][::-1]
+
+        # Only the last `limit` positions of each action can make the cut
+        positions = []
+        for action in actions:
+            positions.extend(self.by_action.get(action, [])[-limit:])
+        positions.sort(reverse=True)
+        return [self.events[i] for i in positions[:limit]]
+
+
+# Process-wide pacman log index
+pacman_log_index = PacmanLogIndex()
+
+
+async def _refresh_log_index(only_if_loaded: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Bring the pacman log index up to date.
+
+    Args:
+        only_if_loaded: Skip building a cold index (for "most recent N"
+            queries that can read the log tail instead)
+
+    Returns:
+        Error response if the log is missing, otherwise None
+    """
+    if not Path(pacman_log_index.path).exists():
+        return create_error_response(
+            "NotFound",
+            f"Pacman log file not found at {pacman_log_index.path}"
+        )
+
+    if only_if_loaded and not pacman_log_index.is_loaded():
+        return None
+
+    # The first refresh parses the whole log, so keep it off the event loop
+    await asyncio.to_thread(pacman_log_index.refresh)
+    return None
+
+
 async def get_transaction_history(
     limit: int = 50,
     transaction_type: str = "all"
@@ -87,37 +478,20 @@ async def get_transaction_history(
     logger.info(f"Getting transaction history (limit={limit}, type={transaction_type})")
 
     try:
-        pacman_log = Path(PACMAN_LOG)
-
-        if not pacman_log.exists():
-            return create_error_response(
-                "NotFound",
-                f"Pacman log file not found at {PACMAN_LOG}"
+        error = await _refresh_log_index(only_if_loaded=True)
+        if error:
+            return error
+
+        actions_to_match = TRANSACTION_ACTIONS.get(transaction_type, TRANSACTION_ACTIONS["all"])
+
+        # Most recent first
+        if pacman_log_index.is_loaded():
+            transactions = pacman_log_index.recent_events(actions_to_match, limit)
+        else:
+            transactions = await asyncio.to_thread(
+                tail_package_events, pacman_log_index.path, actions_to_match, limit
             )
 
-        transactions = []
-        valid_actions = {
-            "all": ["installed", "upgraded", "removed", "downgraded", "reinstalled"],
-            "install": ["installed"],
-            "remove": ["removed"],
-            "upgrade": ["upgraded", "downgraded", "reinstalled"]
-        }
-
-        actions_to_match = valid_actions.get(transaction_type, valid_actions["all"])
-
-        # Read log file from end (most recent first)
-        with open(pacman_log, 'r') as f:
-            lines = f.readlines()
-
-        # Process in reverse order for most recent first
-        for line in reversed(lines):
-            if len(transactions) >= limit:
-                break
-
-            parsed = parse_log_line(line)
-            if parsed and parsed["action"].lower() in actions_to_match:
-                transactions.append(parsed)
-
         logger.info(f"Found {len(transactions)} transactions")
 
         return {
@@ -153,33 +527,24 @@ async def find_when_installed(package_name: str) -> Dict[str, Any]:
     logger.info(f"Finding installation history for package: {package_name}")
 
     try:
-        pacman_log = Path(PACMAN_LOG)
-
-        if not pacman_log.exists():
-            return create_error_response(
-                "NotFound",
-                f"Pacman log file not found at {PACMAN_LOG}"
-            )
+        error = await _refresh_log_index()
+        if error:
+            return error
 
         first_install = None
         upgrades = []
         removals = []
 
-        with open(pacman_log, 'r') as f:
-            for line in f:
-                parsed = parse_log_line(line)
-                if not parsed or parsed["package"] != package_name:
-                    continue
+        for event in pacman_log_index.by_package.get(package_name, []):
+            action = event["action"]
 
-                action = parsed["action"].lower()
-
-                if action == "installed":
-                    if first_install is None:
-                        first_install = parsed
-                elif action in ["upgraded", "downgraded", "reinstalled"]:
-                    upgrades.append(parsed)
-                elif action == "removed":
-                    removals.append(parsed)
+            if action == "installed":
+                if first_install is None:
+                    first_install = event
+            elif action in ["upgraded", "downgraded", "reinstalled"]:
+                upgrades.append(event)
+            elif action == "removed":
+                removals.append(event)
 
         if first_install is None:
             return create_error_response(
@@ -223,47 +588,33 @@ async def find_failed_transactions() -> Dict[str, Any]:
     logger.info("Searching for failed transactions")
 
     try:
-        pacman_log = Path(PACMAN_LOG)
-
-        if not pacman_log.exists():
-            return create_error_response(
-                "NotFound",
-                f"Pacman log file not found at {PACMAN_LOG}"
-            )
-
-        failed_transactions = []
-        error_keywords = ["error", "failed", "warning", "could not", "unable to", "conflict"]
-
-        with open(pacman_log, 'r') as f:
-            for line in f:
-                line_lower = line.lower()
-
-                # Check for error indicators
-                if any(keyword in line_lower for keyword in error_keywords):
-                    # Extract timestamp if available
-                    timestamp_match = re.match(r'\[(\d{4}-\d{2}-\d{2})\s+(\d{2}:\d{2})\]', line)
-                    timestamp = ""
-                    if timestamp_match:
-                        timestamp = f"{timestamp_match.group(1)}T{timestamp_match.group(2)}:00"
-
-                    # Extract severity
-                    severity = "error" if "error" in line_lower or "failed" in line_lower else "warning"
-
-                    failed_transactions.append({
-                        "timestamp": timestamp,
-                        "severity": severity,
-                        "message": line.strip()
-                    })
+        error = await _refresh_log_index()
+        if error:
+            return error
 
         # Limit to most recent 100 failures
-        failed_transactions = failed_transactions[-100:]
-
-        logger.info(f"Found {len(failed_transactions)} failed/warning entries")
+        failed_transactions = pacman_log_index.problems[-100:]
+
+        # Transactions that never logged "transaction completed"
+        interrupted = [
+            {
+                "started": transaction["started"],
+                "ended": transaction["ended"],
+                "status": transaction["status"],
+                "command": transaction["command"],
+                "package_count": len(transaction["events"])
+            }
+            for transaction in pacman_log_index.transactions[-100:]
+            if transaction["status"] != "completed"
+        ]
+
+        logger.info(f"Found {len(failed_transactions)} failed/warning entries, {len(interrupted)} interrupted transactions")
 
         return {
             "count": len(failed_transactions),
-            "has_failures": len(failed_transactions) > 0,
-            "failures": failed_transactions
+            "has_failures": len(failed_transactions) > 0 or len(interrupted) > 0,
+            "failures": failed_transactions,
+            "interrupted_transactions": interrupted
         }
 
     except Exception as e:
@@ -294,40 +645,15 @@ async def get_database_sync_history(limit: int = 20) -> Dict[str, Any]:
     logger.info(f"Getting database sync history (limit={limit})")
 
     try:
-        pacman_log = Path(PACMAN_LOG)
-
-        if not pacman_log.exists():
-            return create_error_response(
-                "NotFound",
-                f"Pacman log file not found at {PACMAN_LOG}"
-            )
-
-        sync_events = []
-
-        with open(pacman_log, 'r') as f:
-            lines = f.readlines()
-
-        # Process in reverse order for most recent first
-        for line in reversed(lines):
-            if len(sync_events) >= limit:
-                break
-
-            # Look for database synchronization entries
-            if "synchronizing package lists" in line.lower() or "starting full system upgrade" in line.lower():
-                timestamp_match = re.match(r'\[(\d{4}-\d{2}-\d{2})\s+(\d{2}:\d{2})\]', line)
-                
-                if timestamp_match:
-                    timestamp = f"{timestamp_match.group(1)}T{timestamp_match.group(2)}:00"
-                    
-                    event_type = "sync"
-                    if "starting full system upgrade" in line.lower():
-                        event_type = "full_upgrade"
-
-                    sync_events.append({
-                        "timestamp": timestamp,
-                        "type": event_type,
-                        "message": line.strip()
-                    })
+        error = await _refresh_log_index(only_if_loaded=True)
+        if error:
+            return error
+
+        # Most recent first
+        if pacman_log_index.is_loaded():
+            sync_events = pacman_log_index.sync_events[-limit:][::-1] if limit > 0 else []
+        else:
+            sync_events = await asyncio.to_thread(tail_sync_events, pacman_log_index.path, limit)
 
         logger.info(f"Found {len(sync_events)} sync events")
 
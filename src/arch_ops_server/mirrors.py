@@ -4,11 +4,15 @@ Mirror management module.
 Manages and optimizes pacman mirrors for better download performance.
 """
 
+import asyncio
+import json
 import logging
-import re
+import math
+import os
+import statistics
 import time
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Awaitable, Callable, Dict, Any, List, Optional, Tuple
 
 import httpx
 
@@ -16,6 +20,10 @@ from .utils import (
     IS_ARCH,
     create_error_response,
 )
+from .http_client import get_http_client
+from .http_cache import cached_get
+from .cache import AsyncTTLCache
+from .config import PACMAN_CONF, config_cache, parse_config_file
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +33,25 @@ MIRRORLIST_PATH = "/etc/pacman.d/mirrorlist"
 # Arch Linux mirror status JSON
 MIRROR_STATUS_URL = "https://archlinux.org/mirrors/status/json/"
 
+# How long a downloaded status document is reused (archlinux.org refreshes it every few minutes)
+MIRROR_STATUS_TTL = float(os.getenv("ARCH_OPS_MIRROR_STATUS_TTL", "300"))
+
+# Saved copy of the status JSON to use instead of archlinux.org (offline mode)
+MIRROR_STATUS_FILE = os.getenv("ARCH_OPS_MIRROR_STATUS_FILE")
+
+# Mirror probing: parallel probes, requests per mirror, and time limits
+MAX_CONCURRENT_MIRROR_PROBES = int(os.getenv("ARCH_OPS_MIRROR_PROBE_CONCURRENCY", "8"))
+MIRROR_PROBE_SAMPLES = 3
+MIRROR_PROBE_TIMEOUT = 5.0    # per request
+MIRROR_PROBE_DEADLINE = 15.0  # per mirror, across all samples
+
+# Throughput benchmark: bytes downloaded per mirror and time limit per mirror.
+# Mirrors are benchmarked one at a time by default so they do not share
+# (and skew each other's share of) the local bandwidth.
+MIRROR_BENCHMARK_BYTES = 4 * 1024 * 1024
+MIRROR_BENCHMARK_TIMEOUT = 30.0
+MIRROR_BENCHMARK_CONCURRENCY = 1
+
 
 async def list_active_mirrors() -> Dict[str, Any]:
     """
@@ -50,34 +77,22 @@ async def list_active_mirrors() -> Dict[str, Any]:
                 f"Mirrorlist not found at {MIRRORLIST_PATH}"
             )
 
-        active_mirrors = []
-        commented_mirrors = []
-
-        with open(mirrorlist, 'r') as f:
-            for line in f:
-                line = line.strip()
-
-                # Skip empty lines and comments that aren't mirrors
-                if not line or (line.startswith('#') and 'Server' not in line):
-                    continue
-
-                # Check if it's a commented mirror
-                if line.startswith('#'):
-                    # Extract mirror URL
-                    match = re.search(r'Server\s*=\s*(.+)', line)
-                    if match:
-                        commented_mirrors.append({
-                            "url": match.group(1).strip(),
-                            "active": False
-                        })
-                elif line.startswith('Server'):
-                    # Active mirror
-                    match = re.search(r'Server\s*=\s*(.+)', line)
-                    if match:
-                        active_mirrors.append({
-                            "url": match.group(1).strip(),
-                            "active": True
-                        })
+        # Reuse the pacman.conf model when it includes the mirrorlist, so the
+        # file is parsed once for both tools; otherwise parse it on its own
+        mirrorlist_model = config_cache.get(PACMAN_CONF, parse_config_file)["files"].get(MIRRORLIST_PATH)
+        if mirrorlist_model is None:
+            mirrorlist_model = config_cache.get(MIRRORLIST_PATH, parse_config_file)["files"].get(
+                MIRRORLIST_PATH, {"servers": [], "commented_servers": []}
+            )
+
+        active_mirrors = [
+            {"url": url, "active": True}
+            for url in mirrorlist_model["servers"]
+        ]
+        commented_mirrors = [
+            {"url": url, "active": False}
+            for url in mirrorlist_model["commented_servers"]
+        ]
 
         logger.info(f"Found {len(active_mirrors)} active, {len(commented_mirrors)} commented mirrors")
 
@@ -97,12 +112,169 @@ async def list_active_mirrors() -> Dict[str, Any]:
         )
 
 
-async def test_mirror_speed(mirror_url: Optional[str] = None) -> Dict[str, Any]:
+def _mirror_test_url(mirror: str, repo: str = "core") -> str:
+    """Build the URL of a repository database on a mirrorlist Server entry (core.db is small and always present)."""
+    # Replace $repo and $arch with actual values for testing
+    test_url = mirror.replace("$repo", repo).replace("$arch", "x86_64")
+    if not test_url.endswith('/'):
+        test_url += '/'
+    return test_url + f"{repo}.db"
+
+
+async def _run_bounded(
+    mirrors: List[str],
+    worker: Callable[[str], Awaitable[Dict[str, Any]]],
+    concurrency: int
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run worker(mirror) for every mirror, at most `concurrency` at a time.
+
+    Args:
+        mirrors: Mirror URLs
+        worker: Coroutine function measuring one mirror
+        concurrency: Maximum number of workers running at once
+
+    Yields:
+        Worker results in completion order
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def bounded(mirror: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await worker(mirror)
+
+    tasks = [asyncio.create_task(bounded(mirror)) for mirror in mirrors]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # The consumer may stop early; don't leave workers running
+        for task in tasks:
+            task.cancel()
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def probe_mirror(
+    mirror: str,
+    samples: int = MIRROR_PROBE_SAMPLES,
+    timeout: float = MIRROR_PROBE_TIMEOUT,
+    deadline: float = MIRROR_PROBE_DEADLINE
+) -> Dict[str, Any]:
+    """
+    Measure a mirror's response time with repeated HEAD requests.
+
+    The first sample includes connection setup; later ones reuse the pooled
+    connection. Sampling stops early when the mirror fails or the deadline
+    is reached.
+
+    Args:
+        mirror: Mirrorlist Server URL (may contain $repo/$arch)
+        samples: Number of requests to time
+        timeout: Time limit per request in seconds
+        deadline: Time limit for all samples of this mirror in seconds
+
+    Returns:
+        Dict with median/p95/min latency in ms, status code and success flag
+    """
+    test_url = _mirror_test_url(mirror)
+    client = get_http_client(test_url)
+
+    latencies: List[float] = []
+    status_code = 0
+    error = None
+    started = time.perf_counter()
+
+    for _ in range(max(1, samples)):
+        remaining = deadline - (time.perf_counter() - started)
+        if remaining <= 0:
+            if not latencies:
+                error = "timeout"
+            break
+
+        try:
+            start_time = time.perf_counter()
+            response = await client.head(test_url, timeout=min(timeout, remaining), follow_redirects=True)
+            latency = (time.perf_counter() - start_time) * 1000  # Convert to ms
+        except httpx.TimeoutException:
+            error = "timeout"
+            break
+        except Exception as e:
+            error = str(e)
+            break
+
+        status_code = response.status_code
+        if status_code != 200:
+            error = f"HTTP {status_code}"
+            break
+        latencies.append(latency)
+
+    if not latencies:
+        result = {
+            "mirror": mirror,
+            "latency_ms": -1,
+            "status_code": status_code,
+            "success": False,
+        }
+        if error:
+            result["error"] = error
+        return result
+
+    latencies.sort()
+    return {
+        "mirror": mirror,
+        "latency_ms": round(statistics.median(latencies), 2),
+        "latency_p95_ms": round(_percentile(latencies, 95), 2),
+        "latency_min_ms": round(latencies[0], 2),
+        "samples": len(latencies),
+        "status_code": status_code,
+        "success": True
+    }
+
+
+async def probe_mirrors(
+    mirrors: List[str],
+    samples: int = MIRROR_PROBE_SAMPLES,
+    concurrency: int = MAX_CONCURRENT_MIRROR_PROBES
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Probe mirrors concurrently, yielding each result as soon as it is ready.
+
+    Args:
+        mirrors: Mirrorlist Server URLs
+        samples: Requests timed per mirror
+        concurrency: Maximum number of mirrors probed at once
+
+    Yields:
+        probe_mirror() results in completion order
+    """
+    async for result in _run_bounded(mirrors, lambda m: probe_mirror(m, samples=samples), concurrency):
+        yield result
+
+
+async def test_mirror_speed(
+    mirror_url: Optional[str] = None,
+    samples: int = MIRROR_PROBE_SAMPLES,
+    concurrency: int = MAX_CONCURRENT_MIRROR_PROBES,
+    progress: Optional[Callable[[int, int, str], Awaitable[None]]] = None
+) -> Dict[str, Any]:
     """
     Test mirror response time.
 
+    Mirrors are probed concurrently (at most `concurrency` at a time), each
+    with `samples` timed requests, so the total time is bounded by the
+    slowest mirror's deadline rather than the sum over all mirrors.
+
     Args:
         mirror_url: Specific mirror URL to test, or None to test all active mirrors
+        samples: Requests timed per mirror (latency_ms is their median)
+        concurrency: Maximum number of mirrors probed at once
+        progress: Awaited with (mirrors done, mirrors total, result summary)
+            as each probe finishes
 
     Returns:
         Dict with mirror latency results
@@ -136,45 +308,12 @@ async def test_mirror_speed(mirror_url: Optional[str] = None) -> Dict[str, Any]:
 
         results = []
 
-        async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-            for mirror in mirrors_to_test:
-                # Replace $repo and $arch with actual values for testing
-                test_url = mirror.replace("$repo", "core").replace("$arch", "x86_64")
-                
-                # Add a test file path (core.db is small and always present)
-                if not test_url.endswith('/'):
-                    test_url += '/'
-                test_url += "core.db"
-
-                try:
-                    start_time = time.time()
-                    response = await client.head(test_url)
-                    latency = (time.time() - start_time) * 1000  # Convert to ms
-
-                    results.append({
-                        "mirror": mirror,
-                        "latency_ms": round(latency, 2),
-                        "status_code": response.status_code,
-                        "success": response.status_code == 200
-                    })
-
-                except httpx.TimeoutException:
-                    results.append({
-                        "mirror": mirror,
-                        "latency_ms": -1,
-                        "status_code": 0,
-                        "success": False,
-                        "error": "timeout"
-                    })
-
-                except Exception as e:
-                    results.append({
-                        "mirror": mirror,
-                        "latency_ms": -1,
-                        "status_code": 0,
-                        "success": False,
-                        "error": str(e)
-                    })
+        async for probe in probe_mirrors(mirrors_to_test, samples=samples, concurrency=concurrency):
+            logger.debug(f"Mirror probe finished: {probe['mirror']} ({probe['latency_ms']} ms)")
+            results.append(probe)
+            if progress is not None:
+                summary = f"{probe['latency_ms']} ms" if probe["success"] else "failed"
+                await progress(len(results), len(mirrors_to_test), f"{probe['mirror']}: {summary}")
 
         # Sort by latency (successful tests first)
         results.sort(key=lambda x: (not x["success"], x["latency_ms"] if x["latency_ms"] > 0 else float('inf')))
@@ -195,93 +334,366 @@ async def test_mirror_speed(mirror_url: Optional[str] = None) -> Dict[str, Any]:
         )
 
 
+async def benchmark_mirror(
+    mirror: str,
+    repo: str = "extra",
+    max_bytes: int = MIRROR_BENCHMARK_BYTES,
+    timeout: float = MIRROR_BENCHMARK_TIMEOUT
+) -> Dict[str, Any]:
+    """
+    Measure a mirror's download throughput.
+
+    Downloads the first max_bytes of the repository database with a Range
+    request (or until the file ends; mirrors ignoring Range are cut off
+    after max_bytes). Connection setup is timed with httpcore trace events
+    and is None when a pooled connection was reused.
+
+    Args:
+        mirror: Mirrorlist Server URL (may contain $repo/$arch)
+        repo: Repository whose database is downloaded
+        max_bytes: Bytes to download
+        timeout: Time limit for the whole download in seconds
+
+    Returns:
+        Dict with throughput_mb_s, ttfb_ms, connect_ms, transfer_ms and bytes
+    """
+    if max_bytes <= 0:
+        return create_error_response(
+            "ValidationError",
+            f"max_bytes must be a positive number of bytes, got {max_bytes}"
+        )
+
+    url = _mirror_test_url(mirror, repo)
+    client = get_http_client(url)
+    events: Dict[str, float] = {}
+
+    async def trace(event_name: str, info: Dict[str, Any]) -> None:
+        events.setdefault(event_name, time.perf_counter())
+
+    result: Dict[str, Any] = {"mirror": mirror, "url": url, "success": False, "status_code": 0}
+
+    async def download() -> None:
+        start = time.perf_counter()
+        received = 0
+        async with client.stream(
+            "GET",
+            url,
+            headers={"Range": f"bytes=0-{max_bytes - 1}"},
+            timeout=timeout,
+            follow_redirects=True,
+            extensions={"trace": trace},
+        ) as response:
+            headers_at = time.perf_counter()
+            result["status_code"] = response.status_code
+            if response.status_code not in (200, 206):
+                result["error"] = f"HTTP {response.status_code}"
+                return
+
+            async for chunk in response.aiter_raw():
+                received += len(chunk)
+                if received >= max_bytes:
+                    received = max_bytes
+                    break
+        done = time.perf_counter()
+
+        connect_start = events.get("connection.connect_tcp.started")
+        connect_end = events.get("connection.start_tls.complete", events.get("connection.connect_tcp.complete"))
+        transfer = done - headers_at
+
+        result.update({
+            "success": received > 0,
+            "bytes": received,
+            "ttfb_ms": round((headers_at - start) * 1000, 2),
+            "connect_ms": round((connect_end - connect_start) * 1000, 2) if connect_start and connect_end else None,
+            "transfer_ms": round(transfer * 1000, 2),
+            "throughput_mb_s": round(received / transfer / (1024 * 1024), 2) if transfer > 0 else None,
+        })
+        if not received:
+            result["error"] = "empty response"
+
+    try:
+        await asyncio.wait_for(download(), timeout=timeout)
+    except (asyncio.TimeoutError, httpx.TimeoutException):
+        result["error"] = "timeout"
+    except Exception as e:
+        result["error"] = str(e)
+
+    return result
+
+
+async def benchmark_mirror_throughput(
+    mirror_url: Optional[str] = None,
+    source: str = "active",
+    country: Optional[str] = None,
+    limit: int = 5,
+    repo: str = "extra",
+    max_bytes: int = MIRROR_BENCHMARK_BYTES,
+    concurrency: int = MIRROR_BENCHMARK_CONCURRENCY
+) -> Dict[str, Any]:
+    """
+    Rank mirrors by measured download throughput.
+
+    Args:
+        mirror_url: Specific mirror URL to benchmark
+        source: Candidates when mirror_url is not given: "active" (mirrorlist,
+            Arch only) or "suggested" (suggest_fastest_mirrors results)
+        country: Country code filter for suggested candidates
+        limit: Number of suggested candidates to benchmark
+        repo: Repository database to download
+        max_bytes: Bytes downloaded per mirror
+        concurrency: Mirrors benchmarked at once (1 avoids sharing bandwidth)
+
+    Returns:
+        Dict with results sorted by throughput (fastest first)
+    """
+    if max_bytes <= 0:
+        return create_error_response(
+            "ValidationError",
+            f"max_bytes must be a positive number of bytes, got {max_bytes}"
+        )
+
+    logger.info(f"Benchmarking mirror throughput: {mirror_url or source}")
+
+    try:
+        if mirror_url:
+            mirrors_to_test = [mirror_url]
+        elif source == "suggested":
+            suggestions = await suggest_fastest_mirrors(country=country, limit=limit)
+            if "error" in suggestions:
+                return suggestions
+            # Status URLs are mirror roots; add the standard repository layout
+            mirrors_to_test = [
+                m["url"].rstrip("/") + "/$repo/os/$arch"
+                for m in suggestions.get("mirrors", [])
+                if m.get("url")
+            ]
+        elif source == "active":
+            if not IS_ARCH:
+                return create_error_response(
+                    "NotSupported",
+                    "Benchmarking active mirrors is only available on Arch Linux; use source='suggested'"
+                )
+            active = await list_active_mirrors()
+            if "error" in active:
+                return active
+            mirrors_to_test = [m["url"] for m in active.get("active_mirrors", [])]
+        else:
+            return create_error_response(
+                "InvalidSource",
+                f"Unknown mirror source '{source}' (expected 'active' or 'suggested')"
+            )
+
+        if not mirrors_to_test:
+            return create_error_response(
+                "NoMirrors",
+                "No mirrors to benchmark"
+            )
+
+        async def worker(mirror: str) -> Dict[str, Any]:
+            return await benchmark_mirror(mirror, repo=repo, max_bytes=max_bytes)
+
+        results = []
+        async for result in _run_bounded(mirrors_to_test, worker, concurrency):
+            logger.debug(f"Mirror benchmark finished: {result['mirror']} ({result.get('throughput_mb_s')} MB/s)")
+            results.append(result)
+
+        # Fastest first, failures last
+        results.sort(key=lambda x: (not x["success"], -(x.get("throughput_mb_s") or 0)))
+
+        logger.info(f"Benchmarked {len(results)} mirrors")
+
+        return {
+            "tested_count": len(results),
+            "repo": repo,
+            "bytes_per_mirror": max_bytes,
+            "results": results,
+            "fastest": results[0] if results and results[0]["success"] else None
+        }
+
+    except Exception as e:
+        logger.error(f"Failed to benchmark mirrors: {e}")
+        return create_error_response(
+            "MirrorBenchmarkError",
+            f"Failed to benchmark mirror throughput: {str(e)}"
+        )
+
+
+class MirrorStatusIndex:
+    """
+    Scored, pre-filtered view of a mirror status document.
+
+    Built once per status refresh: mirrors that are inactive, never synced
+    or incomplete are dropped, the rest are scored and sorted once and
+    indexed by country code and protocol, so a query is a dict lookup plus
+    a slice.
+    """
+
+    def __init__(self, status: Dict[str, Any], source: str) -> None:
+        self.source = source
+        self.last_check = status.get("last_check")
+        self.total_mirrors = len(status.get("urls", []))
+        self.ranked: List[Dict[str, Any]] = []
+        self._index: Dict[Tuple[Optional[str], Optional[str]], List[Dict[str, Any]]] = {}
+
+        for mirror in status.get("urls", []):
+            entry = self._score(mirror)
+            if entry is not None:
+                self.ranked.append(entry)
+
+        self.ranked.sort(key=lambda x: x["score"])
+
+        # Keys: (country, None), (None, protocol) and (country, protocol);
+        # appending in ranked order keeps every list sorted by score
+        for entry in self.ranked:
+            country_code = (entry["country_code"] or "").upper()
+            protocol = (entry["protocol"] or "").lower()
+            for key in ((country_code, None), (None, protocol), (country_code, protocol)):
+                self._index.setdefault(key, []).append(entry)
+
+    @staticmethod
+    def _score(mirror: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Score one status entry (lower is better).
+
+        Args:
+            mirror: Entry from the status document's "urls" list
+
+        Returns:
+            Suggestion dict, or None if the mirror should not be suggested
+        """
+        # Skip if not active or has issues
+        if not mirror.get("active", False):
+            return None
+
+        # Skip mirrors that never synced
+        last_sync = mirror.get("last_sync")
+        if last_sync is None:
+            return None
+
+        # Factors: completion percentage, delay, duration
+        completion = mirror.get("completion_pct", 0) or 0
+        delay = mirror.get("delay", 0) or 0  # Handle None
+        duration_avg = mirror.get("duration_avg", 0) or 0
+
+        # Skip incomplete mirrors
+        if completion < 100:
+            return None
+
+        # Score: delay (hours) + duration (seconds converted to hours equivalent)
+        score = delay + (duration_avg / 3600)
+
+        return {
+            "url": mirror.get("url"),
+            "country": mirror.get("country"),
+            "country_code": mirror.get("country_code"),
+            "protocol": mirror.get("protocol"),
+            "completion_pct": completion,
+            "delay_hours": delay,
+            "duration_avg": duration_avg,
+            "duration_stddev": mirror.get("duration_stddev"),
+            "score": round(score, 2),
+            "last_sync": last_sync
+        }
+
+    def query(self, country: Optional[str] = None, protocol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get suggestable mirrors, best first.
+
+        Args:
+            country: Country code filter (case-insensitive)
+            protocol: Protocol filter such as "https" (case-insensitive)
+
+        Returns:
+            Shared, score-sorted list of suggestion dicts (do not modify)
+        """
+        if not country and not protocol:
+            return self.ranked
+        key = (country.upper() if country else None, protocol.lower() if protocol else None)
+        return self._index.get(key, [])
+
+
+mirror_status_cache = AsyncTTLCache("mirror status", ttl=MIRROR_STATUS_TTL, max_entries=4)
+
+
+async def get_mirror_status_index(status_file: Optional[str] = None) -> MirrorStatusIndex:
+    """
+    Get the indexed mirror status, downloading or reading it when stale.
+
+    Args:
+        status_file: Saved status JSON to use instead of archlinux.org
+            (defaults to ARCH_OPS_MIRROR_STATUS_FILE; None means online)
+
+    Returns:
+        MirrorStatusIndex shared until the TTL expires
+
+    Raises:
+        httpx.HTTPError: If the status download fails
+        OSError: If the status file cannot be read
+        ValueError: If the status file is not valid JSON
+    """
+    path = status_file or MIRROR_STATUS_FILE
+
+    async def load() -> MirrorStatusIndex:
+        if path:
+            logger.info(f"Loading mirror status from {path}")
+            content = await asyncio.to_thread(Path(path).read_text, encoding="utf-8")
+            return MirrorStatusIndex(json.loads(content), source=path)
+
+        response = await cached_get(MIRROR_STATUS_URL, timeout=15.0)
+        return MirrorStatusIndex(response.json(), source=MIRROR_STATUS_URL)
+
+    return await mirror_status_cache.get_or_load(("status", path), load)
+
+
 async def suggest_fastest_mirrors(
     country: Optional[str] = None,
-    limit: int = 10
+    limit: int = 10,
+    protocol: Optional[str] = None,
+    status_file: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Suggest optimal mirrors based on official mirror status.
 
+    The status document is fetched (or read from status_file) at most once
+    per MIRROR_STATUS_TTL and indexed, so queries for different countries
+    reuse it.
+
     Args:
         country: Optional country code to filter mirrors (e.g., 'US', 'DE')
         limit: Number of mirrors to suggest (default 10)
+        protocol: Optional protocol filter (e.g., 'https', 'rsync')
+        status_file: Saved status JSON to use instead of archlinux.org
 
     Returns:
         Dict with recommended mirrors
     """
-    logger.info(f"Fetching mirror suggestions (country={country}, limit={limit})")
+    logger.info(f"Fetching mirror suggestions (country={country}, protocol={protocol}, limit={limit})")
 
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get(MIRROR_STATUS_URL)
-            response.raise_for_status()
+        index = await get_mirror_status_index(status_file)
+
+        if not index.total_mirrors:
+            return create_error_response(
+                "NoData",
+                "No mirror data available from archlinux.org"
+            )
 
-            data = response.json()
-            mirrors = data.get("urls", [])
+        filtered_mirrors = index.query(country=country, protocol=protocol)
 
-            if not mirrors:
-                return create_error_response(
-                    "NoData",
-                    "No mirror data available from archlinux.org"
-                )
+        # Limit results (copies, so callers cannot modify the shared index)
+        suggested_mirrors = [dict(m) for m in filtered_mirrors[:limit]]
+
+        logger.info(f"Suggesting {len(suggested_mirrors)} mirrors")
 
-            # Filter mirrors
-            filtered_mirrors = []
-
-            for mirror in mirrors:
-                # Skip if country specified and doesn't match
-                if country and mirror.get("country_code") != country.upper():
-                    continue
-
-                # Skip if not active or has issues
-                if not mirror.get("active", False):
-                    continue
-
-                # Skip if last sync is too old (more than 24 hours)
-                last_sync = mirror.get("last_sync")
-                if last_sync is None:
-                    continue
-
-                # Calculate score (lower is better)
-                # Factors: completion percentage, delay, duration
-                completion = mirror.get("completion_pct", 0)
-                delay = mirror.get("delay", 0) or 0  # Handle None
-                duration_avg = mirror.get("duration_avg", 0) or 0
-
-                # Skip incomplete mirrors
-                if completion < 100:
-                    continue
-
-                # Score: delay (hours) + duration (seconds converted to hours equivalent)
-                score = delay + (duration_avg / 3600)
-
-                filtered_mirrors.append({
-                    "url": mirror.get("url"),
-                    "country": mirror.get("country"),
-                    "country_code": mirror.get("country_code"),
-                    "protocol": mirror.get("protocol"),
-                    "completion_pct": completion,
-                    "delay_hours": delay,
-                    "duration_avg": duration_avg,
-                    "duration_stddev": mirror.get("duration_stddev"),
-                    "score": round(score, 2),
-                    "last_sync": last_sync
-                })
-
-            # Sort by score (lower is better)
-            filtered_mirrors.sort(key=lambda x: x["score"])
-
-            # Limit results
-            suggested_mirrors = filtered_mirrors[:limit]
-
-            logger.info(f"Suggesting {len(suggested_mirrors)} mirrors")
-
-            return {
-                "suggested_count": len(suggested_mirrors),
-                "total_available": len(filtered_mirrors),
-                "country_filter": country,
-                "mirrors": suggested_mirrors
-            }
+        return {
+            "suggested_count": len(suggested_mirrors),
+            "total_available": len(filtered_mirrors),
+            "country_filter": country,
+            "protocol_filter": protocol,
+            "status_source": index.source,
+            "status_last_check": index.last_check,
+            "mirrors": suggested_mirrors
+        }
 
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP error fetching mirror status: {e}")
@@ -295,6 +707,13 @@ async def suggest_fastest_mirrors(
             "Timeout",
             "Request to mirror status API timed out"
         )
+    except (OSError, ValueError) as e:
+        # Unreadable status file or invalid JSON
+        logger.error(f"Failed to load mirror status: {e}")
+        return create_error_response(
+            "MirrorStatusError",
+            f"Failed to load mirror status: {str(e)}"
+        )
     except Exception as e:
         logger.error(f"Failed to suggest mirrors: {e}")
         return create_error_response(
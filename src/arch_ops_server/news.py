@@ -6,7 +6,7 @@ Fetches and parses Arch Linux news announcements for critical updates.
 
 import logging
 import re
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from xml.etree import ElementTree as ET
@@ -18,6 +18,8 @@ from .utils import (
     run_command,
     create_error_response,
 )
+from .http_cache import cached_get
+from .logs import PACMAN_LOG, find_last_update_timestamp
 
 logger = logging.getLogger(__name__)
 
@@ -53,69 +55,67 @@ async def get_latest_news(
     logger.info(f"Fetching latest Arch Linux news (limit={limit})")
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(ARCH_NEWS_URL)
-            response.raise_for_status()
+        response = await cached_get(ARCH_NEWS_URL, timeout=10.0)
 
-            # Parse RSS feed
-            root = ET.fromstring(response.content)
+        # Parse RSS feed
+        root = ET.fromstring(response.content)
 
-            # Find all items (RSS 2.0 format)
-            news_items = []
+        # Find all items (RSS 2.0 format)
+        news_items = []
+        
+        for item in root.findall('.//item')[:limit]:
+            title_elem = item.find('title')
+            link_elem = item.find('link')
+            pub_date_elem = item.find('pubDate')
+            description_elem = item.find('description')
+
+            if title_elem is None or link_elem is None:
+                continue
+
+            title = title_elem.text
+            link = link_elem.text
+            pub_date = pub_date_elem.text if pub_date_elem is not None else ""
             
-            for item in root.findall('.//item')[:limit]:
-                title_elem = item.find('title')
-                link_elem = item.find('link')
-                pub_date_elem = item.find('pubDate')
-                description_elem = item.find('description')
-
-                if title_elem is None or link_elem is None:
-                    continue
-
-                title = title_elem.text
-                link = link_elem.text
-                pub_date = pub_date_elem.text if pub_date_elem is not None else ""
-                
-                # Parse description and strip HTML tags
-                description = ""
-                if description_elem is not None and description_elem.text:
-                    description = re.sub(r'<[^>]+>', '', description_elem.text)
-                    # Truncate to first 300 chars for summary
-                    description = description[:300] + "..." if len(description) > 300 else description
-
-                # Parse date
-                published_date = ""
-                if pub_date:
-                    try:
-                        # Parse RFC 822 date format
-                        dt = datetime.strptime(pub_date, "%a, %d %b %Y %H:%M:%S %z")
-                        published_date = dt.isoformat()
-                    except ValueError:
-                        published_date = pub_date
-
-                # Filter by date if requested
-                if since_date and published_date:
-                    try:
-                        item_date = datetime.fromisoformat(published_date.replace('Z', '+00:00'))
-                        filter_date = datetime.fromisoformat(since_date + "T00:00:00+00:00")
-                        if item_date < filter_date:
-                            continue
-                    except ValueError as e:
-                        logger.warning(f"Failed to parse date for filtering: {e}")
-
-                news_items.append({
-                    "title": title,
-                    "link": link,
-                    "published": published_date,
-                    "summary": description.strip()
-                })
-
-            logger.info(f"Successfully fetched {len(news_items)} news items")
-
-            return {
-                "count": len(news_items),
-                "news": news_items
-            }
+            # Parse description and strip HTML tags
+            description = ""
+            if description_elem is not None and description_elem.text:
+                description = re.sub(r'<[^>]+>', '', description_elem.text)
+                # Truncate to first 300 chars for summary
+                description = description[:300] + "..." if len(description) > 300 else description
+
+            # Parse date
+            published_date = ""
+            if pub_date:
+                try:
+                    # Parse RFC 822 date format
+                    dt = datetime.strptime(pub_date, "%a, %d %b %Y %H:%M:%S %z")
+                    published_date = dt.isoformat()
+                except ValueError:
+                    published_date = pub_date
+
+            # Filter by date if requested
+            if since_date and published_date:
+                try:
+                    item_date = datetime.fromisoformat(published_date.replace('Z', '+00:00'))
+                    filter_date = datetime.fromisoformat(since_date + "T00:00:00+00:00")
+                    if item_date < filter_date:
+                        continue
+                except ValueError as e:
+                    logger.warning(f"Failed to parse date for filtering: {e}")
+
+            news_items.append({
+                "title": title,
+                "link": link,
+                "published": published_date,
+                "summary": description.strip()
+            })
+
+        logger.info(f"Successfully fetched {len(news_items)} news items")
+
+        return {
+            "count": len(news_items),
+            "news": news_items
+        }
 
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP error fetching news: {e}")
@@ -215,29 +215,27 @@ async def get_news_since_last_update() -> Dict[str, Any]:
 
     try:
         # Parse pacman log for last update timestamp
-        pacman_log = Path("/var/log/pacman.log")
+        pacman_log = Path(PACMAN_LOG)
 
         if not pacman_log.exists():
             return create_error_response(
                 "NotFound",
-                "Pacman log file not found at /var/log/pacman.log"
+                f"Pacman log file not found at {PACMAN_LOG}"
             )
 
-        # Find last system update timestamp
+        # Find last system update timestamp (the most recent one is near EOF)
         last_update = None
+        timestamp = find_last_update_timestamp(str(pacman_log))
+
+        if timestamp:
+            try:
+                last_update = datetime.fromisoformat(timestamp)
+            except ValueError:
+                logger.warning(f"Unparseable log timestamp: {timestamp}")
 
-        with open(pacman_log, 'r') as f:
-            for line in f:
-                # Look for upgrade entries
-                if " upgraded " in line or " installed " in line or "starting full system upgrade" in line:
-                    # Extract timestamp [YYYY-MM-DD HH:MM]
-                    match = re.match(r'\[(\d{4}-\d{2}-\d{2})\s+(\d{2}:\d{2})\]', line)
-                    if match:
-                        date_str = f"{match.group(1)}T{match.group(2)}:00+00:00"
-                        try:
-                            last_update = datetime.fromisoformat(date_str)
-                        except ValueError:
-                            continue
+        if last_update is not None and last_update.tzinfo is None:
+            # Older pacman versions logged no UTC offset; treat those times as UTC
+            last_update = last_update.replace(tzinfo=timezone.utc)
 
         if last_update is None:
             logger.warning("Could not determine last update timestamp")
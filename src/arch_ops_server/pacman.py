@@ -4,17 +4,26 @@ Pacman/Official Repository interface module.
 Provides package info and update checks with hybrid local/remote approach.
 """
 
+import asyncio
 import logging
 import re
-from typing import Dict, Any, List, Optional
+from typing import Awaitable, Callable, Dict, Any, List, Optional
 import httpx
 
 from .utils import (
     IS_ARCH,
     run_command,
+    stream_command,
     create_error_response,
-    check_command_exists
+    check_command_exists,
+    capabilities
 )
+from .http_client import get_http_client
+from .fileindex import file_index
+from .filesdb import MATCH_MODES, files_index
+from .localdb import local_db
+from .syncdb import find_package, sync_db
+from .verify import integrity_verifier
 
 logger = logging.getLogger(__name__)
 
@@ -24,12 +33,29 @@ ARCH_PACKAGES_API = "https://archlinux.org/packages/search/json/"
 # HTTP client settings
 DEFAULT_TIMEOUT = 10.0
 
+# Maximum concurrent archlinux.org API requests for batch lookups
+MAX_CONCURRENT_REMOTE_LOOKUPS = 8
+
+# Maximum `pacman -F` output lines read (common names match thousands of files)
+FILE_SEARCH_MAX_LINES = 50000
+
+# Maximum matches returned by a files index search
+FILE_SEARCH_MAX_MATCHES = 10000
+
+# Maximum issue lines returned by a whole-system verification
+VERIFY_MAX_ISSUES = 500
+
+# Background refresh of the files index started by search_package_files
+_files_index_refresh: Optional[asyncio.Future] = None
+
 
 async def get_official_package_info(package_name: str) -> Dict[str, Any]:
     """
     Get information about an official repository package.
     
     Uses hybrid approach:
+    - If sync databases are available: Read them directly (also works on
+      non-Arch hosts pointed at a downloaded copy via ARCH_OPS_SYNC_DB_DIR)
     - If on Arch Linux: Execute `pacman -Si` for local database query
     - Otherwise: Query archlinux.org API
     
@@ -41,7 +67,14 @@ async def get_official_package_info(package_name: str) -> Dict[str, Any]:
     """
     logger.info(f"Fetching info for official package: {package_name}")
     
-    # Try local pacman first if on Arch
+    # Try the sync database index first
+    if sync_db.is_available():
+        info = await _get_package_info_syncdb(package_name)
+        if info is not None:
+            return info
+        logger.debug(f"{package_name} not found in sync database index")
+    
+    # Try local pacman if on Arch
     if IS_ARCH and check_command_exists("pacman"):
         info = await _get_package_info_local(package_name)
         if info is not None:
@@ -52,6 +85,34 @@ async def get_official_package_info(package_name: str) -> Dict[str, Any]:
     return await _get_package_info_remote(package_name)
 
 
+async def _get_package_info_syncdb(package_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up package info in the sync database index.
+    
+    The first call (and the first after a database sync) parses the
+    databases, so it runs in a worker thread.
+    
+    Args:
+        package_name: Package name
+    
+    Returns:
+        Package info dict or None if not found
+    """
+    try:
+        repos = await asyncio.to_thread(sync_db.load)
+        pkg = find_package(repos, package_name)
+    except Exception as e:
+        logger.warning(f"Sync database lookup failed: {e}")
+        return None
+    
+    if pkg is None:
+        return None
+    
+    info = {"source": "local", **pkg}
+    logger.info(f"Successfully fetched {package_name} info from sync database")
+    return info
+
+
 async def _get_package_info_local(package_name: str) -> Optional[Dict[str, Any]]:
     """
     Query package info using local pacman command.
@@ -104,49 +165,49 @@ async def _get_package_info_remote(package_name: str) -> Dict[str, Any]:
     }
     
     try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            response = await client.get(ARCH_PACKAGES_API, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            results = data.get("results", [])
-            
-            if not results:
-                return create_error_response(
-                    "NotFound",
-                    f"Official package '{package_name}' not found in repositories"
-                )
-            
-            # Take first exact match (there should only be one)
-            pkg = results[0]
-            
-            info = {
-                "source": "remote",
-                "name": pkg.get("pkgname"),
-                "repository": pkg.get("repo"),
-                "version": pkg.get("pkgver"),
-                "release": pkg.get("pkgrel"),
-                "epoch": pkg.get("epoch"),
-                "description": pkg.get("pkgdesc"),
-                "url": pkg.get("url"),
-                "architecture": pkg.get("arch"),
-                "maintainers": pkg.get("maintainers", []),
-                "packager": pkg.get("packager"),
-                "build_date": pkg.get("build_date"),
-                "last_update": pkg.get("last_update"),
-                "licenses": pkg.get("licenses", []),
-                "groups": pkg.get("groups", []),
-                "provides": pkg.get("provides", []),
-                "depends": pkg.get("depends", []),
-                "optdepends": pkg.get("optdepends", []),
-                "conflicts": pkg.get("conflicts", []),
-                "replaces": pkg.get("replaces", []),
-            }
-            
-            logger.info(f"Successfully fetched {package_name} info remotely")
-            
-            return info
-            
+        client = get_http_client(ARCH_PACKAGES_API)
+        response = await client.get(ARCH_PACKAGES_API, params=params, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        
+        data = response.json()
+        results = data.get("results", [])
+        
+        if not results:
+            return create_error_response(
+                "NotFound",
+                f"Official package '{package_name}' not found in repositories"
+            )
+        
+        # Take first exact match (there should only be one)
+        pkg = results[0]
+        
+        info = {
+            "source": "remote",
+            "name": pkg.get("pkgname"),
+            "repository": pkg.get("repo"),
+            "version": pkg.get("pkgver"),
+            "release": pkg.get("pkgrel"),
+            "epoch": pkg.get("epoch"),
+            "description": pkg.get("pkgdesc"),
+            "url": pkg.get("url"),
+            "architecture": pkg.get("arch"),
+            "maintainers": pkg.get("maintainers", []),
+            "packager": pkg.get("packager"),
+            "build_date": pkg.get("build_date"),
+            "last_update": pkg.get("last_update"),
+            "licenses": pkg.get("licenses", []),
+            "groups": pkg.get("groups", []),
+            "provides": pkg.get("provides", []),
+            "depends": pkg.get("depends", []),
+            "optdepends": pkg.get("optdepends", []),
+            "conflicts": pkg.get("conflicts", []),
+            "replaces": pkg.get("replaces", []),
+        }
+        
+        logger.info(f"Successfully fetched {package_name} info remotely")
+        
+        return info
+        
     except httpx.TimeoutException:
         logger.error(f"Remote package info fetch timed out for: {package_name}")
         return create_error_response(
@@ -168,6 +229,115 @@ async def _get_package_info_remote(package_name: str) -> Dict[str, Any]:
         )
 
 
+async def get_official_package_info_batch(package_names: List[str]) -> Dict[str, Any]:
+    """
+    Get information about several official repository packages at once.
+    
+    Resolves names with the same hybrid order as get_official_package_info,
+    but each tier handles every remaining name in one pass:
+    - Sync database index lookups
+    - A single `pacman -Si name1 name2 ...` invocation on Arch Linux
+    - Concurrent archlinux.org API requests (bounded) for the rest
+    
+    Args:
+        package_names: Package names
+    
+    Returns:
+        Dict with per-package info and per-package errors
+    """
+    if not package_names:
+        return create_error_response(
+            "ValidationError",
+            "No packages specified"
+        )
+    
+    # Deduplicate while keeping the caller's order
+    names = list(dict.fromkeys(package_names))
+    logger.info(f"Fetching info for {len(names)} official packages")
+    
+    results: Dict[str, Dict[str, Any]] = {}
+    
+    if sync_db.is_available():
+        try:
+            repos = await asyncio.to_thread(sync_db.load)
+            for name in names:
+                pkg = find_package(repos, name)
+                if pkg is not None:
+                    results[name] = {"source": "local", **pkg}
+        except Exception as e:
+            logger.warning(f"Sync database batch lookup failed: {e}")
+    
+    pending = [name for name in names if name not in results]
+    if pending and IS_ARCH and check_command_exists("pacman"):
+        results.update(await _get_package_info_local_batch(pending))
+    
+    pending = [name for name in names if name not in results]
+    if pending:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REMOTE_LOOKUPS)
+        
+        async def fetch(name: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await _get_package_info_remote(name)
+        
+        remote = await asyncio.gather(*(fetch(name) for name in pending))
+        results.update(zip(pending, remote))
+    
+    packages = {name: results[name] for name in names if not results[name].get("error")}
+    errors = {name: results[name] for name in names if results[name].get("error")}
+    
+    logger.info(f"Fetched {len(packages)}/{len(names)} official packages ({len(errors)} errors)")
+    
+    return {
+        "package_count": len(names),
+        "found_count": len(packages),
+        "error_count": len(errors),
+        "packages": packages,
+        "errors": errors
+    }
+
+
+async def _get_package_info_local_batch(package_names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Query several packages with a single pacman -Si invocation.
+    
+    pacman prints one block per package found (separated by blank lines)
+    and reports missing names on stderr, so a non-zero exit still yields
+    the packages that were found.
+    
+    Args:
+        package_names: Package names
+    
+    Returns:
+        Dict mapping found package names to info dicts
+    """
+    try:
+        exit_code, stdout, stderr = await run_command(
+            ["pacman", "-Si"] + package_names,
+            timeout=5 + len(package_names) // 10,
+            check=False
+        )
+    except Exception as e:
+        logger.warning(f"Local pacman batch query failed: {e}")
+        return {}
+    
+    if exit_code != 0:
+        logger.debug(f"pacman -Si reported missing packages: {stderr.strip()}")
+    
+    results = {}
+    wanted = set(package_names)
+    
+    for block in re.split(r'\n\s*\n', stdout):
+        info = _parse_pacman_output(block)
+        if not info or info.get("name") not in wanted:
+            continue
+        # Keep the first repository's entry, like pacman -S would
+        if info["name"] not in results:
+            info["source"] = "local"
+            results[info["name"]] = info
+    
+    return results
+
+
 def _parse_pacman_output(output: str) -> Optional[Dict[str, Any]]:
     """
     Parse pacman -Si output into structured dict.
@@ -378,6 +548,8 @@ async def remove_package(
             )
 
         logger.info(f"Successfully removed {package_name}")
+        # The removal may have taken commands (AUR helpers, tools) with it
+        capabilities.refresh()
 
         return {
             "success": True,
@@ -455,6 +627,7 @@ async def remove_packages_batch(
             )
 
         logger.info(f"Successfully removed {len(package_names)} packages")
+        capabilities.refresh()
 
         return {
             "success": True,
@@ -472,52 +645,82 @@ async def remove_packages_batch(
         )
 
 
-async def list_orphan_packages() -> Dict[str, Any]:
+def _local_db_missing_error() -> Dict[str, Any]:
     """
-    List all orphaned packages (dependencies no longer required).
+    Build the error response used when the local package database is missing.
 
     Returns:
-        Dict with list of orphan packages
+        Structured error dict
+    """
+    return create_error_response(
+        "NotFound",
+        f"Pacman local database not found at {local_db.path}"
+    )
+
+
+async def list_installed_packages() -> Dict[str, Any]:
+    """
+    List all installed packages.
+
+    Returns:
+        Dict with installed package names and versions
     """
     if not IS_ARCH:
         return create_error_response(
             "NotSupported",
-            "Orphan package detection is only available on Arch Linux"
+            "Installed package listing is only available on Arch Linux"
         )
 
-    if not check_command_exists("pacman"):
+    if not local_db.is_available():
+        return _local_db_missing_error()
+
+    logger.info("Listing installed packages")
+
+    try:
+        # Same output as pacman -Q, served from the local database index
+        # (parsing or checking the desc files runs in a worker thread)
+        installed = await asyncio.to_thread(local_db.packages)
+        packages = [
+            {"name": pkg["name"], "version": pkg["version"]}
+            for pkg in installed
+        ]
+
+        logger.info(f"Found {len(packages)} installed packages")
+
+        return {
+            "package_count": len(packages),
+            "packages": packages
+        }
+
+    except Exception as e:
+        logger.error(f"Failed to list installed packages: {e}")
         return create_error_response(
-            "CommandNotFound",
-            "pacman command not found"
+            "CommandError",
+            f"Failed to list installed packages: {str(e)}"
         )
 
-    logger.info("Listing orphan packages")
 
-    try:
-        exit_code, stdout, stderr = await run_command(
-            ["pacman", "-Qtdq"],
-            timeout=10,
-            check=False
+async def list_orphan_packages() -> Dict[str, Any]:
+    """
+    List all orphaned packages (dependencies no longer required).
+
+    Returns:
+        Dict with list of orphan packages
+    """
+    if not IS_ARCH:
+        return create_error_response(
+            "NotSupported",
+            "Orphan package detection is only available on Arch Linux"
         )
 
-        # Exit code 1 with no output means no orphans
-        if exit_code == 1 and not stdout.strip():
-            logger.info("No orphan packages found")
-            return {
-                "orphan_count": 0,
-                "orphans": []
-            }
+    if not local_db.is_available():
+        return _local_db_missing_error()
 
-        if exit_code != 0:
-            logger.error(f"Failed to list orphans: {stderr}")
-            return create_error_response(
-                "CommandError",
-                f"Failed to list orphan packages: {stderr}",
-                f"Exit code: {exit_code}"
-            )
+    logger.info("Listing orphan packages")
 
-        # Parse output - one package per line
-        orphans = [pkg.strip() for pkg in stdout.strip().split('\n') if pkg.strip()]
+    try:
+        # Same selection as pacman -Qtdq, served from the local database index
+        orphans = [pkg["name"] for pkg in await asyncio.to_thread(local_db.orphan_packages)]
 
         logger.info(f"Found {len(orphans)} orphan packages")
 
@@ -644,53 +847,85 @@ async def find_package_owner(file_path: str) -> Dict[str, Any]:
             "Package ownership queries are only available on Arch Linux"
         )
 
-    if not check_command_exists("pacman"):
-        return create_error_response(
-            "CommandNotFound",
-            "pacman command not found"
-        )
+    if not file_index.is_available():
+        return _local_db_missing_error()
 
     logger.info(f"Finding owner of file: {file_path}")
 
     try:
-        exit_code, stdout, stderr = await run_command(
-            ["pacman", "-Qo", file_path],
-            timeout=5,
-            check=False
-        )
+        # Same lookup as pacman -Qo, served from the file ownership index
+        owners = await asyncio.to_thread(file_index.owners, file_path)
 
-        if exit_code != 0:
+        if not owners:
             logger.info(f"No package owns {file_path}")
             return create_error_response(
                 "NotFound",
-                f"No package owns this file: {file_path}",
-                stderr
+                f"No package owns this file: {file_path}"
             )
 
-        # Parse output: "/path/to/file is owned by package 1.0-1"
-        match = re.search(r'is owned by (\S+)\s+(\S+)', stdout)
-        if match:
-            package_name = match.group(1)
-            version = match.group(2)
+        package_name, version = owners[0]
+        logger.info(f"File {file_path} is owned by {package_name} {version}")
+
+        return {
+            "file": file_path,
+            "package": package_name,
+            "version": version,
+            "owners": [{"package": name, "version": ver} for name, ver in owners]
+        }
+
+    except Exception as e:
+        logger.error(f"Package ownership query failed: {e}")
+        return create_error_response(
+            "CommandError",
+            f"Failed to find package owner: {str(e)}"
+        )
 
-            logger.info(f"File {file_path} is owned by {package_name} {version}")
 
-            return {
-                "file": file_path,
-                "package": package_name,
-                "version": version
-            }
+async def find_package_owners(file_paths: List[str]) -> Dict[str, Any]:
+    """
+    Find the owning packages of many files in one call.
 
+    Args:
+        file_paths: Absolute paths of files or directories
+
+    Returns:
+        Dict mapping each owned path to its owners, plus the unowned paths
+    """
+    if not IS_ARCH:
         return create_error_response(
-            "ParseError",
-            f"Could not parse pacman output: {stdout}"
+            "NotSupported",
+            "Package ownership queries are only available on Arch Linux"
         )
 
+    if not file_index.is_available():
+        return _local_db_missing_error()
+
+    logger.info(f"Finding owners of {len(file_paths)} files")
+
+    try:
+        results = await asyncio.to_thread(file_index.owners_batch, file_paths)
+
+        owners = {
+            path: [{"package": name, "version": version} for name, version in found]
+            for path, found in results.items()
+            if found
+        }
+        unowned = [path for path, found in results.items() if not found]
+
+        logger.info(f"{len(owners)} of {len(results)} files are owned by a package")
+
+        return {
+            "file_count": len(results),
+            "owned_count": len(owners),
+            "owners": owners,
+            "unowned": unowned
+        }
+
     except Exception as e:
         logger.error(f"Package ownership query failed: {e}")
         return create_error_response(
             "CommandError",
-            f"Failed to find package owner: {str(e)}"
+            f"Failed to find package owners: {str(e)}"
         )
 
 
@@ -711,45 +946,24 @@ async def list_package_files(package_name: str, filter_pattern: Optional[str] =
             "Package file listing is only available on Arch Linux"
         )
 
-    if not check_command_exists("pacman"):
-        return create_error_response(
-            "CommandNotFound",
-            "pacman command not found"
-        )
+    if not file_index.is_available():
+        return _local_db_missing_error()
 
     logger.info(f"Listing files for package: {package_name}")
 
     try:
-        exit_code, stdout, stderr = await run_command(
-            ["pacman", "-Ql", package_name],
-            timeout=10,
-            check=False
-        )
+        pattern = re.compile(filter_pattern) if filter_pattern else None
 
-        if exit_code != 0:
-            logger.error(f"Failed to list files for {package_name}: {stderr}")
+        # Same list as pacman -Ql, served from the file ownership index
+        files = await asyncio.to_thread(file_index.files, package_name)
+        if files is None:
             return create_error_response(
                 "NotFound",
-                f"Package not found or no files: {package_name}",
-                stderr
+                f"Package not found or no files: {package_name}"
             )
 
-        # Parse output: "package /path/to/file"
-        files = []
-        for line in stdout.strip().split('\n'):
-            if not line.strip():
-                continue
-
-            parts = line.split(maxsplit=1)
-            if len(parts) == 2:
-                file_path = parts[1]
-
-                # Apply filter if provided
-                if filter_pattern:
-                    if re.search(filter_pattern, file_path):
-                        files.append(file_path)
-                else:
-                    files.append(file_path)
+        if pattern is not None:
+            files = [file_path for file_path in files if pattern.search(file_path)]
 
         logger.info(f"Found {len(files)} files for {package_name}")
 
@@ -768,46 +982,64 @@ async def list_package_files(package_name: str, filter_pattern: Optional[str] =
         )
 
 
-async def search_package_files(filename_pattern: str) -> Dict[str, Any]:
+async def _search_files_with_pacman(filename_pattern: str, regex: bool = False) -> Dict[str, Any]:
     """
-    Search for files across all packages.
+    Search repository files by running pacman -F.
+
+    Used while the files index is being built or refreshed.
 
     Args:
-        filename_pattern: Filename pattern to search for
+        filename_pattern: File name or path (a regex if regex is True)
+        regex: Pass -x so the pattern is a regular expression
 
     Returns:
         Dict with matching files and packages
     """
-    if not IS_ARCH:
-        return create_error_response(
-            "NotSupported",
-            "Package file search is only available on Arch Linux"
-        )
-
-    if not check_command_exists("pacman"):
-        return create_error_response(
-            "CommandNotFound",
-            "pacman command not found"
-        )
-
-    logger.info(f"Searching for files matching: {filename_pattern}")
-
     try:
-        # First check if file database is synced
-        exit_code, stdout, stderr = await run_command(
-            ["pacman", "-F", filename_pattern],
-            timeout=30,
-            check=False
-        )
+        # Parse output: "repository/package version\n    path/to/file"
+        matches = []
+        current_package = None
 
-        if exit_code == 1 and "database" in stderr.lower():
+        cmd = ["pacman", "-F", "-x", filename_pattern] if regex else ["pacman", "-F", filename_pattern]
+        async with stream_command(
+            cmd,
+            timeout=30,
+            max_lines=FILE_SEARCH_MAX_LINES
+        ) as stream:
+            async for line in stream:
+                if not line.strip():
+                    continue
+
+                if line.startswith(' '):
+                    # This is a file path
+                    if current_package:
+                        matches.append({
+                            "package": current_package["package"],
+                            "repository": current_package["repository"],
+                            "version": current_package["version"],
+                            "file": line.strip()
+                        })
+                else:
+                    # This is a package line: "repository/package version"
+                    parts = line.split()
+                    if len(parts) >= 2:
+                        repo_pkg = parts[0].split('/')
+                        if len(repo_pkg) == 2:
+                            current_package = {
+                                "repository": repo_pkg[0],
+                                "package": repo_pkg[1],
+                                "version": parts[1]
+                            }
+
+        # Check if file database is synced
+        if stream.exit_code == 1 and "database" in stream.stderr.lower():
             return create_error_response(
                 "DatabaseNotSynced",
                 "Package file database not synced. Run 'sudo pacman -Fy' first.",
                 "File database needs to be synchronized before searching"
             )
 
-        if exit_code != 0 and not stdout.strip():
+        if stream.exit_code != 0 and not matches:
             logger.info(f"No files found matching {filename_pattern}")
             return {
                 "pattern": filename_pattern,
@@ -815,44 +1047,104 @@ async def search_package_files(filename_pattern: str) -> Dict[str, Any]:
                 "matches": []
             }
 
-        # Parse output: "repository/package version\n    path/to/file"
-        matches = []
-        current_package = None
+        logger.info(f"Found {len(matches)} files matching {filename_pattern}")
 
-        for line in stdout.strip().split('\n'):
-            if not line.strip():
-                continue
-
-            if line.startswith(' '):
-                # This is a file path
-                if current_package:
-                    file_path = line.strip()
-                    matches.append({
-                        "package": current_package["package"],
-                        "repository": current_package["repository"],
-                        "version": current_package["version"],
-                        "file": file_path
-                    })
-            else:
-                # This is a package line: "repository/package version"
-                parts = line.split()
-                if len(parts) >= 2:
-                    repo_pkg = parts[0].split('/')
-                    if len(repo_pkg) == 2:
-                        current_package = {
-                            "repository": repo_pkg[0],
-                            "package": repo_pkg[1],
-                            "version": parts[1]
-                        }
+        return {
+            "pattern": filename_pattern,
+            "match_count": len(matches),
+            "matches": matches,
+            "truncated": stream.truncated
+        }
+
+    except Exception as e:
+        logger.error(f"File search failed: {e}")
+        return create_error_response(
+            "CommandError",
+            f"Failed to search package files: {str(e)}"
+        )
+
+
+def _start_files_index_refresh() -> None:
+    """Refresh the files index in a worker thread unless a refresh is already running."""
+    global _files_index_refresh
+
+    if _files_index_refresh is not None and not _files_index_refresh.done():
+        return
+
+    async def refresh() -> None:
+        try:
+            await asyncio.to_thread(files_index.refresh)
+        except Exception as e:
+            logger.warning(f"Files index refresh failed: {e}")
+
+    _files_index_refresh = asyncio.ensure_future(refresh())
+
+
+async def search_package_files(filename_pattern: str, match_mode: str = "exact") -> Dict[str, Any]:
+    """
+    Search for files across all packages.
+
+    Served from the files index (built from the synced .files databases).
+    While the index is outdated after `pacman -Fy`, exact and regex
+    searches run pacman -F and the index is refreshed in the background.
+
+    Args:
+        filename_pattern: File name, path, glob or regex to search for
+        match_mode: "exact" (like pacman -F), "glob" or "regex" (like pacman -Fx)
+
+    Returns:
+        Dict with matching files and packages
+    """
+    if not IS_ARCH:
+        return create_error_response(
+            "NotSupported",
+            "Package file search is only available on Arch Linux"
+        )
+
+    if match_mode not in MATCH_MODES:
+        return create_error_response(
+            "ValidationError",
+            f"Unknown match mode: {match_mode} (expected one of {', '.join(MATCH_MODES)})"
+        )
+
+    if not files_index.is_available():
+        return create_error_response(
+            "DatabaseNotSynced",
+            "Package file database not synced. Run 'sudo pacman -Fy' first.",
+            "File database needs to be synchronized before searching"
+        )
+
+    logger.info(f"Searching for files matching: {filename_pattern} ({match_mode})")
+
+    try:
+        stale = await asyncio.to_thread(files_index.stale_repositories)
+        if stale:
+            if match_mode != "glob" and check_command_exists("pacman"):
+                logger.info(f"Files index outdated for {', '.join(stale)}, searching with pacman -F")
+                _start_files_index_refresh()
+                return await _search_files_with_pacman(filename_pattern, regex=match_mode == "regex")
+            await asyncio.to_thread(files_index.refresh)
+
+        matches = await asyncio.to_thread(
+            files_index.search, filename_pattern, match_mode, FILE_SEARCH_MAX_MATCHES + 1
+        )
+        truncated = len(matches) > FILE_SEARCH_MAX_MATCHES
+        matches = matches[:FILE_SEARCH_MAX_MATCHES]
 
         logger.info(f"Found {len(matches)} files matching {filename_pattern}")
 
         return {
             "pattern": filename_pattern,
             "match_count": len(matches),
-            "matches": matches
+            "matches": matches,
+            "truncated": truncated
         }
 
+    except re.error as e:
+        return create_error_response(
+            "ValidationError",
+            f"Invalid regular expression: {e}"
+        )
     except Exception as e:
         logger.error(f"File search failed: {e}")
         return create_error_response(
@@ -861,52 +1153,121 @@ async def search_package_files(filename_pattern: str) -> Dict[str, Any]:
         )
 
 
-async def verify_package_integrity(package_name: str, thorough: bool = False) -> Dict[str, Any]:
+async def search_package_files_batch(filenames: List[str]) -> Dict[str, Any]:
     """
-    Verify integrity of an installed package.
+    Find the packages providing many files in one call.
 
     Args:
-        package_name: Name of package to verify
-        thorough: If True, perform thorough check (pacman -Qkk)
+        filenames: Exact file names such as "libfoo.so.3"
 
     Returns:
-        Dict with verification results
+        Dict mapping each file name to its matches, plus the names nothing provides
     """
     if not IS_ARCH:
         return create_error_response(
             "NotSupported",
-            "Package verification is only available on Arch Linux"
+            "Package file search is only available on Arch Linux"
         )
 
-    if not check_command_exists("pacman"):
+    if not files_index.is_available():
         return create_error_response(
-            "CommandNotFound",
-            "pacman command not found"
+            "DatabaseNotSynced",
+            "Package file database not synced. Run 'sudo pacman -Fy' first.",
+            "File database needs to be synchronized before searching"
         )
 
-    logger.info(f"Verifying package integrity: {package_name} (thorough={thorough})")
+    logger.info(f"Searching for {len(filenames)} file names")
 
     try:
-        cmd = ["pacman", "-Qkk" if thorough else "-Qk", package_name]
+        await asyncio.to_thread(files_index.refresh)
+        results = await asyncio.to_thread(files_index.search_many, filenames)
 
-        exit_code, stdout, stderr = await run_command(
-            cmd,
-            timeout=30,
-            check=False
+        return {
+            "file_count": len(results),
+            "results": {name: matches for name, matches in results.items() if matches},
+            "not_found": [name for name, matches in results.items() if not matches]
+        }
+
+    except Exception as e:
+        logger.error(f"File search failed: {e}")
+        return create_error_response(
+            "CommandError",
+            f"Failed to search package files: {str(e)}"
         )
 
-        if exit_code != 0 and "was not found" in stderr:
+
+async def verify_package_integrity(
+    package_name: Optional[str] = None,
+    thorough: bool = False,
+    progress: Optional[Callable[[int, int, str], Awaitable[None]]] = None,
+    full: bool = False
+) -> Dict[str, Any]:
+    """
+    Verify integrity of an installed package, or of every installed package.
+
+    Files are checked natively against the local database, several packages
+    at a time: existence only (like pacman -Qk), or with thorough=True type,
+    permissions, owner, size, modification time and SHA-256 checksum from
+    the package mtree (like pacman -Qkk). Thorough whole-system runs skip
+    files whose stat is unchanged since they passed the previous one.
+
+    Args:
+        package_name: Name of package to verify (default: all installed packages)
+        thorough: If True, perform thorough check (pacman -Qkk)
+        progress: Awaited with (packages done, packages total, last package)
+            while a whole-system verification runs
+        full: Check every file in a thorough whole-system run, including
+            files unchanged since the previous run
+
+    Returns:
+        Dict with verification results
+    """
+    if not IS_ARCH:
+        return create_error_response(
+            "NotSupported",
+            "Package verification is only available on Arch Linux"
+        )
+
+    if not local_db.is_available():
+        return _local_db_missing_error()
+
+    scope = package_name or "all installed packages"
+    logger.info(f"Verifying package integrity: {scope} (thorough={thorough})")
+
+    report = None
+    reports = []
+    if progress is not None:
+        loop = asyncio.get_running_loop()
+
+        def report(done: int, total: int, name: str) -> None:
+            reports.append(asyncio.run_coroutine_threadsafe(progress(done, total, name), loop))
+
+    try:
+        result = await asyncio.to_thread(
+            integrity_verifier.verify,
+            [package_name] if package_name else None,
+            thorough,
+            report,
+            full
+        )
+        # Deliver every progress report before the result
+        await asyncio.gather(*(asyncio.wrap_future(f) for f in reports), return_exceptions=True)
+    except Exception as e:
+        logger.error(f"Package verification failed: {e}")
+        return create_error_response(
+            "CommandError",
+            f"Failed to verify package: {str(e)}"
+        )
+
+    if package_name:
+        if package_name not in result["packages"]:
             return create_error_response(
                 "NotFound",
                 f"Package not installed: {package_name}"
             )
 
-        # Parse verification output
-        issues = []
-        for line in stdout.strip().split('\n'):
-            if "warning" in line.lower() or "missing" in line.lower():
-                issues.append(line.strip())
-
+        checked = result["packages"][package_name]
+        issues = checked["issues"]
         logger.info(f"Found {len(issues)} issues for {package_name}")
 
         return {
@@ -914,15 +1275,29 @@ async def verify_package_integrity(package_name: str, thorough: bool = False) ->
             "thorough": thorough,
             "issues_found": len(issues),
             "issues": issues,
-            "all_ok": len(issues) == 0
+            "all_ok": len(issues) == 0,
+            "files_checked": checked["files_checked"],
+            "files_skipped": checked["files_skipped"]
         }
 
-    except Exception as e:
-        logger.error(f"Package verification failed: {e}")
-        return create_error_response(
-            "CommandError",
-            f"Failed to verify package: {str(e)}"
-        )
+    packages = result["packages"]
+    issues = [issue for name in sorted(packages) for issue in packages[name]["issues"]]
+    with_issues = sorted(name for name, checked in packages.items() if checked["issues"])
+    logger.info(f"Found {len(issues)} issues in {len(with_issues)} of {len(packages)} packages")
+
+    return {
+        "scope": "system",
+        "thorough": thorough,
+        "packages_checked": len(packages),
+        "files_checked": sum(checked["files_checked"] for checked in packages.values()),
+        "files_skipped": sum(checked["files_skipped"] for checked in packages.values()),
+        "issues_found": len(issues),
+        "issues": issues[:VERIFY_MAX_ISSUES],
+        "issues_truncated": len(issues) > VERIFY_MAX_ISSUES,
+        "packages_with_issues": with_issues,
+        "all_ok": len(issues) == 0,
+        "seconds": result["seconds"]
+    }
 
 
 async def list_package_groups() -> Dict[str, Any]:
@@ -938,14 +1313,28 @@ async def list_package_groups() -> Dict[str, Any]:
             "Package groups are only available on Arch Linux"
         )
 
+    logger.info("Listing package groups")
+
+    if sync_db.is_available():
+        try:
+            groups = await asyncio.to_thread(sync_db.groups)
+            groups_list = sorted(groups)
+
+            logger.info(f"Found {len(groups_list)} package groups")
+
+            return {
+                "group_count": len(groups_list),
+                "groups": groups_list
+            }
+        except Exception as e:
+            logger.warning(f"Sync database group listing failed, using pacman: {e}")
+
     if not check_command_exists("pacman"):
         return create_error_response(
             "CommandNotFound",
             "pacman command not found"
         )
 
-    logger.info("Listing package groups")
-
     try:
         exit_code, stdout, stderr = await run_command(
             ["pacman", "-Sg"],
@@ -1000,14 +1389,35 @@ async def list_group_packages(group_name: str) -> Dict[str, Any]:
             "Package groups are only available on Arch Linux"
         )
 
+    logger.info(f"Listing packages in group: {group_name}")
+
+    if sync_db.is_available():
+        try:
+            groups = await asyncio.to_thread(sync_db.groups)
+            if group_name not in groups:
+                return create_error_response(
+                    "NotFound",
+                    f"Group not found: {group_name}"
+                )
+
+            packages = groups[group_name]
+
+            logger.info(f"Found {len(packages)} packages in {group_name}")
+
+            return {
+                "group": group_name,
+                "package_count": len(packages),
+                "packages": packages
+            }
+        except Exception as e:
+            logger.warning(f"Sync database group lookup failed, using pacman: {e}")
+
     if not check_command_exists("pacman"):
         return create_error_response(
             "CommandNotFound",
             "pacman command not found"
         )
 
-    logger.info(f"Listing packages in group: {group_name}")
-
     try:
         exit_code, stdout, stderr = await run_command(
             ["pacman", "-Sg", group_name],
@@ -1058,37 +1468,18 @@ async def list_explicit_packages() -> Dict[str, Any]:
             "Package install reason queries are only available on Arch Linux"
         )
 
-    if not check_command_exists("pacman"):
-        return create_error_response(
-            "CommandNotFound",
-            "pacman command not found"
-        )
+    if not local_db.is_available():
+        return _local_db_missing_error()
 
     logger.info("Listing explicitly installed packages")
 
     try:
-        exit_code, stdout, stderr = await run_command(
-            ["pacman", "-Qe"],
-            timeout=15,
-            check=False
-        )
-
-        if exit_code != 0:
-            return create_error_response(
-                "CommandError",
-                f"Failed to list explicit packages: {stderr}"
-            )
-
-        # Parse output - format: "package version"
-        packages = []
-        for line in stdout.strip().split('\n'):
-            if line.strip():
-                parts = line.split()
-                if len(parts) >= 2:
-                    packages.append({
-                        "name": parts[0],
-                        "version": parts[1]
-                    })
+        # Same selection as pacman -Qe, served from the local database index
+        explicit = await asyncio.to_thread(local_db.explicit_packages)
+        packages = [
+            {"name": pkg["name"], "version": pkg["version"]}
+            for pkg in explicit
+        ]
 
         logger.info(f"Found {len(packages)} explicitly installed packages")
 
@@ -1137,6 +1528,9 @@ async def mark_as_explicit(package_name: str) -> Dict[str, Any]:
             skip_sudo_check=True
         )
 
+        # pacman -D rewrites the desc file in place; rebuild even if its mtime looks unchanged
+        local_db.invalidate()
+
         if exit_code != 0:
             return create_error_response(
                 "CommandError",
@@ -1191,6 +1585,9 @@ async def mark_as_dependency(package_name: str) -> Dict[str, Any]:
             skip_sudo_check=True
         )
 
+        # pacman -D rewrites the desc file in place; rebuild even if its mtime looks unchanged
+        local_db.invalidate()
+
         if exit_code != 0:
             return create_error_response(
                 "CommandError",
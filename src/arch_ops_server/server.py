@@ -6,10 +6,11 @@ This module contains the MCP server configuration, resources, tools, and prompts
 for the Arch Linux MCP server.
 """
 
+import asyncio
 import logging
 import json
-from typing import Any
-from urllib.parse import urlparse
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
 
 from mcp.server import Server
 from mcp.types import (
@@ -27,23 +28,30 @@ from . import (
     # Wiki functions
     search_wiki,
     get_wiki_page_as_text,
+    get_wiki_section,
+    get_wiki_sections,
     # AUR functions
     search_aur,
     get_aur_info,
+    get_aur_info_batch,
     get_pkgbuild,
     analyze_pkgbuild_safety,
     analyze_package_metadata_risk,
     install_package_secure,
     # Pacman functions
     get_official_package_info,
+    get_official_package_info_batch,
     check_updates_dry_run,
     remove_package,
     remove_packages_batch,
+    list_installed_packages,
     list_orphan_packages,
     remove_orphans,
     find_package_owner,
+    find_package_owners,
     list_package_files,
     search_package_files,
+    search_package_files_batch,
     verify_package_integrity,
     list_package_groups,
     list_group_packages,
@@ -70,6 +78,7 @@ from . import (
     list_active_mirrors,
     test_mirror_speed,
     suggest_fastest_mirrors,
+    benchmark_mirror_throughput,
     check_mirrorlist_health,
     # Config functions
     analyze_pacman_conf,
@@ -78,15 +87,19 @@ from . import (
     get_parallel_downloads_setting,
     # Utils
     IS_ARCH,
-    run_command,
 )
 
+from .localdb import dependency_name
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
 # Initialize MCP server
 server = Server("arch-ops-server")
 
+# Time limit for one check run by a prompt workflow
+PROMPT_STEP_TIMEOUT = 30.0
+
 
 # ============================================================================
 # HELPER FUNCTIONS
@@ -141,6 +154,106 @@ def create_standard_output_schema(data_schema: dict, description: str = "") -> d
     return schema
 
 
+class WorkflowStep(NamedTuple):
+    """
+    One check run by run_workflow_steps().
+
+    Attributes:
+        name: Key of the step's result
+        run: Coroutine function; called with the results of depends_on as keyword arguments
+        depends_on: Names of steps that must finish successfully first
+        timeout: Seconds before the step is abandoned
+    """
+    name: str
+    run: Callable[..., Awaitable[Any]]
+    depends_on: Tuple[str, ...] = ()
+    timeout: float = PROMPT_STEP_TIMEOUT
+
+
+async def run_workflow_steps(steps: List[WorkflowStep]) -> Dict[str, Any]:
+    """
+    Run prompt workflow checks concurrently, respecting dependencies.
+
+    Every step starts immediately and waits only for the steps it depends
+    on, so the total latency is that of the slowest dependency chain rather
+    than the sum of all steps. A step that fails or times out does not
+    affect independent steps; steps depending on it are skipped.
+
+    Args:
+        steps: Steps to run; dependencies must be listed before their dependents
+
+    Returns:
+        Dict mapping step name to its result, or to the exception it raised
+        (asyncio.TimeoutError when it timed out)
+
+    Raises:
+        ValueError: If a step depends on an unknown or later step
+    """
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run_step(step: WorkflowStep) -> Any:
+        inputs = {}
+        for dependency in step.depends_on:
+            result = await tasks[dependency]
+            if isinstance(result, Exception):
+                return RuntimeError(f"Skipped because {dependency} failed: {result}")
+            inputs[dependency] = result
+
+        try:
+            return await asyncio.wait_for(step.run(**inputs), timeout=step.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Workflow step {step.name} timed out after {step.timeout:g}s")
+            return asyncio.TimeoutError(f"{step.name} did not finish within {step.timeout:g} seconds")
+        except Exception as e:
+            logger.warning(f"Workflow step {step.name} failed: {e}")
+            return e
+
+    for step in steps:
+        unknown = [d for d in step.depends_on if d not in tasks]
+        if unknown:
+            for task in tasks.values():
+                task.cancel()
+            raise ValueError(f"Step {step.name} depends on unknown or later steps: {unknown}")
+        tasks[step.name] = asyncio.create_task(run_step(step))
+
+    results = await asyncio.gather(*tasks.values())
+    return dict(zip(tasks, results))
+
+
+def _step_result(results: Dict[str, Any], name: str) -> Any:
+    """Return a workflow step result, re-raising the exception it ended with."""
+    result = results[name]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def _progress_reporter() -> Optional[Callable[[int, int, str], Awaitable[None]]]:
+    """
+    Build a progress callback for the tool call being handled.
+
+    Returns:
+        Coroutine function sending MCP progress notifications, or None if
+        the client did not ask for progress (no progressToken)
+    """
+    try:
+        ctx = server.request_context
+    except LookupError:
+        return None
+
+    token = ctx.meta.progressToken if ctx.meta is not None else None
+    if token is None:
+        return None
+
+    async def report(done: int, total: int, message: str) -> None:
+        try:
+            await ctx.session.send_progress_notification(token, done, total, message)
+        except Exception as e:
+            logger.debug(f"Could not send progress notification: {e}")
+
+    return report
+
+
 # ============================================================================
 # RESOURCES
 # ============================================================================
@@ -312,6 +425,8 @@ async def read_resource(uri: str) -> str:
 
     Supported schemes:
     - archwiki://{page_title} - Returns Wiki page as Markdown
+    - archwiki://{page_title}#{section} - Returns only the named sections ("|"-separated headings, anchors or indexes)
+    - archwiki://{page_title}?sections - Returns the page's section outline as JSON
     - aur://{package}/pkgbuild - Returns raw PKGBUILD file
     - aur://{package}/info - Returns AUR package metadata
     - archrepo://{package} - Returns official repository package info
@@ -320,8 +435,8 @@ async def read_resource(uri: str) -> str:
     - pacman://explicit - Returns list of explicitly installed packages (Arch only)
     - pacman://groups - Returns list of all package groups (Arch only)
     - pacman://group/{group_name} - Returns packages in a specific group (Arch only)
-    - system://info - Returns system information
-    - system://disk - Returns disk space information
+    - system://info - Returns system information (?units=bytes for numeric output)
+    - system://disk - Returns disk space information (?units=bytes for numeric output)
     - system://services/failed - Returns failed systemd services
     - system://logs/boot - Returns recent boot logs
 
@@ -352,6 +467,20 @@ async def read_resource(uri: str) -> str:
         if not page_title:
             raise ValueError("Wiki page title required in URI (e.g., archwiki://Installation_guide)")
         
+        # Section outline only
+        if "sections" in parse_qs(parsed.query, keep_blank_values=True):
+            sections = await get_wiki_sections(page_title)
+            return json.dumps({"title": page_title, "sections": sections}, indent=2)
+
+        # Requested sections only, in the order given
+        if parsed.fragment:
+            parts = [
+                await get_wiki_section(page_title, unquote(name))
+                for name in parsed.fragment.split("|")
+                if name.strip()
+            ]
+            return "\n\n".join(parts)
+
         # Fetch Wiki page as Markdown
         content = await get_wiki_page_as_text(page_title)
         return content
@@ -398,18 +527,11 @@ async def read_resource(uri: str) -> str:
 
         if resource_path == "installed":
             # Get installed packages
-            exit_code, stdout, stderr = await run_command(["pacman", "-Q"])
-            if exit_code != 0:
-                raise ValueError(f"Failed to get installed packages: {stderr}")
-
-            # Parse pacman output
-            packages = []
-            for line in stdout.strip().split('\n'):
-                if line.strip():
-                    name, version = line.strip().rsplit(' ', 1)
-                    packages.append({"name": name, "version": version})
+            result = await list_installed_packages()
+            if result.get("error"):
+                raise ValueError(f"Failed to get installed packages: {result['message']}")
 
-            return json.dumps(packages, indent=2)
+            return json.dumps(result["packages"], indent=2)
 
         elif resource_path == "orphans":
             # Get orphan packages
@@ -458,14 +580,17 @@ async def read_resource(uri: str) -> str:
     elif scheme == "system":
         resource_path = parsed.netloc or parsed.path.lstrip('/')
 
+        # ?units=bytes selects numeric output (for dashboards and scripts)
+        human_readable = parse_qs(parsed.query).get("units", [""])[0] != "bytes"
+
         if resource_path == "info":
             # Get system information
-            result = await get_system_info()
+            result = await get_system_info(human_readable=human_readable)
             return json.dumps(result, indent=2)
 
         elif resource_path == "disk":
             # Get disk space information
-            result = await check_disk_space()
+            result = await check_disk_space(human_readable=human_readable)
             return json.dumps(result, indent=2)
 
         elif resource_path == "services/failed":
@@ -624,6 +749,22 @@ async def list_tools() -> list[Tool]:
             }
         ),
         
+        Tool(
+            name="get_official_package_info_batch",
+            description="[DISCOVERY] Get information about many official repository packages in one call. Resolves all names with one local lookup or concurrent archlinux.org API requests. Returns per-package info and per-package errors. Prefer this over repeated get_official_package_info calls.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "package_names": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "List of exact package names"
+                    }
+                },
+                "required": ["package_names"]
+            }
+        ),
+        
         Tool(
             name="check_updates_dry_run",
             description="[LIFECYCLE] Check for available system updates without applying them. Only works on Arch Linux systems. Requires pacman-contrib package. Safe read-only operation that shows pending updates.",
@@ -759,16 +900,20 @@ async def list_tools() -> list[Tool]:
         # Package Ownership Tools
         Tool(
             name="find_package_owner",
-            description="[ORGANIZATION] Find which package owns a specific file on the system. Useful for troubleshooting and understanding file origins. Only works on Arch Linux.",
+            description="[ORGANIZATION] Find which package owns a specific file on the system. Pass file_paths to look up many files at once (e.g., auditing a directory). Useful for troubleshooting and understanding file origins. Only works on Arch Linux.",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "file_path": {
                         "type": "string",
                         "description": "Absolute path to the file (e.g., /usr/bin/vim)"
+                    },
+                    "file_paths": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Absolute paths to look up in one batch (instead of file_path)"
                     }
-                },
-                "required": ["file_path"]
+                }
             }
         ),
 
@@ -793,37 +938,51 @@ async def list_tools() -> list[Tool]:
 
         Tool(
             name="search_package_files",
-            description="[ORGANIZATION] Search for files across all packages in repositories. Requires package database sync (pacman -Fy). Only works on Arch Linux.",
+            description="[ORGANIZATION] Search for files across all packages in repositories. Pass filenames to look up many exact file names at once. Requires package database sync (pacman -Fy). Only works on Arch Linux.",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "filename_pattern": {
                         "type": "string",
-                        "description": "File name or pattern to search for (e.g., 'vim' or '*.service')"
+                        "description": "File name, path or pattern to search for (e.g., 'libfoo.so.3', 'usr/bin/vim' or '*.service')"
+                    },
+                    "match_mode": {
+                        "type": "string",
+                        "enum": ["exact", "glob", "regex"],
+                        "description": "How filename_pattern is matched (default: exact)",
+                        "default": "exact"
+                    },
+                    "filenames": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Exact file names to look up in one batch (instead of filename_pattern)"
                     }
-                },
-                "required": ["filename_pattern"]
+                }
             }
         ),
 
         # Package Verification
         Tool(
             name="verify_package_integrity",
-            description="[MAINTENANCE] Verify the integrity of installed package files. Detects modified, missing, or corrupted files. Only works on Arch Linux.",
+            description="[MAINTENANCE] Verify the integrity of installed package files, or of every installed package. Detects modified, missing, or corrupted files. Only works on Arch Linux.",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "package_name": {
                         "type": "string",
-                        "description": "Name of the package to verify"
+                        "description": "Name of the package to verify (omit to verify every installed package)"
                     },
                     "thorough": {
                         "type": "boolean",
-                        "description": "Perform thorough check including file attributes. Default: false",
+                        "description": "Perform thorough check including file attributes and SHA-256 checksums. Default: false",
+                        "default": False
+                    },
+                    "full": {
+                        "type": "boolean",
+                        "description": "For a thorough check of every package, also re-check files unchanged since the previous run (otherwise skipped). Default: false",
                         "default": False
                     }
-                },
-                "required": ["package_name"]
+                }
             }
         ),
 
@@ -898,7 +1057,13 @@ async def list_tools() -> list[Tool]:
             description="[MONITORING] Get comprehensive system information including kernel version, architecture, hostname, uptime, and memory statistics. Works on any system.",
             inputSchema={
                 "type": "object",
-                "properties": {}
+                "properties": {
+                    "human_readable": {
+                        "type": "boolean",
+                        "description": "Uptime as text and memory in kB/MB. Set false for uptime_seconds and memory in bytes. Default: true",
+                        "default": True
+                    }
+                }
             }
         ),
 
@@ -907,7 +1072,13 @@ async def list_tools() -> list[Tool]:
             description="[MONITORING] Check disk space usage for critical filesystem paths including root, home, var, and pacman cache. Warns when space is low. Works on any system.",
             inputSchema={
                 "type": "object",
-                "properties": {}
+                "properties": {
+                    "human_readable": {
+                        "type": "boolean",
+                        "description": "Sizes like df -h (e.g. '40G'). Set false for exact byte counts and a numeric use_percent. Default: true",
+                        "default": True
+                    }
+                }
             }
         ),
 
@@ -1066,13 +1237,18 @@ async def list_tools() -> list[Tool]:
 
         Tool(
             name="test_mirror_speed",
-            description="[MIRRORS] Test mirror response time. Can test a specific mirror or all active mirrors. Only works on Arch Linux.",
+            description="[MIRRORS] Test mirror response time. Can test a specific mirror or all active mirrors (probed concurrently, median and p95 latency over several requests). Only works on Arch Linux.",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "mirror_url": {
                         "type": "string",
                         "description": "Specific mirror URL to test, or omit to test all active mirrors"
+                    },
+                    "samples": {
+                        "type": "integer",
+                        "description": "Number of timed requests per mirror. Default: 3",
+                        "default": 3
                     }
                 },
                 "required": []
@@ -1093,6 +1269,45 @@ async def list_tools() -> list[Tool]:
                         "type": "integer",
                         "description": "Number of mirrors to suggest (default 10)",
                         "default": 10
+                    },
+                    "protocol": {
+                        "type": "string",
+                        "description": "Optional protocol filter (e.g., 'https', 'rsync')"
+                    }
+                },
+                "required": []
+            }
+        ),
+
+        Tool(
+            name="benchmark_mirror_throughput",
+            description="[MIRRORS] Measure download throughput (MB/s), time to first byte and connection setup time by downloading part of a repository database from each mirror, and rank mirrors by throughput. Benchmarks a specific mirror, the active mirrorlist (Arch only) or the suggest_fastest_mirrors candidates.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "mirror_url": {
+                        "type": "string",
+                        "description": "Specific mirror URL to benchmark (mirrorlist Server format)"
+                    },
+                    "source": {
+                        "type": "string",
+                        "enum": ["active", "suggested"],
+                        "description": "Candidates when mirror_url is omitted: configured mirrors or suggest_fastest_mirrors results. Default: active",
+                        "default": "active"
+                    },
+                    "country": {
+                        "type": "string",
+                        "description": "Country code filter for suggested candidates (e.g., 'US', 'DE')"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Number of suggested candidates to benchmark (default 5)",
+                        "default": 5
+                    },
+                    "max_bytes": {
+                        "type": "integer",
+                        "description": "Bytes to download from each mirror (default 4 MiB)",
+                        "default": 4194304
                     }
                 },
                 "required": []
@@ -1191,6 +1406,11 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
         result = await get_official_package_info(package_name)
         return [TextContent(type="text", text=json.dumps(result, indent=2))]
     
+    elif name == "get_official_package_info_batch":
+        package_names = arguments["package_names"]
+        result = await get_official_package_info_batch(package_names)
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+    
     elif name == "check_updates_dry_run":
         if not IS_ARCH:
             return [TextContent(type="text", text="Error: check_updates_dry_run only available on Arch Linux systems")]
@@ -1258,8 +1478,13 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
         if not IS_ARCH:
             return [TextContent(type="text", text="Error: find_package_owner only available on Arch Linux systems")]
 
-        file_path = arguments["file_path"]
-        result = await find_package_owner(file_path)
+        file_paths = arguments.get("file_paths")
+        if file_paths:
+            result = await find_package_owners(file_paths)
+        elif "file_path" in arguments:
+            result = await find_package_owner(arguments["file_path"])
+        else:
+            return [TextContent(type="text", text="Error: file_path or file_paths is required")]
         return [TextContent(type="text", text=json.dumps(result, indent=2))]
 
     elif name == "list_package_files":
@@ -1275,8 +1500,14 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
         if not IS_ARCH:
             return [TextContent(type="text", text="Error: search_package_files only available on Arch Linux systems")]
 
-        filename_pattern = arguments["filename_pattern"]
-        result = await search_package_files(filename_pattern)
+        filenames = arguments.get("filenames")
+        if filenames:
+            result = await search_package_files_batch(filenames)
+        elif "filename_pattern" in arguments:
+            match_mode = arguments.get("match_mode", "exact")
+            result = await search_package_files(arguments["filename_pattern"], match_mode)
+        else:
+            return [TextContent(type="text", text="Error: filename_pattern or filenames is required")]
         return [TextContent(type="text", text=json.dumps(result, indent=2))]
 
     # Package Verification
@@ -1284,9 +1515,10 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
         if not IS_ARCH:
             return [TextContent(type="text", text="Error: verify_package_integrity only available on Arch Linux systems")]
 
-        package_name = arguments["package_name"]
+        package_name = arguments.get("package_name")
         thorough = arguments.get("thorough", False)
-        result = await verify_package_integrity(package_name, thorough)
+        full = arguments.get("full", False)
+        result = await verify_package_integrity(package_name, thorough, _progress_reporter(), full)
         return [TextContent(type="text", text=json.dumps(result, indent=2))]
 
     # Package Groups
@@ -1331,11 +1563,13 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
 
     # System Diagnostic Tools
     elif name == "get_system_info":
-        result = await get_system_info()
+        human_readable = arguments.get("human_readable", True)
+        result = await get_system_info(human_readable=human_readable)
         return [TextContent(type="text", text=json.dumps(result, indent=2))]
 
     elif name == "check_disk_space":
-        result = await check_disk_space()
+        human_readable = arguments.get("human_readable", True)
+        result = await check_disk_space(human_readable=human_readable)
         return [TextContent(type="text", text=json.dumps(result, indent=2))]
 
     elif name == "get_pacman_cache_stats":
@@ -1422,13 +1656,25 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
             return [TextContent(type="text", text="Error: test_mirror_speed only available on Arch Linux systems")]
         
         mirror_url = arguments.get("mirror_url")
-        result = await test_mirror_speed(mirror_url=mirror_url)
+        samples = arguments.get("samples", 3)
+        result = await test_mirror_speed(mirror_url=mirror_url, samples=samples, progress=_progress_reporter())
         return [TextContent(type="text", text=json.dumps(result, indent=2))]
 
     elif name == "suggest_fastest_mirrors":
         country = arguments.get("country")
         limit = arguments.get("limit", 10)
-        result = await suggest_fastest_mirrors(country=country, limit=limit)
+        protocol = arguments.get("protocol")
+        result = await suggest_fastest_mirrors(country=country, limit=limit, protocol=protocol)
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "benchmark_mirror_throughput":
+        result = await benchmark_mirror_throughput(
+            mirror_url=arguments.get("mirror_url"),
+            source=arguments.get("source", "active"),
+            country=arguments.get("country"),
+            limit=arguments.get("limit", 5),
+            max_bytes=arguments.get("max_bytes", 4 * 1024 * 1024)
+        )
         return [TextContent(type="text", text=json.dumps(result, indent=2))]
 
     elif name == "check_mirrorlist_health":
@@ -1714,18 +1960,33 @@ async def get_prompt(name: str, arguments: dict[str, str]) -> GetPromptResult:
         # Check if it's an official package first
         try:
             official_info = await get_official_package_info(package_name)
-            if official_info.get("found"):
-                deps = official_info.get("dependencies", [])
-                opt_deps = official_info.get("optional_dependencies", [])
+            if not official_info.get("error"):
+                # Sync database/remote info uses depends, pacman -Si output depends_on
+                deps = official_info.get("depends") or official_info.get("depends_on", [])
+                opt_deps = official_info.get("optdepends") or official_info.get("optional_deps", [])
+                
+                # Resolve every dependency in one batch lookup
+                dep_names = list(dict.fromkeys(dependency_name(dep) for dep in deps + opt_deps))
+                resolved = {}
+                if dep_names:
+                    batch = await get_official_package_info_batch(dep_names)
+                    resolved = batch.get("packages", {})
                 
+                def describe(dep: str) -> str:
+                    info = resolved.get(dependency_name(dep))
+                    if info:
+                        return f"- {dep} ({info.get('repository', 'official')} {info.get('version', '')})".rstrip()
+                    return f"- {dep} (virtual or not in official repositories)"
+                
+                deps = [dependency_name(dep) for dep in deps]
                 analysis = f"""
 # Dependency Analysis for {package_name} (Official Package)
 
 ## Required Dependencies
-{chr(10).join([f"- {dep}" for dep in deps]) if deps else "None"}
+{chr(10).join([describe(dep) for dep in deps]) if deps else "None"}
 
 ## Optional Dependencies
-{chr(10).join([f"- {dep}" for dep in opt_deps]) if opt_deps else "None"}
+{chr(10).join([describe(dep) for dep in opt_deps]) if opt_deps else "None"}
 
 ## Installation Order
 1. Install required dependencies first
@@ -1738,7 +1999,7 @@ async def get_prompt(name: str, arguments: dict[str, str]) -> GetPromptResult:
 sudo pacman -S {' '.join(deps) if deps else '# No required dependencies'}
 
 # Install optional dependencies (if needed)
-sudo pacman -S {' '.join(opt_deps) if opt_deps else '# No optional dependencies'}
+sudo pacman -S {' '.join(dependency_name(dep) for dep in opt_deps) if opt_deps else '# No optional dependencies'}
 
 # Install the package
 sudo pacman -S {package_name}
@@ -1747,14 +2008,41 @@ sudo pacman -S {package_name}
             else:
                 # Check AUR
                 aur_info = await get_aur_info(package_name)
-                if aur_info.get("found"):
+                if not aur_info.get("error"):
+                    aur_pkg = aur_info.get("data", {})
+                    
+                    # Classify dependencies: official repos first, then one batched AUR lookup
+                    dep_names = list(dict.fromkeys(
+                        dependency_name(dep)
+                        for dep in aur_pkg.get("depends", []) + aur_pkg.get("makedepends", [])
+                    ))
+                    official_deps = {}
+                    aur_deps = {}
+                    if dep_names:
+                        official_batch = await get_official_package_info_batch(dep_names)
+                        official_deps = official_batch.get("packages", {})
+                        aur_dep_names = [dep for dep in dep_names if dep not in official_deps]
+                        if aur_dep_names:
+                            aur_batch = await get_aur_info_batch(aur_dep_names)
+                            aur_deps = aur_batch.get("data", {}).get("packages", {})
+                    unresolved = [dep for dep in dep_names if dep not in official_deps and dep not in aur_deps]
+                    
                     analysis = f"""
 # Dependency Analysis for {package_name} (AUR Package)
 
 ## AUR Package Information
-- **Maintainer**: {aur_info.get('maintainer', 'Unknown')}
-- **Last Updated**: {aur_info.get('last_modified', 'Unknown')}
-- **Votes**: {aur_info.get('votes', 'Unknown')}
+- **Maintainer**: {aur_pkg.get('maintainer', 'Unknown')}
+- **Last Updated**: {aur_pkg.get('last_modified', 'Unknown')}
+- **Votes**: {aur_pkg.get('votes', 'Unknown')}
+
+## Dependencies from Official Repositories
+{chr(10).join([f"- {dep} ({info.get('repository', 'official')})" for dep, info in official_deps.items()]) if official_deps else "None"}
+
+## Dependencies from the AUR (must also be built and audited)
+{chr(10).join([f"- {dep} ({info.get('version')}, maintainer: {info.get('maintainer') or 'orphaned'})" for dep, info in aur_deps.items()]) if aur_deps else "None"}
+
+## Unresolved Dependencies (virtual or unavailable)
+{chr(10).join([f"- {dep}" for dep in unresolved]) if unresolved else "None"}
 
 ## Installation Considerations
 1. **Security Check**: Run a security audit before installation
@@ -1820,9 +2108,19 @@ paru -S {package_name}  # or yay -S {package_name}
         warnings = []
         recommendations = []
         
+        # Run the independent checks concurrently; the report below is
+        # assembled in a fixed order once all of them finished or timed out
+        results = await run_workflow_steps([
+            WorkflowStep("news", lambda: check_critical_news(limit=10)),
+            WorkflowStep("disk", check_disk_space),
+            WorkflowStep("updates", check_updates_dry_run, timeout=60.0),
+            WorkflowStep("services", check_failed_services),
+            WorkflowStep("database", check_database_freshness),
+        ])
+        
         # Step 1: Check for critical news
         try:
-            critical_news = await check_critical_news(limit=10)
+            critical_news = _step_result(results, "news")
             
             if critical_news.get("has_critical"):
                 analysis += "## ⚠️ Critical Arch Linux News\n\n"
@@ -1841,7 +2139,7 @@ paru -S {package_name}  # or yay -S {package_name}
         
         # Step 2: Check disk space
         try:
-            disk_space = await check_disk_space()
+            disk_space = _step_result(results, "disk")
             disk_usage = disk_space.get("disk_usage", {})
             
             analysis += "## Disk Space Status\n\n"
@@ -1857,7 +2155,7 @@ paru -S {package_name}  # or yay -S {package_name}
         
         # Step 3: Check pending updates
         try:
-            updates = await check_updates_dry_run()
+            updates = _step_result(results, "updates")
             
             if updates.get("updates_available"):
                 count = updates.get("count", 0)
@@ -1889,7 +2187,7 @@ paru -S {package_name}  # or yay -S {package_name}
         
         # Step 4: Check failed services
         try:
-            failed_services = await check_failed_services()
+            failed_services = _step_result(results, "services")
             
             if not failed_services.get("all_ok"):
                 analysis += "## ⚠️ Failed Services Detected\n\n"
@@ -1905,7 +2203,7 @@ paru -S {package_name}  # or yay -S {package_name}
         
         # Step 5: Check database freshness
         try:
-            db_freshness = await check_database_freshness()
+            db_freshness = _step_result(results, "database")
             
             if db_freshness.get("needs_sync"):
                 analysis += "## Database Synchronization\n\n"
@@ -2110,6 +2408,7 @@ Be comprehensive and explain security implications."""
    - Run suggest_fastest_mirrors{f'(country="{country}")' if country else ''}
    - Based on geographic location and current status
    - Show top 10 recommended mirrors
+   - Run benchmark_mirror_throughput(source="suggested"{f', country="{country}"' if country else ''}) to rank them by measured download speed
 
 4. **Health Check**:
    - Run check_mirrorlist_health
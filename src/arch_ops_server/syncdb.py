@@ -0,0 +1,447 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Pacman sync database reader module.
+Streams the repository databases in /var/lib/pacman/sync (tar archives,
+gzip or zstd compressed) into an in-memory index so official package
+lookups do not need pacman or the archlinux.org API.
+"""
+
+import logging
+import os
+import tarfile
+import threading
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from .config import PACMAN_CONF, config_cache, parse_config_file
+from .localdb import parse_desc, dependency_name
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Sync database directory; point it at a downloaded copy on non-Arch hosts
+PACMAN_SYNC_DB = os.getenv("ARCH_OPS_SYNC_DB_DIR", "/var/lib/pacman/sync")
+
+# Lookup order used when pacman.conf cannot be read (its stock order)
+DEFAULT_REPO_ORDER = ["core-testing", "core", "extra-testing", "extra", "multilib-testing", "multilib"]
+
+# Magic bytes used to detect the database compression
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def configured_repositories() -> List[str]:
+    """
+    Get the repositories declared in pacman.conf.
+
+    Returns:
+        Repository names in declaration order (empty if pacman.conf is
+        missing, unreadable or declares none)
+    """
+    if os.path.isfile(PACMAN_CONF):
+        try:
+            config = config_cache.get(PACMAN_CONF, parse_config_file)
+            return [repo["name"] for repo in config.get("repositories", [])]
+        except Exception as e:
+            logger.warning(f"Could not read repositories from {PACMAN_CONF}: {e}")
+    return []
+
+
+def repository_order() -> List[str]:
+    """
+    Get the repository lookup order used by pacman.
+
+    Returns:
+        Repository names in pacman.conf declaration order, or
+        DEFAULT_REPO_ORDER if pacman.conf is missing or declares none
+    """
+    return configured_repositories() or DEFAULT_REPO_ORDER
+
+
+def _repo_sort_key(repo: str, order: List[str]) -> Tuple[int, str]:
+    """Sort repositories in the given order, others alphabetically after."""
+    if repo in order:
+        return (order.index(repo), repo)
+    return (len(order), repo)
+
+
+def repository_files(directory: str, suffix: str) -> List[Path]:
+    """
+    List the repository databases of a sync directory in lookup order.
+
+    When pacman.conf declares repositories, databases of other repositories
+    (left behind after a repository was removed from pacman.conf) are
+    skipped, as pacman ignores them too.
+
+    Args:
+        directory: Sync database directory
+        suffix: Database file suffix (".db" or ".files")
+
+    Returns:
+        Database paths sorted by repository_order()
+    """
+    sync_dir = Path(directory)
+    if not sync_dir.is_dir():
+        return []
+
+    configured = configured_repositories()
+    order = configured or DEFAULT_REPO_ORDER
+    files = [
+        path for path in sync_dir.glob(f"*{suffix}")
+        if not configured or path.stem in configured
+    ]
+    return sorted(files, key=lambda p: _repo_sort_key(p.stem, order))
+
+
+def find_package(
+    repos: Dict[str, Dict[str, Dict[str, Any]]],
+    name: str,
+    repo: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Look up a package by exact name (like pacman -Si) in a loaded index.
+
+    Args:
+        repos: Result of SyncDatabase.load()
+        name: Package name
+        repo: Restrict the lookup to one repository
+
+    Returns:
+        Package dict from the first repository containing it, or None
+    """
+    for repo_name, packages in repos.items():
+        if repo is not None and repo_name != repo:
+            continue
+        pkg = packages.get(name)
+        if pkg is not None:
+            return pkg
+    return None
+
+
+def _package_from_sync_desc(sections: Dict[str, List[str]], repo: str) -> Optional[Dict[str, Any]]:
+    """
+    Build a package dict from parsed sync desc sections.
+
+    Args:
+        sections: Output of parse_desc() (desc and legacy depends merged)
+        repo: Repository the entry belongs to
+
+    Returns:
+        Package dict or None if the entry has no name
+    """
+    def single(key: str, default: str = "") -> str:
+        values = sections.get(key)
+        return values[0] if values else default
+
+    name = single("NAME")
+    if not name:
+        return None
+
+    return {
+        "name": name,
+        "base": single("BASE", name),
+        "repository": repo,
+        "version": single("VERSION"),
+        "description": single("DESC"),
+        "url": single("URL"),
+        "architecture": single("ARCH"),
+        "packager": single("PACKAGER"),
+        "build_date": int(single("BUILDDATE", "0") or 0),
+        "filename": single("FILENAME"),
+        "download_size": int(single("CSIZE", "0") or 0),
+        "installed_size": int(single("ISIZE", "0") or 0),
+        "sha256sum": single("SHA256SUM"),
+        "groups": sections.get("GROUPS", []),
+        "licenses": sections.get("LICENSE", []),
+        "depends": sections.get("DEPENDS", []),
+        "optdepends": sections.get("OPTDEPENDS", []),
+        "makedepends": sections.get("MAKEDEPENDS", []),
+        "checkdepends": sections.get("CHECKDEPENDS", []),
+        "provides": sections.get("PROVIDES", []),
+        "conflicts": sections.get("CONFLICTS", []),
+        "replaces": sections.get("REPLACES", []),
+    }
+
+
+def _open_archive(fileobj) -> tarfile.TarFile:
+    """
+    Open a sync database for streaming, detecting its compression.
+
+    Args:
+        fileobj: Binary file object positioned at the start of the database
+
+    Returns:
+        TarFile in stream mode
+
+    Raises:
+        RuntimeError: If the database is zstd compressed and zstandard is missing
+    """
+    magic = fileobj.read(4)
+    fileobj.seek(0)
+
+    if magic == ZSTD_MAGIC:
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstd compressed database requires the zstandard package")
+        reader = zstandard.ZstdDecompressor().stream_reader(fileobj)
+        return tarfile.open(fileobj=reader, mode="r|")
+
+    # gzip, xz, bzip2 and uncompressed archives
+    return tarfile.open(fileobj=fileobj, mode="r|*")
+
+
+def read_sync_database(path: str, repo: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse one repository database into a package dict.
+
+    The archive is read in a single streaming pass; each entry directory
+    holds a desc file (and a separate depends file in old databases).
+
+    Args:
+        path: Path to the .db file
+        repo: Repository name
+
+    Returns:
+        Dict mapping package name to package dict
+    """
+    entries: Dict[str, Dict[str, List[str]]] = {}
+
+    with open(path, "rb") as f, _open_archive(f) as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+
+            entry, _, filename = member.name.rpartition("/")
+            if filename not in ("desc", "depends"):
+                continue
+
+            data = archive.extractfile(member)
+            if data is None:
+                continue
+
+            content = data.read().decode("utf-8", errors="replace")
+            entries.setdefault(entry, {}).update(parse_desc(content))
+
+    packages: Dict[str, Dict[str, Any]] = {}
+    for sections in entries.values():
+        pkg = _package_from_sync_desc(sections, repo)
+        if pkg is not None:
+            packages[pkg["name"]] = pkg
+
+    return packages
+
+
+def _entry_file_list(sections: Dict[str, List[str]]) -> Optional[Tuple[str, str, List[str]]]:
+    """Build (name, version, files) from a parsed files database entry."""
+    names = sections.get("NAME")
+    if not names:
+        return None
+    versions = sections.get("VERSION")
+    return names[0], versions[0] if versions else "", sections.get("FILES", [])
+
+
+def iter_files_database(path: str) -> Iterator[Tuple[str, str, List[str]]]:
+    """
+    Stream the package file lists of one repository .files database.
+
+    The archive is read in a single streaming pass; each entry directory
+    holds a desc file and a files file, so only one entry is kept in
+    memory at a time.
+
+    Args:
+        path: Path to the .files file
+
+    Yields:
+        (package name, version, paths) tuples; paths are relative to /
+        and directories end with '/'
+    """
+    current = None
+    sections: Dict[str, List[str]] = {}
+
+    with open(path, "rb") as f, _open_archive(f) as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+
+            entry, _, filename = member.name.rpartition("/")
+            if filename not in ("desc", "files"):
+                continue
+
+            if entry != current:
+                if current is not None:
+                    package = _entry_file_list(sections)
+                    if package is not None:
+                        yield package
+                current, sections = entry, {}
+
+            data = archive.extractfile(member)
+            if data is None:
+                continue
+
+            sections.update(parse_desc(data.read().decode("utf-8", errors="replace")))
+
+    if current is not None:
+        package = _entry_file_list(sections)
+        if package is not None:
+            yield package
+
+
+class SyncDatabase:
+    """
+    In-memory index of the pacman sync databases.
+
+    Each repository is re-read only when its .db file changes (pacman -Sy
+    replaces the file, changing its mtime). load() does that check; get()
+    and find_package() are plain dict accesses on a loaded index.
+    """
+
+    def __init__(self, path: str = PACMAN_SYNC_DB) -> None:
+        self.path = path
+        self._repos: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._signatures: Dict[str, Tuple[int, int, int]] = {}
+        self._providers: Dict[str, List[Tuple[str, str]]] = {}
+        self._replacers: Dict[str, List[Tuple[str, str]]] = {}
+        self._groups: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def database_files(self) -> List[Path]:
+        """List the .db files of the configured repositories in lookup order."""
+        return repository_files(self.path, ".db")
+
+    def is_available(self) -> bool:
+        """Check whether any sync database is present."""
+        return bool(self.database_files())
+
+    def invalidate(self) -> None:
+        """Force every repository to be re-read on the next query."""
+        with self._lock:
+            self._signatures.clear()
+
+    def load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Return the per-repository index, re-reading changed databases.
+
+        Returns:
+            Dict mapping repository name to its package dict, in lookup order
+        """
+        with self._lock:
+            files = self.database_files()
+            changed = False
+
+            repos: Dict[str, Dict[str, Dict[str, Any]]] = {}
+            for db_file in files:
+                repo = db_file.stem
+                st = db_file.stat()
+                signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+                if self._signatures.get(repo) == signature and repo in self._repos:
+                    repos[repo] = self._repos[repo]
+                    continue
+
+                try:
+                    repos[repo] = read_sync_database(str(db_file), repo)
+                except (OSError, tarfile.TarError, RuntimeError) as e:
+                    logger.warning(f"Skipping unreadable sync database {db_file}: {e}")
+                    continue
+
+                self._signatures[repo] = signature
+                changed = True
+                logger.info(f"Indexed {len(repos[repo])} packages from {repo} sync database")
+
+            if changed or list(repos) != list(self._repos):
+                self._repos = repos
+                self._signatures = {r: s for r, s in self._signatures.items() if r in repos}
+                self._build_indexes()
+
+            return self._repos
+
+    def _build_indexes(self) -> None:
+        """Rebuild the provides, replaces and group indexes."""
+        providers: Dict[str, List[Tuple[str, str]]] = {}
+        replacers: Dict[str, List[Tuple[str, str]]] = {}
+        groups: Dict[str, List[str]] = {}
+
+        for repo, packages in self._repos.items():
+            for name in sorted(packages):
+                pkg = packages[name]
+                for provide in pkg["provides"]:
+                    providers.setdefault(dependency_name(provide), []).append((repo, name))
+                for replace in pkg["replaces"]:
+                    replacers.setdefault(dependency_name(replace), []).append((repo, name))
+                for group in pkg["groups"]:
+                    members = groups.setdefault(group, [])
+                    if name not in members:
+                        members.append(name)
+
+        self._providers = providers
+        self._replacers = replacers
+        self._groups = {group: sorted(members) for group, members in groups.items()}
+
+    def get(self, name: str, repo: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a package by exact name in the index as last loaded.
+
+        Does not check the databases for changes; call load() (in a worker
+        thread from async code) first.
+
+        Args:
+            name: Package name
+            repo: Restrict the lookup to one repository
+
+        Returns:
+            Package dict from the first repository containing it, or None
+        """
+        return find_package(self._repos, name, repo)
+
+    def providers(self, name: str) -> List[Dict[str, Any]]:
+        """
+        List packages that provide a name, including the package itself.
+
+        Args:
+            name: Package or provision name (version constraints are ignored)
+
+        Returns:
+            Matching package dicts in repository order
+        """
+        repos = self.load()
+        name = dependency_name(name)
+
+        result = []
+        for repo, packages in repos.items():
+            if name in packages:
+                result.append(packages[name])
+            result.extend(
+                repos[provider_repo][provider]
+                for provider_repo, provider in self._providers.get(name, [])
+                if provider_repo == repo
+            )
+        return result
+
+    def replacements(self, name: str) -> List[Dict[str, Any]]:
+        """
+        List packages that declare they replace a name.
+
+        Args:
+            name: Package name
+
+        Returns:
+            Replacing package dicts in repository order
+        """
+        repos = self.load()
+        return [repos[repo][pkg] for repo, pkg in self._replacers.get(name, [])]
+
+    def groups(self) -> Dict[str, List[str]]:
+        """Map each group to its member packages across all repositories."""
+        self.load()
+        return self._groups
+
+    def repositories(self) -> List[str]:
+        """List indexed repositories in lookup order."""
+        return list(self.load())
+
+
+# Process-wide sync database index
+sync_db = SyncDatabase()
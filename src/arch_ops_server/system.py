@@ -5,75 +5,157 @@ Provides system health checks, disk space monitoring, and service status.
 """
 
 import logging
+import math
 import os
-import re
 from pathlib import Path
 from typing import Dict, Any, List
 
 from .utils import (
     IS_ARCH,
-    run_command,
+    stream_command,
     create_error_response,
-    check_command_exists
+    check_command_exists,
+    capabilities
 )
 
 logger = logging.getLogger(__name__)
 
+# procfs files read for system information
+PROC_UPTIME = "/proc/uptime"
+PROC_MEMINFO = "/proc/meminfo"
 
-async def get_system_info() -> Dict[str, Any]:
+# Size suffixes used by df -h
+SIZE_UNITS = ["", "K", "M", "G", "T", "P", "E"]
+
+
+def _format_uptime(seconds: float) -> str:
+    """
+    Format an uptime like `uptime -p` does.
+
+    Args:
+        seconds: Seconds since boot
+
+    Returns:
+        String such as "up 2 days, 3 hours, 5 minutes"
+    """
+    minutes = int(seconds) // 60
+    parts = []
+    for unit, size in (("year", 525600), ("week", 10080), ("day", 1440), ("hour", 60), ("minute", 1)):
+        count, minutes = divmod(minutes, size)
+        if count:
+            parts.append(f"{count} {unit}{'s' if count != 1 else ''}")
+
+    return "up " + (", ".join(parts) if parts else "0 minutes")
+
+
+def _format_size(num_bytes: int) -> str:
+    """
+    Format a byte count like `df -h` does (powers of 1024, rounded up).
+
+    Args:
+        num_bytes: Size in bytes
+
+    Returns:
+        String such as "40G" or "9.5M"
+    """
+    value = float(num_bytes)
+    for unit in SIZE_UNITS:
+        if math.ceil(value) < 1024 or unit == SIZE_UNITS[-1]:
+            break
+        value /= 1024
+
+    if not unit:
+        return str(num_bytes)
+
+    tenths = math.ceil(value * 10) / 10
+    if tenths < 10:
+        return f"{tenths:.1f}{unit}"
+    return f"{math.ceil(value)}{unit}"
+
+
+def _read_meminfo() -> Dict[str, int]:
+    """
+    Read /proc/meminfo.
+
+    Returns:
+        Dict mapping field name to value in kB
+
+    Raises:
+        OSError: If /proc/meminfo cannot be read
+    """
+    meminfo: Dict[str, int] = {}
+    with open(PROC_MEMINFO, "r") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            fields = value.split()
+            if fields and fields[0].isdigit():
+                meminfo[key] = int(fields[0])
+    return meminfo
+
+
+def _mount_point(path: str) -> str:
+    """Find the mount point containing a path (like df's "Mounted on")."""
+    path = os.path.realpath(path)
+    while not os.path.ismount(path):
+        path = os.path.dirname(path)
+    return path
+
+
+async def get_system_info(human_readable: bool = True) -> Dict[str, Any]:
     """
     Get core system information.
 
+    Reads uname(2), /proc/uptime and /proc/meminfo directly instead of
+    running uname/hostname/uptime.
+
+    Args:
+        human_readable: Report uptime as text and memory in kB/MB; when False,
+            report uptime_seconds and memory in bytes
+
     Returns:
-        Dict with kernel, architecture, hostname, uptime, memory info
+        Dict with kernel, architecture, hostname, uptime, memory info,
+        whether systemd is running and the pacman version
     """
     logger.info("Gathering system information")
 
     info = {}
 
     try:
-        # Kernel version
-        exit_code, stdout, _ = await run_command(["uname", "-r"], timeout=5, check=False)
-        if exit_code == 0:
-            info["kernel"] = stdout.strip()
-
-        # Architecture
-        exit_code, stdout, _ = await run_command(["uname", "-m"], timeout=5, check=False)
-        if exit_code == 0:
-            info["architecture"] = stdout.strip()
-
-        # Hostname
-        exit_code, stdout, _ = await run_command(["hostname"], timeout=5, check=False)
-        if exit_code == 0:
-            info["hostname"] = stdout.strip()
-
-        # Uptime
-        exit_code, stdout, _ = await run_command(["uptime", "-p"], timeout=5, check=False)
-        if exit_code == 0:
-            info["uptime"] = stdout.strip()
+        uname = os.uname()
+        info["kernel"] = uname.release
+        info["architecture"] = uname.machine
+        info["hostname"] = uname.nodename
+
+        # Uptime (first field of /proc/uptime is seconds since boot)
+        try:
+            with open(PROC_UPTIME, "r") as f:
+                uptime_seconds = float(f.read().split()[0])
+
+            if human_readable:
+                info["uptime"] = _format_uptime(uptime_seconds)
+            else:
+                info["uptime_seconds"] = int(uptime_seconds)
+        except (OSError, ValueError, IndexError) as e:
+            logger.warning(f"Failed to read uptime: {e}")
 
         # Memory info from /proc/meminfo
         try:
-            meminfo_path = Path("/proc/meminfo")
-            if meminfo_path.exists():
-                with open(meminfo_path, "r") as f:
-                    meminfo = f.read()
-
-                # Parse memory values
-                mem_total_match = re.search(r"MemTotal:\s+(\d+)", meminfo)
-                mem_available_match = re.search(r"MemAvailable:\s+(\d+)", meminfo)
-
-                if mem_total_match:
-                    info["memory_total_kb"] = int(mem_total_match.group(1))
-                    info["memory_total_mb"] = int(mem_total_match.group(1)) // 1024
-
-                if mem_available_match:
-                    info["memory_available_kb"] = int(mem_available_match.group(1))
-                    info["memory_available_mb"] = int(mem_available_match.group(1)) // 1024
+            meminfo = _read_meminfo()
+
+            for field, name in (("MemTotal", "memory_total"), ("MemAvailable", "memory_available")):
+                if field not in meminfo:
+                    continue
+                if human_readable:
+                    info[f"{name}_kb"] = meminfo[field]
+                    info[f"{name}_mb"] = meminfo[field] // 1024
+                else:
+                    info[f"{name}_bytes"] = meminfo[field] * 1024
         except Exception as e:
             logger.warning(f"Failed to read memory info: {e}")
 
         info["is_arch_linux"] = IS_ARCH
+        info["systemd"] = capabilities.has_systemd
+        info["pacman_version"] = await capabilities.pacman_version()
 
         logger.info("Successfully gathered system information")
         return info
@@ -86,10 +168,18 @@ async def get_system_info() -> Dict[str, Any]:
         )
 
 
-async def check_disk_space() -> Dict[str, Any]:
+async def check_disk_space(human_readable: bool = True) -> Dict[str, Any]:
     """
     Check disk space for critical paths.
 
+    Uses statvfs(2) directly instead of running df, with df's definitions:
+    used = total - free, available = space usable by unprivileged users and
+    use percent = used / (used + available), rounded up.
+
+    Args:
+        human_readable: Report sizes like `df -h` ("40G") and use_percent as
+            "60%"; when False, report *_bytes integers and a numeric use_percent
+
     Returns:
         Dict with disk usage for /, /home, /var, /var/cache/pacman/pkg
     """
@@ -104,35 +194,43 @@ async def check_disk_space() -> Dict[str, Any]:
 
     try:
         for path in paths_to_check:
-            if not Path(path).exists():
+            try:
+                st = os.statvfs(path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.warning(f"Failed to stat filesystem for {path}: {e}")
                 continue
 
-            exit_code, stdout, _ = await run_command(
-                ["df", "-h", path],
-                timeout=5,
-                check=False
-            )
-
-            if exit_code == 0:
-                lines = stdout.strip().split('\n')
-                if len(lines) >= 2:
-                    # Parse df output
-                    parts = lines[1].split()
-                    if len(parts) >= 5:
-                        disk_info[path] = {
-                            "size": parts[1],
-                            "used": parts[2],
-                            "available": parts[3],
-                            "use_percent": parts[4],
-                            "mounted_on": parts[5] if len(parts) > 5 else path
-                        }
-
-                        # Check if space is critically low
-                        use_pct = int(parts[4].rstrip('%'))
-                        if use_pct > 90:
-                            disk_info[path]["warning"] = "Critical: Less than 10% free"
-                        elif use_pct > 80:
-                            disk_info[path]["warning"] = "Low: Less than 20% free"
+            size = st.f_blocks * st.f_frsize
+            used = (st.f_blocks - st.f_bfree) * st.f_frsize
+            available = st.f_bavail * st.f_frsize
+            usable = used + available
+            use_pct = math.ceil(used * 100 / usable) if usable else 0
+
+            if human_readable:
+                entry: Dict[str, Any] = {
+                    "size": _format_size(size),
+                    "used": _format_size(used),
+                    "available": _format_size(available),
+                    "use_percent": f"{use_pct}%",
+                }
+            else:
+                entry = {
+                    "size_bytes": size,
+                    "used_bytes": used,
+                    "available_bytes": available,
+                    "use_percent": use_pct,
+                }
+            entry["mounted_on"] = _mount_point(path)
+
+            # Check if space is critically low
+            if use_pct > 90:
+                entry["warning"] = "Critical: Less than 10% free"
+            elif use_pct > 80:
+                entry["warning"] = "Low: Less than 20% free"
+
+            disk_info[path] = entry
 
         logger.info(f"Checked disk space for {len(disk_info)} paths")
 
@@ -207,7 +305,7 @@ async def check_failed_services() -> Dict[str, Any]:
     Returns:
         Dict with list of failed services
     """
-    if not check_command_exists("systemctl"):
+    if not capabilities.has_systemd or not check_command_exists("systemctl"):
         return create_error_response(
             "NotSupported",
             "systemctl not available (systemd-based system required)"
@@ -216,32 +314,25 @@ async def check_failed_services() -> Dict[str, Any]:
     logger.info("Checking for failed services")
 
     try:
-        exit_code, stdout, _ = await run_command(
-            ["systemctl", "--failed", "--no-pager"],
-            timeout=10,
-            check=False
-        )
-
-        # Parse output
         failed_services = []
-        lines = stdout.strip().split('\n')
 
-        for line in lines:
-            # Skip header and footer lines
-            if line.startswith('●') or line.startswith('UNIT'):
-                continue
-            if 'loaded units listed' in line.lower():
-                continue
-
-            # Parse service line
-            parts = line.split()
-            if parts and parts[0].endswith('.service'):
-                failed_services.append({
-                    "unit": parts[0],
-                    "load": parts[1] if len(parts) > 1 else "",
-                    "active": parts[2] if len(parts) > 2 else "",
-                    "sub": parts[3] if len(parts) > 3 else "",
-                })
+        async with stream_command(["systemctl", "--failed", "--no-pager"], timeout=10) as stream:
+            async for line in stream:
+                # Skip header and footer lines
+                if line.startswith('●') or line.startswith('UNIT'):
+                    continue
+                if 'loaded units listed' in line.lower():
+                    continue
+
+                # Parse service line
+                parts = line.split()
+                if parts and parts[0].endswith('.service'):
+                    failed_services.append({
+                        "unit": parts[0],
+                        "load": parts[1] if len(parts) > 1 else "",
+                        "active": parts[2] if len(parts) > 2 else "",
+                        "sub": parts[3] if len(parts) > 3 else "",
+                    })
 
         logger.info(f"Found {len(failed_services)} failed services")
 
@@ -269,7 +360,7 @@ async def get_boot_logs(lines: int = 100) -> Dict[str, Any]:
     Returns:
         Dict with boot log contents
     """
-    if not check_command_exists("journalctl"):
+    if not capabilities.has_systemd or not check_command_exists("journalctl"):
         return create_error_response(
             "NotSupported",
             "journalctl not available (systemd-based system required)"
@@ -278,25 +369,24 @@ async def get_boot_logs(lines: int = 100) -> Dict[str, Any]:
     logger.info(f"Retrieving {lines} lines of boot logs")
 
     try:
-        exit_code, stdout, stderr = await run_command(
-            ["journalctl", "-b", "-n", str(lines), "--no-pager"],
-            timeout=15,
-            check=False
-        )
+        log_lines = []
+
+        async with stream_command(["journalctl", "-b", "-n", str(lines), "--no-pager"], timeout=15) as stream:
+            async for line in stream:
+                log_lines.append(line)
 
-        if exit_code != 0:
+        if stream.exit_code != 0 and not stream.truncated:
             return create_error_response(
                 "CommandError",
-                f"Failed to retrieve boot logs: {stderr}"
+                f"Failed to retrieve boot logs: {stream.stderr}"
             )
 
-        log_lines = stdout.strip().split('\n')
-
         logger.info(f"Retrieved {len(log_lines)} lines of boot logs")
 
         return {
             "line_count": len(log_lines),
-            "logs": log_lines
+            "logs": log_lines,
+            "truncated": stream.truncated
         }
 
     except Exception as e:
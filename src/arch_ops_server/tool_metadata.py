@@ -38,10 +38,10 @@ class ToolMetadata:
     prerequisite_tools: List[str] = field(default_factory=list)
 
 
-# Complete tool metadata definitions for all 41 tools
+# Complete tool metadata definitions for all 43 tools
 TOOL_METADATA = {
     # ========================================================================
-    # Discovery & Information (6 tools)
+    # Discovery & Information (7 tools)
     # ========================================================================
     "search_archwiki": ToolMetadata(
         name="search_archwiki",
@@ -72,7 +72,16 @@ TOOL_METADATA = {
         platform="any",
         permission="read",
         workflow="research",
-        related_tools=["search_aur", "install_package_secure"],
+        related_tools=["search_aur", "install_package_secure", "get_official_package_info_batch"],
+        prerequisite_tools=[]
+    ),
+    "get_official_package_info_batch": ToolMetadata(
+        name="get_official_package_info_batch",
+        category="discovery",
+        platform="any",
+        permission="read",
+        workflow="research",
+        related_tools=["get_official_package_info"],
         prerequisite_tools=[]
     ),
     "get_latest_news": ToolMetadata(
@@ -379,7 +388,7 @@ TOOL_METADATA = {
     ),
 
     # ========================================================================
-    # Mirror Management (4 tools)
+    # Mirror Management (5 tools)
     # ========================================================================
     "list_active_mirrors": ToolMetadata(
         name="list_active_mirrors",
@@ -405,7 +414,16 @@ TOOL_METADATA = {
         platform="any",
         permission="read",
         workflow="optimize",
-        related_tools=["test_mirror_speed"],
+        related_tools=["test_mirror_speed", "benchmark_mirror_throughput"],
+        prerequisite_tools=[]
+    ),
+    "benchmark_mirror_throughput": ToolMetadata(
+        name="benchmark_mirror_throughput",
+        category="mirrors",
+        platform="any",
+        permission="read",
+        workflow="optimize",
+        related_tools=["test_mirror_speed", "suggest_fastest_mirrors"],
         prerequisite_tools=[]
     ),
     "check_mirrorlist_health": ToolMetadata(
@@ -8,6 +8,10 @@ import asyncio
 import logging
 import os
 import platform
+import re
+import shutil
+import signal
+import time
 from pathlib import Path
 from typing import Optional, Dict, Any
 
@@ -54,6 +58,40 @@ def is_arch_linux() -> bool:
 # Cache the result since it won't change during runtime
 IS_ARCH = is_arch_linux()
 
+# Default cap on stdout read by stream_command (bytes)
+COMMAND_OUTPUT_MAX_BYTES = 64 * 1024 * 1024
+
+# Longest single output line stream_command accepts (bytes)
+COMMAND_LINE_LIMIT = 1024 * 1024
+
+# stderr kept by stream_command (bytes); the rest is drained and dropped
+COMMAND_STDERR_MAX_BYTES = 64 * 1024
+
+
+async def _kill_process(process: asyncio.subprocess.Process, process_group: bool) -> None:
+    """
+    Kill a running child (and its process group) and reap it.
+
+    Args:
+        process: Child process
+        process_group: Kill the whole group led by the child (it must have
+            been started with start_new_session=True)
+    """
+    if process.returncode is not None:
+        return
+
+    try:
+        if process_group:
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError) as e:
+        # Already gone, or a setuid child (sudo) we are not allowed to signal
+        logger.debug(f"Could not kill process {process.pid}: {e}")
+        return
+
+    await process.wait()
+
 
 async def run_command(
     cmd: list[str],
@@ -84,42 +122,28 @@ async def run_command(
     
     # Check if this is a sudo command and if password is cached
     is_sudo_command = cmd and cmd[0] == "sudo"
-    if is_sudo_command and not skip_sudo_check:
-        # Test if sudo password is cached (non-interactive mode)
-        test_cmd = ["sudo", "-n", "true"]
-        try:
-            test_process = await asyncio.create_subprocess_exec(
-                *test_cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            await test_process.communicate()
-            password_cached = test_process.returncode == 0
-            logger.debug(f"Sudo password cached: {password_cached}")
-            
-            if not password_cached:
-                logger.warning("Sudo password is required but not cached. "
-                              "Please run 'sudo pacman -S <package>' manually in the terminal.")
-                return (
-                    1,
-                    "",
-                    "Sudo password required. Please configure passwordless sudo for pacman/paru, "
-                    "or run the installation command manually in your terminal."
-                )
-        except Exception as e:
-            logger.warning(f"Could not check sudo status: {e}")
-            password_cached = False
-    else:
-        password_cached = True
+    if is_sudo_command and not skip_sudo_check and not await capabilities.sudo_ready():
+        logger.warning("Sudo password is required but not cached. "
+                      "Please run 'sudo pacman -S <package>' manually in the terminal.")
+        return (
+            1,
+            "",
+            "Sudo password required. Please configure passwordless sudo for pacman/paru, "
+            "or run the installation command manually in your terminal."
+        )
     
+    process = None
     try:
         # Attach stdin to subprocess for commands that might need input
-        # Use asyncio.subprocess.PIPE to allow stdin interaction
+        # Use asyncio.subprocess.PIPE to allow stdin interaction.
+        # Other commands get their own process group so a timeout can kill
+        # everything they spawned (sudo must keep the caller's terminal session).
         process = await asyncio.create_subprocess_exec(
             *cmd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
-            stdin=asyncio.subprocess.PIPE if is_sudo_command else None
+            stdin=asyncio.subprocess.PIPE if is_sudo_command else None,
+            start_new_session=not is_sudo_command
         )
         
         # Communicate with the process
@@ -142,14 +166,196 @@ async def run_command(
         
         return exit_code, stdout_str, stderr_str
         
-    except asyncio.TimeoutError:
-        logger.error(f"Command timed out after {timeout}s: {' '.join(cmd)}")
+    except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+        if isinstance(e, asyncio.TimeoutError):
+            logger.error(f"Command timed out after {timeout}s: {' '.join(cmd)}")
+        if process is not None:
+            await _kill_process(process, process_group=not is_sudo_command)
         raise
     except Exception as e:
         logger.error(f"Command execution failed: {e}")
         raise
 
 
+class CommandStream:
+    """
+    Line-by-line reader of a running command's stdout.
+
+    Created by stream_command() and used as an async context manager and
+    async iterator. Lines are read from the pipe only as the consumer asks
+    for them, so a slow consumer makes the child block instead of output
+    piling up in memory. The child runs in its own process group, which is
+    killed on timeout, cancellation, leaving the context early, or when the
+    output cap is reached.
+
+    After the context exits, exit_code, stderr, truncated, line_count and
+    byte_count describe the run. exit_code is None if the command was
+    killed before it finished.
+    """
+
+    def __init__(
+        self,
+        cmd: list[str],
+        timeout: float,
+        max_bytes: int,
+        max_lines: Optional[int]
+    ) -> None:
+        self.cmd = cmd
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.exit_code: Optional[int] = None
+        self.stderr = ""
+        self.truncated = False
+        self.line_count = 0
+        self.byte_count = 0
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._deadline = 0.0
+        self._finished = False
+        self._killed = False
+
+    async def __aenter__(self) -> "CommandStream":
+        logger.debug(f"Streaming command: {' '.join(self.cmd)}")
+        self._deadline = asyncio.get_running_loop().time() + self.timeout
+        self._process = await asyncio.create_subprocess_exec(
+            *self.cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            stdin=asyncio.subprocess.DEVNULL,
+            start_new_session=True,
+            limit=COMMAND_LINE_LIMIT
+        )
+        self._stderr_task = asyncio.ensure_future(self._read_stderr())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._process.returncode is None:
+            await self._kill()
+        await self._collect_stderr()
+        if not self._killed:
+            self.exit_code = self._process.returncode
+
+    def __aiter__(self) -> "CommandStream":
+        return self
+
+    async def __anext__(self) -> str:
+        if self._finished:
+            raise StopAsyncIteration
+
+        if self.max_lines is not None and self.line_count >= self.max_lines:
+            await self._truncate()
+            raise StopAsyncIteration
+
+        try:
+            line = await asyncio.wait_for(self._process.stdout.readline(), timeout=self._remaining())
+        except asyncio.TimeoutError:
+            logger.error(f"Command timed out after {self.timeout}s: {' '.join(self.cmd)}")
+            await self._kill()
+            raise
+        except ValueError:
+            # A single line longer than COMMAND_LINE_LIMIT
+            await self._truncate()
+            raise StopAsyncIteration
+
+        if not line:
+            await self._wait()
+            raise StopAsyncIteration
+
+        self.byte_count += len(line)
+        if self.byte_count > self.max_bytes:
+            await self._truncate()
+            raise StopAsyncIteration
+
+        self.line_count += 1
+        return line.decode('utf-8', errors='replace').rstrip('\n')
+
+    def _remaining(self) -> float:
+        """Seconds left before the timeout."""
+        return max(self._deadline - asyncio.get_running_loop().time(), 0.0)
+
+    async def _read_stderr(self) -> str:
+        """Drain stderr, keeping the first COMMAND_STDERR_MAX_BYTES."""
+        kept = bytearray()
+        while True:
+            chunk = await self._process.stderr.read(65536)
+            if not chunk:
+                break
+            if len(kept) < COMMAND_STDERR_MAX_BYTES:
+                kept.extend(chunk[:COMMAND_STDERR_MAX_BYTES - len(kept)])
+        return kept.decode('utf-8', errors='replace')
+
+    async def _collect_stderr(self) -> None:
+        """Store the captured stderr once the stream is done."""
+        if self._stderr_task is None:
+            return
+        try:
+            self.stderr = await asyncio.wait_for(self._stderr_task, timeout=1.0)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            self._stderr_task.cancel()
+        self._stderr_task = None
+
+    async def _wait(self) -> None:
+        """Wait for the child to exit after stdout closed, within the timeout."""
+        self._finished = True
+        try:
+            await asyncio.wait_for(self._process.wait(), timeout=self._remaining())
+        except asyncio.TimeoutError:
+            logger.error(f"Command timed out after {self.timeout}s: {' '.join(self.cmd)}")
+            await self._kill()
+            raise
+
+    async def _truncate(self) -> None:
+        """Stop the command because the output cap was reached."""
+        self.truncated = True
+        logger.warning(
+            f"Output of {' '.join(self.cmd)} truncated after {self.line_count} lines "
+            f"({self.byte_count} bytes)"
+        )
+        await self._kill()
+
+    async def _kill(self) -> None:
+        """Kill the command's process group."""
+        self._finished = True
+        if self._process.returncode is None:
+            self._killed = True
+        await _kill_process(self._process, process_group=True)
+
+
+def stream_command(
+    cmd: list[str],
+    timeout: float = 10,
+    max_bytes: int = COMMAND_OUTPUT_MAX_BYTES,
+    max_lines: Optional[int] = None
+) -> CommandStream:
+    """
+    Run a command and read its stdout as decoded lines.
+
+    Use for commands with potentially large output instead of run_command(),
+    which buffers everything. Not for sudo commands (stdin is /dev/null and
+    the child gets its own session).
+
+    Example:
+        async with stream_command(["pacman", "-Ql", "linux"]) as stream:
+            async for line in stream:
+                ...
+        if stream.exit_code != 0: ...
+
+    Args:
+        cmd: Command and arguments as list
+        timeout: Timeout in seconds for the whole run (default: 10)
+        max_bytes: Stop reading (and kill the command) after this much stdout
+        max_lines: Stop reading (and kill the command) after this many lines
+
+    Returns:
+        CommandStream to use with `async with` and `async for`
+
+    Raises:
+        asyncio.TimeoutError: (while iterating) If the command exceeds timeout
+    """
+    return CommandStream(cmd, timeout, max_bytes, max_lines)
+
+
 def add_aur_warning(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Wrap AUR data with prominent safety warning.
@@ -276,6 +482,162 @@ def _get_wiki_suggestions_for_error(error_type: str, message: str) -> list[str]:
     return unique_suggestions[:5]  # Limit to top 5 suggestions
 
 
+# Binaries looked up when the registry is probed at startup
+KNOWN_COMMANDS = (
+    "pacman", "checkupdates", "paccache", "pacman-key",
+    "systemctl", "journalctl", "sudo", "paru", "yay",
+)
+
+# Seconds a successful sudo credential probe is trusted
+SUDO_PROBE_TTL = float(os.getenv("ARCH_OPS_SUDO_PROBE_TTL", "30"))
+
+# Directory that exists only when systemd is the running init (sd_booted(3))
+SYSTEMD_RUNTIME_DIR = "/run/systemd/system"
+
+_PACMAN_VERSION = re.compile(r'Pacman v(\S+)')
+
+
+class CapabilityRegistry:
+    """
+    Cached view of what the host provides to the tools.
+
+    Binary lookups use shutil.which (no subprocess). Found commands are
+    remembered until PATH changes or refresh() is called, so repeated
+    checks are a dict lookup; misses are not cached, so commands
+    installed while the server runs are found by the next check. A successful `sudo -n true` probe is trusted for
+    `sudo_ttl` seconds; failed probes are not cached, so credentials
+    cached with `sudo -v` are picked up by the next call.
+    """
+
+    def __init__(self, sudo_ttl: float = SUDO_PROBE_TTL) -> None:
+        self.sudo_ttl = sudo_ttl
+        self._search_path: Optional[str] = None
+        self._binaries: Dict[str, str] = {}
+        self._systemd: Optional[bool] = None
+        self._pacman_version: Optional[str] = None
+        self._pacman_version_probed = False
+        self._sudo_ready_until = 0.0
+
+    def which(self, command: str) -> Optional[str]:
+        """
+        Locate a command in PATH.
+
+        Args:
+            command: Command name
+
+        Returns:
+            Full path of the command, or None if it is not installed
+        """
+        search_path = os.environ.get("PATH", os.defpath)
+        if search_path != self._search_path:
+            self._binaries.clear()
+            self._search_path = search_path
+
+        location = self._binaries.get(command)
+        if location is None:
+            location = shutil.which(command, path=search_path)
+            if location is not None:
+                self._binaries[command] = location
+        return location
+
+    @property
+    def has_systemd(self) -> bool:
+        """Whether systemd is the running init system."""
+        if self._systemd is None:
+            self._systemd = os.path.isdir(SYSTEMD_RUNTIME_DIR)
+        return self._systemd
+
+    async def sudo_ready(self) -> bool:
+        """
+        Check whether sudo can run without prompting for a password.
+
+        Returns:
+            True if passwordless sudo is configured or credentials are cached
+        """
+        if time.monotonic() < self._sudo_ready_until:
+            return True
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "sudo", "-n", "true",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            await process.communicate()
+            ready = process.returncode == 0
+        except Exception as e:
+            logger.warning(f"Could not check sudo status: {e}")
+            return False
+
+        logger.debug(f"Sudo password cached: {ready}")
+        if ready:
+            self._sudo_ready_until = time.monotonic() + self.sudo_ttl
+        return ready
+
+    async def pacman_version(self) -> Optional[str]:
+        """
+        Get the installed pacman version (probed once).
+
+        Returns:
+            Version string such as "6.1.0", or None if pacman is unavailable
+        """
+        if not self._pacman_version_probed and self.which("pacman"):
+            self._pacman_version_probed = True
+            try:
+                _, stdout, _ = await run_command(["pacman", "--version"], timeout=5, check=False)
+            except Exception as e:
+                logger.warning(f"Could not determine pacman version: {e}")
+                return None
+            match = _PACMAN_VERSION.search(stdout)
+            self._pacman_version = match.group(1) if match else None
+        return self._pacman_version
+
+    async def probe(self) -> Dict[str, Any]:
+        """
+        Populate the registry up front (called once at server startup).
+
+        Returns:
+            Snapshot of the probed capabilities
+        """
+        for command in KNOWN_COMMANDS:
+            self.which(command)
+        await self.pacman_version()
+
+        snapshot = self.snapshot()
+        found = sorted(snapshot["binaries"])
+        logger.info(f"Capabilities: systemd={snapshot['systemd']}, "
+                    f"pacman={snapshot['pacman_version']}, commands={', '.join(found) or 'none'}")
+        return snapshot
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Report what is currently known without probing anything new.
+
+        Returns:
+            Dict with binaries (commands found so far), systemd,
+            pacman_version and sudo_cached
+        """
+        return {
+            "binaries": dict(self._binaries),
+            "systemd": self.has_systemd,
+            "pacman_version": self._pacman_version,
+            "sudo_cached": time.monotonic() < self._sudo_ready_until,
+        }
+
+    def refresh(self) -> None:
+        """Forget everything so the next lookups probe the host again."""
+        self._search_path = None
+        self._binaries.clear()
+        self._systemd = None
+        self._pacman_version = None
+        self._pacman_version_probed = False
+        self._sudo_ready_until = 0.0
+
+
+# Process-wide capability registry
+capabilities = CapabilityRegistry()
+
+
 def check_command_exists(command: str) -> bool:
     """
     Check if a command exists in the system PATH.
@@ -286,11 +648,7 @@ def check_command_exists(command: str) -> bool:
     Returns:
         bool: True if command exists, False otherwise
     """
-    try:
-        result = os.system(f"which {command} > /dev/null 2>&1")
-        return result == 0
-    except Exception:
-        return False
+    return capabilities.which(command) is not None
 
 
 def get_aur_helper() -> Optional[str]:
@@ -311,3 +669,17 @@ def get_aur_helper() -> Optional[str]:
         logger.warning("No AUR helper found (paru or yay)")
         return None
 
+
+
+def get_cache_dir() -> Path:
+    """
+    Get the server's persistent cache directory.
+    
+    Follows the XDG base directory spec: $XDG_CACHE_HOME/arch-ops-server,
+    defaulting to ~/.cache/arch-ops-server. The directory is not created.
+    
+    Returns:
+        Path to the cache directory
+    """
+    base = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "arch-ops-server"
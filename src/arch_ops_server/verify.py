@@ -0,0 +1,429 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Native package file verification module.
+Checks installed files against the pacman local database, like
+`pacman -Qk` (files exist) and `pacman -Qkk` (type, permissions, owner,
+size, modification time and symlink target from the package mtree), plus
+the SHA-256 checksums recorded in the mtree.
+
+Packages are verified in parallel on a thread pool (stat, reads and
+hashing release the GIL). Thorough whole-system runs remember the stat
+of every file that passed, so the next whole-system run skips files that
+have not changed since.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import stat
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .localdb import LocalDatabase, local_db, parse_desc
+from .utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# Worker threads used to verify packages (default: ThreadPoolExecutor's choice)
+VERIFY_WORKERS = int(os.getenv("ARCH_OPS_VERIFY_WORKERS", "0")) or None
+
+# Seconds between progress reports
+PROGRESS_INTERVAL = 0.5
+
+# Bumped whenever the persisted state layout changes
+VERIFY_STATE_FORMAT = "2"
+
+# Persisted state: per "name-version", the fingerprints of its mtree
+# entries as raw array('q') bytes
+_STATE_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE packages (package TEXT PRIMARY KEY, fingerprints BLOB);
+"""
+
+# Octal escapes used by mtree for special characters in paths (e.g. \040)
+_MTREE_ESCAPE = re.compile(rb'\\([0-7]{3})')
+
+_MTREE_TYPES = {"file": stat.S_ISREG, "dir": stat.S_ISDIR, "link": stat.S_ISLNK}
+
+
+# Called with (packages done, packages total, last package name)
+ProgressCallback = Callable[[int, int, str], None]
+
+
+def _unescape(path: str) -> str:
+    """Decode mtree octal escapes in a path."""
+    if '\\' not in path:
+        return path
+    raw = _MTREE_ESCAPE.sub(lambda m: bytes([int(m.group(1), 8)]), path.encode("utf-8", "surrogateescape"))
+    return raw.decode("utf-8", "surrogateescape")
+
+
+def parse_mtree(content: str) -> List[Dict[str, Any]]:
+    """
+    Parse a package mtree (as stored in the local database).
+
+    Package metadata entries (./.PKGINFO, ./.BUILDINFO, ...) are skipped.
+
+    Args:
+        content: Decompressed mtree text
+
+    Returns:
+        List of entries with path (relative, without "./") and the keywords
+        in effect for it (type, mode, uid, gid, size, time, sha256digest, link)
+    """
+    defaults: Dict[str, str] = {}
+    entries = []
+
+    for line in content.split('\n'):
+        if not line or line.startswith('#'):
+            continue
+
+        tokens = line.split()
+        if tokens[0] == "/set":
+            defaults.update(token.split('=', 1) for token in tokens[1:] if '=' in token)
+            continue
+        if tokens[0] == "/unset":
+            for key in tokens[1:]:
+                defaults.pop(key, None)
+            continue
+
+        path = _unescape(tokens[0])
+        if path.startswith("./."):
+            continue
+
+        entry: Dict[str, Any] = dict(defaults)
+        entry.update(token.split('=', 1) for token in tokens[1:] if '=' in token)
+        if "link" in entry:
+            entry["link"] = _unescape(entry["link"])
+        entry["path"] = path[2:] if path.startswith("./") else path
+        entries.append(entry)
+
+    return entries
+
+
+def _stat_fingerprint(st: os.stat_result) -> int:
+    """
+    Hash the stat fields that change whenever a file's content or metadata does.
+
+    ctime cannot be set from user space, so an unchanged fingerprint means
+    the file was not touched. Never 0, which marks files that did not pass.
+    """
+    return hash((st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_mode)) or 1
+
+
+def _check_entry(path: str, entry: Dict[str, Any], st: os.stat_result, backup: bool) -> List[str]:
+    """
+    Compare one file with its mtree entry.
+
+    Backup files (configuration the user is expected to edit) are only
+    checked for type, permissions and owner, as pacman -Qkk does.
+
+    Returns:
+        Problems found, in pacman's wording
+    """
+    problems = []
+    kind = entry.get("type", "file")
+
+    type_check = _MTREE_TYPES.get(kind)
+    if type_check is not None and not type_check(st.st_mode):
+        return ["File type mismatch"]
+
+    if kind != "link" and "mode" in entry and stat.S_IMODE(st.st_mode) != int(entry["mode"], 8):
+        problems.append("Permissions mismatch")
+    if "uid" in entry and st.st_uid != int(entry["uid"]):
+        problems.append("UID mismatch")
+    if "gid" in entry and st.st_gid != int(entry["gid"]):
+        problems.append("GID mismatch")
+
+    if kind == "link":
+        if "link" in entry and os.readlink(path) != entry["link"]:
+            problems.append("Symlink path mismatch")
+        return problems
+
+    if kind != "file" or backup:
+        return problems
+
+    if "time" in entry and int(st.st_mtime) != int(float(entry["time"])):
+        problems.append("Modification time mismatch")
+
+    if "size" in entry and st.st_size != int(entry["size"]):
+        problems.append("Size mismatch")
+    elif "sha256digest" in entry:
+        with open(path, "rb") as f:
+            if hashlib.file_digest(f, "sha256").hexdigest() != entry["sha256digest"]:
+                problems.append("SHA256 checksum mismatch")
+
+    return problems
+
+
+def verify_package_files(
+    name: str,
+    entry_dir: Path,
+    thorough: bool = False,
+    root: str = "/",
+    known: Optional[array] = None
+) -> Dict[str, Any]:
+    """
+    Verify the installed files of one package.
+
+    Args:
+        name: Package name
+        entry_dir: Local database entry directory of the package
+        thorough: Check metadata and checksums from the mtree instead of
+            only checking that files exist
+        root: Installation root the package paths are relative to
+        known: "passed" array of the previous thorough run of this
+            package version; files whose stat is unchanged are not checked again
+
+    Returns:
+        Dict with issues (pacman -Qk style lines), files_checked,
+        files_skipped and passed (stat fingerprint per mtree entry, 0 for
+        entries that did not pass)
+    """
+    issues: List[str] = []
+    checked = 0
+    skipped = 0
+
+    try:
+        content = (entry_dir / "files").read_text(encoding="utf-8", errors="surrogateescape")
+        sections = parse_desc(content)
+        if thorough:
+            with gzip.open(entry_dir / "mtree", "rt", encoding="utf-8", errors="surrogateescape") as f:
+                entries = parse_mtree(f.read())
+        else:
+            entries = [{"path": path.rstrip('/')} for path in sections.get("FILES", [])]
+    except (OSError, EOFError) as e:
+        return {
+            "issues": [f"{name}: could not read package file list ({e})"],
+            "files_checked": 0,
+            "files_skipped": 0,
+            "passed": array('q'),
+        }
+
+    passed = array('q', bytes(8 * len(entries))) if thorough else array('q')
+    if known is not None and len(known) != len(entries):
+        known = None
+
+    # %BACKUP% lines are "<path>\t<md5 of the packaged file>"
+    backup_files = {line.split('\t', 1)[0] for line in sections.get("BACKUP", [])}
+    for i, entry in enumerate(entries):
+        relative = entry["path"]
+        path = os.path.join(root, relative)
+
+        try:
+            st = os.lstat(path)
+        except FileNotFoundError:
+            checked += 1
+            issues.append(f"{name}: /{relative} (No such file or directory)")
+            continue
+        except OSError as e:
+            checked += 1
+            issues.append(f"{name}: /{relative} ({e.strerror})")
+            continue
+
+        if not thorough:
+            checked += 1
+            continue
+
+        fingerprint = _stat_fingerprint(st)
+        if known is not None and known[i] == fingerprint:
+            skipped += 1
+            passed[i] = fingerprint
+            continue
+
+        checked += 1
+        try:
+            problems = _check_entry(path, entry, st, relative in backup_files)
+        except (OSError, ValueError) as e:
+            problems = [f"Could not check file: {e}"]
+
+        if problems:
+            issues.extend(f"{name}: /{relative} ({problem})" for problem in problems)
+        else:
+            passed[i] = fingerprint
+
+    return {
+        "issues": issues,
+        "files_checked": checked,
+        "files_skipped": skipped,
+        "passed": passed,
+    }
+
+
+class IntegrityVerifier:
+    """
+    Parallel verifier for installed packages.
+
+    Thorough whole-system runs record, per package version, a stat
+    fingerprint of every file that passed (8 bytes per file, in mtree
+    order). The state is persisted in the server cache directory so the
+    next whole-system run (including after a restart) only re-checks files
+    whose stat changed or that belong to a newly installed version.
+    Verifying selected packages always checks every file.
+    """
+
+    def __init__(
+        self,
+        db: Optional[LocalDatabase] = None,
+        root: str = "/",
+        state_path: Optional[Path] = None,
+        workers: Optional[int] = VERIFY_WORKERS
+    ) -> None:
+        self.db = db or local_db
+        self.root = root
+        self.state_path = state_path
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._state: Optional[Dict[str, array]] = None
+
+    @property
+    def state_file(self) -> Path:
+        """Persisted verification state location."""
+        return self.state_path or get_cache_dir() / "verify-state.sqlite"
+
+    def _load_state(self) -> Dict[str, array]:
+        """Return the per-package fingerprints of files that passed, loading them once."""
+        if self._state is None:
+            self._state = {}
+            path = self.state_file
+            if path.is_file():
+                try:
+                    with closing(sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)) as db:
+                        meta = dict(db.execute("SELECT key, value FROM meta").fetchall())
+                        if meta.get("format") == VERIFY_STATE_FORMAT and meta.get("root") == self.root:
+                            for package, blob in db.execute("SELECT package, fingerprints FROM packages"):
+                                fingerprints = array('q')
+                                fingerprints.frombytes(blob)
+                                self._state[package] = fingerprints
+                except (sqlite3.Error, ValueError) as e:
+                    logger.warning(f"Ignoring unreadable verification state {path}: {e}")
+                    self._state = {}
+        return self._state
+
+    def _save_state(self) -> None:
+        """Write the state atomically (temporary file + os.replace)."""
+        path = self.state_file
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.unlink(missing_ok=True)
+            with closing(sqlite3.connect(tmp_path)) as db, db:
+                db.executescript(_STATE_SCHEMA)
+                db.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+                    ("format", VERIFY_STATE_FORMAT),
+                    ("root", self.root),
+                ])
+                db.executemany(
+                    "INSERT INTO packages (package, fingerprints) VALUES (?, ?)",
+                    ((package, fingerprints.tobytes()) for package, fingerprints in self._state.items())
+                )
+            os.replace(tmp_path, path)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not save verification state to {path}: {e}")
+
+    def clear_state(self) -> None:
+        """Forget which files passed, so the next thorough run checks everything."""
+        self._state = {}
+        try:
+            self.state_file.unlink()
+        except FileNotFoundError:
+            pass
+
+    def verify(
+        self,
+        names: Optional[List[str]] = None,
+        thorough: bool = False,
+        progress: Optional[ProgressCallback] = None,
+        full: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Verify packages in parallel.
+
+        Args:
+            names: Packages to verify (default: every installed package)
+            thorough: Check metadata and checksums, not only existence
+            progress: Called from this thread at most every PROGRESS_INTERVAL
+                seconds, and once at the end, with (done, total, package)
+            full: Check every file of a thorough whole-system run, even if
+                unchanged since the previous one (the state is then rebuilt)
+
+        Returns:
+            Dict with per-package results (issues, files_checked,
+            files_skipped, version), packages not installed, and totals
+
+        Raises:
+            FileNotFoundError: If the local database does not exist
+        """
+        with self._lock:
+            packages = self.db.load()
+            selected = sorted(packages) if names is None else list(dict.fromkeys(names))
+            missing = [name for name in selected if name not in packages]
+            selected = [name for name in selected if name in packages]
+
+            # Only whole-system runs skip files unchanged since the last one
+            incremental = thorough and names is None
+            state = self._load_state() if incremental else {}
+            start = time.monotonic()
+            results: Dict[str, Dict[str, Any]] = {}
+
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {}
+                for name in selected:
+                    pkg = packages[name]
+                    entry_dir = self.db.entry_path(name)
+                    state_key = f"{name}-{pkg['version']}"
+                    future = executor.submit(
+                        verify_package_files, name, entry_dir, thorough,
+                        self.root, None if full else state.get(state_key)
+                    )
+                    futures[future] = (name, state_key)
+
+                last_report = 0.0
+                for done, future in enumerate(as_completed(futures), 1):
+                    name, state_key = futures[future]
+                    result = future.result()
+                    if incremental:
+                        state[state_key] = result["passed"]
+                    results[name] = {
+                        "version": packages[name]["version"],
+                        "issues": result["issues"],
+                        "files_checked": result["files_checked"],
+                        "files_skipped": result["files_skipped"],
+                    }
+
+                    now = time.monotonic()
+                    if progress is not None and (now - last_report >= PROGRESS_INTERVAL or done == len(futures)):
+                        last_report = now
+                        progress(done, len(futures), name)
+
+            if incremental:
+                # Drop state of removed packages and replaced versions
+                installed = {f"{name}-{pkg['version']}" for name, pkg in packages.items()}
+                for key in set(state) - installed:
+                    del state[key]
+                self._save_state()
+
+            elapsed = time.monotonic() - start
+            logger.info(
+                f"Verified {len(results)} packages in {elapsed:.1f}s "
+                f"({sum(r['files_checked'] for r in results.values())} files checked, "
+                f"{sum(r['files_skipped'] for r in results.values())} unchanged)"
+            )
+
+            return {
+                "packages": results,
+                "not_installed": missing,
+                "seconds": round(elapsed, 2),
+            }
+
+
+# Process-wide package verifier
+integrity_verifier = IntegrityVerifier()
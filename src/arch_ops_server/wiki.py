@@ -4,13 +4,23 @@ Arch Wiki interface module.
 Provides search and page retrieval via MediaWiki API with BeautifulSoup fallback.
 """
 
+import asyncio
+import json
 import logging
-from typing import List, Dict, Any, Optional
+import os
+import re
+import sqlite3
+import time
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 import httpx
 from bs4 import BeautifulSoup
 from markdownify import markdownify as md
 
 from .utils import create_error_response
+from .http_client import get_http_client
+from .http_cache import cached_get
+from .wiki_cache import normalize_title, wiki_page_cache
+from .wiki_index import wiki_index
 
 logger = logging.getLogger(__name__)
 
@@ -21,22 +31,69 @@ WIKI_BASE_URL = "https://wiki.archlinux.org"
 # HTTP client settings
 DEFAULT_TIMEOUT = 10.0
 
+# Seconds a cached page is served without asking the wiki for its revision
+WIKI_REVALIDATE_AFTER = float(os.getenv("ARCH_OPS_WIKI_REVALIDATE_AFTER", "60"))
+
+# Markup inside section headings returned by prop=sections
+_HTML_TAG = re.compile(r'<[^>]+>')
+
+# Maximum titles per prop=revisions query (MediaWiki limit for anonymous clients)
+MAX_REVISION_TITLES = 50
+
+
+async def _search_local_index(query: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Search the offline full-text index if one has been built.
+
+    Args:
+        query: Search term
+        limit: Maximum number of results
+
+    Returns:
+        Results with URLs, or None if there is no usable index
+    """
+    if not wiki_index.is_available():
+        return None
+
+    try:
+        results = await asyncio.to_thread(wiki_index.search, query, limit)
+    except sqlite3.Error as e:
+        logger.warning(f"Offline wiki index search failed: {e}")
+        return None
+
+    for result in results:
+        result["url"] = f"{WIKI_BASE_URL}/title/{result['title'].replace(' ', '_')}"
+    return results
+
 
 async def search_wiki(query: str, limit: int = 10) -> Dict[str, Any]:
     """
-    Search the Arch Wiki using MediaWiki API.
-    
-    Uses the opensearch action which returns suggestions.
+    Search the Arch Wiki.
+
+    The offline full-text index (see wiki_index) is used when it has been
+    built and finds matches; otherwise the MediaWiki opensearch action is
+    queried, which returns title suggestions.
     
     Args:
         query: Search term
         limit: Maximum number of results (default: 10)
     
     Returns:
-        Dict containing search results with titles, snippets, and URLs
+        Dict containing search results with titles, snippets, and URLs,
+        and the backend that answered ("index" or "api")
     """
     logger.info(f"Searching Arch Wiki for: {query}")
-    
+
+    local_results = await _search_local_index(query, limit)
+    if local_results:
+        logger.info(f"Found {len(local_results)} results for '{query}' in offline index")
+        return {
+            "query": query,
+            "count": len(local_results),
+            "results": local_results,
+            "source": "index"
+        }
+
     params = {
         "action": "opensearch",
         "search": query,
@@ -46,41 +103,43 @@ async def search_wiki(query: str, limit: int = 10) -> Dict[str, Any]:
     }
     
     try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            response = await client.get(WIKI_API_URL, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
+        client = get_http_client(WIKI_API_URL)
+        response = await client.get(WIKI_API_URL, params=params, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        
+        data = response.json()
+        
+        # OpenSearch returns: [query, [titles], [descriptions], [urls]]
+        if len(data) >= 4:
+            titles = data[1]
+            descriptions = data[2]
+            urls = data[3]
             
-            # OpenSearch returns: [query, [titles], [descriptions], [urls]]
-            if len(data) >= 4:
-                titles = data[1]
-                descriptions = data[2]
-                urls = data[3]
-                
-                results = [
-                    {
-                        "title": title,
-                        "snippet": desc,
-                        "url": url
-                    }
-                    for title, desc, url in zip(titles, descriptions, urls)
-                ]
-                
-                logger.info(f"Found {len(results)} results for '{query}'")
-                
-                return {
-                    "query": query,
-                    "count": len(results),
-                    "results": results
-                }
-            else:
-                return {
-                    "query": query,
-                    "count": 0,
-                    "results": []
+            results = [
+                {
+                    "title": title,
+                    "snippet": desc,
+                    "url": url
                 }
-                
+                for title, desc, url in zip(titles, descriptions, urls)
+            ]
+            
+            logger.info(f"Found {len(results)} results for '{query}'")
+            
+            return {
+                "query": query,
+                "count": len(results),
+                "results": results,
+                "source": "api"
+            }
+        else:
+            return {
+                "query": query,
+                "count": 0,
+                "results": [],
+                "source": "api"
+            }
+            
     except httpx.TimeoutException:
         logger.error(f"Wiki search timed out for query: {query}")
         return create_error_response(
@@ -103,24 +162,179 @@ async def search_wiki(query: str, limit: int = 10) -> Dict[str, Any]:
         )
 
 
-async def get_wiki_page(title: str, as_markdown: bool = True) -> str:
+async def get_wiki_revisions(titles: List[str]) -> Dict[str, Optional[int]]:
+    """
+    Get the current revision id of several pages.
+
+    Uses the cheap prop=revisions query, batching up to
+    MAX_REVISION_TITLES titles per request.
+
+    Args:
+        titles: Page titles
+
+    Returns:
+        Dict mapping each requested title to its revid, or None if the page
+        does not exist
+
+    Raises:
+        httpx.HTTPError: If a query fails
+    """
+    revisions: Dict[str, Optional[int]] = {}
+    client = get_http_client(WIKI_API_URL)
+
+    for start in range(0, len(titles), MAX_REVISION_TITLES):
+        chunk = titles[start:start + MAX_REVISION_TITLES]
+        params = {
+            "action": "query",
+            "prop": "revisions",
+            "rvprop": "ids",
+            "titles": "|".join(chunk),
+            "format": "json",
+            "formatversion": "2"
+        }
+        response = await client.get(WIKI_API_URL, params=params, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        query = response.json().get("query", {})
+
+        by_title = {
+            page["title"]: page["revisions"][0]["revid"]
+            for page in query.get("pages", [])
+            if page.get("revisions")
+        }
+        normalized = {item["from"]: item["to"] for item in query.get("normalized", [])}
+        for title in chunk:
+            revisions[title] = by_title.get(normalized.get(title, title))
+
+    return revisions
+
+
+class _RevisionBatcher:
+    """
+    Coalesce revision lookups made in the same event loop iteration.
+
+    Concurrent get_wiki_page calls each ask for one revid; the batcher
+    collects them and answers all with a single get_wiki_revisions query.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def revision(self, title: str) -> Optional[int]:
+        """
+        Get the current revid of a page, sharing the query with concurrent callers.
+
+        Args:
+            title: Page title
+
+        Returns:
+            Revision id or None if the page does not exist
+
+        Raises:
+            httpx.HTTPError: If the query fails
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(title, []).append(future)
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush())
+        return await future
+
+    async def _flush(self) -> None:
+        """Send one query for every title requested since the last flush."""
+        # Let the other callers scheduled in this iteration register first
+        await asyncio.sleep(0)
+        pending, self._pending, self._flush_task = self._pending, {}, None
+
+        try:
+            revisions = await get_wiki_revisions(list(pending))
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for title, futures in pending.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(revisions.get(title))
+
+
+_revision_batcher = _RevisionBatcher()
+
+
+async def _cached_page(title: str, fmt: str) -> Optional[str]:
+    """
+    Return a cached page if it is still the current revision.
+
+    Entries confirmed within WIKI_REVALIDATE_AFTER seconds are served
+    directly; older ones are checked with a revision query. If the wiki
+    cannot be reached the cached copy is served as is.
+
+    Args:
+        title: Page title
+        fmt: "markdown" or "html"
+
+    Returns:
+        Cached content, or None if missing or outdated
+    """
+    entry = wiki_page_cache.get(title, fmt)
+    if entry is None:
+        return None
+
+    if time.time() - entry["validated_at"] < WIKI_REVALIDATE_AFTER:
+        logger.debug(f"Wiki cache hit: {title}")
+        return entry["content"]
+
+    try:
+        revid = await _revision_batcher.revision(entry["title"])
+    except Exception as e:
+        logger.warning(f"Could not revalidate cached wiki page {title}, serving cached copy: {e}")
+        return entry["content"]
+
+    if revid != entry["revid"]:
+        logger.info(f"Wiki page {title} changed (revision {entry['revid']} -> {revid})")
+        return None
+
+    wiki_page_cache.mark_validated(entry)
+    logger.debug(f"Wiki cache revalidated: {title}")
+    return entry["content"]
+
+
+async def get_wiki_page(title: str, as_markdown: bool = True, section: Optional[int] = None) -> str:
     """
     Fetch a Wiki page using MediaWiki API, with scraping fallback.
-    
+
+    Pages fetched through the API are cached (converted, if requested)
+    with their revision id and only downloaded again once edited.
+
     Args:
         title: Page title (e.g., "Installation_guide")
         as_markdown: Convert HTML to Markdown (default: True)
+        section: Only fetch this section index (0 is the lead; see
+            get_wiki_sections). The scraping fallback is not used for sections.
     
     Returns:
         Page content as Markdown or HTML string
     """
-    logger.info(f"Fetching Wiki page: {title}")
-    
+    logger.info(f"Fetching Wiki page: {title}" + (f" (section {section})" if section is not None else ""))
+
+    fmt = "markdown" if as_markdown else "html"
+    if section is not None:
+        fmt = f"{fmt}#{section}"
+
+    cached = await _cached_page(title, fmt)
+    if cached is not None:
+        return cached
+
     # Try MediaWiki API first
-    content = await _fetch_via_api(title)
-    
+    content, revid = None, None
+    parsed = await _fetch_parsed_page(title, section)
+    if parsed is not None:
+        content, revid = parsed
+
     # Fallback to scraping if API fails
-    if content is None:
+    if content is None and section is None:
         logger.warning(f"API fetch failed for {title}, falling back to scraping")
         content = await _fetch_via_scraping(title)
     
@@ -135,54 +349,224 @@ async def get_wiki_page(title: str, as_markdown: bool = True) -> str:
             content = md(content, heading_style="ATX", strip=['script', 'style'])
         except Exception as e:
             logger.warning(f"Markdown conversion failed: {e}, returning HTML")
-    
+            revid = None
+
+    if revid is not None:
+        wiki_page_cache.store(title, fmt, revid, content)
+
     return content
 
 
-async def _fetch_via_api(title: str) -> Optional[str]:
+async def get_wiki_sections(title: str) -> List[Dict[str, Any]]:
     """
-    Fetch page content via MediaWiki API.
-    
+    Get the section outline of a Wiki page.
+
+    Uses action=parse&prop=sections, which returns only the table of
+    contents, so callers can pick sections without downloading the page.
+
     Args:
         title: Page title
-    
+
     Returns:
-        HTML content or None if failed
+        List of sections in page order, each with index (for
+        get_wiki_page's section argument), level, number, heading and anchor
+
+    Raises:
+        ValueError: If the page does not exist or the outline cannot be fetched
     """
+    cached = await _cached_page(title, "sections")
+    if cached is not None:
+        return json.loads(cached)
+
     params = {
         "action": "parse",
         "page": title,
         "format": "json",
-        "prop": "text",
+        "prop": "sections|revid"
+    }
+
+    try:
+        response = await cached_get(WIKI_API_URL, params=params, timeout=DEFAULT_TIMEOUT)
+        data = response.json()
+    except Exception as e:
+        raise ValueError(f"Could not fetch sections of '{title}': {e}") from e
+
+    if "error" in data or "parse" not in data:
+        info = data.get("error", {}).get("info", "unexpected response")
+        raise ValueError(f"Page '{title}' not found or could not be retrieved: {info}")
+
+    sections = [
+        {
+            "index": int(item["index"]),
+            "level": int(item["level"]),
+            "number": item.get("number", ""),
+            "heading": _HTML_TAG.sub("", item.get("line", "")),
+            "anchor": item.get("anchor", ""),
+        }
+        # Sections transcluded from templates have indexes like "T-1"
+        for item in data["parse"].get("sections", [])
+        if str(item.get("index", "")).isdigit()
+    ]
+
+    revid = data["parse"].get("revid")
+    if revid is not None:
+        wiki_page_cache.store(title, "sections", revid, json.dumps(sections))
+
+    return sections
+
+
+def _find_section(sections: List[Dict[str, Any]], name: str) -> Optional[Dict[str, Any]]:
+    """
+    Find a section by index, anchor or heading text.
+
+    Args:
+        sections: Output of get_wiki_sections()
+        name: Section index ("3"), anchor ("Boot_loader") or heading ("Boot loader")
+
+    Returns:
+        Matching section or None
+    """
+    name = name.strip()
+    if name.isdigit():
+        return next((s for s in sections if s["index"] == int(name)), None)
+
+    wanted = name.replace("_", " ").lower()
+    for section in sections:
+        if section["anchor"].replace("_", " ").lower() == wanted or section["heading"].lower() == wanted:
+            return section
+    return None
+
+
+async def get_wiki_section(title: str, section: str, as_markdown: bool = True) -> str:
+    """
+    Fetch one section of a Wiki page (including its subsections).
+
+    Args:
+        title: Page title
+        section: Section heading, anchor or index ("0" is the lead before
+            the first heading)
+        as_markdown: Convert HTML to Markdown (default: True)
+
+    Returns:
+        Section content as Markdown or HTML string
+
+    Raises:
+        ValueError: If the page or the section does not exist
+    """
+    if section.strip() == "0":
+        return await get_wiki_page(title, as_markdown, section=0)
+
+    sections = await get_wiki_sections(title)
+    match = _find_section(sections, section)
+    if match is None:
+        headings = ", ".join(s["heading"] for s in sections if s["level"] == 2)
+        raise ValueError(f"Section '{section}' not found in '{title}'. Top-level sections: {headings}")
+
+    return await get_wiki_page(title, as_markdown, section=match["index"])
+
+
+async def stream_wiki_page(title: str, as_markdown: bool = True) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield a Wiki page one top-level section at a time.
+
+    The lead and each top-level section are fetched and converted
+    separately, with the next section downloaded while the current one is
+    consumed, so the first part is available without converting the whole
+    page and a consumer that stops early skips the rest.
+
+    Args:
+        title: Page title
+        as_markdown: Convert HTML to Markdown (default: True)
+
+    Yields:
+        Dicts with index, level, heading and content of each part (the lead
+        has index 0 and level 1)
+
+    Raises:
+        ValueError: If the page does not exist
+    """
+    sections = await get_wiki_sections(title)
+    top_level = min((s["level"] for s in sections), default=2)
+    parts = [{"index": 0, "level": 1, "heading": normalize_title(title)}] + [
+        {"index": s["index"], "level": s["level"], "heading": s["heading"]}
+        for s in sections
+        if s["level"] == top_level
+    ]
+
+    def fetch(part: Dict[str, Any]) -> asyncio.Future:
+        return asyncio.ensure_future(get_wiki_page(title, as_markdown, section=part["index"]))
+
+    pending = fetch(parts[0])
+    try:
+        for position, part in enumerate(parts):
+            content = await pending
+            if position + 1 < len(parts):
+                pending = fetch(parts[position + 1])
+            yield {**part, "content": content}
+    finally:
+        if not pending.done():
+            pending.cancel()
+
+
+async def _fetch_parsed_page(title: str, section: Optional[int] = None) -> Optional[Tuple[str, Optional[int]]]:
+    """
+    Fetch page HTML and its revision id via the MediaWiki parse API.
+
+    Args:
+        title: Page title
+        section: Only render this section index
+
+    Returns:
+        Tuple of (HTML content, revid) or None if failed
+    """
+    params = {
+        "action": "parse",
+        "page": title,
+        "format": "json",
+        "prop": "text|revid",
         "disableeditsection": "1",
         "disabletoc": "1"
     }
-    
+    if section is not None:
+        params["section"] = str(section)
+
     try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            response = await client.get(WIKI_API_URL, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Check for errors in response
-            if "error" in data:
-                logger.warning(f"API error: {data['error'].get('info', 'Unknown error')}")
-                return None
-            
-            # Extract HTML content
-            if "parse" in data and "text" in data["parse"]:
-                html_content = data["parse"]["text"]["*"]
-                logger.info(f"Successfully fetched {title} via API")
-                return html_content
-            
+        response = await cached_get(WIKI_API_URL, params=params, timeout=DEFAULT_TIMEOUT)
+
+        data = response.json()
+
+        # Check for errors in response
+        if "error" in data:
+            logger.warning(f"API error: {data['error'].get('info', 'Unknown error')}")
             return None
-            
+
+        # Extract HTML content
+        if "parse" in data and "text" in data["parse"]:
+            html_content = data["parse"]["text"]["*"]
+            logger.info(f"Successfully fetched {title} via API")
+            return html_content, data["parse"].get("revid")
+
+        return None
+
     except Exception as e:
         logger.warning(f"API fetch failed for {title}: {e}")
         return None
 
 
+async def _fetch_via_api(title: str) -> Optional[str]:
+    """
+    Fetch page content via MediaWiki API.
+    
+    Args:
+        title: Page title
+    
+    Returns:
+        HTML content or None if failed
+    """
+    parsed = await _fetch_parsed_page(title)
+    return parsed[0] if parsed else None
+
+
 async def _fetch_via_scraping(title: str) -> Optional[str]:
     """
     Fetch page content via direct HTTP scraping (fallback).
@@ -197,26 +581,24 @@ async def _fetch_via_scraping(title: str) -> Optional[str]:
     url = f"{WIKI_BASE_URL}/title/{title}"
     
     try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            response = await client.get(url, follow_redirects=True)
-            response.raise_for_status()
-            
-            # Parse HTML
-            soup = BeautifulSoup(response.text, 'lxml')
-            
-            # Find main content div
-            content_div = soup.find('div', {'id': 'bodyContent'})
-            
-            if content_div:
-                # Remove unnecessary elements
-                for element in content_div.find_all(['script', 'style', 'nav']):
-                    element.decompose()
-                
-                logger.info(f"Successfully scraped {title}")
-                return str(content_div)
-            
-            return None
+        response = await cached_get(url, timeout=DEFAULT_TIMEOUT, follow_redirects=True)
+        
+        # Parse HTML
+        soup = BeautifulSoup(response.text, 'lxml')
+        
+        # Find main content div
+        content_div = soup.find('div', {'id': 'bodyContent'})
+        
+        if content_div:
+            # Remove unnecessary elements
+            for element in content_div.find_all(['script', 'style', 'nav']):
+                element.decompose()
             
+            logger.info(f"Successfully scraped {title}")
+            return str(content_div)
+        
+        return None
+        
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
             logger.error(f"Page not found: {title}")
@@ -0,0 +1,199 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Wiki page cache module.
+Keeps converted Arch Wiki pages together with the revision they were built
+from, in a bounded in-memory LRU backed by a bounded on-disk store, so a
+page is only downloaded and converted again after it has been edited.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# Subdirectory of the server cache directory holding wiki pages
+WIKI_CACHE_SUBDIR = "wiki"
+
+# Size bounds of the memory and disk tiers (page content, in megabytes)
+WIKI_CACHE_MEMORY_MB = float(os.getenv("ARCH_OPS_WIKI_CACHE_MEMORY_MB", "32"))
+WIKI_CACHE_DISK_MB = float(os.getenv("ARCH_OPS_WIKI_CACHE_DISK_MB", "128"))
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalize a page title the way MediaWiki does.
+
+    Underscores and runs of whitespace become single spaces and the first
+    letter is upper-cased, so "installation_guide" and "Installation guide"
+    share a cache entry.
+
+    Args:
+        title: Page title as requested
+
+    Returns:
+        Normalized title
+    """
+    title = " ".join(title.replace("_", " ").split())
+    return title[:1].upper() + title[1:]
+
+
+class WikiPageCache:
+    """
+    Two-tier cache of rendered wiki pages keyed by (title, format).
+
+    Each entry records the page revid and when that revid was last
+    confirmed current. The memory tier is an LRU bounded by total content
+    size; every entry is also written to a <sha256>.json file on disk so it
+    survives restarts. The disk tier is trimmed oldest-first (by file
+    modification time) when it exceeds its bound.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        memory_bytes: int = int(WIKI_CACHE_MEMORY_MB * 1024 * 1024),
+        disk_bytes: int = int(WIKI_CACHE_DISK_MB * 1024 * 1024)
+    ) -> None:
+        self.directory = directory or (get_cache_dir() / WIKI_CACHE_SUBDIR)
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._memory_used = 0
+
+    @staticmethod
+    def _key(title: str, fmt: str) -> str:
+        """Return the cache key of a page in a given format."""
+        return f"{fmt}:{normalize_title(title)}"
+
+    def _path(self, key: str) -> Path:
+        """Return the disk path of an entry."""
+        return self.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        """Insert an entry in the memory tier, evicting least recently used ones."""
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._memory_used -= len(previous["content"])
+
+        size = len(entry["content"])
+        if size > self.memory_bytes:
+            return
+
+        self._entries[key] = entry
+        self._memory_used += size
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._memory_used -= len(evicted["content"])
+
+    def get(self, title: str, fmt: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a page in memory, then on disk.
+
+        Args:
+            title: Page title
+            fmt: "markdown" or "html"
+
+        Returns:
+            Entry dict (title, format, revid, content, validated_at) or None
+        """
+        key = self._key(title, fmt)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+
+        try:
+            entry = json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        if entry.get("key") != key or "content" not in entry:
+            return None
+
+        self._remember(key, entry)
+        return entry
+
+    def store(self, title: str, fmt: str, revid: int, content: str) -> Dict[str, Any]:
+        """
+        Save a rendered page in both tiers.
+
+        Args:
+            title: Page title
+            fmt: "markdown" or "html"
+            revid: Revision the content was rendered from
+            content: Rendered page
+
+        Returns:
+            The stored entry
+        """
+        key = self._key(title, fmt)
+        entry = {
+            "key": key,
+            "title": normalize_title(title),
+            "format": fmt,
+            "revid": revid,
+            "content": content,
+            "validated_at": time.time(),
+        }
+        self._remember(key, entry)
+        self._write(key, entry)
+        self._trim_disk()
+        return entry
+
+    def mark_validated(self, entry: Dict[str, Any]) -> None:
+        """
+        Record that an entry's revid was just confirmed current.
+
+        Args:
+            entry: Entry returned by get()
+        """
+        entry["validated_at"] = time.time()
+        self._write(entry["key"], entry)
+
+    def _write(self, key: str, entry: Dict[str, Any]) -> None:
+        """Write an entry to disk atomically (temporary file + os.replace)."""
+        path = self._path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".json.tmp")
+            tmp_path.write_text(json.dumps(entry), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write wiki cache entry for {entry['title']}: {e}")
+
+    def _trim_disk(self) -> None:
+        """Delete the least recently written entries until the disk tier fits its bound."""
+        try:
+            files = [(path, path.stat()) for path in self.directory.glob("*.json")]
+        except OSError:
+            return
+
+        total = sum(st.st_size for _, st in files)
+        for path, st in sorted(files, key=lambda item: item[1].st_mtime_ns):
+            if total <= self.disk_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= st.st_size
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        self._entries.clear()
+        self._memory_used = 0
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# Process-wide wiki page cache
+wiki_page_cache = WikiPageCache()
@@ -0,0 +1,348 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Offline Arch Wiki search index module.
+Builds an SQLite FTS5 full-text index from the arch-wiki-docs HTML tree or
+a MediaWiki XML dump, so Wiki searches are answered locally with BM25
+ranking and snippets, including on hosts without network access.
+
+Build the index with:
+    python -m arch_ops_server.wiki_index [SOURCE] [--output PATH]
+"""
+
+import argparse
+import bz2
+import gzip
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+import xml.etree.ElementTree as ET
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from .utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# Default index location; override to share a prebuilt index
+WIKI_INDEX_PATH = os.getenv("ARCH_OPS_WIKI_INDEX")
+
+# HTML tree installed by the arch-wiki-docs package
+ARCH_WIKI_DOCS_DIR = "/usr/share/doc/arch-wiki/html"
+
+# BM25 column weights: a match in the title counts ten times a body match
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+# Words of context around matches in snippets
+SNIPPET_TOKENS = 24
+
+# Innermost template call; applied until none is left to remove nested ones
+_WIKITEXT_TEMPLATE = re.compile(r'\{\{[^{}]*\}\}')
+
+# Other wikitext markup removed when indexing XML dumps
+_WIKITEXT_PATTERNS = [
+    (re.compile(r'<!--.*?-->', re.DOTALL), ' '),
+    (re.compile(r'<ref[^>]*/>|<ref[^>]*>.*?</ref>', re.DOTALL), ' '),
+    (re.compile(r'\[\[(?:Category|File|Image):[^\]]*\]\]', re.IGNORECASE), ' '),
+    (re.compile(r'\[\[[a-z-]{2,5}:[^\]]*\]\]'), ' '),
+    (re.compile(r'\[\[(?:[^|\]]*\|)?([^\]]*)\]\]'), r'\1'),
+    (re.compile(r'\[https?://\S+\s+([^\]]*)\]'), r'\1'),
+    (re.compile(r'<[^>]+>'), ' '),
+    (re.compile(r"'{2,}|={2,}"), ' '),
+]
+
+_QUERY_TERM = re.compile(r'\w+', re.UNICODE)
+
+
+def default_index_path() -> Path:
+    """Return the index location ($ARCH_OPS_WIKI_INDEX or the server cache directory)."""
+    return Path(WIKI_INDEX_PATH) if WIKI_INDEX_PATH else get_cache_dir() / "wiki-index.sqlite"
+
+
+def _strip_wikitext(text: str) -> str:
+    """Reduce wikitext to plain words for indexing."""
+    previous = None
+    while previous != text:
+        previous, text = text, _WIKITEXT_TEMPLATE.sub(' ', text)
+
+    for pattern, replacement in _WIKITEXT_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return " ".join(text.split())
+
+
+def iter_html_pages(directory: Path) -> Iterator[Tuple[str, str]]:
+    """
+    Read pages from an arch-wiki-docs HTML tree.
+
+    Redirect stubs (meta refresh pages) are skipped.
+
+    Args:
+        directory: Tree root, e.g. /usr/share/doc/arch-wiki/html/en
+
+    Yields:
+        (title, plain text body) tuples
+    """
+    for path in sorted(directory.rglob("*.html")):
+        try:
+            html = path.read_text(encoding="utf-8", errors="replace")
+        except OSError as e:
+            logger.warning(f"Skipping unreadable wiki page {path}: {e}")
+            continue
+
+        soup = BeautifulSoup(html, "lxml")
+        if soup.find("meta", attrs={"http-equiv": re.compile("refresh", re.IGNORECASE)}):
+            continue
+
+        heading = soup.find(id="firstHeading") or soup.find("h1")
+        if heading is not None:
+            title = heading.get_text(" ", strip=True)
+        elif soup.title is not None:
+            title = soup.title.get_text(strip=True).rsplit(" - ", 1)[0]
+        else:
+            title = path.stem.replace("_", " ")
+
+        content = soup.find(id="bodyContent") or soup.find("main") or soup.body or soup
+        for element in content.find_all(["script", "style", "nav"]):
+            element.decompose()
+
+        yield title, " ".join(content.get_text(" ").split())
+
+
+def _open_dump(path: Path):
+    """Open an XML dump, decompressing .gz and .bz2 files."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    if path.suffix == ".bz2":
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+
+def iter_xml_dump_pages(path: Path) -> Iterator[Tuple[str, str]]:
+    """
+    Read main-namespace pages from a MediaWiki XML dump.
+
+    The dump is parsed incrementally so memory use does not grow with its
+    size. Redirects are skipped.
+
+    Args:
+        path: Dump file (.xml, .xml.gz or .xml.bz2)
+
+    Yields:
+        (title, plain text body) tuples
+    """
+    with _open_dump(path) as f:
+        for _, element in ET.iterparse(f, events=("end",)):
+            if element.tag.rsplit("}", 1)[-1] != "page":
+                continue
+
+            fields = {child.tag.rsplit("}", 1)[-1]: child for child in element}
+            namespace = fields.get("ns")
+            revision = fields.get("revision")
+            if (namespace is not None and namespace.text != "0") or "redirect" in fields or revision is None:
+                element.clear()
+                continue
+
+            text = next(
+                (child.text or "" for child in revision if child.tag.rsplit("}", 1)[-1] == "text"),
+                ""
+            )
+            title = fields["title"].text if "title" in fields else ""
+            element.clear()
+
+            if title:
+                yield title, _strip_wikitext(text)
+
+
+def build_wiki_index(source: Optional[str] = None, output: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build the offline search index.
+
+    The index is written to a temporary file and moved into place, so
+    searches running during a rebuild keep using the previous index.
+
+    Args:
+        source: arch-wiki-docs HTML directory or MediaWiki XML dump
+            (default: the English pages of the installed arch-wiki-docs)
+        output: Index file (default: default_index_path())
+
+    Returns:
+        Dict with page count, source, index path and build time
+
+    Raises:
+        FileNotFoundError: If the source does not exist
+    """
+    source_path = Path(source or ARCH_WIKI_DOCS_DIR)
+    if source is None and (source_path / "en").is_dir():
+        source_path = source_path / "en"
+    if not source_path.exists():
+        raise FileNotFoundError(f"Wiki source not found: {source_path}")
+
+    index_path = Path(output) if output else default_index_path()
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    pages = iter_html_pages(source_path) if source_path.is_dir() else iter_xml_dump_pages(source_path)
+
+    start = time.monotonic()
+    count = 0
+    with closing(sqlite3.connect(tmp_path)) as db, db:
+        db.execute("CREATE VIRTUAL TABLE pages USING fts5(title, body, tokenize='porter unicode61')")
+        db.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        seen = set()
+        for title, body in pages:
+            if title in seen:
+                continue
+            seen.add(title)
+            db.execute("INSERT INTO pages (title, body) VALUES (?, ?)", (title, body))
+            count += 1
+
+        db.execute("INSERT INTO pages (pages) VALUES ('optimize')")
+        db.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+            ("source", str(source_path)),
+            ("built_at", str(int(time.time()))),
+            ("page_count", str(count)),
+        ])
+    os.replace(tmp_path, index_path)
+
+    elapsed = time.monotonic() - start
+    logger.info(f"Indexed {count} wiki pages from {source_path} in {elapsed:.1f}s")
+
+    return {
+        "pages": count,
+        "source": str(source_path),
+        "index_path": str(index_path),
+        "seconds": round(elapsed, 2),
+    }
+
+
+def _match_expression(query: str, operator: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Every word is quoted so user input cannot inject FTS5 syntax; the last
+    word is a prefix match so partial words still find pages.
+
+    Args:
+        query: Search text
+        operator: "AND" or "OR"
+
+    Returns:
+        MATCH expression, or None if the query has no words
+    """
+    terms = _QUERY_TERM.findall(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return f" {operator} ".join(quoted)
+
+
+class WikiIndex:
+    """
+    Read access to the offline search index.
+
+    Each search opens the database read-only, so a rebuilt index (moved
+    into place by build_wiki_index) is picked up without a restart.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+
+    @property
+    def index_path(self) -> Path:
+        """Index file in use."""
+        return self.path or default_index_path()
+
+    def is_available(self) -> bool:
+        """Check whether an index has been built."""
+        return self.index_path.is_file()
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Search the index with BM25 ranking.
+
+        All words must match; if no page contains every word, pages
+        matching any of them are returned instead.
+
+        Args:
+            query: Search text
+            limit: Maximum number of results
+
+        Returns:
+            List of dicts with title, snippet and score (lower is better)
+
+        Raises:
+            sqlite3.Error: If the index cannot be read
+        """
+        uri = f"{self.index_path.resolve().as_uri()}?mode=ro"
+        with closing(sqlite3.connect(uri, uri=True)) as db:
+            for operator in ("AND", "OR"):
+                expression = _match_expression(query, operator)
+                if expression is None:
+                    return []
+
+                rows = db.execute(
+                    "SELECT title, snippet(pages, 1, '', '', '...', ?), "
+                    "bm25(pages, ?, ?) AS score "
+                    "FROM pages WHERE pages MATCH ? ORDER BY score LIMIT ?",
+                    (SNIPPET_TOKENS, TITLE_WEIGHT, BODY_WEIGHT, expression, limit)
+                ).fetchall()
+                if rows:
+                    break
+
+        return [
+            {
+                "title": title,
+                "snippet": snippet,
+                "score": round(score, 3),
+            }
+            for title, snippet, score in rows
+        ]
+
+    def info(self) -> Dict[str, str]:
+        """
+        Read index metadata.
+
+        Returns:
+            Dict with source, built_at and page_count
+        """
+        uri = f"{self.index_path.resolve().as_uri()}?mode=ro"
+        with closing(sqlite3.connect(uri, uri=True)) as db:
+            return dict(db.execute("SELECT key, value FROM meta").fetchall())
+
+
+# Process-wide offline wiki index
+wiki_index = WikiIndex()
+
+
+def main() -> int:
+    """Command line entry point for building the index."""
+    parser = argparse.ArgumentParser(description="Build the offline Arch Wiki search index.")
+    parser.add_argument(
+        "source", nargs="?",
+        help=f"arch-wiki-docs HTML directory or MediaWiki XML dump (default: {ARCH_WIKI_DOCS_DIR}/en)"
+    )
+    parser.add_argument("--output", help=f"index file (default: {default_index_path()})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        result = build_wiki_index(args.source, args.output)
+    except (OSError, ET.ParseError, sqlite3.Error) as e:
+        print(f"Failed to build wiki index: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Indexed {result['pages']} pages into {result['index_path']} in {result['seconds']}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
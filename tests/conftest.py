@@ -79,6 +79,91 @@ def mock_subprocess_failure():
     return _create_subprocess
 
 
+class FakeCommandStream:
+    """Stand-in for utils.CommandStream that yields canned output lines."""
+
+    def __init__(self, stdout: str = "", exit_code: int = 0, stderr: str = "") -> None:
+        self._lines = stdout.splitlines()
+        self._exit_code = exit_code
+        self._stderr = stderr
+        self.exit_code = None
+        self.stderr = ""
+        self.truncated = False
+        self.line_count = 0
+
+    async def __aenter__(self) -> "FakeCommandStream":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.exit_code = self._exit_code
+        self.stderr = self._stderr
+
+    async def __aiter__(self):
+        for line in self._lines:
+            self.line_count += 1
+            yield line
+
+
+@pytest.fixture
+def mock_stream_command():
+    """
+    Build a stream_command replacement returning canned output.
+
+    Returns a factory (stdout, exit_code, stderr); the replacement it
+    creates records the commands it was called with in `.calls`.
+    """
+    def _factory(stdout: str = "", exit_code: int = 0, stderr: str = ""):
+        def _stream_command(cmd, **kwargs):
+            _stream_command.calls.append(cmd)
+            return FakeCommandStream(stdout, exit_code, stderr)
+
+        _stream_command.calls = []
+        return _stream_command
+
+    return _factory
+
+
+@pytest.fixture(autouse=True)
+def reset_http_clients():
+    """Drop pooled HTTP clients so each test builds (and can mock) its own."""
+    from arch_ops_server.http_client import http_clients
+
+    http_clients.reset()
+    yield
+    http_clients.reset()
+
+
+@pytest.fixture(autouse=True)
+def isolated_http_cache(tmp_path: Path):
+    """Keep the persistent HTTP cache inside the test's temporary directory."""
+    from arch_ops_server.http_cache import http_cache
+
+    original = http_cache.directory
+    http_cache.directory = tmp_path / "http-cache"
+    yield http_cache
+    http_cache.directory = original
+
+
+@pytest.fixture(autouse=True)
+def reset_aur_cache():
+    """Empty the AUR RPC response cache so mocked responses are not reused."""
+    from arch_ops_server.aur import aur_rpc_cache
+
+    aur_rpc_cache.clear()
+    yield
+    aur_rpc_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_mirror_status_cache():
+    """Forget the indexed mirror status so each test fetches its own."""
+    from arch_ops_server.mirrors import mirror_status_cache
+
+    mirror_status_cache.clear()
+    yield
+    mirror_status_cache.clear()
+
+
 @pytest.fixture
 async def mock_httpx_client() -> AsyncGenerator[httpx.AsyncClient, None]:
     """Provide a mock httpx AsyncClient for testing HTTP requests."""
@@ -249,3 +334,321 @@ Install Reason  : Explicitly installed
 Install Script  : Yes
 Validated By    : Signature
 """
+
+
+def _format_desc(fields: dict) -> str:
+    """Render alpm desc sections from a dict of field values."""
+    desc = ""
+    for key, value in fields.items():
+        values = value if isinstance(value, list) else [value]
+        desc += f"%{key}%\n" + "".join(f"{v}\n" for v in values) + "\n"
+    return desc
+
+
+def _write_local_db_entry(local_dir: Path, fields: dict, files: list = None) -> Path:
+    """Write one /var/lib/pacman/local/<name>-<version>/ entry."""
+    entry = local_dir / f"{fields['NAME']}-{fields['VERSION']}"
+    entry.mkdir(parents=True)
+
+    (entry / "desc").write_text(_format_desc(fields))
+
+    files_content = "%FILES%\n" + "".join(f"{f}\n" for f in (files or [])) + "\n"
+    (entry / "files").write_text(files_content)
+
+    return entry
+
+
+@pytest.fixture
+def fake_local_db(tmp_path: Path) -> Path:
+    """
+    Create a small pacman local database.
+
+    vim (explicit) depends on vim-runtime and gpm, libfoo is an orphaned
+    dependency, and base-tool depends on sh, which bash provides.
+    """
+    local_dir = tmp_path / "local"
+    local_dir.mkdir()
+    (local_dir / "ALPM_DB_VERSION").write_text("9\n")
+
+    _write_local_db_entry(local_dir, {
+        "NAME": "vim",
+        "VERSION": "9.0.1000-1",
+        "DESC": "Vi Improved",
+        "ARCH": "x86_64",
+        "GROUPS": ["editors"],
+        "SIZE": "3670016",
+        "DEPENDS": ["vim-runtime=9.0.1000-1", "gpm"],
+        "OPTDEPENDS": ["python: Python language support"],
+    }, files=["usr/", "usr/bin/", "usr/bin/vim", "usr/share/vim/vimrc"])
+    _write_local_db_entry(local_dir, {
+        "NAME": "vim-runtime",
+        "VERSION": "9.0.1000-1",
+        "GROUPS": ["editors"],
+        "REASON": "1",
+    }, files=["usr/", "usr/share/", "usr/share/vim/"])
+    _write_local_db_entry(local_dir, {
+        "NAME": "gpm",
+        "VERSION": "1.20.7-4",
+        "REASON": "1",
+    }, files=["usr/", "usr/bin/", "usr/bin/gpm"])
+    _write_local_db_entry(local_dir, {
+        "NAME": "libfoo",
+        "VERSION": "1.0-1",
+        "REASON": "1",
+    }, files=["usr/", "usr/lib/", "usr/lib/libfoo.so.1"])
+    _write_local_db_entry(local_dir, {
+        "NAME": "bash",
+        "VERSION": "5.2.21-2",
+        "REASON": "1",
+        "PROVIDES": ["sh"],
+    }, files=["usr/", "usr/bin/", "usr/bin/bash", "usr/bin/sh"])
+    _write_local_db_entry(local_dir, {
+        "NAME": "base-tool",
+        "VERSION": "2-1",
+        "DEPENDS": ["sh"],
+    }, files=["usr/", "usr/bin/", "usr/bin/base-tool"])
+
+    return local_dir
+
+
+def _write_sync_db(path: Path, entries: list, compression: str = "gz") -> Path:
+    """Write a pacman sync database (tar archive of <name>-<version>/desc)."""
+    import io
+    import tarfile
+
+    with tarfile.open(path, f"w:{compression}" if compression else "w") as archive:
+        for fields in entries:
+            data = _format_desc(fields).encode()
+            info = tarfile.TarInfo(f"{fields['NAME']}-{fields['VERSION']}/desc")
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+    return path
+
+
+@pytest.fixture
+def make_sync_db():
+    """Factory writing sync databases: make_sync_db(path, entries, compression)."""
+    return _write_sync_db
+
+
+@pytest.fixture
+def fake_sync_db(tmp_path: Path) -> Path:
+    """
+    Create core and extra sync databases.
+
+    bash is in core and provides sh, vim and vim-runtime are in extra and
+    form the editors group, and neovim provides and replaces vi.
+    """
+    sync_dir = tmp_path / "sync"
+    sync_dir.mkdir()
+
+    _write_sync_db(sync_dir / "core.db", [
+        {
+            "NAME": "bash",
+            "VERSION": "5.2.21-2",
+            "DESC": "The GNU Bourne Again shell",
+            "ARCH": "x86_64",
+            "CSIZE": "1800000",
+            "ISIZE": "9000000",
+            "PROVIDES": ["sh"],
+            "DEPENDS": ["readline", "glibc"],
+        },
+    ])
+    _write_sync_db(sync_dir / "extra.db", [
+        {
+            "NAME": "vim",
+            "VERSION": "9.0.1000-1",
+            "DESC": "Vi Improved",
+            "URL": "https://www.vim.org",
+            "ARCH": "x86_64",
+            "GROUPS": ["editors"],
+            "LICENSE": ["custom:vim"],
+            "DEPENDS": ["vim-runtime=9.0.1000-1", "gpm"],
+        },
+        {
+            "NAME": "vim-runtime",
+            "VERSION": "9.0.1000-1",
+            "GROUPS": ["editors"],
+        },
+        {
+            "NAME": "neovim",
+            "VERSION": "0.9.5-1",
+            "PROVIDES": ["vi"],
+            "REPLACES": ["vi"],
+        },
+    ])
+
+    return sync_dir
+
+
+def _write_files_db(path: Path, packages: dict, compression: str = "gz") -> Path:
+    """Write a pacman files database: {name: (version, [paths])} as desc + files entries."""
+    import io
+    import tarfile
+
+    with tarfile.open(path, f"w:{compression}" if compression else "w") as archive:
+        for name, (version, files) in packages.items():
+            for filename, content in (
+                ("desc", _format_desc({"NAME": name, "VERSION": version})),
+                ("files", "%FILES%\n" + "".join(f"{f}\n" for f in files) + "\n"),
+            ):
+                data = content.encode()
+                info = tarfile.TarInfo(f"{name}-{version}/{filename}")
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+
+    return path
+
+
+@pytest.fixture
+def make_files_db():
+    """Factory writing files databases: make_files_db(path, packages, compression)."""
+    return _write_files_db
+
+
+@pytest.fixture
+def fake_files_db(tmp_path: Path) -> Path:
+    """
+    Create core and extra files databases.
+
+    bash (core) ships /usr/bin/bash and /usr/bin/sh; vim and gvim (extra)
+    both ship a vim binary, in /usr/bin and /opt/gvim/bin.
+    """
+    sync_dir = tmp_path / "files-sync"
+    sync_dir.mkdir()
+
+    _write_files_db(sync_dir / "core.files", {
+        "bash": ("5.2.21-2", ["usr/", "usr/bin/", "usr/bin/bash", "usr/bin/sh",
+                              "usr/share/doc/bash/README"]),
+        "zlib": ("1:1.3-1", ["usr/", "usr/lib/", "usr/lib/libz.so.1", "usr/lib/libz.so.1.3"]),
+    })
+    _write_files_db(sync_dir / "extra.files", {
+        "vim": ("9.0.1000-1", ["usr/", "usr/bin/", "usr/bin/vim", "usr/bin/vimdiff",
+                               "usr/lib/systemd/user/vim.service"]),
+        "gvim": ("9.0.1000-1", ["opt/", "opt/gvim/", "opt/gvim/bin/", "opt/gvim/bin/vim"]),
+    })
+
+    return sync_dir
+
+
+@pytest.fixture
+def fake_mirror():
+    """
+    Serve a fake mirror over HTTP on localhost.
+
+    Files are served from the `files` dict (path -> bytes), so
+    /core/os/x86_64/core.db and /extra/os/x86_64/extra.db exist by default.
+    Range requests are honoured and every request is recorded in
+    `requests` as (method, path, headers). Yields an object with `url`
+    (a mirrorlist Server value), `files` and `requests`.
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from types import SimpleNamespace
+
+    mirror = SimpleNamespace(
+        files={
+            "/core/os/x86_64/core.db": b"c" * 64 * 1024,
+            "/extra/os/x86_64/extra.db": b"e" * 512 * 1024,
+        },
+        requests=[],
+    )
+
+    class Handler(BaseHTTPRequestHandler):
+        def _serve(self, send_body: bool) -> None:
+            mirror.requests.append((self.command, self.path, dict(self.headers)))
+            data = mirror.files.get(self.path)
+            if data is None:
+                self.send_error(404)
+                return
+
+            status = 200
+            range_header = self.headers.get("Range", "")
+            if range_header.startswith("bytes="):
+                first, _, last = range_header[len("bytes="):].partition("-")
+                start = int(first or 0)
+                end = min(int(last) if last else len(data) - 1, len(data) - 1)
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+                data = data[start:end + 1]
+            else:
+                self.send_response(status)
+
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(data)
+
+        def do_GET(self) -> None:
+            self._serve(send_body=True)
+
+        def do_HEAD(self) -> None:
+            self._serve(send_body=False)
+
+        def log_message(self, format, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+
+    mirror.url = f"http://127.0.0.1:{server.server_address[1]}/$repo/os/$arch"
+    try:
+        yield mirror
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def reset_config_cache():
+    """Drop parsed configuration files so each test reads its own."""
+    from arch_ops_server.config import config_cache
+
+    config_cache.invalidate()
+    yield
+    config_cache.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def reset_capabilities():
+    """Forget probed binaries and sudo state so each test probes its own."""
+    from arch_ops_server.utils import capabilities
+
+    capabilities.refresh()
+    yield
+    capabilities.refresh()
+
+
+@pytest.fixture
+def systemd_host(tmp_path: Path, monkeypatch):
+    """Make the capability registry see systemd as the running init system."""
+    runtime_dir = tmp_path / "run-systemd-system"
+    runtime_dir.mkdir()
+    monkeypatch.setattr("arch_ops_server.utils.SYSTEMD_RUNTIME_DIR", str(runtime_dir))
+    return runtime_dir
+
+
+@pytest.fixture(autouse=True)
+def isolated_wiki_cache(tmp_path: Path):
+    """Keep cached wiki pages inside the test's temporary directory."""
+    from arch_ops_server.wiki_cache import wiki_page_cache
+
+    original = wiki_page_cache.directory
+    wiki_page_cache.directory = tmp_path / "wiki-cache"
+    wiki_page_cache.clear()
+    yield wiki_page_cache
+    wiki_page_cache.clear()
+    wiki_page_cache.directory = original
+
+
+@pytest.fixture(autouse=True)
+def isolated_wiki_index(tmp_path: Path):
+    """Point the offline wiki index at the test's temporary directory (not built)."""
+    from arch_ops_server.wiki_index import wiki_index
+
+    original = wiki_index.path
+    wiki_index.path = tmp_path / "wiki-index.sqlite"
+    yield wiki_index
+    wiki_index.path = original
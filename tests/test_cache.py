@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Tests for arch_ops_server.cache module.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from arch_ops_server.cache import AsyncTTLCache
+
+
+class TestAsyncTTLCache:
+    """Test TTL/LRU cache with single-flight loading."""
+
+    @pytest.mark.asyncio
+    async def test_hit_after_miss(self):
+        """Test that a second lookup is served from the cache."""
+        cache = AsyncTTLCache("test")
+        loader = AsyncMock(return_value={"value": 1})
+
+        first = await cache.get_or_load("key", loader)
+        second = await cache.get_or_load("key", loader)
+
+        assert first is second
+        loader.assert_awaited_once()
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        """Test that expired entries are reloaded."""
+        cache = AsyncTTLCache("test", ttl=10)
+        loader = AsyncMock(side_effect=[{"v": 1}, {"v": 2}])
+
+        with patch("arch_ops_server.cache.time.monotonic", return_value=100.0):
+            assert await cache.get_or_load("key", loader) == {"v": 1}
+        with patch("arch_ops_server.cache.time.monotonic", return_value=111.0):
+            assert await cache.get_or_load("key", loader) == {"v": 2}
+
+        assert loader.await_count == 2
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        cache = AsyncTTLCache("test", max_entries=2)
+
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_single_flight(self):
+        """Test that concurrent identical loads share one call."""
+        cache = AsyncTTLCache("test")
+        release = asyncio.Event()
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"value": calls}
+
+        tasks = [asyncio.create_task(cache.get_or_load("key", loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert calls == 1
+        assert all(result == {"value": 1} for result in results)
+        assert cache.stats()["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_exceptions_not_cached(self):
+        """Test that failed loads propagate and are retried next time."""
+        cache = AsyncTTLCache("test")
+        loader = AsyncMock(side_effect=[RuntimeError("boom"), {"ok": True}])
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load("key", loader)
+
+        assert await cache.get_or_load("key", loader) == {"ok": True}
+
+    @pytest.mark.asyncio
+    async def test_cache_if_predicate(self):
+        """Test that rejected values are returned but not stored."""
+        cache = AsyncTTLCache("test")
+        loader = AsyncMock(return_value={"type": "error"})
+
+        await cache.get_or_load("key", loader, cache_if=lambda v: v["type"] != "error")
+        await cache.get_or_load("key", loader, cache_if=lambda v: v["type"] != "error")
+
+        assert loader.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_zero_ttl_disables_cache(self):
+        """Test that a zero TTL turns caching off."""
+        cache = AsyncTTLCache("test", ttl=0)
+        loader = AsyncMock(return_value={"v": 1})
+
+        await cache.get_or_load("key", loader)
+        await cache.get_or_load("key", loader)
+
+        assert loader.await_count == 2
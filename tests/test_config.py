@@ -3,14 +3,17 @@
 Tests for arch_ops_server.config module.
 """
 
+import os
 from unittest.mock import patch, mock_open
 
 import pytest
 
+from arch_ops_server import config as config_module
 from arch_ops_server.config import (
     PACMAN_CONF,
     MAKEPKG_CONF,
     parse_config_file,
+    config_cache,
     analyze_pacman_conf,
     analyze_makepkg_conf,
     check_ignored_packages,
@@ -57,6 +60,212 @@ Key = Value
         assert len(result["comments"]) >= 1
 
 
+class TestConfigIncludes:
+    """Test Include handling and the parsed-config cache."""
+
+    @pytest.fixture
+    def pacman_conf(self, tmp_path):
+        """pacman.conf including a mirrorlist and a glob of drop-ins."""
+        mirrorlist = tmp_path / "mirrorlist"
+        mirrorlist.write_text(
+            "## Germany\n"
+            "Server = https://a.example.org/$repo/os/$arch\n"
+            "#Server = https://disabled.example.org/$repo/os/$arch\n"
+            "Server = https://b.example.org/$repo/os/$arch\n"
+        )
+        dropins = tmp_path / "conf.d"
+        dropins.mkdir()
+        (dropins / "10-parallel.conf").write_text("ParallelDownloads = 8\n")
+
+        conf = tmp_path / "pacman.conf"
+        conf.write_text(
+            "[options]\n"
+            f"Include = {dropins}/*.conf\n"
+            "\n"
+            "[core]\n"
+            f"Include = {mirrorlist}\n"
+            "\n"
+            "[extra]\n"
+            f"Include = {mirrorlist}\n"
+        )
+        return conf
+
+    def test_include_servers_attached_to_repository(self, pacman_conf, tmp_path):
+        """Test that mirrorlist Server lines land on the including repository."""
+        result = parse_config_file(str(pacman_conf))
+
+        core, extra = result["repositories"]
+        assert core["servers"] == [
+            "https://a.example.org/$repo/os/$arch",
+            "https://b.example.org/$repo/os/$arch",
+        ]
+        assert extra["servers"] == core["servers"]
+        assert core["config"]["Include"] == str(tmp_path / "mirrorlist")
+        assert result["options"]["ParallelDownloads"] == "8"
+        assert "Include" not in result["options"]
+        assert [inc["section"] for inc in result["includes"]] == ["options", "core", "extra"]
+        # Comments are only collected from the main file
+        assert result["comments"] == []
+
+    @pytest.mark.asyncio
+    async def test_analyze_returns_trimmed_copy(self, pacman_conf):
+        """Test that analysis reports server counts instead of mirror lists."""
+        with (
+            patch("arch_ops_server.config.IS_ARCH", True),
+            patch("arch_ops_server.config.PACMAN_CONF", str(pacman_conf)),
+        ):
+            result = await analyze_pacman_conf()
+
+        raw = result["raw_config"]
+        assert "files" not in raw
+        assert [(repo["name"], repo["server_count"]) for repo in raw["repositories"]] == [("core", 2), ("extra", 2)]
+        assert "servers" not in raw["repositories"][0]
+
+        raw["options"]["ParallelDownloads"] = "1"
+        cached = config_cache.get(str(pacman_conf), parse_config_file)
+        assert cached["options"]["ParallelDownloads"] == "8"
+
+    @pytest.mark.asyncio
+    async def test_analyze_returns_list_copies(self, tmp_path):
+        """Test that changing the returned lists does not alter later results."""
+        conf = tmp_path / "pacman.conf"
+        conf.write_text("[options]\nIgnorePkg = linux\nIgnoreGroup = gnome\nColor\n")
+
+        with (
+            patch("arch_ops_server.config.IS_ARCH", True),
+            patch("arch_ops_server.config.PACMAN_CONF", str(conf)),
+        ):
+            first = await analyze_pacman_conf()
+            first["ignored_packages"].append("glibc")
+            first["ignored_groups"].append("kde-applications")
+            first["flags"].append("VerbosePkgLists")
+
+            second = await analyze_pacman_conf()
+
+        assert second["ignored_packages"] == ["linux"]
+        assert second["ignored_groups"] == ["gnome"]
+        assert second["flags"] == ["Color"]
+
+    def test_missing_include_is_recorded(self, tmp_path):
+        """Test that an Include naming a missing file matches nothing."""
+        conf = tmp_path / "pacman.conf"
+        conf.write_text(f"[core]\nInclude = {tmp_path}/missing\n")
+
+        result = parse_config_file(str(conf))
+
+        assert result["includes"][0]["files"] == []
+        assert result["repositories"][0]["servers"] == []
+
+    def test_unchanged_files_parsed_once(self, pacman_conf):
+        """Test that repeated lookups reuse the parsed result."""
+        calls = []
+
+        def counting_parser(path, sources):
+            calls.append(path)
+            return parse_config_file(path, sources)
+
+        first = config_cache.get(str(pacman_conf), counting_parser)
+        second = config_cache.get(str(pacman_conf), counting_parser)
+
+        assert first is second
+        assert calls == [str(pacman_conf)]
+
+    def test_included_file_change_invalidates(self, pacman_conf, tmp_path):
+        """Test that editing the mirrorlist triggers a re-parse."""
+        first = config_cache.get(str(pacman_conf), parse_config_file)
+
+        mirrorlist = tmp_path / "mirrorlist"
+        mirrorlist.write_text("Server = https://c.example.org/$repo/os/$arch\n")
+        st = os.stat(mirrorlist)
+        os.utime(mirrorlist, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        second = config_cache.get(str(pacman_conf), parse_config_file)
+
+        assert second is not first
+        assert second["repositories"][0]["servers"] == ["https://c.example.org/$repo/os/$arch"]
+
+    def test_new_glob_match_invalidates(self, pacman_conf, tmp_path):
+        """Test that adding a file matching an Include glob triggers a re-parse."""
+        first = config_cache.get(str(pacman_conf), parse_config_file)
+
+        dropins = tmp_path / "conf.d"
+        (dropins / "20-color.conf").write_text("Color\nVerbosePkgLists = 1\n")
+        st = os.stat(dropins)
+        os.utime(dropins, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        second = config_cache.get(str(pacman_conf), parse_config_file)
+
+        assert second is not first
+        assert second["options"]["VerbosePkgLists"] == "1"
+
+
+class TestConfigModel:
+    """Test the pacman.conf repository model."""
+
+    def test_repeated_list_options_accumulate(self, tmp_path):
+        """Test that repeated IgnorePkg lines are merged instead of overwritten."""
+        conf = tmp_path / "pacman.conf"
+        conf.write_text(
+            "[options]\n"
+            "IgnorePkg = linux linux-headers\n"
+            "IgnorePkg = firefox\n"
+            "Color\n"
+            "ILoveCandy\n"
+        )
+
+        result = parse_config_file(str(conf))
+
+        assert result["list_options"]["IgnorePkg"] == ["linux", "linux-headers", "firefox"]
+        assert result["options"]["IgnorePkg"] == "firefox"
+        assert result["flags"] == ["Color", "ILoveCandy"]
+
+    def test_repositories_ordered_and_merged(self, tmp_path):
+        """Test repository order, hyphenated names and repeated sections."""
+        conf = tmp_path / "pacman.conf"
+        conf.write_text(
+            "[core-testing]\n"
+            "Server = https://a.example.org/$repo\n"
+            "[core]\n"
+            "Server = https://b.example.org/$repo\n"
+            "[core-testing]\n"
+            "Server = https://c.example.org/$repo\n"
+        )
+
+        result = parse_config_file(str(conf))
+
+        assert [repo["name"] for repo in result["repositories"]] == ["core-testing", "core"]
+        assert result["repositories"][0]["servers"] == [
+            "https://a.example.org/$repo",
+            "https://c.example.org/$repo",
+        ]
+
+    def test_include_cycle_skipped(self, tmp_path):
+        """Test that a file including itself does not recurse."""
+        loop = tmp_path / "loop.conf"
+        loop.write_text(f"Server = https://a.example.org/$repo\nInclude = {loop}\n")
+        conf = tmp_path / "pacman.conf"
+        conf.write_text(f"[custom]\nInclude = {loop}\n")
+
+        result = parse_config_file(str(conf))
+
+        assert result["repositories"][0]["servers"] == ["https://a.example.org/$repo"]
+
+    def test_shared_include_read_once(self, tmp_path):
+        """Test that a mirrorlist included by many repositories is read once."""
+        mirrorlist = tmp_path / "mirrorlist"
+        mirrorlist.write_text("Server = https://a.example.org/$repo\n#Server = https://b.example.org/$repo\n")
+        conf = tmp_path / "pacman.conf"
+        conf.write_text("".join(f"[{repo}]\nInclude = {mirrorlist}\n" for repo in ("core", "extra", "multilib")))
+
+        with patch("arch_ops_server.config._read_config_lines",
+                   wraps=config_module._read_config_lines) as read:
+            result = parse_config_file(str(conf))
+
+        assert [call.args[0] for call in read.call_args_list] == [str(conf), str(mirrorlist)]
+        assert all(repo["servers"] == ["https://a.example.org/$repo"] for repo in result["repositories"])
+        assert result["files"][str(mirrorlist)]["commented_servers"] == ["https://b.example.org/$repo"]
+
+
 class TestPacmanConf:
     """Test pacman.conf parsing."""
 
@@ -204,6 +413,24 @@ PKGEXT='.pkg.tar.zst'
             assert "options" in result
             assert isinstance(result["options"], list)
 
+    @pytest.mark.asyncio
+    async def test_analyze_makepkg_conf_returns_copy(self, sample_makepkg_conf, tmp_path):
+        """Test that changing all_config does not alter the cached parse."""
+        conf = tmp_path / "makepkg.conf"
+        conf.write_text(sample_makepkg_conf)
+
+        with (
+            patch("arch_ops_server.config.IS_ARCH", True),
+            patch("arch_ops_server.config.MAKEPKG_CONF", str(conf)),
+        ):
+            first = await analyze_makepkg_conf()
+            first["all_config"]["CFLAGS"] = "POISON"
+
+            second = await analyze_makepkg_conf()
+
+        assert "-O2" in second["cflags"]
+        assert second["all_config"]["CFLAGS"] != "POISON"
+
     @pytest.mark.asyncio
     @patch("arch_ops_server.config.IS_ARCH", False)
     async def test_analyze_makepkg_conf_not_arch(self):
@@ -0,0 +1,160 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Tests for arch_ops_server.fileindex module.
+"""
+
+import os
+import shutil
+from unittest.mock import patch
+
+import pytest
+
+from arch_ops_server.fileindex import FileOwnershipIndex, entry_package
+
+
+def touch_dir(path):
+    """Advance a directory's mtime, as pacman adding/removing an entry does."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+@pytest.fixture
+def index(fake_local_db, tmp_path):
+    """File ownership index over the fake local database."""
+    return FileOwnershipIndex(str(fake_local_db), cache_path=tmp_path / "file-owners.sqlite")
+
+
+class TestEntryPackage:
+    """Test local database entry name parsing."""
+
+    @pytest.mark.parametrize("entry,expected", [
+        ("vim-9.0.1000-1", ("vim", "9.0.1000-1")),
+        ("vim-runtime-9.0.1000-1", ("vim-runtime", "9.0.1000-1")),
+        ("python-3.12.1-1.1", ("python", "3.12.1-1.1")),
+        ("xorg-server-1:21.1.11-1", ("xorg-server", "1:21.1.11-1")),
+    ])
+    def test_entry_package(self, entry, expected):
+        """Test splitting name-pkgver-pkgrel."""
+        assert entry_package(entry) == expected
+
+
+class TestFileOwnershipIndex:
+    """Test the reverse file ownership index."""
+
+    def test_file_owner(self, index):
+        """Test looking up the owner of a file."""
+        assert index.owners("/usr/bin/vim") == [("vim", "9.0.1000-1")]
+        assert index.owners("/usr/lib/libfoo.so.1") == [("libfoo", "1.0-1")]
+
+    def test_directory_has_every_owner(self, index):
+        """Test that shared directories report all owning packages."""
+        owners = {name for name, _ in index.owners("/usr/bin/")}
+
+        assert owners == {"vim", "gpm", "bash", "base-tool"}
+        assert {name for name, _ in index.owners("/usr/bin")} == owners
+
+    def test_unowned_and_relative_segments(self, index):
+        """Test unowned paths and path normalization."""
+        assert index.owners("/usr/bin/not-installed") == []
+        assert index.owners("/etc/hostname") == []
+        assert index.owners("/usr/share/../bin/gpm") == [("gpm", "1.20.7-4")]
+
+    def test_owners_batch(self, index):
+        """Test looking up many paths with one refresh."""
+        with patch.object(index, "refresh", wraps=index.refresh) as refresh:
+            result = index.owners_batch(["/usr/bin/bash", "/usr/bin/sh", "/nowhere"])
+
+        assert refresh.call_count == 1
+        assert result == {
+            "/usr/bin/bash": [("bash", "5.2.21-2")],
+            "/usr/bin/sh": [("bash", "5.2.21-2")],
+            "/nowhere": [],
+        }
+
+    def test_files_in_database_order(self, index):
+        """Test that file lists match pacman -Ql order."""
+        assert index.files("vim") == ["/usr/", "/usr/bin/", "/usr/bin/vim", "/usr/share/vim/vimrc"]
+        assert index.files("not-installed") is None
+
+    def test_unchanged_database_is_not_rescanned(self, index):
+        """Test that refresh does nothing while the database is unchanged."""
+        assert index.refresh() == 6
+
+        with patch("arch_ops_server.fileindex.os.scandir") as scandir:
+            assert index.refresh() == 0
+
+        scandir.assert_not_called()
+
+    def test_incremental_install_and_remove(self, index, fake_local_db):
+        """Test that only added and removed entries are processed."""
+        index.refresh()
+
+        shutil.rmtree(fake_local_db / "gpm-1.20.7-4")
+        new_entry = fake_local_db / "htop-3.3.0-1"
+        new_entry.mkdir()
+        (new_entry / "desc").write_text("%NAME%\nhtop\n\n%VERSION%\n3.3.0-1\n\n")
+        (new_entry / "files").write_text("%FILES%\nusr/\nusr/bin/\nusr/bin/htop\n\n")
+        touch_dir(fake_local_db)
+
+        assert index.refresh() == 2
+        assert index.owners("/usr/bin/gpm") == []
+        assert index.files("gpm") is None
+        assert index.owners("/usr/bin/htop") == [("htop", "3.3.0-1")]
+        assert ("gpm", "1.20.7-4") not in index.owners("/usr/bin/")
+
+    def test_upgrade_replaces_entry(self, index, fake_local_db):
+        """Test that an upgraded package's new file list replaces the old one."""
+        index.refresh()
+
+        old_entry = fake_local_db / "libfoo-1.0-1"
+        new_entry = fake_local_db / "libfoo-2.0-1"
+        old_entry.rename(new_entry)
+        (new_entry / "files").write_text("%FILES%\nusr/\nusr/lib/\nusr/lib/libfoo.so.2\n\n")
+        touch_dir(fake_local_db)
+
+        index.refresh()
+
+        assert index.owners("/usr/lib/libfoo.so.1") == []
+        assert index.owners("/usr/lib/libfoo.so.2") == [("libfoo", "2.0-1")]
+        assert index.files("libfoo") == ["/usr/", "/usr/lib/", "/usr/lib/libfoo.so.2"]
+
+    def test_persisted_index_is_reused(self, index, fake_local_db, tmp_path):
+        """Test that a new process loads the saved index instead of rereading files."""
+        index.refresh()
+
+        restored = FileOwnershipIndex(str(fake_local_db), cache_path=tmp_path / "file-owners.sqlite")
+        with patch("arch_ops_server.fileindex.parse_desc") as parse:
+            assert restored.owners("/usr/bin/vim") == [("vim", "9.0.1000-1")]
+
+        parse.assert_not_called()
+        assert restored.stats() == index.stats()
+
+    def test_persisted_index_for_other_database_ignored(self, index, fake_local_db, tmp_path):
+        """Test that a saved index built from another database path is not used."""
+        index.refresh()
+
+        other_db = tmp_path / "other"
+        shutil.copytree(fake_local_db, other_db)
+        (other_db / "vim-9.0.1000-1" / "files").write_text("%FILES%\nusr/bin/vi\n\n")
+
+        other = FileOwnershipIndex(str(other_db), cache_path=tmp_path / "file-owners.sqlite")
+
+        assert other.owners("/usr/bin/vim") == []
+        assert other.owners("/usr/bin/vi") == [("vim", "9.0.1000-1")]
+
+    def test_corrupt_cache_file_ignored(self, fake_local_db, tmp_path):
+        """Test that an unreadable cache file falls back to a full scan."""
+        cache_path = tmp_path / "file-owners.sqlite"
+        cache_path.write_bytes(b"not a database")
+
+        index = FileOwnershipIndex(str(fake_local_db), cache_path=cache_path)
+
+        assert index.owners("/usr/bin/bash") == [("bash", "5.2.21-2")]
+
+    def test_missing_database(self, tmp_path):
+        """Test behaviour when the database directory does not exist."""
+        index = FileOwnershipIndex(str(tmp_path / "missing"), cache_path=tmp_path / "cache.sqlite")
+
+        assert not index.is_available()
+        with pytest.raises(FileNotFoundError):
+            index.refresh()
@@ -0,0 +1,170 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Tests for arch_ops_server.filesdb module.
+"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from arch_ops_server.filesdb import FilesIndex
+
+
+def files_of(matches):
+    """Reduce matches to (package, file) pairs."""
+    return [(m["package"], m["file"]) for m in matches]
+
+
+@pytest.fixture
+def index(fake_files_db, tmp_path):
+    """Files index over the fake files databases, already built."""
+    index = FilesIndex(str(fake_files_db), index_path=tmp_path / "files-index.sqlite")
+    index.refresh()
+    return index
+
+
+class TestFilesIndexBuild:
+    """Test ingesting and refreshing the files databases."""
+
+    def test_refresh_ingests_every_repository(self, fake_files_db, tmp_path):
+        """Test that the first refresh ingests all repositories."""
+        index = FilesIndex(str(fake_files_db), index_path=tmp_path / "files-index.sqlite")
+
+        assert not index.is_current()
+        assert index.refresh() == ["core", "extra"]
+        assert index.is_current()
+        assert index.info()["repositories"] == {
+            "core": {"packages": 2, "files": 5},
+            "extra": {"packages": 2, "files": 4},
+        }
+
+    def test_unchanged_databases_are_not_reread(self, index):
+        """Test that a refresh without pacman -Fy reads nothing."""
+        with patch("arch_ops_server.filesdb.iter_files_database") as reader:
+            assert index.refresh() == []
+
+        reader.assert_not_called()
+
+    def test_changed_repository_is_reingested(self, index, fake_files_db, make_files_db):
+        """Test that only the replaced database is read again."""
+        make_files_db(fake_files_db / "extra.files", {
+            "neovim": ("0.9.5-1", ["usr/", "usr/bin/", "usr/bin/nvim"]),
+        })
+        st = os.stat(fake_files_db / "extra.files")
+        os.utime(fake_files_db / "extra.files", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        assert index.refresh() == ["extra"]
+        assert index.search("vim") == []
+        assert files_of(index.search("nvim")) == [("neovim", "usr/bin/nvim")]
+        assert files_of(index.search("bash")) == [("bash", "usr/bin/bash")]
+
+    def test_removed_repository_is_dropped(self, index, fake_files_db):
+        """Test that a repository no longer synced disappears from results."""
+        (fake_files_db / "extra.files").unlink()
+
+        assert index.refresh() == ["extra"]
+        assert index.search("vim") == []
+
+    def test_unconfigured_repository_is_dropped(self, index, tmp_path):
+        """Test that a repository removed from pacman.conf is dropped despite its stale database."""
+        pacman_conf = tmp_path / "pacman.conf"
+        pacman_conf.write_text("[options]\nArchitecture = auto\n\n[core]\n")
+
+        with patch("arch_ops_server.syncdb.PACMAN_CONF", str(pacman_conf)):
+            assert index.refresh() == ["extra"]
+            assert index.search("vim") == []
+            assert list(index.info()["repositories"]) == ["core"]
+
+    def test_failed_ingest_is_not_retried(self, index, fake_files_db):
+        """Test that an unreadable database is recorded instead of retried on every search."""
+        (fake_files_db / "extra.files").write_bytes(b"not a tar archive")
+
+        assert index.refresh() == ["extra"]
+        with patch("arch_ops_server.filesdb.iter_files_database") as reader:
+            assert index.refresh() == []
+        reader.assert_not_called()
+
+        assert index.is_current()
+        assert "error" in index.info()["repositories"]["extra"]
+        # The previously indexed files are still served
+        assert files_of(index.search("vimdiff")) == [("vim", "usr/bin/vimdiff")]
+
+
+class TestFilesIndexSearch:
+    """Test exact, glob and regex searches."""
+
+    def test_exact_basename(self, index):
+        """Test that a bare name matches file basenames (like pacman -F)."""
+        matches = index.search("vim")
+
+        assert files_of(matches) == [("gvim", "opt/gvim/bin/vim"), ("vim", "usr/bin/vim")]
+        assert matches[0]["repository"] == "extra"
+        assert matches[0]["version"] == "9.0.1000-1"
+
+    def test_exact_full_path_and_suffix(self, index):
+        """Test absolute paths and path suffixes."""
+        assert files_of(index.search("/usr/bin/vim")) == [("vim", "usr/bin/vim")]
+        assert files_of(index.search("bin/vim")) == [("gvim", "opt/gvim/bin/vim"), ("vim", "usr/bin/vim")]
+        assert index.search("sbin/vim") == []
+
+    def test_directories_are_not_matched(self, index):
+        """Test that directory entries are not reported as files."""
+        assert index.search("bin") == []
+
+    def test_repository_order(self, index):
+        """Test that core results come before extra results."""
+        matches = index.search("*", mode="glob")
+
+        repos = [m["repository"] for m in matches]
+        assert repos == sorted(repos, key=["core", "extra"].index)
+
+    def test_glob(self, index):
+        """Test glob matching on basenames and paths."""
+        assert files_of(index.search("libz.so*", mode="glob")) == [
+            ("zlib", "usr/lib/libz.so.1"), ("zlib", "usr/lib/libz.so.1.3"),
+        ]
+        assert files_of(index.search("*.service", mode="glob")) == [
+            ("vim", "usr/lib/systemd/user/vim.service"),
+        ]
+        assert files_of(index.search("usr/bin/vim*", mode="glob")) == [
+            ("vim", "usr/bin/vim"), ("vim", "usr/bin/vimdiff"),
+        ]
+
+    def test_regex(self, index):
+        """Test regex matching (like pacman -Fx)."""
+        assert files_of(index.search(r"^libz\.so\.\d+$", mode="regex")) == [("zlib", "usr/lib/libz.so.1")]
+        assert files_of(index.search(r"^opt/.*/vim$", mode="regex")) == [("gvim", "opt/gvim/bin/vim")]
+
+    def test_invalid_mode(self, index):
+        """Test that unknown modes are rejected."""
+        with pytest.raises(ValueError):
+            index.search("vim", mode="fuzzy")
+
+    def test_limit(self, index):
+        """Test capping the number of matches."""
+        assert len(index.search("*", mode="glob", limit=3)) == 3
+
+    def test_limit_keeps_first_repositories(self, index, fake_files_db, make_files_db):
+        """Test that a capped search drops later repositories, not core."""
+        # Re-ingest core so its rows are stored after extra's
+        make_files_db(fake_files_db / "core.files", {
+            "bash": ("5.2.21-3", ["usr/", "usr/bin/", "usr/bin/bash", "usr/bin/sh"]),
+        })
+        st = os.stat(fake_files_db / "core.files")
+        os.utime(fake_files_db / "core.files", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        index.refresh()
+
+        matches = index.search("*", mode="glob", limit=2)
+
+        assert [(m["repository"], m["file"]) for m in matches] == [
+            ("core", "usr/bin/bash"), ("core", "usr/bin/sh"),
+        ]
+
+    def test_search_many(self, index):
+        """Test looking up several basenames in one call."""
+        results = index.search_many(["libz.so.1", "sh", "libmissing.so"])
+
+        assert files_of(results["libz.so.1"]) == [("zlib", "usr/lib/libz.so.1")]
+        assert files_of(results["sh"]) == [("bash", "usr/bin/sh")]
+        assert results["libmissing.so"] == []
@@ -0,0 +1,141 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Tests for arch_ops_server.http_cache module.
+"""
+
+import os
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from arch_ops_server.http_cache import CachedResponse, HttpCache, cached_get
+
+URL = "https://archlinux.org/feeds/news/"
+
+
+def _response(status_code: int, content: bytes = b"", headers: dict = None) -> httpx.Response:
+    """Build a real httpx response for URL."""
+    return httpx.Response(
+        status_code,
+        content=content,
+        headers=headers or {},
+        request=httpx.Request("GET", URL),
+    )
+
+
+class TestCachedGet:
+    """Test conditional revalidation through the disk cache."""
+
+    @pytest.mark.asyncio
+    async def test_stores_and_revalidates_with_etag(self, isolated_http_cache):
+        """Test that a stored ETag is sent back and a 304 is served from disk."""
+        fresh = _response(200, b"<rss>feed</rss>", {"ETag": '"v1"', "Content-Type": "application/rss+xml"})
+        not_modified = _response(304)
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(side_effect=[fresh, not_modified])
+
+            first = await cached_get(URL)
+            second = await cached_get(URL)
+
+            assert first.content == b"<rss>feed</rss>"
+            assert isinstance(second, CachedResponse)
+            assert second.content == b"<rss>feed</rss>"
+            assert second.text == "<rss>feed</rss>"
+            second_headers = mock_client.return_value.get.call_args_list[1].kwargs["headers"]
+            assert second_headers == {"If-None-Match": '"v1"'}
+
+    @pytest.mark.asyncio
+    async def test_last_modified_validator(self, isolated_http_cache):
+        """Test revalidation with If-Modified-Since."""
+        stamp = "Wed, 01 Jan 2025 00:00:00 GMT"
+        fresh = _response(200, b'{"urls": []}', {"Last-Modified": stamp})
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(side_effect=[fresh, _response(304)])
+
+            await cached_get(URL, params={"a": "1"})
+            second = await cached_get(URL, params={"a": "1"})
+
+            assert second.json() == {"urls": []}
+            second_headers = mock_client.return_value.get.call_args_list[1].kwargs["headers"]
+            assert second_headers == {"If-Modified-Since": stamp}
+
+    @pytest.mark.asyncio
+    async def test_changed_resource_replaces_entry(self, isolated_http_cache):
+        """Test that a new 200 overwrites the cached body."""
+        responses = [
+            _response(200, b"old", {"ETag": '"v1"'}),
+            _response(200, b"new", {"ETag": '"v2"'}),
+            _response(304),
+        ]
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(side_effect=responses)
+
+            await cached_get(URL)
+            await cached_get(URL)
+            third = await cached_get(URL)
+
+            assert third.content == b"new"
+            assert mock_client.return_value.get.call_args_list[2].kwargs["headers"] == {"If-None-Match": '"v2"'}
+
+    @pytest.mark.asyncio
+    async def test_no_validator_not_stored(self, isolated_http_cache):
+        """Test that responses without validators are not cached."""
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(return_value=_response(200, b"body"))
+
+            await cached_get(URL)
+            await cached_get(URL)
+
+            assert mock_client.return_value.get.call_args_list[1].kwargs["headers"] == {}
+            assert not isolated_http_cache.directory.exists()
+
+    @pytest.mark.asyncio
+    async def test_http_error_raises(self, isolated_http_cache):
+        """Test that HTTP errors propagate like client.get + raise_for_status."""
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(return_value=_response(503))
+
+            with pytest.raises(httpx.HTTPStatusError):
+                await cached_get(URL)
+
+    @pytest.mark.asyncio
+    async def test_entries_survive_new_cache_instance(self, isolated_http_cache):
+        """Test that entries persist on disk across HttpCache instances."""
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(
+                return_value=_response(200, b"persisted", {"ETag": '"p"'})
+            )
+            await cached_get(URL)
+
+        reopened = HttpCache(isolated_http_cache.directory)
+        meta, body = reopened.load(URL)
+
+        assert body == b"persisted"
+        assert meta["headers"]["etag"] == '"p"'
+
+
+
+class TestHttpCacheBound:
+    """Test the size bound of the disk cache."""
+
+    def test_oldest_entries_removed_over_bound(self, tmp_path):
+        """Test that the least recently written entries are deleted first."""
+        cache = HttpCache(tmp_path, disk_bytes=1000)
+        urls = [f"{URL}?page={index}" for index in range(3)]
+        for index, url in enumerate(urls):
+            cache.store(url, _response(200, b"x" * 300, {"ETag": f'"{index}"'}))
+            meta_path, _ = cache._paths(url)
+            os.utime(meta_path, ns=(index * 10**9, index * 10**9))
+        cache.store(f"{URL}?page=3", _response(200, b"x" * 300, {"ETag": '"3"'}))
+
+        assert cache.load(urls[0]) is None
+        assert not any(path.exists() for path in cache._paths(urls[0]))
+        assert cache.load(urls[1]) is None
+        assert cache.load(urls[2]) is not None
+        assert cache.load(f"{URL}?page=3") is not None
+        total = sum(path.stat().st_size for path in tmp_path.iterdir())
+        assert total <= 1000
@@ -0,0 +1,88 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Tests for arch_ops_server.http_client module.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from arch_ops_server.http_client import (
+    DEFAULT_POOL,
+    DEFAULT_POOL_MAX_CONNECTIONS,
+    MAX_CONNECTIONS_PER_HOST,
+    KNOWN_HOSTS,
+    HttpClientRegistry,
+    http_client_lifespan,
+    http_clients,
+)
+
+
+class TestHttpClientRegistry:
+    """Test pooled client registry."""
+
+    def test_same_host_reuses_client(self):
+        """Test that requests to one host share a single client."""
+        registry = HttpClientRegistry()
+
+        first = registry.get("https://aur.archlinux.org/rpc")
+        second = registry.get("https://aur.archlinux.org/cgit/aur.git/plain/PKGBUILD")
+
+        assert first is second
+
+    def test_known_hosts_get_separate_pools(self):
+        """Test that each known host has its own client."""
+        registry = HttpClientRegistry()
+
+        wiki = registry.get("https://wiki.archlinux.org/api.php")
+        aur = registry.get("https://aur.archlinux.org/rpc")
+
+        assert wiki is not aur
+
+    def test_unknown_hosts_share_default_pool(self):
+        """Test that mirror hosts fall back to the shared default client."""
+        registry = HttpClientRegistry()
+
+        mirror_a = registry.get("https://mirror.a.example/core/os/x86_64/core.db")
+        mirror_b = registry.get("https://mirror.b.example/core/os/x86_64/core.db")
+
+        assert mirror_a is mirror_b
+        assert mirror_a is registry.get(None)
+
+    def test_default_pool_sized_for_many_mirrors(self):
+        """Test that the shared mirror pool is not capped at one host's limit."""
+        registry = HttpClientRegistry()
+
+        with patch("arch_ops_server.http_client.httpx.Limits", wraps=httpx.Limits) as limits:
+            registry.get("https://mirror.a.example/core/os/x86_64/core.db")
+            registry.get("https://aur.archlinux.org/rpc")
+
+        default, known = (call.kwargs["max_connections"] for call in limits.call_args_list)
+        assert default == DEFAULT_POOL_MAX_CONNECTIONS
+        assert known == MAX_CONNECTIONS_PER_HOST
+
+    @pytest.mark.asyncio
+    async def test_close_releases_clients(self):
+        """Test that close() closes clients and a new one is created afterwards."""
+        registry = HttpClientRegistry()
+        registry.start()
+
+        client = registry.get("https://archlinux.org/feeds/news/")
+        assert len(registry._clients) == len(KNOWN_HOSTS) + 1
+
+        await registry.close()
+
+        assert client.is_closed
+        assert registry._clients == {}
+        assert registry.get("https://archlinux.org/feeds/news/") is not client
+
+    @pytest.mark.asyncio
+    async def test_lifespan_opens_and_closes(self):
+        """Test the server lifespan helper."""
+        with patch.object(http_clients, "close", new=AsyncMock()) as mock_close:
+            async with http_client_lifespan() as registry:
+                assert registry is http_clients
+                assert DEFAULT_POOL in registry._clients
+
+            mock_close.assert_awaited_once()
@@ -0,0 +1,143 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Tests for arch_ops_server.localdb module.
+"""
+
+import os
+
+import pytest
+
+from arch_ops_server.localdb import (
+    LocalDatabase,
+    dependency_name,
+    parse_desc,
+)
+
+
+class TestParseDesc:
+    """Test alpm desc file parsing."""
+
+    def test_parse_desc_sections(self):
+        """Test parsing single and multi-value sections."""
+        content = "%NAME%\nvim\n\n%DEPENDS%\nglibc\ngpm\n\n%REASON%\n1\n\n"
+
+        sections = parse_desc(content)
+
+        assert sections["NAME"] == ["vim"]
+        assert sections["DEPENDS"] == ["glibc", "gpm"]
+        assert sections["REASON"] == ["1"]
+
+    def test_parse_desc_empty(self):
+        """Test parsing empty content."""
+        assert parse_desc("") == {}
+
+    @pytest.mark.parametrize("depend,expected", [
+        ("glibc", "glibc"),
+        ("glibc>=2.38", "glibc"),
+        ("vim-runtime=9.0-1", "vim-runtime"),
+        ("python: Python language support", "python"),
+        ("libfoo.so=1-64", "libfoo.so"),
+    ])
+    def test_dependency_name(self, depend, expected):
+        """Test stripping version constraints and descriptions."""
+        assert dependency_name(depend) == expected
+
+
+class TestLocalDatabase:
+    """Test the in-memory local database index."""
+
+    def test_load_packages(self, fake_local_db):
+        """Test that all entries are indexed with versions and reasons."""
+        db = LocalDatabase(str(fake_local_db))
+
+        vim = db.get("vim")
+
+        assert len(db.packages()) == 6
+        assert vim["version"] == "9.0.1000-1"
+        assert vim["reason"] == "explicit"
+        assert vim["installed_size"] == 3670016
+        assert db.get("gpm")["reason"] == "dependency"
+
+    def test_required_by(self, fake_local_db):
+        """Test reverse dependencies, including through provides."""
+        db = LocalDatabase(str(fake_local_db))
+
+        assert db.get("vim-runtime")["required_by"] == ["vim"]
+        assert db.get("gpm")["required_by"] == ["vim"]
+        assert db.get("bash")["required_by"] == ["base-tool"]
+        assert db.get("libfoo")["required_by"] == []
+
+    def test_explicit_and_orphans(self, fake_local_db):
+        """Test pacman -Qe and -Qtd equivalents."""
+        db = LocalDatabase(str(fake_local_db))
+
+        explicit = [pkg["name"] for pkg in db.explicit_packages()]
+        orphans = [pkg["name"] for pkg in db.orphan_packages()]
+
+        assert explicit == ["base-tool", "vim"]
+        assert orphans == ["libfoo"]
+
+    def test_groups(self, fake_local_db):
+        """Test group membership index."""
+        db = LocalDatabase(str(fake_local_db))
+
+        assert db.groups() == {"editors": ["vim", "vim-runtime"]}
+
+    def test_files(self, fake_local_db):
+        """Test reading a package file list."""
+        db = LocalDatabase(str(fake_local_db))
+
+        files = db.files("vim")
+
+        assert "/usr/bin/vim" in files
+        assert "/usr/bin/" in files
+        assert db.files("not-installed") is None
+
+    def test_index_is_cached_until_directory_changes(self, fake_local_db):
+        """Test that the index is reused and rebuilt after a change."""
+        db = LocalDatabase(str(fake_local_db))
+
+        first = db.load()
+        assert db.load() is first
+
+        (fake_local_db / "gpm-1.20.7-4" / "desc").unlink()
+        (fake_local_db / "gpm-1.20.7-4" / "files").unlink()
+        (fake_local_db / "gpm-1.20.7-4").rmdir()
+        st = os.stat(fake_local_db)
+        os.utime(fake_local_db, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        assert "gpm" not in db.load()
+
+    def test_invalidate(self, fake_local_db):
+        """Test that invalidate() picks up in-place desc rewrites."""
+        db = LocalDatabase(str(fake_local_db))
+        db.load()
+
+        desc = fake_local_db / "libfoo-1.0-1" / "desc"
+        desc.write_text(desc.read_text().replace("%REASON%\n1\n", "%REASON%\n0\n"))
+        db.invalidate()
+
+        assert db.get("libfoo")["reason"] == "explicit"
+
+    def test_external_desc_rewrite_detected(self, fake_local_db):
+        """Test that pacman -D run outside the server is picked up without invalidate()."""
+        db = LocalDatabase(str(fake_local_db))
+        db.load()
+        directory_st = os.stat(fake_local_db)
+
+        desc = fake_local_db / "libfoo-1.0-1" / "desc"
+        st = desc.stat()
+        desc.write_text(desc.read_text().replace("%REASON%\n1\n", "%REASON%\n0\n"))
+        os.utime(desc, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        os.utime(fake_local_db, ns=(directory_st.st_atime_ns, directory_st.st_mtime_ns))
+
+        assert db.get("libfoo")["reason"] == "explicit"
+        assert "libfoo" not in [pkg["name"] for pkg in db.orphan_packages()]
+
+    def test_missing_database(self, tmp_path):
+        """Test behaviour when the database directory does not exist."""
+        db = LocalDatabase(str(tmp_path / "missing"))
+
+        assert not db.is_available()
+        with pytest.raises(FileNotFoundError):
+            db.load()
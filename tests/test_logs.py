@@ -264,3 +264,230 @@ class TestDatabaseSyncHistory:
         assert "error" in result
         assert result["error"] == "NotSupported"
 
+
+
+MODERN_LOG = """[2025-11-09T10:00:00+0000] [PACMAN] Running 'pacman -Syu'
+[2025-11-09T10:00:00+0000] [PACMAN] synchronizing package lists
+[2025-11-09T10:00:02+0000] [PACMAN] starting full system upgrade
+[2025-11-09T10:00:05+0000] [ALPM] transaction started
+[2025-11-09T10:00:05+0000] [ALPM] upgraded linux (6.6.1-1 -> 6.6.2-1)
+[2025-11-09T10:00:06+0000] [ALPM] installed vim (9.0.1000-1)
+[2025-11-09T10:00:06+0000] [ALPM-SCRIPTLET] installed helper (not a package event)
+[2025-11-09T10:00:07+0000] [ALPM] warning: /etc/pacman.conf installed as /etc/pacman.conf.pacnew
+[2025-11-09T10:00:08+0000] [ALPM] transaction completed
+[2025-11-10T09:00:00+0000] [PACMAN] Running 'pacman -R firefox'
+[2025-11-10T09:00:01+0000] [ALPM] transaction started
+[2025-11-10T09:00:01+0000] [ALPM] removed firefox (120.0-1)
+[2025-11-10T09:00:02+0000] [ALPM] transaction failed
+"""
+
+
+class TestPacmanLogIndex:
+    """Test the incremental pacman log index."""
+
+    @pytest.fixture
+    def log_file(self, tmp_path):
+        """Write the sample log and point the shared index at it."""
+        from arch_ops_server.logs import PacmanLogIndex
+
+        path = tmp_path / "pacman.log"
+        path.write_text(MODERN_LOG)
+        with (
+            patch("arch_ops_server.logs.IS_ARCH", True),
+            patch("arch_ops_server.logs.pacman_log_index", PacmanLogIndex(str(path))) as index,
+        ):
+            yield path, index
+
+    def test_index_contents(self, log_file):
+        """Test events, transactions, syncs and problems from one pass."""
+        _, index = log_file
+
+        index.refresh()
+
+        assert [e["package"] for e in index.events] == ["linux", "vim", "firefox"]
+        assert index.events[0]["timestamp"] == "2025-11-09T10:00:05+0000"
+        assert index.events[0]["version_info"] == "6.6.1-1 -> 6.6.2-1"
+        assert [t["status"] for t in index.transactions] == ["completed", "failed"]
+        assert index.transactions[0]["command"] == "pacman -Syu"
+        assert len(index.transactions[0]["events"]) == 2
+        assert [e["type"] for e in index.sync_events] == ["sync", "full_upgrade"]
+        assert len(index.problems) == 2
+
+    def test_legacy_timestamp_format(self, tmp_path):
+        """Test lines written by older pacman versions."""
+        from arch_ops_server.logs import PacmanLogIndex
+
+        path = tmp_path / "pacman.log"
+        path.write_text(
+            "[2017-03-01 12:00] [ALPM] installed vim (8.0-1)\n"
+            "[2012-01-01 08:00] installed gpm (1.20-1)\n"
+        )
+        index = PacmanLogIndex(str(path))
+
+        index.refresh()
+
+        assert [e["timestamp"] for e in index.events] == ["2017-03-01T12:00:00", "2012-01-01T08:00:00"]
+
+    def test_incremental_refresh(self, log_file):
+        """Test that only appended bytes are parsed."""
+        path, index = log_file
+        first = index.refresh()
+
+        assert index.refresh() == 0
+
+        with open(path, "a") as f:
+            f.write("[2025-11-11T08:00:00+0000] [ALPM] installed git (2.43.0-1)\n")
+            f.write("[2025-11-11T08:00:01+0000] [ALPM] installed ")
+
+        appended = index.refresh()
+
+        assert appended < first
+        assert index.events[-1]["package"] == "git"
+
+        with open(path, "a") as f:
+            f.write("curl (8.5.0-1)\n")
+        index.refresh()
+
+        assert index.events[-1]["package"] == "curl"
+        assert index.offset == path.stat().st_size
+
+    def test_rotation_rebuilds(self, log_file):
+        """Test that a replaced log file is re-indexed from scratch."""
+        path, index = log_file
+        index.refresh()
+
+        replacement = path.with_suffix(".new")
+        replacement.write_text("[2025-12-01T00:00:00+0000] [ALPM] installed zsh (5.9-5)\n")
+        replacement.replace(path)
+        index.refresh()
+
+        assert [e["package"] for e in index.events] == ["zsh"]
+
+    @pytest.mark.asyncio
+    async def test_transaction_history_uses_index(self, log_file):
+        """Test filtered, most-recent-first history."""
+        result = await get_transaction_history(limit=10, transaction_type="all")
+        installs = await get_transaction_history(limit=10, transaction_type="install")
+        limited = await get_transaction_history(limit=1)
+
+        assert [t["package"] for t in result["transactions"]] == ["firefox", "vim", "linux"]
+        assert [t["package"] for t in installs["transactions"]] == ["vim"]
+        assert limited["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_find_when_installed_uses_index(self, log_file):
+        """Test per-package history lookup."""
+        vim = await find_when_installed("vim")
+        firefox = await find_when_installed("firefox")
+
+        assert vim["first_installed"]["timestamp"] == "2025-11-09T10:00:06+0000"
+        assert vim["upgrade_count"] == 0
+        assert firefox["type"] == "NotFound"
+
+    @pytest.mark.asyncio
+    async def test_failed_transactions_reports_interrupted(self, log_file):
+        """Test that non-completed transactions are reported."""
+        result = await find_failed_transactions()
+
+        assert result["has_failures"] is True
+        assert len(result["interrupted_transactions"]) == 1
+        assert result["interrupted_transactions"][0]["command"] == "pacman -R firefox"
+
+    @pytest.mark.asyncio
+    async def test_sync_history_uses_index(self, log_file):
+        """Test most-recent-first sync events."""
+        result = await get_database_sync_history(limit=1)
+
+        assert result["count"] == 1
+        assert result["sync_events"][0]["type"] == "full_upgrade"
+
+
+class TestTailReader:
+    """Test backwards log reading for most-recent-N queries."""
+
+    @pytest.mark.parametrize("block_size", [1, 7, 64, 65536])
+    def test_read_lines_reversed(self, tmp_path, block_size):
+        """Test line order and boundaries for any block size."""
+        from arch_ops_server.logs import read_lines_reversed
+
+        path = tmp_path / "pacman.log"
+        path.write_text("first\nsecond line\n\nthird\n")
+
+        lines = list(read_lines_reversed(str(path), block_size=block_size))
+
+        assert lines == ["third", "second line", "first"]
+
+    def test_read_lines_reversed_unterminated(self, tmp_path):
+        """Test a file whose last line has no newline, and an empty file."""
+        from arch_ops_server.logs import read_lines_reversed
+
+        path = tmp_path / "pacman.log"
+        path.write_text("a\nb")
+        empty = tmp_path / "empty.log"
+        empty.write_text("")
+
+        assert list(read_lines_reversed(str(path), block_size=2)) == ["b", "a"]
+        assert list(read_lines_reversed(str(empty))) == []
+
+    def test_tail_stops_early(self, tmp_path):
+        """Test that a small limit does not read the whole file."""
+        from arch_ops_server.logs import tail_package_events
+
+        path = tmp_path / "pacman.log"
+        filler = "[2025-01-01T00:00:00+0000] [ALPM] installed old (1-1)\n" * 50000
+        path.write_text(filler + MODERN_LOG)
+
+        reads = []
+        real_open = open
+
+        def tracking_open(*args, **kwargs):
+            f = real_open(*args, **kwargs)
+            original_read = f.read
+
+            def read(size=-1):
+                data = original_read(size)
+                reads.append(len(data))
+                return data
+
+            f.read = read
+            return f
+
+        with patch("builtins.open", tracking_open):
+            events = tail_package_events(str(path), ["installed"], 1)
+
+        assert events[0]["package"] == "vim"
+        assert sum(reads) < path.stat().st_size // 10
+
+    @pytest.mark.asyncio
+    async def test_cold_queries_do_not_build_index(self, tmp_path):
+        """Test that history queries on a cold index read the tail only."""
+        from arch_ops_server.logs import PacmanLogIndex
+
+        path = tmp_path / "pacman.log"
+        path.write_text(MODERN_LOG)
+        index = PacmanLogIndex(str(path))
+
+        with (
+            patch("arch_ops_server.logs.IS_ARCH", True),
+            patch("arch_ops_server.logs.pacman_log_index", index),
+        ):
+            cold = await get_transaction_history(limit=2)
+            cold_sync = await get_database_sync_history(limit=5)
+            assert not index.is_loaded()
+
+            index.refresh()
+            warm = await get_transaction_history(limit=2)
+            warm_sync = await get_database_sync_history(limit=5)
+
+        assert cold["transactions"] == warm["transactions"]
+        assert [t["package"] for t in cold["transactions"]] == ["firefox", "vim"]
+        assert cold_sync["sync_events"] == warm_sync["sync_events"]
+
+    def test_find_last_update_timestamp(self, tmp_path):
+        """Test locating the most recent install/upgrade from EOF."""
+        from arch_ops_server.logs import find_last_update_timestamp
+
+        path = tmp_path / "pacman.log"
+        path.write_text(MODERN_LOG)
+
+        assert find_last_update_timestamp(str(path)) == "2025-11-09T10:00:06+0000"
@@ -3,6 +3,10 @@
 Tests for arch_ops_server.mirrors module.
 """
 
+import asyncio
+import itertools
+import json
+import time
 from unittest.mock import AsyncMock, MagicMock, patch, mock_open
 
 import httpx
@@ -11,7 +15,12 @@ import pytest
 from arch_ops_server.mirrors import (
     MIRRORLIST_PATH,
     MIRROR_STATUS_URL,
+    MirrorStatusIndex,
+    benchmark_mirror,
+    benchmark_mirror_throughput,
     list_active_mirrors,
+    probe_mirror,
+    probe_mirrors,
     test_mirror_speed,
     suggest_fastest_mirrors,
     check_mirrorlist_health,
@@ -90,6 +99,39 @@ Server = https://mirror.de1.archlinux.org/$repo/os/$arch
             assert result["error"] == "NotFound"
 
 
+    @pytest.mark.asyncio
+    @patch("arch_ops_server.mirrors.IS_ARCH", True)
+    async def test_list_active_mirrors_shares_pacman_conf_model(self, sample_mirrorlist, tmp_path):
+        """Test that the mirrorlist included by pacman.conf is parsed once for both tools."""
+        from arch_ops_server.config import analyze_pacman_conf
+
+        mirrorlist = tmp_path / "mirrorlist"
+        mirrorlist.write_text(sample_mirrorlist)
+        pacman_conf = tmp_path / "pacman.conf"
+        pacman_conf.write_text(f"[options]\n\n[core]\nInclude = {mirrorlist}\n\n[extra]\nInclude = {mirrorlist}\n")
+
+        real_open = open
+        opened = []
+
+        def tracking_open(path, *args, **kwargs):
+            opened.append(str(path))
+            return real_open(path, *args, **kwargs)
+
+        with patch("arch_ops_server.mirrors.MIRRORLIST_PATH", str(mirrorlist)), \
+             patch("arch_ops_server.mirrors.PACMAN_CONF", str(pacman_conf)), \
+             patch("arch_ops_server.config.PACMAN_CONF", str(pacman_conf)), \
+             patch("arch_ops_server.config.IS_ARCH", True), \
+             patch("builtins.open", tracking_open):
+            conf = await analyze_pacman_conf()
+            result = await list_active_mirrors()
+
+        assert result["active_count"] == 2
+        assert result["commented_count"] == 2
+        assert result["active_mirrors"][0]["url"] == "https://mirror.us1.archlinux.org/$repo/os/$arch"
+        assert conf["server_counts"] == {"core": 2, "extra": 2}
+        assert opened.count(str(mirrorlist)) == 1
+
+
 class TestMirrorSpeed:
     """Test mirror speed testing functionality."""
 
@@ -103,8 +145,8 @@ class TestMirrorSpeed:
         mock_response.status_code = 200
         
         with patch("httpx.AsyncClient") as mock_client, \
-             patch("time.time", side_effect=[0.0, 0.05]):  # 50ms latency
-            mock_client.return_value.__aenter__.return_value.head = AsyncMock(
+             patch("arch_ops_server.mirrors.time.perf_counter", side_effect=itertools.count(0.0, 0.05)):  # 50ms latency
+            mock_client.return_value.head = AsyncMock(
                 return_value=mock_response
             )
             
@@ -122,7 +164,7 @@ class TestMirrorSpeed:
         mirror_url = "https://slow-mirror.example.com/$repo/os/$arch"
         
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.head = AsyncMock(
+            mock_client.return_value.head = AsyncMock(
                 side_effect=httpx.TimeoutException("Timeout")
             )
             
@@ -144,8 +186,8 @@ Server = https://mirror2.example.com/$repo/os/$arch
         
         with patch("builtins.open", mock_open(read_data=mirrorlist)), \
              patch("httpx.AsyncClient") as mock_client, \
-             patch("time.time", side_effect=[0.0, 0.05, 0.1, 0.15]):
-            mock_client.return_value.__aenter__.return_value.head = AsyncMock(
+             patch("arch_ops_server.mirrors.time.perf_counter", side_effect=itertools.count(0.0, 0.05)):
+            mock_client.return_value.head = AsyncMock(
                 return_value=mock_response
             )
             
@@ -163,6 +205,196 @@ Server = https://mirror2.example.com/$repo/os/$arch
         assert "error" in result
         assert result["error"] == "NotSupported"
 
+    @pytest.mark.asyncio
+    async def test_probe_mirror_latency_stats(self):
+        """Test median, p95 and min over several samples."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        # started, then (deadline check, start, end) per sample
+        clock = [0.0, 0.0, 0.0, 0.030, 0.0, 0.0, 0.010, 0.0, 0.0, 0.020]
+
+        with patch("httpx.AsyncClient") as mock_client, \
+             patch("arch_ops_server.mirrors.time.perf_counter", side_effect=clock):
+            mock_client.return_value.head = AsyncMock(return_value=mock_response)
+
+            result = await probe_mirror("https://mirror.example.com/$repo/os/$arch", samples=3)
+
+        assert result["success"] is True
+        assert result["samples"] == 3
+        assert result["latency_ms"] == 20.0
+        assert result["latency_p95_ms"] == 30.0
+        assert result["latency_min_ms"] == 10.0
+        assert mock_client.return_value.head.await_args.args[0] == "https://mirror.example.com/core/os/x86_64/core.db"
+
+    @pytest.mark.asyncio
+    async def test_probe_mirror_stops_on_error_status(self):
+        """Test that a failing mirror is not sampled again."""
+        mock_response = MagicMock()
+        mock_response.status_code = 404
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.head = AsyncMock(return_value=mock_response)
+
+            result = await probe_mirror("https://mirror.example.com/$repo/os/$arch", samples=3)
+
+        assert result["success"] is False
+        assert result["status_code"] == 404
+        assert result["error"] == "HTTP 404"
+        assert mock_client.return_value.head.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_probe_mirrors_concurrent_and_streamed(self):
+        """Test bounded concurrency and completion-order results."""
+        delays = {"slow": 0.2, "fast": 0.01, "medium": 0.1}
+        active = 0
+        peak = 0
+
+        async def head(url, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(delays[url.split("/")[2]])
+            active -= 1
+            response = MagicMock()
+            response.status_code = 200
+            return response
+
+        mirrors = [f"https://{name}/$repo/os/$arch" for name in delays]
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.head = head
+
+            start = time.monotonic()
+            order = [r["mirror"] async for r in probe_mirrors(mirrors, samples=1, concurrency=2)]
+            elapsed = time.monotonic() - start
+
+        assert peak == 2
+        assert order == [
+            "https://fast/$repo/os/$arch",
+            "https://medium/$repo/os/$arch",
+            "https://slow/$repo/os/$arch",
+        ]
+        # Sequential probing would take the sum (0.31s)
+        assert elapsed < 0.3
+
+    @pytest.mark.asyncio
+    async def test_mirror_speed_reports_each_probe(self):
+        """Test that every finished probe is reported as progress, in completion order."""
+        delays = {"slow": 0.05, "fast": 0.0}
+
+        async def head(url, **kwargs):
+            await asyncio.sleep(delays[url.split("/")[2]])
+            response = MagicMock()
+            response.status_code = 200
+            return response
+
+        active = {"active_mirrors": [{"url": f"https://{name}/$repo/os/$arch"} for name in delays]}
+        progress = AsyncMock()
+
+        with patch("arch_ops_server.mirrors.IS_ARCH", True), \
+             patch("arch_ops_server.mirrors.list_active_mirrors", AsyncMock(return_value=active)), \
+             patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.head = head
+
+            result = await test_mirror_speed(samples=1, progress=progress)
+
+        assert result["tested_count"] == 2
+        reports = [call.args for call in progress.await_args_list]
+        assert [(done, total) for done, total, _ in reports] == [(1, 2), (2, 2)]
+        assert reports[0][2].startswith("https://fast/$repo/os/$arch: ")
+
+
+class TestMirrorThroughput:
+    """Test the download throughput benchmark against a local mirror."""
+
+    @pytest.mark.asyncio
+    async def test_benchmark_mirror_range_download(self, fake_mirror):
+        """Test that a bounded byte range is downloaded and timed."""
+        result = await benchmark_mirror(fake_mirror.url, repo="extra", max_bytes=128 * 1024)
+
+        assert result["success"] is True
+        assert result["status_code"] == 206
+        assert result["bytes"] == 128 * 1024
+        assert result["throughput_mb_s"] > 0
+        assert result["ttfb_ms"] >= 0
+        assert result["connect_ms"] is not None
+
+        method, path, headers = fake_mirror.requests[0]
+        assert (method, path) == ("GET", "/extra/os/x86_64/extra.db")
+        assert headers["Range"] == "bytes=0-131071"
+
+    @pytest.mark.asyncio
+    async def test_benchmark_mirror_whole_small_file(self, fake_mirror):
+        """Test that files smaller than the byte budget are read completely."""
+        result = await benchmark_mirror(fake_mirror.url, repo="core", max_bytes=1024 * 1024)
+
+        assert result["success"] is True
+        assert result["bytes"] == 64 * 1024
+
+    @pytest.mark.asyncio
+    async def test_benchmark_mirror_missing_file(self, fake_mirror):
+        """Test a mirror without the requested database."""
+        result = await benchmark_mirror(fake_mirror.url, repo="multilib")
+
+        assert result["success"] is False
+        assert result["status_code"] == 404
+        assert result["error"] == "HTTP 404"
+
+    @pytest.mark.asyncio
+    async def test_rank_suggested_mirrors(self, fake_mirror):
+        """Test ranking suggest_fastest_mirrors candidates by throughput."""
+        root = fake_mirror.url.replace("$repo/os/$arch", "")
+        suggestions = {"mirrors": [
+            {"url": "http://127.0.0.1:9/archlinux/"},  # nothing listens on the discard port
+            {"url": root},
+        ]}
+
+        with patch("arch_ops_server.mirrors.suggest_fastest_mirrors", AsyncMock(return_value=suggestions)):
+            result = await benchmark_mirror_throughput(source="suggested", max_bytes=64 * 1024)
+
+        assert result["tested_count"] == 2
+        assert result["fastest"]["mirror"] == fake_mirror.url
+        assert result["results"][0]["bytes"] == 64 * 1024
+        assert result["results"][1]["success"] is False
+        assert "error" in result["results"][1]
+
+    @pytest.mark.asyncio
+    async def test_results_sorted_by_throughput(self):
+        """Test that faster mirrors come first and failures last."""
+        speeds = {"a": 5.0, "b": None, "c": 40.0}
+
+        async def fake_benchmark(mirror, **kwargs):
+            speed = speeds[mirror]
+            return {"mirror": mirror, "success": speed is not None, "throughput_mb_s": speed}
+
+        with patch("arch_ops_server.mirrors.benchmark_mirror", fake_benchmark), \
+             patch("arch_ops_server.mirrors.IS_ARCH", True), \
+             patch("arch_ops_server.mirrors.list_active_mirrors", AsyncMock(return_value={
+                 "active_mirrors": [{"url": name} for name in speeds]
+             })):
+            result = await benchmark_mirror_throughput()
+
+        assert [r["mirror"] for r in result["results"]] == ["c", "a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_source(self):
+        """Test an unknown candidate source."""
+        result = await benchmark_mirror_throughput(source="nearby")
+
+        assert result["type"] == "InvalidSource"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("max_bytes", [0, -1])
+    async def test_non_positive_max_bytes_rejected(self, max_bytes):
+        """Test that an empty or negative byte budget is rejected before any request."""
+        with patch("arch_ops_server.mirrors.get_http_client") as get_client:
+            single = await benchmark_mirror("https://mirror.example/$repo/os/$arch", max_bytes=max_bytes)
+            ranked = await benchmark_mirror_throughput(mirror_url="https://mirror.example/", max_bytes=max_bytes)
+
+        assert single["type"] == "ValidationError"
+        assert ranked["type"] == "ValidationError"
+        get_client.assert_not_called()
+
 
 class TestMirrorSuggestions:
     """Test mirror suggestion functionality."""
@@ -219,7 +451,7 @@ class TestMirrorSuggestions:
         mock_response.raise_for_status = MagicMock()
         
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
             
@@ -241,7 +473,7 @@ class TestMirrorSuggestions:
         mock_response.raise_for_status = MagicMock()
         
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
             
@@ -260,7 +492,7 @@ class TestMirrorSuggestions:
         mock_response.raise_for_status = MagicMock()
         
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
             
@@ -280,7 +512,7 @@ class TestMirrorSuggestions:
         )
         
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
             
@@ -289,6 +521,70 @@ class TestMirrorSuggestions:
             assert "error" in result
             assert result["error"] == "HTTPError"
 
+    @pytest.mark.asyncio
+    async def test_status_fetched_once_across_countries(self, sample_mirror_status):
+        """Test that queries for different countries reuse one download."""
+        mock_response = MagicMock()
+        mock_response.json = MagicMock(return_value=sample_mirror_status)
+        mock_response.raise_for_status = MagicMock()
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(return_value=mock_response)
+
+            us = await suggest_fastest_mirrors(country="us")
+            de = await suggest_fastest_mirrors(country="DE")
+            everywhere = await suggest_fastest_mirrors(limit=1)
+
+            assert mock_client.return_value.get.await_count == 1
+
+        assert [m["country_code"] for m in us["mirrors"]] == ["US"]
+        assert [m["country_code"] for m in de["mirrors"]] == ["DE"]
+        assert everywhere["total_available"] == 2
+        assert everywhere["mirrors"][0]["country_code"] == "DE"
+
+    @pytest.mark.asyncio
+    async def test_offline_status_file(self, tmp_path, sample_mirror_status):
+        """Test loading a saved status document instead of downloading it."""
+        sample_mirror_status["urls"].append({
+            **sample_mirror_status["urls"][1],
+            "url": "rsync://mirror.de2.archlinux.org/archlinux/",
+            "protocol": "rsync",
+        })
+        status_file = tmp_path / "status.json"
+        status_file.write_text(json.dumps(sample_mirror_status))
+
+        with patch("httpx.AsyncClient") as mock_client:
+            result = await suggest_fastest_mirrors(country="DE", protocol="https", status_file=str(status_file))
+
+            mock_client.return_value.get.assert_not_called()
+
+        assert result["status_source"] == str(status_file)
+        assert [m["url"] for m in result["mirrors"]] == ["https://mirror.de1.archlinux.org/$repo/os/$arch"]
+
+    @pytest.mark.asyncio
+    async def test_offline_status_file_invalid(self, tmp_path):
+        """Test an unreadable status file."""
+        status_file = tmp_path / "status.json"
+        status_file.write_text("not json")
+
+        result = await suggest_fastest_mirrors(status_file=str(status_file))
+
+        assert result["type"] == "MirrorStatusError"
+
+    def test_index_ignores_unusable_mirrors(self, sample_mirror_status):
+        """Test that inactive, unsynced and incomplete mirrors are not indexed."""
+        sample_mirror_status["urls"].append({
+            **sample_mirror_status["urls"][0],
+            "url": "https://partial.example/",
+            "completion_pct": None,
+        })
+
+        index = MirrorStatusIndex(sample_mirror_status, source="test")
+
+        assert index.total_mirrors == 4
+        assert [m["country_code"] for m in index.query()] == ["DE", "US"]
+        assert index.query(country="XX") == []
+
 
 class TestMirrorlistHealth:
     """Test mirrorlist health checking."""
@@ -306,8 +602,8 @@ Server = https://mirror3.example.com/$repo/os/$arch
         
         with patch("builtins.open", mock_open(read_data=mirrorlist)), \
              patch("httpx.AsyncClient") as mock_client, \
-             patch("time.time", side_effect=[0.0, 0.05] * 3):
-            mock_client.return_value.__aenter__.return_value.head = AsyncMock(
+             patch("arch_ops_server.mirrors.time.perf_counter", side_effect=itertools.count(0.0, 0.05)):
+            mock_client.return_value.head = AsyncMock(
                 return_value=mock_response
             )
             
@@ -344,8 +640,8 @@ Server = https://mirror3.example.com/$repo/os/$arch
         
         with patch("builtins.open", mock_open(read_data=mirrorlist)), \
              patch("httpx.AsyncClient") as mock_client, \
-             patch("time.time", side_effect=[0.0, 2.0]):  # 2 second latency
-            mock_client.return_value.__aenter__.return_value.head = AsyncMock(
+             patch("arch_ops_server.mirrors.time.perf_counter", side_effect=itertools.count(0.0, 2.0)):  # 2 second latency
+            mock_client.return_value.head = AsyncMock(
                 return_value=mock_response
             )
             
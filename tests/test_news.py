@@ -59,7 +59,7 @@ class TestNewsRetrieval:
         mock_response.raise_for_status = MagicMock()
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -78,7 +78,7 @@ class TestNewsRetrieval:
         mock_response.raise_for_status = MagicMock()
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -97,7 +97,7 @@ class TestNewsRetrieval:
         )
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -110,7 +110,7 @@ class TestNewsRetrieval:
     async def test_get_latest_news_timeout(self):
         """Test news retrieval with timeout."""
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 side_effect=httpx.TimeoutException("Request timed out")
             )
 
@@ -153,7 +153,7 @@ class TestCriticalNews:
         mock_response.raise_for_status = MagicMock()
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -185,7 +185,7 @@ class TestCriticalNews:
         mock_response.raise_for_status = MagicMock()
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -236,7 +236,7 @@ class TestNewsSinceUpdate:
 
         with patch("httpx.AsyncClient") as mock_client, \
              patch("builtins.open", mock_open(read_data=sample_pacman_log)):
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -265,3 +265,33 @@ class TestNewsSinceUpdate:
             assert "error" in result
             assert result["error"] == "NotFound"
 
+
+
+class TestNewsSinceUpdateLogTail:
+    """Test last-update detection against a real log file."""
+
+    @pytest.mark.asyncio
+    @patch("arch_ops_server.news.IS_ARCH", True)
+    async def test_last_update_from_log_tail(self, tmp_path):
+        """Test that the newest install/upgrade timestamp filters the news."""
+        log = tmp_path / "pacman.log"
+        log.write_text(
+            "[2025-11-08T10:01:00+0000] [ALPM] upgraded linux (6.6.1-1 -> 6.6.2-1)\n"
+            "[2025-11-09T15:30:00+0000] [ALPM] installed test-package (1.0-1)\n"
+            "[2025-11-09T15:31:00+0000] [ALPM] running 'texinfo-install.hook'...\n"
+        )
+        news = {
+            "news": [
+                {"title": "after", "published": "2025-11-10T10:00:00+00:00"},
+                {"title": "before", "published": "2025-11-06T10:00:00+00:00"},
+            ]
+        }
+
+        with (
+            patch("arch_ops_server.news.PACMAN_LOG", str(log)),
+            patch("arch_ops_server.news.get_latest_news", AsyncMock(return_value=news)),
+        ):
+            result = await get_news_since_last_update()
+
+        assert result["last_update"] == "2025-11-09T15:30:00+00:00"
+        assert [item["title"] for item in result["news"]] == ["after"]
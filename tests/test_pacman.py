@@ -3,6 +3,7 @@
 Tests for arch_ops_server.pacman module.
 """
 
+import os
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
@@ -14,7 +15,19 @@ from arch_ops_server.pacman import (
     _parse_pacman_output,
     check_updates_dry_run,
     get_official_package_info,
+    get_official_package_info_batch,
     check_database_freshness,
+    find_package_owner,
+    find_package_owners,
+    list_explicit_packages,
+    list_group_packages,
+    list_installed_packages,
+    list_orphan_packages,
+    list_package_files,
+    list_package_groups,
+    search_package_files,
+    search_package_files_batch,
+    verify_package_integrity,
 )
 
 
@@ -66,7 +79,7 @@ class TestGetOfficialPackageInfo:
             patch("arch_ops_server.pacman.IS_ARCH", False),
             patch("httpx.AsyncClient") as mock_client,
         ):
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -105,7 +118,7 @@ class TestGetOfficialPackageInfo:
             mock_run.return_value = (1, "", "error: package not found")
 
             # Remote query succeeds
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -125,7 +138,7 @@ class TestGetOfficialPackageInfo:
             patch("arch_ops_server.pacman.IS_ARCH", False),
             patch("httpx.AsyncClient") as mock_client,
         ):
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -141,7 +154,7 @@ class TestGetOfficialPackageInfo:
             patch("arch_ops_server.pacman.IS_ARCH", False),
             patch("httpx.AsyncClient") as mock_client,
         ):
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 side_effect=httpx.TimeoutException("Request timed out")
             )
 
@@ -542,3 +555,432 @@ class TestDatabaseFreshness:
             
             assert "error" in result
             assert result["error"] == "NotFound"
+
+
+class TestLocalDatabaseQueries:
+    """Test installed-package queries served from the local database."""
+
+    @pytest.fixture
+    def local_db(self, fake_local_db):
+        """Point the shared local database index at the fake database."""
+        from arch_ops_server.localdb import LocalDatabase
+
+        with patch("arch_ops_server.pacman.local_db", LocalDatabase(str(fake_local_db))) as db:
+            yield db
+
+    @pytest.mark.asyncio
+    async def test_list_explicit_packages(self, local_db):
+        """Test listing explicit packages without running pacman."""
+        with (
+            patch("arch_ops_server.pacman.IS_ARCH", True),
+            patch("arch_ops_server.pacman.run_command") as mock_run,
+        ):
+            result = await list_explicit_packages()
+
+            assert result["package_count"] == 2
+            assert {"name": "vim", "version": "9.0.1000-1"} in result["packages"]
+            mock_run.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_list_orphan_packages(self, local_db):
+        """Test orphan detection from the local database."""
+        with patch("arch_ops_server.pacman.IS_ARCH", True):
+            result = await list_orphan_packages()
+
+            assert result["orphan_count"] == 1
+            assert result["orphans"] == ["libfoo"]
+
+    @pytest.mark.asyncio
+    async def test_list_installed_packages(self, local_db):
+        """Test listing all installed packages."""
+        with patch("arch_ops_server.pacman.IS_ARCH", True):
+            result = await list_installed_packages()
+
+            assert result["package_count"] == 6
+            assert result["packages"][0] == {"name": "base-tool", "version": "2-1"}
+
+    @pytest.mark.asyncio
+    async def test_local_database_missing(self, tmp_path):
+        """Test error when the local database directory is missing."""
+        from arch_ops_server.localdb import LocalDatabase
+
+        with (
+            patch("arch_ops_server.pacman.IS_ARCH", True),
+            patch("arch_ops_server.pacman.local_db", LocalDatabase(str(tmp_path / "missing"))),
+        ):
+            result = await list_explicit_packages()
+
+            assert result["error"] is True
+            assert result["type"] == "NotFound"
+
+
+class TestFileOwnershipQueries:
+    """Test ownership and file-list queries served from the file index."""
+
+    @pytest.fixture
+    def file_index(self, fake_local_db, tmp_path):
+        """Point the shared file ownership index at the fake database."""
+        from arch_ops_server.fileindex import FileOwnershipIndex
+
+        index = FileOwnershipIndex(str(fake_local_db), cache_path=tmp_path / "file-owners.sqlite")
+        with (
+            patch("arch_ops_server.pacman.IS_ARCH", True),
+            patch("arch_ops_server.pacman.file_index", index),
+            patch("arch_ops_server.pacman.run_command") as mock_run,
+        ):
+            yield index
+            mock_run.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_find_package_owner(self, file_index):
+        """Test finding the owner of a file without running pacman."""
+        result = await find_package_owner("/usr/bin/vim")
+
+        assert result["package"] == "vim"
+        assert result["version"] == "9.0.1000-1"
+        assert result["owners"] == [{"package": "vim", "version": "9.0.1000-1"}]
+
+    @pytest.mark.asyncio
+    async def test_find_package_owner_unowned(self, file_index):
+        """Test the error for a file no package owns."""
+        result = await find_package_owner("/usr/bin/unknown")
+
+        assert result["error"] is True
+        assert result["type"] == "NotFound"
+
+    @pytest.mark.asyncio
+    async def test_find_package_owners_batch(self, file_index):
+        """Test looking up several files in one call."""
+        result = await find_package_owners(["/usr/bin/gpm", "/usr/bin/bash", "/usr/bin/unknown"])
+
+        assert result["file_count"] == 3
+        assert result["owned_count"] == 2
+        assert result["owners"]["/usr/bin/gpm"] == [{"package": "gpm", "version": "1.20.7-4"}]
+        assert result["unowned"] == ["/usr/bin/unknown"]
+
+    @pytest.mark.asyncio
+    async def test_list_package_files_filtered(self, file_index):
+        """Test listing a package's files with a regex filter."""
+        result = await list_package_files("vim", r"/bin/")
+
+        assert result["files"] == ["/usr/bin/", "/usr/bin/vim"]
+        assert result["filter_applied"] is True
+
+    @pytest.mark.asyncio
+    async def test_list_package_files_not_installed(self, file_index):
+        """Test the error for a package that is not installed."""
+        result = await list_package_files("not-installed")
+
+        assert result["error"] is True
+        assert result["type"] == "NotFound"
+
+
+class TestFileSearch:
+    """Test repository file search served from the files index."""
+
+    @pytest.fixture
+    def files_index(self, fake_files_db, tmp_path):
+        """Point the shared files index at the fake files databases."""
+        from arch_ops_server.filesdb import FilesIndex
+
+        index = FilesIndex(str(fake_files_db), index_path=tmp_path / "files-index.sqlite")
+        with (
+            patch("arch_ops_server.pacman.IS_ARCH", True),
+            patch("arch_ops_server.pacman.files_index", index),
+        ):
+            yield index
+
+    @pytest.mark.asyncio
+    async def test_search_uses_index(self, files_index, mock_stream_command):
+        """Test that a current index answers without running pacman -F."""
+        files_index.refresh()
+        stream_command = mock_stream_command()
+
+        with patch("arch_ops_server.pacman.stream_command", stream_command):
+            result = await search_package_files("libz.so.1")
+
+        assert stream_command.calls == []
+        assert result["match_count"] == 1
+        assert result["matches"][0] == {
+            "package": "zlib", "repository": "core", "version": "1:1.3-1", "file": "usr/lib/libz.so.1",
+        }
+        assert result["truncated"] is False
+
+    @pytest.mark.asyncio
+    async def test_outdated_index_falls_back_to_pacman(self, files_index, mock_stream_command):
+        """Test that pacman -F answers while the index is refreshed in the background."""
+        stream_command = mock_stream_command("core/zlib 1:1.3-1\n    usr/lib/libz.so.1\n")
+
+        with (
+            patch("arch_ops_server.pacman.check_command_exists", return_value=True),
+            patch("arch_ops_server.pacman.stream_command", stream_command),
+            patch("arch_ops_server.pacman._start_files_index_refresh") as start_refresh,
+        ):
+            result = await search_package_files("libz.so.1")
+
+        assert stream_command.calls == [["pacman", "-F", "libz.so.1"]]
+        start_refresh.assert_called_once()
+        assert result["matches"][0]["package"] == "zlib"
+
+    @pytest.mark.asyncio
+    async def test_glob_waits_for_index(self, files_index):
+        """Test that glob searches (unsupported by pacman -F) build the index first."""
+        with patch("arch_ops_server.pacman.check_command_exists", return_value=True):
+            result = await search_package_files("*.service", match_mode="glob")
+
+        assert result["match_count"] == 1
+        assert files_index.is_current()
+
+    @pytest.mark.asyncio
+    async def test_invalid_regex(self, files_index):
+        """Test the error for an invalid regular expression."""
+        files_index.refresh()
+
+        result = await search_package_files("lib(", match_mode="regex")
+
+        assert result["error"] is True
+        assert result["type"] == "ValidationError"
+
+    @pytest.mark.asyncio
+    async def test_not_synced(self, tmp_path):
+        """Test the error when no files database was synced."""
+        from arch_ops_server.filesdb import FilesIndex
+
+        index = FilesIndex(str(tmp_path / "empty"), index_path=tmp_path / "files-index.sqlite")
+        with (
+            patch("arch_ops_server.pacman.IS_ARCH", True),
+            patch("arch_ops_server.pacman.files_index", index),
+        ):
+            result = await search_package_files("vim")
+
+        assert result["type"] == "DatabaseNotSynced"
+
+    @pytest.mark.asyncio
+    async def test_batch(self, files_index):
+        """Test looking up many file names in one call."""
+        result = await search_package_files_batch(["libz.so.1", "sh", "libmissing.so"])
+
+        assert result["file_count"] == 3
+        assert result["results"]["sh"][0]["package"] == "bash"
+        assert result["not_found"] == ["libmissing.so"]
+
+
+
+class TestVerifyPackageIntegrity:
+    """Test native package verification."""
+
+    @pytest.fixture
+    def verifier(self, fake_local_db, tmp_path):
+        """Verify the fake local database against a root holding its files."""
+        from arch_ops_server.localdb import LocalDatabase
+        from arch_ops_server.verify import IntegrityVerifier
+
+        db = LocalDatabase(str(fake_local_db))
+        root = tmp_path / "root"
+        for pkg in db.packages():
+            for path in db.files(pkg["name"]):
+                full = root / path.lstrip('/')
+                if path.endswith('/'):
+                    full.mkdir(parents=True, exist_ok=True)
+                else:
+                    full.parent.mkdir(parents=True, exist_ok=True)
+                    full.touch()
+
+        verifier = IntegrityVerifier(db, root=str(root), state_path=tmp_path / "verify-state.sqlite")
+        with (
+            patch("arch_ops_server.pacman.IS_ARCH", True),
+            patch("arch_ops_server.pacman.local_db", db),
+            patch("arch_ops_server.pacman.integrity_verifier", verifier),
+        ):
+            yield verifier
+
+    @pytest.mark.asyncio
+    async def test_single_package(self, verifier, mock_stream_command):
+        """Test verifying one package without running pacman."""
+        os.unlink(os.path.join(verifier.root, "usr/bin/gpm"))
+        stream_command = mock_stream_command()
+
+        with patch("arch_ops_server.pacman.stream_command", stream_command):
+            result = await verify_package_integrity("gpm")
+
+        assert result["package"] == "gpm"
+        assert result["issues"] == ["gpm: /usr/bin/gpm (No such file or directory)"]
+        assert result["all_ok"] is False
+        assert result["files_checked"] == 3
+        assert stream_command.calls == []
+
+    @pytest.mark.asyncio
+    async def test_package_not_installed(self, verifier):
+        """Test error for a package that is not installed."""
+        result = await verify_package_integrity("nonexistent")
+
+        assert result["error"] is True
+        assert result["type"] == "NotFound"
+
+    @pytest.mark.asyncio
+    async def test_whole_system(self, verifier):
+        """Test verifying every installed package with progress reports."""
+        progress = AsyncMock()
+
+        result = await verify_package_integrity(progress=progress)
+
+        assert result["scope"] == "system"
+        assert result["packages_checked"] == 6
+        assert result["files_checked"] == 20
+        assert result["all_ok"] is True
+        assert result["packages_with_issues"] == []
+        assert progress.await_args.args[:2] == (6, 6)
+
+    @pytest.mark.asyncio
+    async def test_local_database_missing(self, tmp_path):
+        """Test error when the local database directory is missing."""
+        from arch_ops_server.localdb import LocalDatabase
+
+        with (
+            patch("arch_ops_server.pacman.IS_ARCH", True),
+            patch("arch_ops_server.pacman.local_db", LocalDatabase(str(tmp_path / "missing"))),
+        ):
+            result = await verify_package_integrity("vim")
+
+        assert result["type"] == "NotFound"
+
+class TestSyncDatabaseQueries:
+    """Test official package queries served from the sync databases."""
+
+    @pytest.fixture
+    def sync_db(self, fake_sync_db):
+        """Point the shared sync database index at the fake databases."""
+        from arch_ops_server.syncdb import SyncDatabase
+
+        with patch("arch_ops_server.pacman.sync_db", SyncDatabase(str(fake_sync_db))) as db:
+            yield db
+
+    @pytest.mark.asyncio
+    async def test_get_package_info_from_sync_db(self, sync_db):
+        """Test that the sync database answers without pacman or HTTP."""
+        with (
+            patch("arch_ops_server.pacman.IS_ARCH", False),
+            patch("arch_ops_server.pacman.run_command") as mock_run,
+            patch("httpx.AsyncClient") as mock_client,
+        ):
+            result = await get_official_package_info("vim")
+
+            assert result["source"] == "local"
+            assert result["repository"] == "extra"
+            assert result["version"] == "9.0.1000-1"
+            mock_run.assert_not_called()
+            mock_client.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_package_info_sync_db_miss_uses_remote(self, sync_db, mock_httpx_response):
+        """Test remote fallback for packages missing from the sync databases."""
+        mock_response = mock_httpx_response(status_code=200, json_data={"results": []})
+
+        with (
+            patch("arch_ops_server.pacman.IS_ARCH", False),
+            patch("httpx.AsyncClient") as mock_client,
+        ):
+            mock_client.return_value.get = AsyncMock(return_value=mock_response)
+
+            result = await get_official_package_info("not-in-repos")
+
+            assert result["type"] == "NotFound"
+            mock_client.return_value.get.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_list_package_groups(self, sync_db):
+        """Test listing groups from the sync databases."""
+        with patch("arch_ops_server.pacman.IS_ARCH", True):
+            result = await list_package_groups()
+
+            assert result == {"group_count": 1, "groups": ["editors"]}
+
+    @pytest.mark.asyncio
+    async def test_list_group_packages(self, sync_db):
+        """Test listing group members from the sync databases."""
+        with patch("arch_ops_server.pacman.IS_ARCH", True):
+            result = await list_group_packages("editors")
+            missing = await list_group_packages("nonexistent")
+
+            assert result["packages"] == ["vim", "vim-runtime"]
+            assert missing["type"] == "NotFound"
+
+
+class TestGetOfficialPackageInfoBatch:
+    """Test batched official package lookups."""
+
+    @pytest.mark.asyncio
+    async def test_batch_empty(self):
+        """Test validation of an empty name list."""
+        result = await get_official_package_info_batch([])
+
+        assert result["error"] is True
+        assert result["type"] == "ValidationError"
+
+    @pytest.mark.asyncio
+    async def test_batch_sync_db(self, fake_sync_db):
+        """Test that sync database hits need neither pacman nor HTTP."""
+        from arch_ops_server.syncdb import SyncDatabase
+
+        with (
+            patch("arch_ops_server.pacman.sync_db", SyncDatabase(str(fake_sync_db))),
+            patch("arch_ops_server.pacman.IS_ARCH", False),
+            patch("httpx.AsyncClient") as mock_client,
+        ):
+            result = await get_official_package_info_batch(["vim", "bash", "vim"])
+
+            assert result["package_count"] == 2
+            assert list(result["packages"]) == ["vim", "bash"]
+            assert result["errors"] == {}
+            mock_client.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_single_pacman_invocation(self, sample_pacman_info):
+        """Test that all names go to one pacman -Si call."""
+        gpm_info = sample_pacman_info.replace("Name            : vim", "Name            : gpm")
+
+        with (
+            patch("arch_ops_server.pacman.IS_ARCH", True),
+            patch("arch_ops_server.pacman.check_command_exists", return_value=True),
+            patch("arch_ops_server.pacman.run_command") as mock_run,
+            patch("arch_ops_server.pacman._get_package_info_remote") as mock_remote,
+        ):
+            mock_run.return_value = (
+                1,
+                sample_pacman_info + "\n" + gpm_info,
+                "error: package 'missing' was not found\n",
+            )
+            mock_remote.return_value = {"error": True, "type": "NotFound", "message": "not found"}
+
+            result = await get_official_package_info_batch(["vim", "gpm", "missing"])
+
+            mock_run.assert_called_once()
+            assert mock_run.call_args[0][0] == ["pacman", "-Si", "vim", "gpm", "missing"]
+            assert set(result["packages"]) == {"vim", "gpm"}
+            assert result["packages"]["gpm"]["source"] == "local"
+            assert list(result["errors"]) == ["missing"]
+            mock_remote.assert_called_once_with("missing")
+
+    @pytest.mark.asyncio
+    async def test_batch_remote_concurrent(self, mock_httpx_response):
+        """Test remote lookups with per-package results and errors."""
+        def respond(url, params=None, **kwargs):
+            if params["name"] == "missing":
+                return mock_httpx_response(status_code=200, json_data={"results": []})
+            return mock_httpx_response(
+                status_code=200,
+                json_data={"results": [{"pkgname": params["name"], "repo": "extra"}]},
+            )
+
+        with (
+            patch("arch_ops_server.pacman.IS_ARCH", False),
+            patch("httpx.AsyncClient") as mock_client,
+        ):
+            mock_client.return_value.get = AsyncMock(side_effect=respond)
+
+            result = await get_official_package_info_batch(["vim", "git", "missing"])
+
+            assert mock_client.return_value.get.await_count == 3
+            assert result["found_count"] == 2
+            assert result["packages"]["git"]["name"] == "git"
+            assert result["errors"]["missing"]["type"] == "NotFound"
@@ -0,0 +1,135 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Tests for arch_ops_server.server helpers.
+"""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from arch_ops_server.server import WorkflowStep, read_resource, run_workflow_steps
+
+
+class TestRunWorkflowSteps:
+    """Test the concurrent prompt workflow runner."""
+
+    @pytest.mark.asyncio
+    async def test_independent_steps_run_concurrently(self):
+        """Test that latency is the slowest step, not the sum."""
+        async def slow(value):
+            await asyncio.sleep(0.2)
+            return value
+
+        start = time.monotonic()
+        results = await run_workflow_steps([
+            WorkflowStep("a", lambda: slow(1)),
+            WorkflowStep("b", lambda: slow(2)),
+            WorkflowStep("c", lambda: slow(3)),
+        ])
+        elapsed = time.monotonic() - start
+
+        assert results == {"a": 1, "b": 2, "c": 3}
+        assert elapsed < 0.5
+
+    @pytest.mark.asyncio
+    async def test_timeout_and_failure_are_isolated(self):
+        """Test that a hung or failing step does not affect the others."""
+        async def hang():
+            await asyncio.sleep(10)
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        async def ok():
+            return "ok"
+
+        results = await run_workflow_steps([
+            WorkflowStep("hang", hang, timeout=0.05),
+            WorkflowStep("fail", fail),
+            WorkflowStep("ok", ok),
+        ])
+
+        assert isinstance(results["hang"], asyncio.TimeoutError)
+        assert "hang" in str(results["hang"])
+        assert isinstance(results["fail"], RuntimeError)
+        assert results["ok"] == "ok"
+
+    @pytest.mark.asyncio
+    async def test_dependencies_receive_results(self):
+        """Test that dependent steps wait for and receive their inputs."""
+        order = []
+
+        async def first():
+            await asyncio.sleep(0.05)
+            order.append("first")
+            return 20
+
+        async def second(first):
+            order.append("second")
+            return first + 1
+
+        results = await run_workflow_steps([
+            WorkflowStep("first", first),
+            WorkflowStep("second", second, depends_on=("first",)),
+        ])
+
+        assert results["second"] == 21
+        assert order == ["first", "second"]
+
+    @pytest.mark.asyncio
+    async def test_failed_dependency_skips_dependents(self):
+        """Test that steps depending on a failed step are not run."""
+        called = []
+
+        async def fail():
+            raise OSError("no database")
+
+        async def dependent(source):
+            called.append(source)
+
+        results = await run_workflow_steps([
+            WorkflowStep("source", fail),
+            WorkflowStep("dependent", dependent, depends_on=("source",)),
+        ])
+
+        assert called == []
+        assert "source failed" in str(results["dependent"])
+
+    @pytest.mark.asyncio
+    async def test_unknown_dependency_rejected(self):
+        """Test that a dependency on a later or missing step is an error."""
+        async def ok():
+            return None
+
+        with pytest.raises(ValueError):
+            await run_workflow_steps([
+                WorkflowStep("a", ok, depends_on=("b",)),
+                WorkflowStep("b", ok),
+            ])
+
+
+class TestWikiResource:
+    """Test archwiki:// resource variants."""
+
+    @pytest.mark.asyncio
+    async def test_fragment_selects_sections(self):
+        """Test that archwiki://Page#A|B fetches only those sections."""
+        section = AsyncMock(side_effect=lambda title, name: f"{title}:{name}")
+        with patch("arch_ops_server.server.get_wiki_section", section), \
+             patch("arch_ops_server.server.get_wiki_page_as_text", AsyncMock()) as full_page:
+            result = await read_resource("archwiki://Installation_guide#Pre-installation|Boot%20loader")
+
+        full_page.assert_not_called()
+        assert result == "Installation_guide:Pre-installation\n\nInstallation_guide:Boot loader"
+
+    @pytest.mark.asyncio
+    async def test_sections_query_returns_outline(self):
+        """Test that archwiki://Page?sections returns the outline as JSON."""
+        outline = [{"index": 1, "level": 2, "number": "1", "heading": "Intro", "anchor": "Intro"}]
+        with patch("arch_ops_server.server.get_wiki_sections", AsyncMock(return_value=outline)):
+            result = await read_resource("archwiki://Installation_guide?sections")
+
+        assert json.loads(result) == {"title": "Installation_guide", "sections": outline}
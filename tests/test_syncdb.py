@@ -0,0 +1,201 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Tests for arch_ops_server.syncdb module.
+"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from arch_ops_server.syncdb import (
+    ZSTD_AVAILABLE,
+    SyncDatabase,
+    iter_files_database,
+    read_sync_database,
+)
+
+
+class TestReadSyncDatabase:
+    """Test parsing a single repository database."""
+
+    def test_read_gzip_database(self, fake_sync_db):
+        """Test reading a gzip compressed database."""
+        packages = read_sync_database(str(fake_sync_db / "extra.db"), "extra")
+
+        assert sorted(packages) == ["neovim", "vim", "vim-runtime"]
+        assert packages["vim"]["repository"] == "extra"
+        assert packages["vim"]["depends"] == ["vim-runtime=9.0.1000-1", "gpm"]
+        assert packages["vim"]["licenses"] == ["custom:vim"]
+
+    def test_read_uncompressed_database(self, tmp_path, make_sync_db):
+        """Test reading an uncompressed database."""
+        db = make_sync_db(tmp_path / "local-repo.db", [
+            {"NAME": "foo", "VERSION": "1-1"},
+        ], compression="")
+
+        packages = read_sync_database(str(db), "local-repo")
+
+        assert packages["foo"]["version"] == "1-1"
+
+    def test_read_legacy_depends_file(self, tmp_path):
+        """Test merging the separate depends file of old databases."""
+        import io
+        import tarfile
+
+        db = tmp_path / "old.db"
+        with tarfile.open(db, "w:gz") as archive:
+            for name, content in (
+                ("foo-1-1/desc", "%NAME%\nfoo\n\n%VERSION%\n1-1\n\n"),
+                ("foo-1-1/depends", "%DEPENDS%\nbar\n\n"),
+            ):
+                data = content.encode()
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+
+        packages = read_sync_database(str(db), "old")
+
+        assert packages["foo"]["depends"] == ["bar"]
+
+    @pytest.mark.skipif(not ZSTD_AVAILABLE, reason="zstandard not installed")
+    def test_read_zstd_database(self, tmp_path, make_sync_db):
+        """Test reading a zstd compressed database."""
+        import zstandard
+
+        plain = make_sync_db(tmp_path / "plain.tar", [
+            {"NAME": "foo", "VERSION": "1-1"},
+        ], compression="")
+        db = tmp_path / "zst.db"
+        db.write_bytes(zstandard.ZstdCompressor().compress(plain.read_bytes()))
+
+        packages = read_sync_database(str(db), "zst")
+
+        assert packages["foo"]["version"] == "1-1"
+
+
+class TestIterFilesDatabase:
+    """Test streaming a repository files database."""
+
+    def test_iter_files_database(self, fake_files_db):
+        """Test that every package is yielded with its version and paths."""
+        packages = {name: (version, files) for name, version, files in iter_files_database(
+            str(fake_files_db / "core.files")
+        )}
+
+        assert sorted(packages) == ["bash", "zlib"]
+        assert packages["zlib"][0] == "1:1.3-1"
+        assert "usr/bin/sh" in packages["bash"][1]
+
+
+class TestSyncDatabase:
+    """Test the multi-repository index."""
+
+    def test_get_package(self, fake_sync_db):
+        """Test exact-name lookup across repositories."""
+        db = SyncDatabase(str(fake_sync_db))
+        db.load()
+
+        bash = db.get("bash")
+
+        assert bash["repository"] == "core"
+        assert bash["download_size"] == 1800000
+        assert db.get("vim")["repository"] == "extra"
+        assert db.get("vim", repo="core") is None
+        assert db.get("missing") is None
+
+    def test_repository_order(self, fake_sync_db, make_sync_db):
+        """Test that known repositories are searched in pacman.conf order."""
+        make_sync_db(fake_sync_db / "custom.db", [
+            {"NAME": "vim", "VERSION": "1-1"},
+        ])
+        db = SyncDatabase(str(fake_sync_db))
+
+        assert db.repositories() == ["core", "extra", "custom"]
+        assert db.get("vim")["version"] == "9.0.1000-1"
+
+    def test_unconfigured_repository_skipped(self, fake_sync_db, make_sync_db, tmp_path):
+        """Test that databases of repositories missing from pacman.conf are not indexed."""
+        make_sync_db(fake_sync_db / "community.db", [
+            {"NAME": "leftover", "VERSION": "1-1"},
+        ])
+        pacman_conf = tmp_path / "pacman.conf"
+        pacman_conf.write_text("[options]\nArchitecture = auto\n\n[core]\n\n[extra]\n")
+
+        with patch("arch_ops_server.syncdb.PACMAN_CONF", str(pacman_conf)):
+            db = SyncDatabase(str(fake_sync_db))
+
+            assert db.repositories() == ["core", "extra"]
+            assert db.get("leftover") is None
+
+    def test_repository_order_from_pacman_conf(self, fake_sync_db, make_sync_db, tmp_path):
+        """Test that pacman.conf declaration order decides which repository wins."""
+        make_sync_db(fake_sync_db / "custom.db", [
+            {"NAME": "vim", "VERSION": "1-1"},
+        ])
+        pacman_conf = tmp_path / "pacman.conf"
+        pacman_conf.write_text("[options]\nArchitecture = auto\n\n[custom]\n\n[core]\n\n[extra]\n")
+
+        with patch("arch_ops_server.syncdb.PACMAN_CONF", str(pacman_conf)):
+            db = SyncDatabase(str(fake_sync_db))
+
+            assert db.repositories() == ["custom", "core", "extra"]
+            assert db.get("vim")["version"] == "1-1"
+
+    def test_providers_and_replacements(self, fake_sync_db):
+        """Test the provides and replaces indexes."""
+        db = SyncDatabase(str(fake_sync_db))
+
+        assert [pkg["name"] for pkg in db.providers("sh")] == ["bash"]
+        assert [pkg["name"] for pkg in db.providers("vim>=9")] == ["vim"]
+        assert [pkg["name"] for pkg in db.replacements("vi")] == ["neovim"]
+        assert db.providers("nothing") == []
+
+    def test_groups(self, fake_sync_db):
+        """Test the group index."""
+        db = SyncDatabase(str(fake_sync_db))
+
+        assert db.groups() == {"editors": ["vim", "vim-runtime"]}
+
+    def test_only_changed_repository_is_reread(self, fake_sync_db, make_sync_db):
+        """Test invalidation by database file mtime."""
+        db = SyncDatabase(str(fake_sync_db))
+        first = db.load()
+        core = first["core"]
+
+        extra_db = fake_sync_db / "extra.db"
+        make_sync_db(extra_db, [{"NAME": "vim", "VERSION": "9.1.0-1"}])
+        st = os.stat(extra_db)
+        os.utime(extra_db, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        second = db.load()
+
+        assert second["core"] is core
+        assert db.get("vim")["version"] == "9.1.0-1"
+        assert db.groups() == {}
+
+    def test_removed_repository(self, fake_sync_db):
+        """Test that a deleted database drops out of the index."""
+        db = SyncDatabase(str(fake_sync_db))
+        db.load()
+
+        (fake_sync_db / "extra.db").unlink()
+        db.load()
+
+        assert db.get("vim") is None
+        assert db.repositories() == ["core"]
+
+    def test_corrupt_database_is_skipped(self, fake_sync_db):
+        """Test that an unreadable database does not break other repositories."""
+        (fake_sync_db / "broken.db").write_bytes(b"not a tarball")
+        db = SyncDatabase(str(fake_sync_db))
+
+        assert db.repositories() == ["core", "extra"]
+
+    def test_missing_directory(self, tmp_path):
+        """Test behaviour without a sync directory."""
+        db = SyncDatabase(str(tmp_path / "missing"))
+
+        assert not db.is_available()
+        assert db.load() == {}
+        assert db.get("vim") is None
@@ -3,11 +3,14 @@
 Tests for arch_ops_server.system module.
 """
 
+import os
 from unittest.mock import AsyncMock, MagicMock, patch, mock_open
 
 import pytest
 
 from arch_ops_server.system import (
+    _format_size,
+    _format_uptime,
     get_system_info,
     check_disk_space,
     get_pacman_cache_stats,
@@ -16,52 +19,80 @@ from arch_ops_server.system import (
 )
 
 
+def _statvfs(total_gb: int, free_gb: int, frsize: int = 4096) -> os.statvfs_result:
+    """Build a statvfs result with no root-reserved blocks."""
+    blocks = total_gb * 1024 ** 3 // frsize
+    free = free_gb * 1024 ** 3 // frsize
+    return os.statvfs_result((frsize, frsize, blocks, free, free, 0, 0, 0, 0, 255))
+
+
 class TestSystemInfo:
     """Test system information retrieval."""
 
+    @pytest.fixture
+    def procfs(self, tmp_path):
+        """Point the procfs paths at fake files."""
+        uptime = tmp_path / "uptime"
+        uptime.write_text("183900.52 700000.00\n")
+        meminfo = tmp_path / "meminfo"
+        meminfo.write_text(
+            "MemTotal:       16384000 kB\n"
+            "MemFree:         8192000 kB\n"
+            "MemAvailable:   12288000 kB\n"
+        )
+        uname = os.uname_result(("Linux", "archbox", "6.6.1-arch1-1", "#1 SMP PREEMPT_DYNAMIC", "x86_64"))
+
+        with patch("arch_ops_server.system.PROC_UPTIME", str(uptime)), \
+             patch("arch_ops_server.system.PROC_MEMINFO", str(meminfo)), \
+             patch("arch_ops_server.system.os.uname", return_value=uname):
+            yield tmp_path
+
     @pytest.mark.asyncio
-    async def test_get_system_info_success(self):
+    async def test_get_system_info_success(self, procfs):
         """Test successful system info retrieval."""
-        async def mock_run_command(cmd, **kwargs):
-            if "uname" in cmd and "-r" in cmd:
-                return (0, "6.6.1-arch1-1\n", "")
-            elif "uname" in cmd and "-m" in cmd:
-                return (0, "x86_64\n", "")
-            elif "hostname" in cmd:
-                return (0, "archbox\n", "")
-            elif "uptime" in cmd:
-                return (0, "up 2 days, 3 hours\n", "")
-            return (0, "", "")
-        
-        meminfo_content = """MemTotal:       16384000 kB
-MemFree:         8192000 kB
-MemAvailable:   12288000 kB
-"""
-        
-        with patch("arch_ops_server.system.run_command", mock_run_command), \
-             patch("builtins.open", mock_open(read_data=meminfo_content)):
+        with patch("arch_ops_server.system.stream_command") as mock_run:
             result = await get_system_info()
-            
-            assert result["kernel"] == "6.6.1-arch1-1"
-            assert result["architecture"] == "x86_64"
-            assert result["hostname"] == "archbox"
-            assert "uptime" in result
-            assert result["memory_total_mb"] > 0
+
+        mock_run.assert_not_called()
+        assert result["kernel"] == "6.6.1-arch1-1"
+        assert result["architecture"] == "x86_64"
+        assert result["hostname"] == "archbox"
+        assert result["uptime"] == "up 2 days, 3 hours, 5 minutes"
+        assert result["memory_total_kb"] == 16384000
+        assert result["memory_available_mb"] == 12000
 
     @pytest.mark.asyncio
-    async def test_get_system_info_partial_failure(self):
-        """Test system info with some commands failing."""
-        async def mock_run_command(cmd, **kwargs):
-            if "uname" in cmd and "-r" in cmd:
-                return (0, "6.6.1-arch1-1\n", "")
-            return (1, "", "error")
-        
-        with patch("arch_ops_server.system.run_command", mock_run_command):
+    async def test_get_system_info_bytes(self, procfs):
+        """Test numeric output mode."""
+        result = await get_system_info(human_readable=False)
+
+        assert result["uptime_seconds"] == 183900
+        assert result["memory_total_bytes"] == 16384000 * 1024
+        assert result["memory_available_bytes"] == 12288000 * 1024
+        assert "uptime" not in result
+        assert "memory_total_kb" not in result
+
+    @pytest.mark.asyncio
+    async def test_get_system_info_partial_failure(self, procfs):
+        """Test system info with unreadable procfs files."""
+        with patch("arch_ops_server.system.PROC_UPTIME", str(procfs / "missing")), \
+             patch("arch_ops_server.system.PROC_MEMINFO", str(procfs / "missing")):
             result = await get_system_info()
-            
-            # Should still return partial info
-            assert "kernel" in result
-            assert result["kernel"] == "6.6.1-arch1-1"
+
+        # Should still return partial info
+        assert result["kernel"] == "6.6.1-arch1-1"
+        assert "uptime" not in result
+        assert "memory_total_mb" not in result
+
+    @pytest.mark.parametrize("seconds,expected", [
+        (30, "up 0 minutes"),
+        (61, "up 1 minute"),
+        (90061, "up 1 day, 1 hour, 1 minute"),
+        (8 * 86400, "up 1 week, 1 day"),
+    ])
+    def test_format_uptime(self, seconds, expected):
+        """Test uptime -p style formatting."""
+        assert _format_uptime(seconds) == expected
 
 
 class TestDiskSpace:
@@ -70,51 +101,75 @@ class TestDiskSpace:
     @pytest.mark.asyncio
     async def test_check_disk_space_success(self):
         """Test successful disk space check."""
-        df_output = """Filesystem      Size  Used Avail Use% Mounted on
-/dev/sda1       100G   60G   40G  60% /
-"""
-        async def mock_run_command(cmd, **kwargs):
-            return (0, df_output, "")
-        
-        with patch("arch_ops_server.system.run_command", mock_run_command):
+        with patch("arch_ops_server.system.os.statvfs", return_value=_statvfs(100, 40)), \
+             patch("arch_ops_server.system.stream_command") as mock_run:
             result = await check_disk_space()
-            
-            assert "disk_usage" in result
-            assert "/" in result["disk_usage"]
-            assert result["disk_usage"]["/"]["size"] == "100G"
-            assert result["disk_usage"]["/"]["use_percent"] == "60%"
+
+        mock_run.assert_not_called()
+        assert "disk_usage" in result
+        assert "/" in result["disk_usage"]
+        assert result["disk_usage"]["/"]["size"] == "100G"
+        assert result["disk_usage"]["/"]["available"] == "40G"
+        assert result["disk_usage"]["/"]["use_percent"] == "60%"
+        assert result["disk_usage"]["/"]["mounted_on"] == "/"
+
+    @pytest.mark.asyncio
+    async def test_check_disk_space_bytes(self):
+        """Test numeric output mode."""
+        with patch("arch_ops_server.system.os.statvfs", return_value=_statvfs(100, 40)):
+            result = await check_disk_space(human_readable=False)
+
+        usage = result["disk_usage"]["/"]
+        assert usage["size_bytes"] == 100 * 1024 ** 3
+        assert usage["used_bytes"] == 60 * 1024 ** 3
+        assert usage["available_bytes"] == 40 * 1024 ** 3
+        assert usage["use_percent"] == 60
 
     @pytest.mark.asyncio
     async def test_check_disk_space_critical(self):
         """Test disk space with critical warning."""
-        df_output = """Filesystem      Size  Used Avail Use% Mounted on
-/dev/sda1       100G   95G    5G  95% /
-"""
-        async def mock_run_command(cmd, **kwargs):
-            return (0, df_output, "")
-        
-        with patch("arch_ops_server.system.run_command", mock_run_command):
+        with patch("arch_ops_server.system.os.statvfs", return_value=_statvfs(100, 5)):
             result = await check_disk_space()
-            
-            assert "/" in result["disk_usage"]
-            assert "warning" in result["disk_usage"]["/"]
-            assert "Critical" in result["disk_usage"]["/"]["warning"]
+
+        assert "/" in result["disk_usage"]
+        assert "warning" in result["disk_usage"]["/"]
+        assert "Critical" in result["disk_usage"]["/"]["warning"]
 
     @pytest.mark.asyncio
     async def test_check_disk_space_low(self):
         """Test disk space with low warning."""
-        df_output = """Filesystem      Size  Used Avail Use% Mounted on
-/dev/sda1       100G   85G   15G  85% /
-"""
-        async def mock_run_command(cmd, **kwargs):
-            return (0, df_output, "")
-        
-        with patch("arch_ops_server.system.run_command", mock_run_command):
+        with patch("arch_ops_server.system.os.statvfs", return_value=_statvfs(100, 15)):
             result = await check_disk_space()
-            
-            assert "/" in result["disk_usage"]
-            assert "warning" in result["disk_usage"]["/"]
-            assert "Low" in result["disk_usage"]["/"]["warning"]
+
+        assert "/" in result["disk_usage"]
+        assert "warning" in result["disk_usage"]["/"]
+        assert "Low" in result["disk_usage"]["/"]["warning"]
+
+    @pytest.mark.asyncio
+    async def test_check_disk_space_skips_missing_paths(self):
+        """Test that paths that do not exist are skipped."""
+        def statvfs(path):
+            if path == "/":
+                return _statvfs(100, 40)
+            raise FileNotFoundError(path)
+
+        with patch("arch_ops_server.system.os.statvfs", side_effect=statvfs):
+            result = await check_disk_space()
+
+        assert list(result["disk_usage"]) == ["/"]
+        assert result["paths_checked"] == 1
+
+    @pytest.mark.parametrize("num_bytes,expected", [
+        (0, "0"),
+        (1023, "1023"),
+        (1536, "1.5K"),
+        (int(9.5 * 1024 ** 3), "9.5G"),
+        (1024 ** 3 - 1, "1.0G"),
+        (40 * 1024 ** 3 + 1, "41G"),
+    ])
+    def test_format_size(self, num_bytes, expected):
+        """Test df -h style sizes (rounded up)."""
+        assert _format_size(num_bytes) == expected
 
 
 class TestPacmanCache:
@@ -150,36 +205,31 @@ class TestPacmanCache:
         assert result["error"] == "NotSupported"
 
 
+@pytest.mark.usefixtures("systemd_host")
 class TestFailedServices:
     """Test failed services detection."""
 
     @pytest.mark.asyncio
-    async def test_check_failed_services_none(self):
+    async def test_check_failed_services_none(self, mock_stream_command):
         """Test when no services have failed."""
         systemctl_output = """0 loaded units listed.
 """
-        async def mock_run_command(cmd, **kwargs):
-            return (0, systemctl_output, "")
-        
         with patch("arch_ops_server.system.check_command_exists", return_value=True), \
-             patch("arch_ops_server.system.run_command", mock_run_command):
+             patch("arch_ops_server.system.stream_command", mock_stream_command(systemctl_output)):
             result = await check_failed_services()
             
             assert result["all_ok"] is True
             assert result["failed_count"] == 0
 
     @pytest.mark.asyncio
-    async def test_check_failed_services_some_failed(self):
+    async def test_check_failed_services_some_failed(self, mock_stream_command):
         """Test when some services have failed."""
         systemctl_output = """● docker.service    loaded failed failed Docker Application Container Engine
 ● ssh.service       loaded failed failed OpenSSH server daemon
 2 loaded units listed.
 """
-        async def mock_run_command(cmd, **kwargs):
-            return (0, systemctl_output, "")
-        
         with patch("arch_ops_server.system.check_command_exists", return_value=True), \
-             patch("arch_ops_server.system.run_command", mock_run_command):
+             patch("arch_ops_server.system.stream_command", mock_stream_command(systemctl_output)):
             result = await check_failed_services()
             
             assert result["all_ok"] is False
@@ -200,21 +250,19 @@ class TestFailedServices:
             assert result["error"] == "NotSupported"
 
 
+@pytest.mark.usefixtures("systemd_host")
 class TestBootLogs:
     """Test boot log retrieval."""
 
     @pytest.mark.asyncio
-    async def test_get_boot_logs_success(self):
+    async def test_get_boot_logs_success(self, mock_stream_command):
         """Test successful boot log retrieval."""
         log_output = """Nov 10 10:00:00 archbox kernel: Linux version 6.6.1
 Nov 10 10:00:01 archbox systemd[1]: Starting system...
 Nov 10 10:00:02 archbox systemd[1]: System started successfully
 """
-        async def mock_run_command(cmd, **kwargs):
-            return (0, log_output, "")
-        
         with patch("arch_ops_server.system.check_command_exists", return_value=True), \
-             patch("arch_ops_server.system.run_command", mock_run_command):
+             patch("arch_ops_server.system.stream_command", mock_stream_command(log_output)):
             result = await get_boot_logs(lines=100)
             
             assert result["line_count"] == 3
@@ -222,35 +270,41 @@ Nov 10 10:00:02 archbox systemd[1]: System started successfully
             assert "kernel" in result["logs"][0]
 
     @pytest.mark.asyncio
-    async def test_get_boot_logs_custom_lines(self):
+    async def test_get_boot_logs_custom_lines(self, mock_stream_command):
         """Test boot logs with custom line count."""
         log_output = "\n".join([f"Line {i}" for i in range(50)])
-        
-        async def mock_run_command(cmd, **kwargs):
-            # Check that correct line count was requested
-            assert "-n" in cmd
-            assert "50" in cmd
-            return (0, log_output, "")
+        stream_command = mock_stream_command(log_output)
         
         with patch("arch_ops_server.system.check_command_exists", return_value=True), \
-             patch("arch_ops_server.system.run_command", mock_run_command):
+             patch("arch_ops_server.system.stream_command", stream_command):
             result = await get_boot_logs(lines=50)
             
             assert result["line_count"] == 50
+            # Check that correct line count was requested
+            assert "-n" in stream_command.calls[0]
+            assert "50" in stream_command.calls[0]
 
     @pytest.mark.asyncio
-    async def test_get_boot_logs_failure(self):
+    async def test_get_boot_logs_failure(self, mock_stream_command):
         """Test boot log retrieval failure."""
-        async def mock_run_command(cmd, **kwargs):
-            return (1, "", "journalctl error")
-        
         with patch("arch_ops_server.system.check_command_exists", return_value=True), \
-             patch("arch_ops_server.system.run_command", mock_run_command):
+             patch("arch_ops_server.system.stream_command", mock_stream_command("", 1, "journalctl error")):
             result = await get_boot_logs()
             
             assert "error" in result
             assert result["error"] == "CommandError"
 
+    @pytest.mark.asyncio
+    async def test_get_boot_logs_without_systemd(self, monkeypatch, tmp_path):
+        """Test that hosts not booted with systemd are rejected before running journalctl."""
+        monkeypatch.setattr("arch_ops_server.utils.SYSTEMD_RUNTIME_DIR", str(tmp_path / "missing"))
+        with patch("arch_ops_server.system.check_command_exists", return_value=True), \
+             patch("arch_ops_server.system.stream_command") as stream_command:
+            result = await get_boot_logs()
+
+            assert result["type"] == "NotSupported"
+            stream_command.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_get_boot_logs_no_journalctl(self):
         """Test when journalctl is not available."""
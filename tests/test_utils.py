@@ -11,15 +11,36 @@ import pytest
 
 from arch_ops_server.utils import (
     IS_ARCH,
+    CapabilityRegistry,
     add_aur_warning,
     check_command_exists,
     create_error_response,
     get_aur_helper,
+    get_cache_dir,
     is_arch_linux,
     run_command,
+    stream_command,
 )
 
 
+def process_alive(pid: int) -> bool:
+    """Check whether a process exists and is not a zombie."""
+    try:
+        state = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()[0]
+    except (OSError, IndexError):
+        return False
+    return state != "Z"
+
+
+async def wait_dead(pid: int, timeout: float = 2.0) -> bool:
+    """Wait until a process has exited."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while process_alive(pid) and loop.time() < deadline:
+        await asyncio.sleep(0.02)
+    return not process_alive(pid)
+
+
 class TestPlatformDetection:
     """Test platform detection functionality."""
 
@@ -160,6 +181,96 @@ class TestCommandExecution:
             assert call_count == 1  # Only the test command, not the actual command
 
 
+class TestStreamCommand:
+    """Test streaming command execution."""
+
+    @pytest.mark.asyncio
+    async def test_lines_exit_code_and_stderr(self):
+        """Test that lines, exit status and stderr are reported."""
+        async with stream_command(["sh", "-c", "printf 'a\\n  b\\n'; echo oops >&2; exit 3"]) as stream:
+            lines = [line async for line in stream]
+
+        assert lines == ["a", "  b"]
+        assert stream.exit_code == 3
+        assert stream.stderr == "oops\n"
+        assert stream.truncated is False
+        assert stream.line_count == 2
+
+    @pytest.mark.asyncio
+    async def test_max_lines_truncates_and_kills(self):
+        """Test that reaching the line cap stops the command."""
+        async with stream_command(["seq", "1", "100000000"], max_lines=5) as stream:
+            lines = [line async for line in stream]
+
+        assert lines == ["1", "2", "3", "4", "5"]
+        assert stream.truncated is True
+        assert stream.exit_code is None
+
+    @pytest.mark.asyncio
+    async def test_max_bytes_truncates(self):
+        """Test that reaching the byte cap stops the command."""
+        async with stream_command(["seq", "1", "100000000"], max_bytes=20) as stream:
+            lines = [line async for line in stream]
+
+        # "1\n" .. "9\n" is 18 bytes, "10\n" would exceed the cap
+        assert lines == [str(i) for i in range(1, 10)]
+        assert stream.truncated is True
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_process_group(self):
+        """Test that a timeout kills the command and what it spawned."""
+        with pytest.raises(asyncio.TimeoutError):
+            async with stream_command(["sh", "-c", "sleep 30 & echo $!; wait"], timeout=0.3) as stream:
+                async for line in stream:
+                    grandchild = int(line)
+
+        assert await wait_dead(grandchild)
+
+    @pytest.mark.asyncio
+    async def test_leaving_early_kills(self):
+        """Test that breaking out of the loop stops the command."""
+        async with stream_command(["sh", "-c", "echo $$; exec sleep 30"], timeout=30) as stream:
+            async for line in stream:
+                pid = int(line)
+                break
+
+        assert stream.exit_code is None
+        assert await wait_dead(pid)
+
+    @pytest.mark.asyncio
+    async def test_cancellation_kills(self):
+        """Test that cancelling the consumer stops the command."""
+        started = asyncio.Event()
+        pids = []
+
+        async def consume():
+            async with stream_command(["sh", "-c", "echo $$; exec sleep 30"], timeout=30) as stream:
+                async for line in stream:
+                    pids.append(int(line))
+                    started.set()
+
+        task = asyncio.ensure_future(consume())
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert await wait_dead(pids[0])
+
+    @pytest.mark.asyncio
+    async def test_run_command_timeout_kills_process_group(self, tmp_path):
+        """Test that run_command no longer leaves timed-out children running."""
+        pidfile = tmp_path / "pid"
+        with pytest.raises(asyncio.TimeoutError):
+            await run_command(
+                ["sh", "-c", f"sleep 30 & echo $! > {pidfile}; wait"],
+                timeout=0.3,
+                skip_sudo_check=True
+            )
+
+        assert await wait_dead(int(pidfile.read_text()))
+
+
 class TestErrorHandling:
     """Test error response creation and formatting."""
 
@@ -250,21 +361,127 @@ class TestCommandExistence:
 
     def test_check_command_exists_found(self):
         """Test detecting an existing command."""
-        with patch("os.system", return_value=0):
+        with patch("arch_ops_server.utils.shutil.which", return_value="/usr/bin/ls"):
             result = check_command_exists("ls")
             assert result is True
 
     def test_check_command_exists_not_found(self):
         """Test detecting a missing command."""
-        with patch("os.system", return_value=1):
+        with patch("arch_ops_server.utils.shutil.which", return_value=None):
             result = check_command_exists("nonexistent_command_xyz")
             assert result is False
 
-    def test_check_command_exists_exception(self):
-        """Test handling exceptions during command check."""
-        with patch("os.system", side_effect=Exception("Test error")):
-            result = check_command_exists("test")
-            assert result is False
+    def test_check_command_exists_does_not_fork(self):
+        """Test that lookups never start a shell or subprocess."""
+        with patch("os.system") as mock_system, \
+             patch("asyncio.create_subprocess_exec") as mock_exec:
+            check_command_exists("ls")
+
+        mock_system.assert_not_called()
+        mock_exec.assert_not_called()
+
+
+class TestCapabilityRegistry:
+    """Test the cached capability registry."""
+
+    def test_binaries_are_looked_up_once(self):
+        """Test that repeated checks reuse the first lookup."""
+        registry = CapabilityRegistry()
+        with patch("arch_ops_server.utils.shutil.which", return_value="/usr/bin/pacman") as mock_which:
+            for _ in range(5):
+                assert registry.which("pacman") == "/usr/bin/pacman"
+
+        assert mock_which.call_count == 1
+
+    def test_path_change_invalidates_lookups(self, monkeypatch):
+        """Test that a new PATH triggers a fresh lookup."""
+        registry = CapabilityRegistry()
+        monkeypatch.setenv("PATH", "/usr/bin")
+        with patch("arch_ops_server.utils.shutil.which", side_effect=[None, "/opt/bin/paru"]):
+            assert registry.which("paru") is None
+            monkeypatch.setenv("PATH", "/opt/bin:/usr/bin")
+            assert registry.which("paru") == "/opt/bin/paru"
+
+    def test_refresh_forgets_lookups(self):
+        """Test that refresh() makes the next lookup probe again."""
+        registry = CapabilityRegistry()
+        with patch("arch_ops_server.utils.shutil.which", side_effect=["/usr/bin/yay", "/usr/local/bin/yay"]):
+            assert registry.which("yay") == "/usr/bin/yay"
+            registry.refresh()
+            assert registry.which("yay") == "/usr/local/bin/yay"
+
+    def test_missing_commands_not_cached(self):
+        """Test that a command installed after a failed lookup is found."""
+        registry = CapabilityRegistry()
+        with patch("arch_ops_server.utils.shutil.which", side_effect=[None, "/usr/bin/paru"]):
+            assert registry.which("paru") is None
+            assert registry.which("paru") == "/usr/bin/paru"
+
+    @pytest.mark.asyncio
+    async def test_sudo_success_is_cached(self):
+        """Test that a successful sudo probe is reused within the TTL."""
+        registry = CapabilityRegistry(sudo_ttl=60)
+        process = MagicMock(returncode=0)
+        process.communicate = AsyncMock(return_value=(b"", b""))
+
+        with patch("asyncio.create_subprocess_exec", AsyncMock(return_value=process)) as mock_exec:
+            assert await registry.sudo_ready() is True
+            assert await registry.sudo_ready() is True
+
+        assert mock_exec.call_count == 1
+        assert registry.snapshot()["sudo_cached"] is True
+
+    @pytest.mark.asyncio
+    async def test_sudo_failure_is_not_cached(self):
+        """Test that a failed sudo probe is retried on the next call."""
+        registry = CapabilityRegistry(sudo_ttl=60)
+        process = MagicMock(returncode=1)
+        process.communicate = AsyncMock(return_value=(b"", b"sudo: a password is required"))
+
+        with patch("asyncio.create_subprocess_exec", AsyncMock(return_value=process)) as mock_exec:
+            assert await registry.sudo_ready() is False
+            assert await registry.sudo_ready() is False
+
+        assert mock_exec.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_sudo_success_expires(self):
+        """Test that a cached sudo probe expires after the TTL."""
+        registry = CapabilityRegistry(sudo_ttl=0)
+        process = MagicMock(returncode=0)
+        process.communicate = AsyncMock(return_value=(b"", b""))
+
+        with patch("asyncio.create_subprocess_exec", AsyncMock(return_value=process)) as mock_exec:
+            await registry.sudo_ready()
+            await registry.sudo_ready()
+
+        assert mock_exec.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_pacman_version_probed_once(self):
+        """Test that the pacman version is parsed and remembered."""
+        registry = CapabilityRegistry()
+        output = " .--.                  Pacman v6.1.0 - libalpm v14.0.0\n"
+        mock_run = AsyncMock(return_value=(0, output, ""))
+
+        with patch("arch_ops_server.utils.shutil.which", return_value="/usr/bin/pacman"), \
+             patch("arch_ops_server.utils.run_command", mock_run):
+            assert await registry.pacman_version() == "6.1.0"
+            assert await registry.pacman_version() == "6.1.0"
+
+        assert mock_run.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_pacman_version_without_pacman(self):
+        """Test that no subprocess is started when pacman is missing."""
+        registry = CapabilityRegistry()
+        mock_run = AsyncMock()
+
+        with patch("arch_ops_server.utils.shutil.which", return_value=None), \
+             patch("arch_ops_server.utils.run_command", mock_run):
+            assert await registry.pacman_version() is None
+
+        mock_run.assert_not_called()
 
 
 class TestAURHelper:
@@ -295,3 +512,19 @@ class TestAURHelper:
         with patch("arch_ops_server.utils.check_command_exists", return_value=False):
             result = get_aur_helper()
             assert result is None
+
+
+class TestCacheDir:
+    """Test persistent cache directory resolution."""
+
+    def test_cache_dir_follows_xdg(self, monkeypatch, tmp_path):
+        """Test that XDG_CACHE_HOME is honoured."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+        assert get_cache_dir() == tmp_path / "arch-ops-server"
+
+    def test_cache_dir_default(self, monkeypatch):
+        """Test the ~/.cache fallback."""
+        monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+
+        assert get_cache_dir() == Path.home() / ".cache" / "arch-ops-server"
@@ -0,0 +1,286 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Tests for arch_ops_server.verify module.
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+
+import pytest
+
+from arch_ops_server.localdb import LocalDatabase, parse_desc
+from arch_ops_server.verify import IntegrityVerifier, parse_mtree, verify_package_files
+
+
+def write_mtree(entry_dir, root):
+    """Write the gzip mtree of a local db entry from the files installed under root."""
+    sections = parse_desc((entry_dir / "files").read_text())
+    lines = ["#mtree", "/set type=file uid=0 gid=0 mode=644", "./.PKGINFO time=1.0 size=10"]
+
+    for path in sections.get("FILES", []):
+        relative = path.rstrip('/')
+        full = os.path.join(root, relative)
+        st = os.lstat(full)
+        keywords = [f"uid={st.st_uid}", f"gid={st.st_gid}", f"mode={st.st_mode & 0o7777:o}"]
+        if os.path.islink(full):
+            keywords += ["type=link", f"link={os.readlink(full)}"]
+        elif os.path.isdir(full):
+            keywords.append("type=dir")
+        else:
+            with open(full, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            keywords += [f"time={st.st_mtime:.6f}", f"size={st.st_size}", f"sha256digest={digest}"]
+        lines.append(f"./{relative} " + " ".join(keywords))
+
+    with gzip.open(entry_dir / "mtree", "wt") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+@pytest.fixture
+def installed_root(fake_local_db, tmp_path):
+    """
+    Install the files of every fake local db package under a root directory.
+
+    /usr/share/vim/vimrc is a backup file of vim, and /usr/bin/sh is a
+    symlink to bash.
+    """
+    root = tmp_path / "root"
+    for entry_dir in sorted(fake_local_db.iterdir()):
+        if not entry_dir.is_dir():
+            continue
+        for path in parse_desc((entry_dir / "files").read_text()).get("FILES", []):
+            full = root / path
+            if path.endswith('/'):
+                full.mkdir(parents=True, exist_ok=True)
+            elif path == "usr/bin/sh":
+                full.parent.mkdir(parents=True, exist_ok=True)
+                full.symlink_to("bash")
+            else:
+                full.parent.mkdir(parents=True, exist_ok=True)
+                full.write_text(f"contents of {path}\n")
+
+    vim_entry = fake_local_db / "vim-9.0.1000-1"
+    with open(vim_entry / "files", "a") as f:
+        f.write("%BACKUP%\nusr/share/vim/vimrc\t0123456789abcdef0123456789abcdef\n\n")
+
+    for entry_dir in fake_local_db.iterdir():
+        if entry_dir.is_dir():
+            write_mtree(entry_dir, root)
+    return root
+
+
+@pytest.fixture
+def verifier(fake_local_db, installed_root, tmp_path):
+    """Verifier over the fake local database and installed root."""
+    return IntegrityVerifier(
+        LocalDatabase(str(fake_local_db)),
+        root=str(installed_root),
+        state_path=tmp_path / "verify-state.sqlite",
+        workers=2
+    )
+
+
+class TestParseMtree:
+    """Test mtree parsing."""
+
+    def test_set_unset_and_overrides(self):
+        """Test that /set defaults apply until overridden or unset."""
+        entries = parse_mtree(
+            "#mtree\n"
+            "/set type=file uid=0 gid=0 mode=644\n"
+            "./usr/bin type=dir mode=755\n"
+            "./usr/bin/vim mode=755 size=10 sha256digest=abc\n"
+            "/unset mode\n"
+            "./usr/share/doc size=3\n"
+        )
+
+        assert entries == [
+            {"type": "dir", "uid": "0", "gid": "0", "mode": "755", "path": "usr/bin"},
+            {"type": "file", "uid": "0", "gid": "0", "mode": "755", "size": "10",
+             "sha256digest": "abc", "path": "usr/bin/vim"},
+            {"type": "file", "uid": "0", "gid": "0", "size": "3", "path": "usr/share/doc"},
+        ]
+
+    def test_metadata_skipped_and_escapes_decoded(self):
+        """Test that package metadata is skipped and octal escapes are decoded."""
+        entries = parse_mtree(
+            "./.BUILDINFO time=1.0\n"
+            "./.PKGINFO time=1.0\n"
+            "./usr/share/My\\040Docs type=dir\n"
+            "./usr/lib/link\\040one type=link link=target\\040two\n"
+        )
+
+        assert [entry["path"] for entry in entries] == ["usr/share/My Docs", "usr/lib/link one"]
+        assert entries[1]["link"] == "target two"
+
+
+class TestVerifyPackageFiles:
+    """Test verification of a single package."""
+
+    def test_quick_check_passes(self, fake_local_db, installed_root):
+        """Test that existence checks pass when every file is present."""
+        result = verify_package_files("vim", fake_local_db / "vim-9.0.1000-1", root=str(installed_root))
+
+        assert result["issues"] == []
+        assert result["files_checked"] == 4
+
+    def test_quick_check_reports_missing_file(self, fake_local_db, installed_root):
+        """Test that a deleted file is reported in pacman -Qk wording."""
+        (installed_root / "usr/bin/vim").unlink()
+
+        result = verify_package_files("vim", fake_local_db / "vim-9.0.1000-1", root=str(installed_root))
+
+        assert result["issues"] == ["vim: /usr/bin/vim (No such file or directory)"]
+
+    def test_thorough_check_passes(self, fake_local_db, installed_root):
+        """Test that an untouched package passes every mtree check."""
+        for entry in ("vim-9.0.1000-1", "bash-5.2.21-2"):
+            result = verify_package_files(entry.split('-')[0], fake_local_db / entry, True, str(installed_root))
+            assert result["issues"] == []
+
+    def test_thorough_check_detects_changes(self, fake_local_db, installed_root):
+        """Test size, checksum, permission, mtime and symlink mismatches."""
+        vim = installed_root / "usr/bin/vim"
+        vim.write_text("contents of usr/bin/VIM\n")
+        bash = installed_root / "usr/bin/bash"
+        st = bash.stat()
+        bash.write_text("much longer contents of usr/bin/bash\n")
+        os.utime(bash, ns=(st.st_atime_ns, st.st_mtime_ns))
+        (installed_root / "usr/bin/sh").unlink()
+        (installed_root / "usr/bin/sh").symlink_to("dash")
+        (installed_root / "usr/bin/base-tool").chmod(0o600)
+        os.utime(installed_root / "usr/bin/gpm", (0, 0))
+
+        issues = []
+        for entry in ("vim-9.0.1000-1", "bash-5.2.21-2", "base-tool-2-1", "gpm-1.20.7-4"):
+            result = verify_package_files(entry.rsplit('-', 2)[0], fake_local_db / entry, True, str(installed_root))
+            issues += result["issues"]
+
+        assert "vim: /usr/bin/vim (SHA256 checksum mismatch)" in issues
+        assert "bash: /usr/bin/bash (Size mismatch)" in issues
+        assert "bash: /usr/bin/sh (Symlink path mismatch)" in issues
+        assert "base-tool: /usr/bin/base-tool (Permissions mismatch)" in issues
+        assert "gpm: /usr/bin/gpm (Modification time mismatch)" in issues
+        assert len(issues) == 5
+
+    def test_thorough_check_allows_edited_backup_file(self, fake_local_db, installed_root):
+        """Test that edited configuration files are not reported, like pacman -Qkk."""
+        (installed_root / "usr/share/vim/vimrc").write_text("set number\n")
+
+        result = verify_package_files("vim", fake_local_db / "vim-9.0.1000-1", True, str(installed_root))
+
+        assert result["issues"] == []
+
+    def test_missing_mtree(self, fake_local_db, installed_root):
+        """Test that a package without mtree is reported instead of failing."""
+        (fake_local_db / "gpm-1.20.7-4" / "mtree").unlink()
+
+        result = verify_package_files("gpm", fake_local_db / "gpm-1.20.7-4", True, str(installed_root))
+
+        assert len(result["issues"]) == 1
+        assert result["issues"][0].startswith("gpm: could not read package file list")
+
+
+class TestIntegrityVerifier:
+    """Test parallel whole-system verification."""
+
+    def test_whole_system(self, verifier):
+        """Test that every installed package is verified."""
+        result = verifier.verify(thorough=True)
+
+        assert sorted(result["packages"]) == ["base-tool", "bash", "gpm", "libfoo", "vim", "vim-runtime"]
+        assert all(not checked["issues"] for checked in result["packages"].values())
+        assert result["packages"]["vim"]["version"] == "9.0.1000-1"
+        assert result["not_installed"] == []
+
+    def test_selected_and_unknown_packages(self, verifier):
+        """Test verifying named packages, including ones not installed."""
+        result = verifier.verify(["gpm", "nonexistent"])
+
+        assert list(result["packages"]) == ["gpm"]
+        assert result["not_installed"] == ["nonexistent"]
+
+    def test_unchanged_files_skipped(self, verifier, installed_root):
+        """Test that a second thorough whole-system run only re-checks changed files."""
+        first = verifier.verify(thorough=True)["packages"]["vim"]
+        assert first["files_checked"] == 4
+
+        second = verifier.verify(thorough=True)["packages"]["vim"]
+        assert (second["files_checked"], second["files_skipped"]) == (0, 4)
+
+        (installed_root / "usr/bin/vim").write_text("contents of usr/bin/VIM\n")
+        third = verifier.verify(thorough=True)["packages"]["vim"]
+        assert (third["files_checked"], third["files_skipped"]) == (1, 3)
+        assert third["issues"] == ["vim: /usr/bin/vim (SHA256 checksum mismatch)"]
+
+        # Files with issues are checked again until they pass
+        fourth = verifier.verify(thorough=True)["packages"]["vim"]
+        assert fourth["files_checked"] == 1
+
+    def test_selected_packages_always_fully_checked(self, verifier):
+        """Test that verifying named packages ignores the previous run."""
+        verifier.verify(thorough=True)
+
+        result = verifier.verify(["vim"], thorough=True)["packages"]["vim"]
+
+        assert (result["files_checked"], result["files_skipped"]) == (4, 0)
+
+    def test_full_run_ignores_state(self, verifier):
+        """Test that a full run checks unchanged files again."""
+        verifier.verify(thorough=True)
+
+        full = verifier.verify(thorough=True, full=True)["packages"]["bash"]
+        assert (full["files_checked"], full["files_skipped"]) == (4, 0)
+
+        # The full run rebuilt the state
+        assert verifier.verify(thorough=True)["packages"]["bash"]["files_skipped"] == 4
+
+    def test_state_persisted(self, verifier, fake_local_db, installed_root, tmp_path):
+        """Test that a new verifier reuses the saved state."""
+        verifier.verify(thorough=True)
+
+        restored = IntegrityVerifier(
+            LocalDatabase(str(fake_local_db)),
+            root=str(installed_root),
+            state_path=tmp_path / "verify-state.sqlite"
+        )
+        result = restored.verify(thorough=True)["packages"]["bash"]
+
+        assert result["files_checked"] == 0
+        assert result["files_skipped"] == 4
+
+        restored.clear_state()
+        assert restored.verify(thorough=True)["packages"]["bash"]["files_skipped"] == 0
+
+    def test_corrupt_state_ignored(self, verifier):
+        """Test that an unreadable state file only costs a full check."""
+        verifier.state_file.write_bytes(b"not a database")
+
+        result = verifier.verify(thorough=True)["packages"]["bash"]
+
+        assert (result["files_checked"], result["files_skipped"]) == (4, 0)
+        assert verifier.verify(thorough=True)["packages"]["bash"]["files_skipped"] == 4
+
+    def test_state_of_removed_packages_pruned(self, verifier, fake_local_db):
+        """Test that whole-system runs forget packages that are gone."""
+        verifier.verify(thorough=True)
+        shutil.rmtree(fake_local_db / "gpm-1.20.7-4")
+        st = os.stat(fake_local_db)
+        os.utime(fake_local_db, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        verifier.verify(thorough=True)
+
+        assert "gpm-1.20.7-4" not in verifier._load_state()
+        assert "vim-9.0.1000-1" in verifier._load_state()
+
+    def test_progress_reported(self, verifier):
+        """Test that progress ends with every package done."""
+        calls = []
+
+        verifier.verify(progress=lambda done, total, name: calls.append((done, total, name)))
+
+        assert calls
+        assert calls[-1][:2] == (6, 6)
+        assert all(done <= total for done, total, _ in calls)
@@ -3,6 +3,7 @@
 Tests for arch_ops_server.wiki module.
 """
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
@@ -15,7 +16,10 @@ from arch_ops_server.wiki import (
     _fetch_via_scraping,
     get_wiki_page,
     get_wiki_page_as_text,
+    get_wiki_section,
+    get_wiki_sections,
     search_wiki,
+    stream_wiki_page,
 )
 
 
@@ -40,7 +44,7 @@ class TestWikiSearch:
         )
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -61,7 +65,7 @@ class TestWikiSearch:
         )
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -75,7 +79,7 @@ class TestWikiSearch:
     async def test_search_wiki_timeout(self):
         """Test Wiki search timeout handling."""
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 side_effect=httpx.TimeoutException("Request timed out")
             )
 
@@ -95,7 +99,7 @@ class TestWikiSearch:
             mock_get.side_effect = httpx.HTTPStatusError(
                 "Server error", request=MagicMock(), response=mock_response
             )
-            mock_client.return_value.__aenter__.return_value.get = mock_get
+            mock_client.return_value.get = mock_get
 
             result = await search_wiki("test")
 
@@ -106,7 +110,7 @@ class TestWikiSearch:
     async def test_search_wiki_general_exception(self):
         """Test Wiki search general exception handling."""
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 side_effect=Exception("Network error")
             )
 
@@ -133,7 +137,7 @@ class TestFetchViaAPI:
         )
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -151,7 +155,7 @@ class TestFetchViaAPI:
         )
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -167,7 +171,7 @@ class TestFetchViaAPI:
         )
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -179,7 +183,7 @@ class TestFetchViaAPI:
     async def test_fetch_via_api_exception(self):
         """Test API fetch exception handling."""
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 side_effect=Exception("Connection error")
             )
 
@@ -209,7 +213,7 @@ class TestFetchViaScraping:
         mock_response = mock_httpx_response(status_code=200, text_data=html_content)
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -231,7 +235,7 @@ class TestFetchViaScraping:
             mock_get.side_effect = httpx.HTTPStatusError(
                 "Not found", request=MagicMock(), response=mock_response
             )
-            mock_client.return_value.__aenter__.return_value.get = mock_get
+            mock_client.return_value.get = mock_get
 
             result = await _fetch_via_scraping("NonexistentPage")
 
@@ -245,7 +249,7 @@ class TestFetchViaScraping:
         mock_response = mock_httpx_response(status_code=200, text_data=html_content)
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -257,7 +261,7 @@ class TestFetchViaScraping:
     async def test_fetch_via_scraping_exception(self):
         """Test scraping exception handling."""
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 side_effect=Exception("Network error")
             )
 
@@ -283,7 +287,7 @@ class TestGetWikiPage:
         )
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -315,7 +319,7 @@ class TestGetWikiPage:
             return api_response if call_count == 1 else scraping_response
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 side_effect=mock_get
             )
 
@@ -329,7 +333,7 @@ class TestGetWikiPage:
         """Test page not found raises ValueError."""
         with patch("httpx.AsyncClient") as mock_client:
             # Both API and scraping fail
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 side_effect=Exception("Not found")
             )
 
@@ -345,7 +349,7 @@ class TestGetWikiPage:
         )
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -362,7 +366,7 @@ class TestGetWikiPage:
         )
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -389,7 +393,7 @@ class TestGetWikiPageAsText:
         )
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
 
@@ -397,3 +401,192 @@ class TestGetWikiPageAsText:
 
             assert result is not None
             assert "Content" in result
+
+
+class TestWikiPageCaching:
+    """Test revision-aware caching of converted pages."""
+
+    @pytest.fixture
+    def wiki_api(self, mock_httpx_response):
+        """Fake MediaWiki API recording the actions it serves."""
+        state = {"revid": 100, "calls": []}
+
+        async def fake_get(url, params=None, **kwargs):
+            state["calls"].append(params)
+            if params["action"] == "parse":
+                return mock_httpx_response(status_code=200, json_data={
+                    "parse": {
+                        "title": "Installation guide",
+                        "revid": state["revid"],
+                        "text": {"*": f"<h1>Guide</h1><p>revision {state['revid']}</p>"},
+                    }
+                })
+            titles = params["titles"].split("|")
+            return mock_httpx_response(status_code=200, json_data={
+                "query": {
+                    "normalized": [
+                        {"from": t, "to": t.replace("_", " ")} for t in titles if "_" in t
+                    ],
+                    "pages": [
+                        {"title": t.replace("_", " "), "revisions": [{"revid": state["revid"]}]}
+                        for t in titles
+                    ],
+                }
+            })
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(side_effect=fake_get)
+            yield state
+
+    def actions(self, state):
+        """List the API actions requested so far."""
+        return [params["action"] for params in state["calls"]]
+
+    @pytest.mark.asyncio
+    async def test_recent_page_served_without_request(self, wiki_api):
+        """Test that a just-fetched page is served from the cache."""
+        first = await get_wiki_page("Installation_guide")
+        second = await get_wiki_page("installation guide")
+
+        assert first == second
+        assert "revision 100" in first
+        assert self.actions(wiki_api) == ["parse"]
+
+    @pytest.mark.asyncio
+    async def test_unchanged_revision_not_refetched(self, wiki_api):
+        """Test that an old entry is revalidated with a revision query only."""
+        await get_wiki_page("Installation_guide")
+
+        with patch("arch_ops_server.wiki.WIKI_REVALIDATE_AFTER", 0):
+            with patch("arch_ops_server.wiki.md") as convert:
+                result = await get_wiki_page("Installation_guide")
+
+        convert.assert_not_called()
+        assert "revision 100" in result
+        assert self.actions(wiki_api) == ["parse", "query"]
+
+    @pytest.mark.asyncio
+    async def test_changed_revision_refetched(self, wiki_api):
+        """Test that an edited page is downloaded and converted again."""
+        await get_wiki_page("Installation_guide")
+        wiki_api["revid"] = 101
+
+        with patch("arch_ops_server.wiki.WIKI_REVALIDATE_AFTER", 0):
+            result = await get_wiki_page("Installation_guide")
+
+        assert "revision 101" in result
+        assert self.actions(wiki_api) == ["parse", "query", "parse"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_revalidations_batched(self, wiki_api):
+        """Test that concurrent revalidations share one revision query."""
+        from arch_ops_server.wiki_cache import wiki_page_cache
+
+        for title in ("Pacman", "Systemd", "Installation guide"):
+            wiki_page_cache.store(title, "markdown", 100, f"cached {title}")
+
+        with patch("arch_ops_server.wiki.WIKI_REVALIDATE_AFTER", 0):
+            results = await asyncio.gather(
+                get_wiki_page("Pacman"),
+                get_wiki_page("Systemd"),
+                get_wiki_page("Installation_guide"),
+            )
+
+        assert results == ["cached Pacman", "cached Systemd", "cached Installation guide"]
+        assert self.actions(wiki_api) == ["query"]
+        assert wiki_api["calls"][0]["titles"] == "Pacman|Systemd|Installation guide"
+
+    @pytest.mark.asyncio
+    async def test_cached_copy_served_when_offline(self):
+        """Test that a failed revalidation falls back to the cached page."""
+        from arch_ops_server.wiki_cache import wiki_page_cache
+
+        wiki_page_cache.store("Pacman", "markdown", 100, "cached pacman")
+
+        with patch("arch_ops_server.wiki.WIKI_REVALIDATE_AFTER", 0), \
+             patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(side_effect=httpx.ConnectError("offline"))
+            result = await get_wiki_page("Pacman")
+
+        assert result == "cached pacman"
+
+
+class TestWikiSections:
+    """Test section outline, section retrieval and streaming."""
+
+    SECTIONS = [
+        {"index": "1", "level": "2", "number": "1", "line": "Pre-installation", "anchor": "Pre-installation"},
+        {"index": "2", "level": "3", "number": "1.1", "line": "Boot the <i>live</i> environment", "anchor": "Boot_the_live_environment"},
+        {"index": "3", "level": "2", "number": "2", "line": "Installation", "anchor": "Installation"},
+        {"index": "T-1", "level": "2", "number": "3", "line": "From a template", "anchor": "From_a_template"},
+    ]
+
+    @pytest.fixture
+    def wiki_api(self, mock_httpx_response):
+        """Fake parse API serving the outline and individual sections."""
+        calls = []
+
+        async def fake_get(url, params=None, **kwargs):
+            calls.append(dict(params))
+            if params["prop"] == "sections|revid":
+                return mock_httpx_response(status_code=200, json_data={
+                    "parse": {"title": "Installation guide", "revid": 5, "sections": self.SECTIONS}
+                })
+            section = params.get("section", "all")
+            return mock_httpx_response(status_code=200, json_data={
+                "parse": {"revid": 5, "text": {"*": f"<h2>Part {section}</h2><p>body of {section}</p>"}}
+            })
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(side_effect=fake_get)
+            yield calls
+
+    @pytest.mark.asyncio
+    async def test_get_wiki_sections(self, wiki_api):
+        """Test outline parsing (template sections skipped, markup stripped)."""
+        sections = await get_wiki_sections("Installation_guide")
+
+        assert [s["index"] for s in sections] == [1, 2, 3]
+        assert sections[1]["heading"] == "Boot the live environment"
+        assert sections[1]["level"] == 3
+
+        # The outline is cached with the page revision
+        await get_wiki_sections("Installation_guide")
+        assert len(wiki_api) == 1
+
+    @pytest.mark.asyncio
+    async def test_get_wiki_section_by_heading_or_anchor(self, wiki_api):
+        """Test that only the matching section is requested."""
+        by_heading = await get_wiki_section("Installation_guide", "boot the live environment")
+        by_anchor = await get_wiki_section("Installation_guide", "Boot_the_live_environment")
+        by_index = await get_wiki_section("Installation_guide", "2")
+
+        assert "body of 2" in by_heading
+        assert by_heading == by_anchor == by_index
+        assert [c.get("section") for c in wiki_api] == [None, "2"]
+
+    @pytest.mark.asyncio
+    async def test_get_wiki_section_missing(self, wiki_api):
+        """Test that an unknown section lists the available ones."""
+        with pytest.raises(ValueError, match="Pre-installation, Installation"):
+            await get_wiki_section("Installation_guide", "Nope")
+
+    @pytest.mark.asyncio
+    async def test_stream_wiki_page(self, wiki_api):
+        """Test that the lead and top-level sections are yielded in order."""
+        parts = [part async for part in stream_wiki_page("Installation_guide")]
+
+        assert [p["index"] for p in parts] == [0, 1, 3]
+        assert parts[0]["heading"] == "Installation guide"
+        assert "body of 3" in parts[2]["content"]
+
+    @pytest.mark.asyncio
+    async def test_stream_wiki_page_stops_early(self, wiki_api):
+        """Test that a consumer stopping early skips the remaining sections."""
+        stream = stream_wiki_page("Installation_guide")
+        first = await stream.__anext__()
+        await stream.aclose()
+
+        assert first["index"] == 0
+        requested = [c.get("section") for c in wiki_api if "section" in c]
+        assert "3" not in requested
@@ -0,0 +1,76 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Tests for arch_ops_server.wiki_cache module.
+"""
+
+import os
+
+from arch_ops_server.wiki_cache import WikiPageCache, normalize_title
+
+
+class TestNormalizeTitle:
+    """Test MediaWiki title normalization."""
+
+    def test_underscores_and_case(self):
+        """Test that spelling variants of a title normalize the same."""
+        assert normalize_title("installation_guide") == "Installation guide"
+        assert normalize_title(" Installation   guide ") == "Installation guide"
+        assert normalize_title("systemd") == "Systemd"
+
+
+class TestWikiPageCache:
+    """Test the two-tier wiki page store."""
+
+    def test_store_and_get(self, tmp_path):
+        """Test that stored pages are found under any title spelling."""
+        cache = WikiPageCache(tmp_path)
+        cache.store("Installation_guide", "markdown", 42, "# Guide")
+
+        entry = cache.get("installation guide", "markdown")
+
+        assert entry["revid"] == 42
+        assert entry["content"] == "# Guide"
+        assert cache.get("Installation_guide", "html") is None
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Test that a new cache instance reads entries written by another."""
+        WikiPageCache(tmp_path).store("Pacman", "markdown", 7, "pacman page")
+
+        entry = WikiPageCache(tmp_path).get("Pacman", "markdown")
+
+        assert entry["revid"] == 7
+        assert entry["content"] == "pacman page"
+
+    def test_memory_tier_bounded(self, tmp_path):
+        """Test that the memory tier evicts least recently used pages."""
+        cache = WikiPageCache(tmp_path, memory_bytes=25)
+        cache.store("A", "markdown", 1, "a" * 10)
+        cache.store("B", "markdown", 1, "b" * 10)
+        cache.get("A", "markdown")
+        cache.store("C", "markdown", 1, "c" * 10)
+
+        assert list(cache._entries) == ["markdown:A", "markdown:C"]
+        # Evicted pages are still served from disk
+        assert cache.get("B", "markdown")["content"] == "b" * 10
+
+    def test_disk_tier_bounded(self, tmp_path):
+        """Test that the oldest disk entries are removed over the size bound."""
+        cache = WikiPageCache(tmp_path, disk_bytes=1000)
+        for index, title in enumerate(("Old", "Middle", "New")):
+            cache.store(title, "markdown", 1, title[0] * 400)
+            path = cache._path(cache._key(title, "markdown"))
+            os.utime(path, ns=(index * 10**9, index * 10**9))
+        cache.store("Newest", "markdown", 1, "n" * 400)
+
+        cache._entries.clear()
+        assert cache.get("Old", "markdown") is None
+        assert cache.get("Newest", "markdown") is not None
+
+    def test_corrupt_entry_ignored(self, tmp_path):
+        """Test that an unreadable disk entry is a cache miss."""
+        cache = WikiPageCache(tmp_path)
+        cache.store("Pacman", "markdown", 7, "page")
+        cache._path(cache._key("Pacman", "markdown")).write_text("{not json")
+        cache._entries.clear()
+
+        assert cache.get("Pacman", "markdown") is None
@@ -0,0 +1,150 @@
+# SPDX-License-Identifier: GPL-3.0-only OR MIT
+"""
+Tests for arch_ops_server.wiki_index module.
+"""
+
+import bz2
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from arch_ops_server.wiki import search_wiki
+from arch_ops_server.wiki_index import (
+    WikiIndex,
+    _strip_wikitext,
+    build_wiki_index,
+)
+
+
+def write_page(directory, name, title, body):
+    """Write an arch-wiki-docs style HTML page."""
+    (directory / f"{name}.html").write_text(
+        f"<html><head><title>{title} - ArchWiki</title></head><body>"
+        f"<h1 id=\"firstHeading\">{title}</h1>"
+        f"<div id=\"bodyContent\"><p>{body}</p><script>var ignored = 1;</script></div>"
+        "</body></html>"
+    )
+
+
+@pytest.fixture
+def html_tree(tmp_path):
+    """Small arch-wiki-docs HTML tree."""
+    tree = tmp_path / "html" / "en"
+    tree.mkdir(parents=True)
+    write_page(tree, "Pacman", "Pacman", "The package manager. Use pacman -Syu to upgrade the system.")
+    write_page(tree, "Systemd", "Systemd", "The init system. It can also upgrade itself after pacman runs.")
+    write_page(tree, "Installation_guide", "Installation guide", "Partition the disks and install the base package.")
+    (tree / "Package_manager.html").write_text(
+        '<html><head><meta http-equiv="refresh" content="0; url=Pacman.html"></head></html>'
+    )
+    return tree
+
+
+class TestBuildIndex:
+    """Test building the index from the supported sources."""
+
+    def test_build_from_html_tree(self, html_tree, tmp_path):
+        """Test that pages are indexed and redirect stubs skipped."""
+        result = build_wiki_index(str(html_tree), str(tmp_path / "index.sqlite"))
+
+        assert result["pages"] == 3
+        index = WikiIndex(tmp_path / "index.sqlite")
+        assert index.info()["page_count"] == "3"
+        assert not (tmp_path / "index.sqlite.tmp").exists()
+
+    def test_build_from_xml_dump(self, tmp_path):
+        """Test that a compressed dump is indexed (main namespace, no redirects)."""
+        dump = tmp_path / "archwiki.xml.bz2"
+        dump.write_bytes(bz2.compress(b"""<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/">
+  <page><title>Pacman</title><ns>0</ns>
+    <revision><text>'''pacman''' is the [[Arch Linux|Arch]] {{ic|package {{Nested|manager}}}} tool.</text></revision>
+  </page>
+  <page><title>Package manager</title><ns>0</ns><redirect title="Pacman"/>
+    <revision><text>#REDIRECT [[Pacman]]</text></revision>
+  </page>
+  <page><title>Talk:Pacman</title><ns>1</ns>
+    <revision><text>Discussion about pacman</text></revision>
+  </page>
+</mediawiki>"""))
+
+        result = build_wiki_index(str(dump), str(tmp_path / "index.sqlite"))
+
+        assert result["pages"] == 1
+        results = WikiIndex(tmp_path / "index.sqlite").search("arch tool")
+        assert [r["title"] for r in results] == ["Pacman"]
+
+    def test_missing_source(self, tmp_path):
+        """Test that a missing source raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            build_wiki_index(str(tmp_path / "missing"), str(tmp_path / "index.sqlite"))
+
+    def test_strip_wikitext(self):
+        """Test reduction of wikitext markup to plain words."""
+        text = "== Usage ==\n'''Bold''' [[Target|label]] [[Category:Package management]] {{Note|{{ic|x}}}} <ref>cite</ref>"
+        assert _strip_wikitext(text) == "Usage Bold label"
+
+
+class TestSearchIndex:
+    """Test ranked search over a built index."""
+
+    @pytest.fixture
+    def index(self, html_tree, tmp_path):
+        """Index built from the sample HTML tree."""
+        build_wiki_index(str(html_tree), str(tmp_path / "index.sqlite"))
+        return WikiIndex(tmp_path / "index.sqlite")
+
+    def test_title_matches_rank_first(self, index):
+        """Test that a title match outranks a body mention."""
+        results = index.search("pacman")
+
+        assert [r["title"] for r in results] == ["Pacman", "Systemd"]
+        assert "pacman" in results[0]["snippet"].lower()
+        assert "ignored" not in results[0]["snippet"]
+
+    def test_stemming_and_prefix(self, index):
+        """Test porter stemming and prefix matching of the last word."""
+        assert [r["title"] for r in index.search("upgrading")] == ["Pacman", "Systemd"]
+        assert [r["title"] for r in index.search("partit")] == ["Installation guide"]
+
+    def test_falls_back_to_any_word(self, index):
+        """Test that pages matching only some words are returned if none match all."""
+        results = index.search("partition kernelmodules")
+
+        assert [r["title"] for r in results] == ["Installation guide"]
+
+    def test_query_syntax_is_not_interpreted(self, index):
+        """Test that FTS5 operators in user input are treated as words."""
+        assert index.search('pacman" OR NEAR(') == index.search("pacman OR NEAR")
+        assert index.search("***") == []
+
+
+class TestSearchWikiBackend:
+    """Test search_wiki backend selection."""
+
+    @pytest.mark.asyncio
+    async def test_uses_local_index(self, html_tree, isolated_wiki_index):
+        """Test that a built index answers without network access."""
+        build_wiki_index(str(html_tree), str(isolated_wiki_index.path))
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(side_effect=AssertionError("network used"))
+            result = await search_wiki("installation", limit=5)
+
+        assert result["source"] == "index"
+        assert result["results"][0]["title"] == "Installation guide"
+        assert result["results"][0]["url"] == "https://wiki.archlinux.org/title/Installation_guide"
+
+    @pytest.mark.asyncio
+    async def test_no_local_match_uses_api(self, html_tree, isolated_wiki_index, mock_httpx_response):
+        """Test that the API is queried when the index has no match."""
+        build_wiki_index(str(html_tree), str(isolated_wiki_index.path))
+        response = mock_httpx_response(status_code=200, json_data=[
+            "nvidia", ["NVIDIA"], [""], ["https://wiki.archlinux.org/title/NVIDIA"]
+        ])
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(return_value=response)
+            result = await search_wiki("nvidia")
+
+        assert result["source"] == "api"
+        assert result["results"][0]["title"] == "NVIDIA"